@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+import json
+import sys
+
+from sem6000 import benchmark
+
+
+def _print_usage():
+    print("Usage: " + sys.argv[0] + " [-o <results.json>] [-b <baseline.json>] [-k <name filter>] [-r <repeat>]", file=sys.stderr)
+    print("", file=sys.stderr)
+    print("Runs the benchmarks and writes the results as JSON to stdout or <results.json>.", file=sys.stderr)
+    print("If a baseline is given, benchmarks exceeding their threshold are listed and the exit code is 1.", file=sys.stderr)
+
+
+def _print_progress(name, result):
+    line = "{:<64}{:>14.2f} us{:>14.0f} ops/s".format(name, result['seconds_per_operation'] * 1000000, result['operations_per_second'])
+    if 'allocated_bytes_per_operation' in result:
+        line += "{:>14.1f} bytes".format(result['allocated_bytes_per_operation'])
+
+    print(line, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    output_filename = None
+    baseline_filename = None
+    name_filter = None
+    repeat = 5
+
+    args = sys.argv[1:]
+    while len(args):
+        option = args.pop(0)
+        if not option in ['-o', '-b', '-k', '-r'] or not len(args):
+            _print_usage()
+            sys.exit(2)
+
+        value = args.pop(0)
+        if option == '-o':
+            output_filename = value
+        elif option == '-b':
+            baseline_filename = value
+        elif option == '-k':
+            name_filter = value
+        elif option == '-r':
+            repeat = int(value)
+
+    baseline = None
+    if not baseline_filename is None:
+        baseline = benchmark.load_results(baseline_filename)
+
+    results = benchmark.run_benchmarks(name_filter=name_filter, repeat=repeat, progress=_print_progress)
+
+    if output_filename is None:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        benchmark.save_results(results, output_filename)
+
+    if not baseline is None:
+        regressions = benchmark.compare_results(baseline, results)
+
+        for name, baseline_seconds_per_operation, seconds_per_operation, ratio in regressions:
+            print("regression: " + name + " " + "{:.2f}".format(baseline_seconds_per_operation * 1000000) + " us -> " + "{:.2f}".format(seconds_per_operation * 1000000) + " us (" + "{:+.0f}".format((ratio - 1) * 100) + "%)", file=sys.stderr)
+
+        if len(regressions):
+            sys.exit(1)
+
+        print("no regressions compared to " + baseline_filename, file=sys.stderr)
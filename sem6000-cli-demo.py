@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 
 from sem6000 import sem6000
+from sem6000 import daemon
 from sem6000.message import *
 from sem6000 import util
 
@@ -10,9 +11,8 @@ import sys
 
 if __name__ == '__main__':
     if len(sys.argv) == 2 and sys.argv[1] == 'discover':    
-        devices = sem6000.SEM6000.discover()
-        for device in devices:
-            print(device['name'] + '\t' + device['address'])
+        for device in sem6000.SEM6000.discover_incrementally():
+            print(str(device['name']) + '\t' + device['address'], flush=True)
     elif len(sys.argv) < 2:
         scriptname = sys.argv[0]
         print("Usage:" , file=sys.stderr)
@@ -106,7 +106,11 @@ if __name__ == '__main__':
         pin = sys.argv[2]
         cmd = sys.argv[3]
 
-        sem6000 = sem6000.SEM6000(deviceAddr, debug=True)
+        # a running sem6000d keeps the connection open, which saves connecting and authorizing on every call
+        if daemon.is_daemon_running():
+            sem6000 = daemon.SEM6000DaemonClient(deviceAddr)
+        else:
+            sem6000 = sem6000.SEM6000(deviceAddr, debug=True)
 
         if cmd != 'reset_pin' and cmd != 'get_device_name':
             sem6000.authorize(pin)
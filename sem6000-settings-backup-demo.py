@@ -16,9 +16,13 @@ else:
 
     device_name_response = device.request_device_name()
 
-    settings_response = device.request_settings()
-    timer_response = device.request_timer_status()
-    random_mode_response = device.request_random_mode_status()
+    # requested at once instead of waiting for each response
+    responses = device.send_many([RequestSettingsCommand(), RequestTimerStatusCommand(), RequestRandomModeStatusCommand()])
+    for response in responses:
+        if isinstance(response, Exception):
+            raise response
+
+    settings_response, timer_response, random_mode_response = responses
     scheduler_response = device.request_scheduler()
 
     data = {}
@@ -0,0 +1,534 @@
+from abc import *
+import datetime
+
+from .message import *
+from . import util
+
+
+# notification class the device responds with to each command class
+NOTIFICATION_CLASS_BY_COMMAND_CLASS = {
+    AuthorizeCommand: AuthorizedNotification,
+    ChangePinCommand: PinChangedNotification,
+    ResetPinCommand: PinResetNotification,
+    PowerSwitchCommand: PowerSwitchedNotification,
+    ChangeNightmodeCommand: NightmodeChangedNotification,
+    SynchronizeDateAndTimeCommand: DateAndTimeChangedNotification,
+    RequestSettingsCommand: SettingsRequestedNotification,
+    ChangePowerLimitCommand: PowerLimitChangedNotification,
+    ChangePricesCommand: PricesChangedNotification,
+    ChangeReducedPeriodCommand: ReducedPeriodChangedNotification,
+    RequestTimerStatusCommand: TimerStatusRequestedNotification,
+    SetTimerCommand: TimerSetNotification,
+    RequestSchedulerCommand: SchedulerRequestedNotification,
+    AddSchedulerCommand: SchedulerChangedNotification,
+    EditSchedulerCommand: SchedulerChangedNotification,
+    RemoveSchedulerCommand: SchedulerChangedNotification,
+    RequestRandomModeStatusCommand: RandomModeStatusRequestedNotification,
+    ChangeRandomModeCommand: RandomModeChangedNotification,
+    RequestMeasurementCommand: MeasurementRequestedNotification,
+    RequestConsumptionOfLast12MonthsCommand: ConsumptionOfLast12MonthsRequestedNotification,
+    RequestConsumptionOfLast30DaysCommand: ConsumptionOfLast30DaysRequestedNotification,
+    RequestConsumptionOfLast23HoursCommand: ConsumptionOfLast23HoursRequestedNotification,
+    ResetConsumptionCommand: ConsumptionResetNotification,
+    FactoryResetCommand: FactoryResetNotification,
+    ChangeDeviceNameCommand: DeviceNameChangedNotification,
+    RequestDeviceSerialCommand: DeviceSerialRequestedNotification,
+}
+
+# commands which do not change the state of the device
+READ_COMMAND_CLASSES = (
+    RequestSettingsCommand,
+    RequestTimerStatusCommand,
+    RequestSchedulerCommand,
+    RequestRandomModeStatusCommand,
+    RequestMeasurementCommand,
+    RequestConsumptionOfLast12MonthsCommand,
+    RequestConsumptionOfLast30DaysCommand,
+    RequestConsumptionOfLast23HoursCommand,
+    RequestDeviceSerialCommand,
+)
+
+
+def check_scheduler_page(notification, page_number):
+    """
+    Returns the notification if it is a page of schedulers, raises an Exception otherwise.
+    """
+    if not isinstance(notification, SchedulerRequestedNotification):
+        if page_number == 0:
+            raise Exception('Request scheduler 1st page failed')
+        raise Exception('Request scheduler page ' + str(page_number) + ' failed')
+
+    return notification
+
+
+def merge_scheduler_pages(notifications):
+    """
+    Returns a SchedulerRequestedNotification having the scheduler entries of all pages ordered by their slot id.
+
+    Parameters:
+        notifications   - SchedulerRequestedNotification of each page, the first page first
+    """
+    number_of_schedulers = None
+
+    # pages may arrive in any order, entries are identified by their slot id
+    scheduler_entry_by_slot_id = {}
+    for notification in notifications:
+        if number_of_schedulers is None:
+            number_of_schedulers = notification.number_of_schedulers
+
+        for scheduler_entry in notification.scheduler_entries:
+            scheduler_entry_by_slot_id.setdefault(scheduler_entry.slot_id, scheduler_entry)
+
+    scheduler_entries = [scheduler_entry_by_slot_id[slot_id] for slot_id in sorted(scheduler_entry_by_slot_id)]
+
+    return SchedulerRequestedNotification(number_of_schedulers=number_of_schedulers, scheduler_entries=scheduler_entries)
+
+
+class AbstractSEM6000(ABC):
+    """
+    Commands of the remote device shared by SEM6000 and AsyncSEM6000.
+
+    The methods build the command and pass it to _call() or _request() of the subclass, which send it and check the response
+    by _check_response(). They return what these return, a notification for SEM6000 and an awaitable of it for AsyncSEM6000.
+    """
+
+    @abstractmethod
+    def _call(self, command, error_message):
+        '''
+        Sends the command and returns _check_response() of its response.
+
+        Parameters:
+            command         - Command to send
+            error_message   - Message of the Exception raised if the command failed
+        '''
+
+        pass
+
+    def _request(self, command, error_message, force_refresh):
+        '''
+        Like _call() for commands whose response may be cached, subclasses having a cache answer from it.
+
+        Parameters:
+            force_refresh   - If set to true the device is asked even if a cached response exists
+        '''
+
+        return self._call(command, error_message)
+
+    def _check_response(self, command, notification, error_message):
+        """
+        Returns the notification if it is the successful response to the command, raises an Exception having error_message otherwise.
+        """
+        if not isinstance(notification, NOTIFICATION_CLASS_BY_COMMAND_CLASS[type(command)]):
+            raise Exception(error_message)
+
+        if isinstance(command, AuthorizeCommand):
+            # a rejected pin is not used to authorize again after a reconnect
+            self.pin = command.pin if notification.was_successful else None
+
+        # only responses to commands changing the device have was_successful
+        if not getattr(notification, 'was_successful', True):
+            raise Exception(error_message)
+
+        return notification
+
+    def authorize(self, pin):
+        """
+        Authorize on the connected device.
+
+        Parameters:
+            pin - 4 digit PIN, i.e. '0000'
+
+        Returns an AuthorizedNotification.
+        """
+        return self._call(AuthorizeCommand(pin), "Authentication failed")
+
+    def change_pin(self, new_pin):
+        """
+        Change the pin on the remote device.
+
+        Parameters:
+            new_pin - 4 digit PIN to change the current PIN to, i.e. '0000'
+
+        Returns a PinChangedNotification.
+        """
+        return self._call(ChangePinCommand(self.pin, new_pin), "Change PIN failed")
+
+    def reset_pin(self):
+        """
+        Reset the pin to 0000 on the remote device.
+
+        Returns a PinResetNotification.
+        """
+        return self._call(ResetPinCommand(), "Reset PIN failed")
+
+    def power_on(self):
+        """
+        Tell the remote device to turn the power on.
+
+        Returns a PowerSwitchedNotification.
+        """
+        return self._call(PowerSwitchCommand(True), "Power on failed")
+
+    def power_off(self):
+        """
+        Tell the remote device to turn the power off.
+
+        Returns a PowerSwitchedNotification.
+        """
+        return self._call(PowerSwitchCommand(False), "Power off failed")
+
+    def nightmode_on(self):
+        """
+        Activate nightmode on the remote device.
+
+        Returns a NightmodeChangedNotification.
+        """
+        return self._call(ChangeNightmodeCommand(True), "Nightmode on failed")
+
+    def nightmode_off(self):
+        """
+        Disable nightmode on the remote device.
+
+        Returns a NightmodeChangedNotification.
+        """
+        return self._call(ChangeNightmodeCommand(False), "Nightmode off failed")
+
+    def change_date_and_time(self, isodatetime):
+        """
+        Set date and time on the remote device.
+
+        Parameters:
+            isodatetime - ISO string representing date and time, i.e. '2020-01-01T10:00'
+
+        Returns a DateAndTimeChangedNotification.
+        """
+        return self._call(SynchronizeDateAndTimeCommand(isodatetime), "Set date and time failed")
+
+    def request_settings(self, force_refresh=False):
+        """
+        Request the current settings from the remote device.
+
+        Parameters:
+            force_refresh   - Optional, if set to true the device is asked even if a cached response exists
+
+        Returns a SettingsRequestedNotification.
+        """
+        return self._request(RequestSettingsCommand(), "Request settings failed", force_refresh)
+
+    def change_power_limit(self, power_limit_in_watt):
+        """
+        Set the power limit when the remote device should be automatically turn off.
+
+        Returns a PowerLimitChangedNotification.
+        """
+        command = ChangePowerLimitCommand(power_limit_in_watt=int(power_limit_in_watt))
+
+        return self._call(command, "Set power limit failed")
+
+    def change_prices(self, normal_price_in_cent, reduced_period_price_in_cent):
+        """
+        Set the power prices.
+
+        Parameters:
+            normal_price_in_cent            - Power price in cents.
+            reduced_period_price_in_cent    - Power price in cents during reduced period.
+
+        Returns a PricesChangedNotification.
+        """
+        command = ChangePricesCommand(normal_price_in_cent=int(normal_price_in_cent), reduced_period_price_in_cent=int(reduced_period_price_in_cent))
+
+        return self._call(command, "Set prices failed")
+
+    def change_reduced_period(self, is_active, start_isotime, end_isotime):
+        """
+        Sets start and end time of the reduced period.
+
+        Parameters:
+            is_active       - True if reduced prices should be used, False if not.
+            start_isotime   - ISO start time of the reduced period, i.e. '10:00'
+            end_isotime     - ISO end time of the reduced period, i.e. '20:00'
+
+        Returns a ReducedPeriodChangedNotification.
+        """
+        command = ChangeReducedPeriodCommand(
+            is_active=util._parse_boolean(is_active),
+            start_isotime=start_isotime,
+            end_isotime=end_isotime)
+
+        return self._call(command, "Set reduced period failed")
+
+    def request_timer_status(self, force_refresh=False):
+        """
+        Request the current status of the timer.
+
+        Parameters:
+            force_refresh   - Optional, if set to true the device is asked even if a cached response exists
+
+        Returns a TimerStatusRequestedNotification.
+        """
+        return self._request(RequestTimerStatusCommand(), "Request timer status failed", force_refresh)
+
+    def activate_timer(self, is_action_turn_on, delay_isotime):
+        """
+        Activate the timer.
+
+        Parameters:
+            is_action_turn_on   - True if the power should be turned on after the delay has passed, False if the power should be turned off.
+            delay_isotime       - Delay in iso time format, i.e. '00:00:05' for 5 seconds.
+
+        Returns a TimerSetNotification.
+        """
+        time = datetime.time.fromisoformat(delay_isotime)
+        timedelta = datetime.timedelta(hours=time.hour, minutes=time.minute, seconds=time.second)
+        dt = datetime.datetime.now() + timedelta
+
+        command = SetTimerCommand(
+            is_reset_timer=False,
+            is_action_turn_on=util._parse_boolean(is_action_turn_on),
+            target_isodatetime=dt.isoformat(timespec='seconds'))
+
+        return self._call(command, "Set timer failed")
+
+    def activate_timer_at(self, is_action_turn_on, target_isodatetime):
+        """
+        Activate the timer at the specified date and time.
+
+        Parameters:
+            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
+            target_isodatetime  - iso date and time format, i.e. '2020-01-01T00:00:05'.
+
+        Returns a TimerSetNotification.
+        """
+        command = SetTimerCommand(
+            is_reset_timer=False,
+            is_action_turn_on=util._parse_boolean(is_action_turn_on),
+            target_isodatetime=target_isodatetime)
+
+        return self._call(command, "Set timer failed")
+
+    def reset_timer(self):
+        """
+        Stop and reset the timer.
+
+        Returns a TimerSetNotification.
+        """
+        return self._call(SetTimerCommand(is_reset_timer=True, is_action_turn_on=False), "Reset timer failed")
+
+    def add_onetime_scheduler(self, is_active, is_action_turn_on, isodatetime):
+        """
+        Add a scheduler entry occuring at a specific date and time.
+
+        Parameters:
+            is_active           - True if the scheduler entry should be active, else False.
+            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
+            isodatetime         - ISO date and time for when the scheduler entry should be executed, i.e. '2020-01-01T10:00'
+
+        Returns a SchedulerChangedNotification.
+        """
+        command = AddSchedulerCommand(
+            OneTimeScheduler(
+                is_active=util._parse_boolean(is_active),
+                is_action_turn_on=util._parse_boolean(is_action_turn_on),
+                isodatetime=isodatetime
+            ))
+
+        return self._call(command, "Add scheduler failed")
+
+    def edit_onetime_scheduler(self, slot_id, is_active, is_action_turn_on, isodatetime):
+        """
+        Edit an existing scheduler entry occuring at a specific date and time.
+
+        Parameters:
+            slot_id             - id of the slot where the scheduler entry is currently stored at.
+            is_active           - True if the scheduler entry should be active, else False.
+            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
+            isodatetime         - ISO date and time for when the scheduler entry should be executed, i.e. '2020-01-01T10:00'
+
+        Returns a SchedulerChangedNotification.
+        """
+        command = EditSchedulerCommand(
+            slot_id=int(slot_id),
+            scheduler=OneTimeScheduler(
+                is_active=util._parse_boolean(is_active),
+                is_action_turn_on=util._parse_boolean(is_action_turn_on),
+                isodatetime=isodatetime
+            ))
+
+        return self._call(command, "Edit scheduler failed")
+
+    def add_repeated_scheduler(self, is_active, is_action_turn_on, repeat_on_weekdays, isotime):
+        """
+        Add a scheduler entry that will be repeated regulary.
+
+        Parameters:
+            is_active           - True if the scheduler entry should be active, else False.
+            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
+            repeat_on_weekdays  - Comma separated list of Weekdays the scheduler should be repeated on, i.e. 'Mon,Wed,Fri'
+            isotime             - ISO time for when the scheduler entry should be executed, i.e. '10:00'
+
+        Returns a SchedulerChangedNotification.
+        """
+        command = AddSchedulerCommand(
+            RepeatedScheduler(
+                is_active=util._parse_boolean(is_active),
+                is_action_turn_on=util._parse_boolean(is_action_turn_on),
+                repeat_on_weekdays=util._parse_weekdays_list(repeat_on_weekdays),
+                isotime=isotime
+            ))
+
+        return self._call(command, "Add scheduler failed")
+
+    def edit_repeated_scheduler(self, slot_id, is_active, is_action_turn_on, repeat_on_weekdays, isotime):
+        """
+        Edit an existing scheduler entry that will be repeated regulary.
+
+        Parameters:
+            slot_id             - id of the slot where the scheduler entry is currently stored at.
+            is_active           - True if the scheduler entry should be active, else False.
+            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
+            repeat_on_weekdays  - Comma separated list of Weekdays the scheduler should be repeated on, i.e. 'Mon,Wed,Fri'
+            isotime             - ISO time for when the scheduler entry should be executed, i.e. '10:00'
+
+        Returns a SchedulerChangedNotification.
+        """
+        command = EditSchedulerCommand(
+            slot_id=int(slot_id),
+            scheduler=RepeatedScheduler(
+                is_active=util._parse_boolean(is_active),
+                is_action_turn_on=util._parse_boolean(is_action_turn_on),
+                repeat_on_weekdays=util._parse_weekdays_list(repeat_on_weekdays),
+                isotime=isotime
+            ))
+
+        return self._call(command, "Edit scheduler failed")
+
+    def remove_scheduler(self, slot_id):
+        """
+        Remove an existing scheduler entry.
+
+        Parameters:
+            slot_id             - id of the slot where the scheduler entry is currently stored at.
+
+        Returns a SchedulerChangedNotification.
+        """
+        return self._call(RemoveSchedulerCommand(slot_id=int(slot_id)), "Remove scheduler failed")
+
+    def request_random_mode_status(self, force_refresh=False):
+        """
+        Request the current status of the random mode from the remote device.
+
+        Parameters:
+            force_refresh   - Optional, if set to true the device is asked even if a cached response exists
+
+        Returns a RandomModeStatusRequestedNotification.
+        """
+        return self._request(RequestRandomModeStatusCommand(), "Request random mode status failed", force_refresh)
+
+    def change_random_mode(self, active_on_weekdays, start_isotime, end_isotime):
+        """
+        Activate random mode on the remote device.
+
+        Parameters:
+            active_on_weekdays  - Comma separated list of Weekdays the scheduler should be repeated on, i.e. 'Mon,Wed,Fri'
+            start_isotime       - ISO time of when random mode should start, i.e. '10:00'
+            end_isotime         - ISO time of when random mode should stop, i.e. '20:00'
+
+        Returns a RandomModeChangedNotification.
+        """
+        command = ChangeRandomModeCommand(
+            is_active=True,
+            active_on_weekdays=util._parse_weekdays_list(active_on_weekdays),
+            start_isotime=start_isotime,
+            end_isotime=end_isotime)
+
+        return self._call(command, "Set random mode failed")
+
+    def reset_random_mode(self):
+        """
+        Disable random mode on the remote device.
+
+        Returns a RandomModeChangedNotification.
+        """
+        command = ChangeRandomModeCommand(
+            is_active=False,
+            active_on_weekdays=[],
+            start_isotime="00:00",
+            end_isotime="00:00")
+
+        return self._call(command, "Set random mode failed")
+
+    def request_measurement(self):
+        """
+        Request current measurement values.
+
+        Returns a MeasurementRequestedNotification.
+        """
+        return self._call(RequestMeasurementCommand(), "Request measurement failed")
+
+    def request_consumption_of_last_12_months(self):
+        """
+        Request consumption values of last 12 months.
+
+        Date and time need to be set for the device to start collecting these data.
+
+        Returns a ConsumptionOfLast12MonthsRequestedNotification.
+        """
+        return self._call(RequestConsumptionOfLast12MonthsCommand(), "Request consumption of last 12 months failed")
+
+    def request_consumption_of_last_30_days(self):
+        """
+        Request consumption values of last 30 days.
+
+        Date and time need to be set for the device to start collecting these data.
+
+        Returns a ConsumptionOfLast30DaysRequestedNotification.
+        """
+        return self._call(RequestConsumptionOfLast30DaysCommand(), "Request consumption of last 30 days failed")
+
+    def request_consumption_of_last_23_hours(self):
+        """
+        Request consumption values of curent hour and last 23 hours.
+
+        Date and time need to be set for the device to start collecting these data.
+
+        Returns a ConsumptionOfLast23HoursRequestedNotification.
+        """
+        return self._call(RequestConsumptionOfLast23HoursCommand(), "Request consumption of last 23 hours failed")
+
+    def reset_consumption(self):
+        """
+        Reset consumption data.
+
+        Returns a ResetConsumptionNoticiation.
+        """
+        return self._call(ResetConsumptionCommand(), "Reset consumption failed")
+
+    def factory_reset(self):
+        """
+        Reset the remote device to factory state.
+
+        Returns a FactoryResetNotification.
+        """
+        return self._call(FactoryResetCommand(), "Factory reset failed")
+
+    def change_device_name(self, new_name):
+        """
+        Set the name of the remote device.
+
+        Parameters:
+            new_name    - Name to be set.
+
+        Returns a DeviceNameChangedNotification.
+        """
+        return self._call(ChangeDeviceNameCommand(new_name=new_name), "Set device name failed")
+
+    def request_device_serial(self, force_refresh=False):
+        """
+        Request the serial number of the remote device.
+
+        Parameters:
+            force_refresh   - Optional, if set to true the device is asked even if a cached response exists
+
+        Returns a DeviceSerialRequestedNotification.
+        """
+        return self._request(RequestDeviceSerialCommand(), "Request device serial failed", force_refresh)
@@ -0,0 +1,64 @@
+class AdaptiveTimeout:
+    def __init__(self, minimum_timeout_in_seconds=0.25, maximum_timeout_in_seconds=3, initial_timeout_in_seconds=None, smoothing_factor=0.125, deviation_smoothing_factor=0.25, deviation_factor=4):
+        """ Create a new AdaptiveTimeout() instance deriving the timeout of a device from the round trip times of its commands
+
+            Like the retransmission timeout of TCP (RFC 6298) the timeout is the exponentially weighted moving average of the
+            round trip times plus deviation_factor times their mean deviation, limited to minimum and maximum timeout.
+            Timeouts do not change the estimate, so a device which stops responding only costs its last timeout per command.
+            An instance belongs to one device.
+
+            Parameters:
+                minimum_timeout_in_seconds  - Optional, lower limit of the timeout. Default: 0.25
+                maximum_timeout_in_seconds  - Optional, upper limit of the timeout. Default: 3
+                initial_timeout_in_seconds  - Optional, timeout until a round trip time was observed. Default: maximum_timeout_in_seconds
+                smoothing_factor            - Optional, weight of a new round trip time in the average. Default: 0.125
+                deviation_smoothing_factor  - Optional, weight of a new deviation in the mean deviation. Default: 0.25
+                deviation_factor            - Optional, number of mean deviations added to the average. Default: 4
+        """
+        if minimum_timeout_in_seconds > maximum_timeout_in_seconds:
+            raise Exception("minimum_timeout_in_seconds is greater than maximum_timeout_in_seconds")
+
+        self.minimum_timeout_in_seconds = minimum_timeout_in_seconds
+        self.maximum_timeout_in_seconds = maximum_timeout_in_seconds
+        self.initial_timeout_in_seconds = initial_timeout_in_seconds
+        if self.initial_timeout_in_seconds is None:
+            self.initial_timeout_in_seconds = maximum_timeout_in_seconds
+
+        self.smoothing_factor = smoothing_factor
+        self.deviation_smoothing_factor = deviation_smoothing_factor
+        self.deviation_factor = deviation_factor
+
+        self.smoothed_round_trip_time_in_seconds = None
+        self.round_trip_time_deviation_in_seconds = None
+
+        self.number_of_round_trip_times = 0
+
+    def observe(self, round_trip_time_in_seconds):
+        """
+        Update the estimate with the time from writing a command until its response was complete.
+        """
+        if self.smoothed_round_trip_time_in_seconds is None:
+            self.smoothed_round_trip_time_in_seconds = round_trip_time_in_seconds
+            self.round_trip_time_deviation_in_seconds = round_trip_time_in_seconds / 2
+        else:
+            deviation = abs(self.smoothed_round_trip_time_in_seconds - round_trip_time_in_seconds)
+
+            self.round_trip_time_deviation_in_seconds += self.deviation_smoothing_factor * (deviation - self.round_trip_time_deviation_in_seconds)
+            self.smoothed_round_trip_time_in_seconds += self.smoothing_factor * (round_trip_time_in_seconds - self.smoothed_round_trip_time_in_seconds)
+
+        self.number_of_round_trip_times += 1
+
+    def get_timeout(self):
+        """
+        Returns the time in seconds to wait for the response to the next command.
+        """
+        if self.smoothed_round_trip_time_in_seconds is None:
+            timeout = self.initial_timeout_in_seconds
+        else:
+            timeout = self.smoothed_round_trip_time_in_seconds + self.deviation_factor * self.round_trip_time_deviation_in_seconds
+
+        return min(self.maximum_timeout_in_seconds, max(self.minimum_timeout_in_seconds, timeout))
+
+    def __str__(self):
+        name = self.__class__.__name__
+        return name + "(timeout=" + str(self.get_timeout()) + ", smoothed_round_trip_time_in_seconds=" + str(self.smoothed_round_trip_time_in_seconds) + ", round_trip_time_deviation_in_seconds=" + str(self.round_trip_time_deviation_in_seconds) + ")"
@@ -0,0 +1,203 @@
+import asyncio
+import binascii
+import sys
+import time
+
+from .abstract_sem6000 import AbstractSEM6000, check_scheduler_page, merge_scheduler_pages
+from .bluetooth_lowenergy_interface import backends
+from .bluetooth_lowenergy_interface.threaded_async_interface import ThreadedAsyncBluetoothInterface
+from .delegate import SEM6000Delegate
+from . import encoder
+from .message import *
+
+
+def _create_bluetooth_lowenergy_interface(bluetooth_device):
+    # the module of the backend, i.e. bluepy, is only imported if no other interface is provided
+    return ThreadedAsyncBluetoothInterface(backends.create_bluetooth_lowenergy_interface(bluetooth_device))
+
+
+class AsyncSEM6000(AbstractSEM6000):
+    SERVICECLASS_UUID='0000fff0-0000-1000-8000-00805f9b34fb'
+    CHARACTERISTIC_UUID_NAME='00002a00-0000-1000-8000-00805f9b34fb'
+    CHARACTERISTIC_UUID_CONTROL='0000fff3-0000-1000-8000-00805f9b34fb'
+    CHARACTERISTIC_UUID_RESPONSE='0000fff4-0000-1000-8000-00805f9b34fb'
+
+    def __init__(self, bluetooth_lowenergy_interface=None, bluetooth_device='hci0', timeout=3, debug=False):
+        """ Create a new AsyncSEM6000() instance
+
+            All methods talking to the remote device return awaitables, so a single event loop can drive many devices concurrently.
+            Use connect() and authorize() to establish a session.
+
+            Parameters:
+                bluetooth_lowenergy_interface   - Optional, AbstractAsyncBluetoothInterface to use. Default: interface of the default backend run in an executor
+                bluetooth_device                - Optional, bluetooth device name to use if no interface is given. Default: 'hci0'
+                timeout                         - Optional, maximum time in seconds to wait for a response from the device. Default: 3
+                debug                           - Optional, if set to true commands and responses are printed to sys.stderr
+        """
+        self.timeout = timeout
+        self.debug = debug
+
+        self.connection_settings = {}
+
+        self.pin = None
+
+        self._encoder = encoder.MessageEncoder()
+
+        # commands and their responses must not interleave on the same device
+        self._lock = None
+
+        if bluetooth_lowenergy_interface is None:
+            bluetooth_lowenergy_interface = _create_bluetooth_lowenergy_interface(bluetooth_device)
+
+        self._delegate = SEM6000Delegate(self.debug)
+        self._bluetooth_lowenergy_interface = bluetooth_lowenergy_interface
+        self._bluetooth_lowenergy_interface.add_notification_handler(self._delegate._handle_notification)
+
+    def _get_lock(self):
+        # the lock must be created on the event loop it is used with
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        return self._lock
+
+    async def _disconnect(self):
+        if self._bluetooth_lowenergy_interface:
+            await self._bluetooth_lowenergy_interface.disconnect()
+
+            return True
+
+        return False
+
+    async def _reconnect(self):
+        await self._disconnect()
+
+        try:
+            await self._bluetooth_lowenergy_interface.connect(self.connection_settings["device_address"])
+        except Exception as e:
+            await self._disconnect()
+            raise e
+
+        await self._bluetooth_lowenergy_interface.enable_notifications()
+
+        if self.pin:
+            try:
+                command = AuthorizeCommand(self.pin)
+                self._check_response(command, await self._write_command(command), "Authentication failed")
+            except Exception as e:
+                await self._disconnect()
+                raise e
+
+    async def _is_connected(self):
+        if self._bluetooth_lowenergy_interface is None:
+            return False
+
+        return await self._bluetooth_lowenergy_interface.is_connected()
+
+    async def _send_command(self, command):
+        async with self._get_lock():
+            if not await self._is_connected():
+                if self.connection_settings.get("device_address") and self.pin:
+                    await self._reconnect()
+                else:
+                    raise Exception("Not connected and no deviceAddress / pin set")
+
+            return await self._write_command(command)
+
+    async def _call(self, command, error_message):
+        return self._check_response(command, await self._send_command(command), error_message)
+
+    async def _write_command(self, command):
+        encoded_command = self._encoder.encode(command)
+
+        if self.debug:
+            print("sent data: " + str(binascii.hexlify(encoded_command)) + " (" + str(command) + ")", file=sys.stderr)
+
+        self._delegate.reset_notification_data()
+
+        await self._bluetooth_lowenergy_interface.write_to_characteristic(AsyncSEM6000.CHARACTERISTIC_UUID_CONTROL, encoded_command)
+        await self._wait_for_notifications()
+
+        return self._delegate.consume_notification()
+
+    async def _wait_for_notifications(self):
+        # the timeout covers all fragments of the response, not each of them
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await self._bluetooth_lowenergy_interface.wait_for_notifications(remaining):
+                break
+
+            if self._delegate.has_final_raw_notification():
+                break
+
+    async def connect(self, device_address):
+        """
+        Connect to a remote device.
+
+        Parameters:
+            device_address  - MAC address to connect to, i.e. '00:11:22:33:44:55'.
+        """
+        self.connection_settings["device_address"] = device_address
+
+        async with self._get_lock():
+            return await self._reconnect()
+
+    async def disconnect(self):
+        """
+        Disconnect from the current remote device.
+        """
+        async with self._get_lock():
+            return await self._disconnect()
+
+    @staticmethod
+    async def discover(timeout=5, bluetooth_device='hci0'):
+        """
+        Discover remote devices.
+
+        This method needs special permissions.
+
+        Parameters:
+            timeout             - Optional, time in seconds to wait for devices to respond. Default: 5
+            bluetooth_device    - Optional, bluetooth device name to use. Default: 'hci0'
+        """
+        bluetooth_lowenergy_interface = _create_bluetooth_lowenergy_interface(bluetooth_device)
+
+        return await bluetooth_lowenergy_interface.discover(timeout, service_uuids=[AsyncSEM6000.SERVICECLASS_UUID])
+
+    async def request_device_name(self):
+        """
+        Request the name of the remote device.
+
+        Returns a DeviceNameRequestedNotification.
+        """
+        async with self._get_lock():
+            data = await self._bluetooth_lowenergy_interface.read_from_characteristic(AsyncSEM6000.CHARACTERISTIC_UUID_NAME)
+
+        if self.debug:
+            print("received data: " + str(binascii.hexlify(data)), file=sys.stderr)
+
+        device_name = data.decode(encoding='utf-8')
+
+        return DeviceNameRequestedNotification(device_name)
+
+    async def request_scheduler(self, force_refresh=False):
+        """
+        Request all currently set schedulers.
+
+        Parameters:
+            force_refresh   - Optional, ignored as responses are not cached
+
+        Returns a SchedulerRequestedNotification.
+        """
+        command = RequestSchedulerCommand(page_number=0)
+        notification = check_scheduler_page(await self._send_command(command), command.page_number)
+
+        notifications = [notification]
+
+        max_page_number = notification.number_of_schedulers // 4
+        for page_number in range(1, max_page_number+1):
+            further_notification = await self._send_command(RequestSchedulerCommand(page_number=page_number))
+            notifications.append(check_scheduler_page(further_notification, page_number))
+
+        return merge_scheduler_pages(notifications)
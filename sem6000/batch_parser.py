@@ -0,0 +1,432 @@
+import array
+import struct
+
+from .parser import MessageParser
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_MEASUREMENT_COLUMNS = [
+    ('is_power_active', 'B'),
+    ('power_in_milliwatt', 'I'),
+    ('voltage_in_volt', 'H'),
+    ('current_in_milliampere', 'H'),
+    ('frequency_in_hertz', 'H'),
+    ('total_consumption_in_kilowatt_hour', 'I'),
+]
+
+# (opcode, length byte) of frames being decoded into columns
+_MEASUREMENT_KEY = (0x04, 17)
+_CONSUMPTION_OF_LAST_23_HOURS_KEY = (0x0a, 51)
+_CONSUMPTION_OF_LAST_30_DAYS_KEY = (0x0b, 123)
+_CONSUMPTION_OF_LAST_12_MONTHS_KEY = (0x0c, 51)
+
+_COLUMNAR_KEYS = set([_MEASUREMENT_KEY, _CONSUMPTION_OF_LAST_23_HOURS_KEY, _CONSUMPTION_OF_LAST_30_DAYS_KEY, _CONSUMPTION_OF_LAST_12_MONTHS_KEY])
+
+# '>4xI' reads the is_power_active byte together with the three bytes of power_in_milliwatt
+_MEASUREMENT_STRUCT = struct.Struct('>4xIBHB2xIB')
+_CONSUMPTION_OF_LAST_23_HOURS_STRUCT = struct.Struct('>4x24H')
+# each value is sent as three bytes followed by a zero byte
+_CONSUMPTION_OF_LAST_30_DAYS_STRUCT = struct.Struct('>4x30I')
+_CONSUMPTION_OF_LAST_12_MONTHS_STRUCT = struct.Struct('>4x12I')
+
+# a run of frames having the same size is checked in blocks of this number of frames
+_MINIMUM_RUN_BLOCK_SIZE = 64
+_MAXIMUM_RUN_BLOCK_SIZE = 65536
+
+
+class ParsedFrames:
+    """
+    Result of parse_many().
+
+    Frames are numbered in order of their offset. Measurement and consumption frames are decoded into columns,
+    each column holding one value per frame. The frame number of each value is stored in the column 'index'.
+    Columns are numpy arrays if numpy is used, array.array otherwise.
+
+    Attributes:
+        number_of_frames                    - Number of frames found in the data
+        offsets                             - Offset of each frame inside the data
+        error_mask                          - 1 for each malformed frame, 0 otherwise
+        errors                              - Dictionary of frame number -> error message of malformed frames
+        measurements                        - Dictionary of column name -> values of MeasurementRequestedNotification frames
+        consumptions_of_last_23_hours       - Dictionary of 'index' -> frame numbers, 'consumption_n_hours_ago_in_watt_hour' -> one column for each n
+        consumptions_of_last_30_days        - Dictionary of 'index' -> frame numbers, 'consumption_n_days_ago_in_watt_hour' -> one column for each n, column 0 (today) is not sent by the device and always 0
+        consumptions_of_last_12_months      - Dictionary of 'index' -> frame numbers, 'consumption_n_months_ago_in_watt_hour' -> one column for each n, column 0 (current month) is not sent by the device and always 0
+        notifications                       - Dictionary of frame number -> notification of all other valid frames
+    """
+
+    def __init__(self, number_of_frames, offsets, error_mask, errors, measurements, consumptions_of_last_23_hours, consumptions_of_last_30_days, consumptions_of_last_12_months, notifications):
+        self.number_of_frames = number_of_frames
+        self.offsets = offsets
+        self.error_mask = error_mask
+        self.errors = errors
+        self.measurements = measurements
+        self.consumptions_of_last_23_hours = consumptions_of_last_23_hours
+        self.consumptions_of_last_30_days = consumptions_of_last_30_days
+        self.consumptions_of_last_12_months = consumptions_of_last_12_months
+        self.notifications = notifications
+
+    def __len__(self):
+        return self.number_of_frames
+
+
+class _ParseError:
+    def __init__(self, message):
+        self.message = message
+
+
+class _FrameNumbers:
+    '''Collects frame numbers or offsets, runs are added as ranges without touching each value'''
+
+    def __init__(self):
+        self._pieces = []
+        self._values = []
+
+    def append(self, value):
+        self._values.append(value)
+
+    def extend_range(self, start, step, count):
+        if len(self._values):
+            self._pieces.append(self._values)
+            self._values = []
+
+        self._pieces.append((start, step, count))
+
+    def __iter__(self):
+        for piece in self._pieces + [self._values]:
+            if type(piece) is tuple:
+                start, step, count = piece
+                for value in range(start, start + step * count, step):
+                    yield value
+            else:
+                for value in piece:
+                    yield value
+
+    def to_numpy(self):
+        arrays = []
+        for piece in self._pieces + [self._values]:
+            if type(piece) is tuple:
+                start, step, count = piece
+                arrays.append(numpy.arange(start, start + step * count, step, dtype=numpy.int64))
+            else:
+                arrays.append(numpy.array(piece, dtype=numpy.int64))
+
+        return numpy.concatenate(arrays)
+
+
+def _split_frames(data, data_as_array=None):
+    """
+    Splits the data into frames.
+
+    Returns (number of frames, _FrameNumbers of the offset of each frame, list of (frame number, start, end) of frames not being decoded into columns,
+    dictionary of (opcode, length byte) -> (_FrameNumbers of frame numbers, _FrameNumbers of starts) of frames being decoded into columns).
+    """
+    frames = _FrameNumbers()
+    other_frames = []
+    columnar_frames = {}
+    for key in _COLUMNAR_KEYS:
+        columnar_frames[key] = (_FrameNumbers(), _FrameNumbers())
+
+    number_of_bytes = len(data)
+    number_of_frames = 0
+
+    offset = 0
+    previous_size = None
+    run_length = 0
+    run_block_size = _MINIMUM_RUN_BLOCK_SIZE
+
+    while offset < number_of_bytes:
+        if data[offset] != 0x0f or offset + 2 >= number_of_bytes:
+            # skip everything up to the next possible start of a frame as one malformed frame
+            end = data.find(b'\x0f', offset + 1)
+            if end == -1:
+                end = number_of_bytes
+
+            frames.append(offset)
+            other_frames.append((number_of_frames, offset, end))
+            number_of_frames += 1
+            offset = end
+            previous_size = None
+            continue
+
+        length = data[offset + 1]
+        key = (data[offset + 2], length)
+
+        end = offset + 2 + length
+        if data[end:end + 2] == b'\xff\xff':
+            end += 2
+        if end > number_of_bytes:
+            end = number_of_bytes
+
+        size = end - offset
+
+        if not key in columnar_frames or size < 2 + length:
+            frames.append(offset)
+            other_frames.append((number_of_frames, offset, end))
+            number_of_frames += 1
+            offset = end
+            previous_size = None
+            continue
+
+        frame_numbers, starts = columnar_frames[key]
+
+        if size == previous_size:
+            run_length += 1
+        else:
+            run_length = 1
+            run_block_size = _MINIMUM_RUN_BLOCK_SIZE
+        previous_size = size
+
+        if not data_as_array is None and run_length >= 8:
+            # frames of a run start at a multiple of the frame size, check them all at once
+            number_of_run_frames = min(run_block_size, (number_of_bytes - offset) // size)
+            block = data_as_array[offset:offset + number_of_run_frames * size].reshape(number_of_run_frames, size)
+
+            is_same_frame = (block[:, 0] == 0x0f) & (block[:, 1] == length) & (block[:, 2] == key[0])
+            if size == 2 + length + 2:
+                is_same_frame &= (block[:, size - 2] == 0xff) & (block[:, size - 1] == 0xff)
+
+            # the end of the last frame of the run is only known once the following frame was checked
+            number_of_run_frames = int(numpy.argmin(is_same_frame)) if not is_same_frame.all() else number_of_run_frames
+            number_of_run_frames -= 1
+
+            if number_of_run_frames > 0:
+                frames.extend_range(offset, size, number_of_run_frames)
+                frame_numbers.extend_range(number_of_frames, 1, number_of_run_frames)
+                starts.extend_range(offset, size, number_of_run_frames)
+
+                number_of_frames += number_of_run_frames
+                offset += number_of_run_frames * size
+
+                if run_block_size < _MAXIMUM_RUN_BLOCK_SIZE:
+                    run_block_size *= 2
+                continue
+
+        frames.append(offset)
+        frame_numbers.append(number_of_frames)
+        starts.append(offset)
+        number_of_frames += 1
+        offset = end
+
+    return number_of_frames, frames, other_frames, columnar_frames
+
+
+def _decode_measurements_with_numpy(frames):
+    columns = {}
+
+    columns['is_power_active'] = (frames[:, 4] == 0x01).astype(numpy.uint8)
+    columns['power_in_milliwatt'] = (frames[:, 5].astype(numpy.uint32) << 16) | (frames[:, 6].astype(numpy.uint32) << 8) | frames[:, 7]
+    columns['voltage_in_volt'] = frames[:, 8].astype(numpy.uint16)
+    columns['current_in_milliampere'] = (frames[:, 9].astype(numpy.uint16) << 8) | frames[:, 10]
+    columns['frequency_in_hertz'] = frames[:, 11].astype(numpy.uint16)
+    columns['total_consumption_in_kilowatt_hour'] = frames[:, 14:18].copy().view('>u4').reshape(-1).astype(numpy.uint32)
+
+    return columns
+
+
+def _decode_consumptions_with_numpy(frames, number_of_values, value_size, is_current_value_missing):
+    values = frames[:, 4:4 + number_of_values * value_size].reshape(-1, number_of_values, value_size).astype(numpy.uint32)
+
+    if value_size == 2:
+        consumptions = (values[:, :, 0] << 8) | values[:, :, 1]
+    else:
+        consumptions = (values[:, :, 0] << 16) | (values[:, :, 1] << 8) | values[:, :, 2]
+
+    # the oldest value is sent first, column n has to hold the value of n hours, days or months ago
+    consumptions = consumptions[:, ::-1].T
+
+    if is_current_value_missing:
+        consumptions = numpy.concatenate([numpy.zeros((1, consumptions.shape[1]), dtype=numpy.uint32), consumptions])
+
+    return numpy.ascontiguousarray(consumptions)
+
+
+def _decode_columns_with_numpy(data_as_array, frame_numbers, starts, length, decode):
+    '''Returns (dictionary of column name -> numpy array for valid frames, frame numbers of invalid frames, starts of invalid frames)'''
+
+    frame_numbers = frame_numbers.to_numpy()
+    starts = starts.to_numpy()
+
+    frames = data_as_array[starts[:, None] + numpy.arange(2 + length)]
+
+    checksums = (frames[:, 2:-1].sum(axis=1, dtype=numpy.uint32) + 1) & 0xff
+    is_valid = (checksums == frames[:, -1]) & (frames[:, 3] == 0x00)
+
+    columns = decode(frames[is_valid])
+    columns['index'] = frame_numbers[is_valid]
+
+    is_invalid = ~is_valid
+    return columns, frame_numbers[is_invalid].tolist(), starts[is_invalid].tolist()
+
+
+def _is_valid_frame(data, start, length):
+    return data[start + 3] == 0x00 and (1 + sum(data[start + 2:start + 1 + length])) & 0xff == data[start + 1 + length]
+
+
+def _decode_measurements(data, frame_numbers, starts):
+    index = array.array('q')
+    columns = {}
+    for name, typecode in _MEASUREMENT_COLUMNS:
+        columns[name] = array.array(typecode)
+
+    is_power_active_column = columns['is_power_active']
+    power_in_milliwatt_column = columns['power_in_milliwatt']
+    voltage_in_volt_column = columns['voltage_in_volt']
+    current_in_milliampere_column = columns['current_in_milliampere']
+    frequency_in_hertz_column = columns['frequency_in_hertz']
+    total_consumption_in_kilowatt_hour_column = columns['total_consumption_in_kilowatt_hour']
+
+    invalid_frame_numbers = []
+    invalid_starts = []
+
+    unpack_from = _MEASUREMENT_STRUCT.unpack_from
+    for frame_number, start in zip(frame_numbers, starts):
+        if not _is_valid_frame(data, start, 17):
+            invalid_frame_numbers.append(frame_number)
+            invalid_starts.append(start)
+            continue
+
+        is_power_active_and_power, voltage_in_volt, current_in_milliampere, frequency_in_hertz, total_consumption_in_kilowatt_hour, checksum = unpack_from(data, start)
+
+        index.append(frame_number)
+        is_power_active_column.append(1 if is_power_active_and_power >> 24 == 0x01 else 0)
+        power_in_milliwatt_column.append(is_power_active_and_power & 0xffffff)
+        voltage_in_volt_column.append(voltage_in_volt)
+        current_in_milliampere_column.append(current_in_milliampere)
+        frequency_in_hertz_column.append(frequency_in_hertz)
+        total_consumption_in_kilowatt_hour_column.append(total_consumption_in_kilowatt_hour)
+
+    columns['index'] = index
+    return columns, invalid_frame_numbers, invalid_starts
+
+
+def _decode_consumptions(data, frame_numbers, starts, length, number_of_values, consumption_struct, value_shift, is_current_value_missing):
+    index = array.array('q')
+
+    consumptions_by_n = []
+    for n in range(number_of_values + (1 if is_current_value_missing else 0)):
+        consumptions_by_n.append(array.array('I'))
+
+    invalid_frame_numbers = []
+    invalid_starts = []
+
+    first_n = 1 if is_current_value_missing else 0
+    unpack_from = consumption_struct.unpack_from
+    for frame_number, start in zip(frame_numbers, starts):
+        if not _is_valid_frame(data, start, length):
+            invalid_frame_numbers.append(frame_number)
+            invalid_starts.append(start)
+            continue
+
+        index.append(frame_number)
+
+        values = unpack_from(data, start)
+        # the oldest value is sent first
+        n = first_n + len(values) - 1
+        for value in values:
+            consumptions_by_n[n].append(value >> value_shift)
+            n -= 1
+
+    if is_current_value_missing:
+        consumptions_by_n[0] = array.array('I', bytes(len(index) * consumptions_by_n[0].itemsize))
+
+    return index, consumptions_by_n, invalid_frame_numbers, invalid_starts
+
+
+def parse_many(data, parser=None, use_numpy=None):
+    """
+    Parse a buffer of concatenated notification frames, i.e. a capture of received notifications.
+
+    Measurement and consumption frames are grouped and decoded into columns. All other frames are parsed one by one.
+    Malformed frames do not raise an exception, they are marked in the error_mask of the result.
+
+    Parameters:
+        data        - bytes, bytearray or memoryview of frames, each frame optionally followed by the suffix b'\\xff\\xff'
+        parser      - Optional, MessageParser for frames not being decoded into columns. Default: MessageParser()
+        use_numpy   - Optional, if set to false columns are decoded without numpy. Default: True if numpy is installed
+
+    Returns a ParsedFrames instance.
+    """
+    if parser is None:
+        parser = MessageParser()
+
+    if use_numpy is None:
+        use_numpy = not numpy is None
+    if use_numpy and numpy is None:
+        raise Exception("numpy is not installed")
+
+    if not type(data) in (bytes, bytearray):
+        data = bytes(data)
+
+    data_as_array = None
+    if use_numpy:
+        data_as_array = numpy.frombuffer(data, dtype=numpy.uint8)
+
+    number_of_frames, frames, other_frames, columnar_frames = _split_frames(data, data_as_array)
+
+    if use_numpy:
+        decode_columns = lambda key, decode: _decode_columns_with_numpy(data_as_array, columnar_frames[key][0], columnar_frames[key][1], key[1], decode)
+
+        measurements, invalid_measurement_frame_numbers, invalid_measurement_starts = decode_columns(_MEASUREMENT_KEY, _decode_measurements_with_numpy)
+
+        consumptions_of_last_23_hours, invalid_hours_frame_numbers, invalid_hours_starts = decode_columns(_CONSUMPTION_OF_LAST_23_HOURS_KEY, lambda frames: {'consumption_n_hours_ago_in_watt_hour': _decode_consumptions_with_numpy(frames, 24, 2, False)})
+        consumptions_of_last_30_days, invalid_days_frame_numbers, invalid_days_starts = decode_columns(_CONSUMPTION_OF_LAST_30_DAYS_KEY, lambda frames: {'consumption_n_days_ago_in_watt_hour': _decode_consumptions_with_numpy(frames, 30, 4, True)})
+        consumptions_of_last_12_months, invalid_months_frame_numbers, invalid_months_starts = decode_columns(_CONSUMPTION_OF_LAST_12_MONTHS_KEY, lambda frames: {'consumption_n_months_ago_in_watt_hour': _decode_consumptions_with_numpy(frames, 12, 4, True)})
+
+        offsets = frames.to_numpy()
+        error_mask = numpy.zeros(number_of_frames, dtype=numpy.uint8)
+    else:
+        frame_numbers, starts = columnar_frames[_MEASUREMENT_KEY]
+        measurements, invalid_measurement_frame_numbers, invalid_measurement_starts = _decode_measurements(data, frame_numbers, starts)
+
+        frame_numbers, starts = columnar_frames[_CONSUMPTION_OF_LAST_23_HOURS_KEY]
+        index, consumptions_by_n, invalid_hours_frame_numbers, invalid_hours_starts = _decode_consumptions(data, frame_numbers, starts, 51, 24, _CONSUMPTION_OF_LAST_23_HOURS_STRUCT, 0, False)
+        consumptions_of_last_23_hours = {'index': index, 'consumption_n_hours_ago_in_watt_hour': consumptions_by_n}
+
+        frame_numbers, starts = columnar_frames[_CONSUMPTION_OF_LAST_30_DAYS_KEY]
+        index, consumptions_by_n, invalid_days_frame_numbers, invalid_days_starts = _decode_consumptions(data, frame_numbers, starts, 123, 30, _CONSUMPTION_OF_LAST_30_DAYS_STRUCT, 8, True)
+        consumptions_of_last_30_days = {'index': index, 'consumption_n_days_ago_in_watt_hour': consumptions_by_n}
+
+        frame_numbers, starts = columnar_frames[_CONSUMPTION_OF_LAST_12_MONTHS_KEY]
+        index, consumptions_by_n, invalid_months_frame_numbers, invalid_months_starts = _decode_consumptions(data, frame_numbers, starts, 51, 12, _CONSUMPTION_OF_LAST_12_MONTHS_STRUCT, 8, True)
+        consumptions_of_last_12_months = {'index': index, 'consumption_n_months_ago_in_watt_hour': consumptions_by_n}
+
+        offsets = array.array('q', frames)
+        error_mask = array.array('B', bytes(number_of_frames))
+
+    # invalid frames of the columnar groups are parsed one by one, so their error message matches MessageParser.parse()
+    invalid_frame_numbers = invalid_measurement_frame_numbers + invalid_hours_frame_numbers + invalid_days_frame_numbers + invalid_months_frame_numbers
+    invalid_starts = invalid_measurement_starts + invalid_hours_starts + invalid_days_starts + invalid_months_starts
+    for frame_number, start in zip(invalid_frame_numbers, invalid_starts):
+        end = start + 2 + data[start + 1]
+        if data[end:end + 2] == b'\xff\xff':
+            end += 2
+        other_frames.append((frame_number, start, end))
+
+    # notifications are immutable, so identical frames, i.e. repeated acknowledgements, are parsed only once
+    notification_or_error_by_frame = {}
+
+    errors = {}
+    notifications = {}
+    for frame_number, start, end in other_frames:
+        frame = data[start:end]
+
+        notification_or_error = notification_or_error_by_frame.get(frame)
+        if notification_or_error is None:
+            try:
+                notification_or_error = parser.parse(frame)
+            except Exception as e:
+                notification_or_error = _ParseError(str(e))
+
+            notification_or_error_by_frame[frame] = notification_or_error
+
+        if type(notification_or_error) is _ParseError:
+            errors[frame_number] = notification_or_error.message
+            error_mask[frame_number] = 1
+        else:
+            notifications[frame_number] = notification_or_error
+
+    return ParsedFrames(number_of_frames=number_of_frames, offsets=offsets, error_mask=error_mask, errors=errors, measurements=measurements, consumptions_of_last_23_hours=consumptions_of_last_23_hours, consumptions_of_last_30_days=consumptions_of_last_30_days, consumptions_of_last_12_months=consumptions_of_last_12_months, notifications=notifications)
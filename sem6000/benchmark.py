@@ -0,0 +1,572 @@
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from . import batch_parser
+from .capture import CaptureWriter
+from .daemon import SEM6000Daemon, SEM6000DaemonClient
+from .delegate import SEM6000Delegate
+from .encoder import MessageEncoder
+from .fleet import FleetPoller
+from .message import *
+from .parser import MessageParser
+from .sem6000 import SEM6000
+from .simulator import SimulatedSEM6000Interface
+from .storage import MeasurementStore
+from . import util
+
+
+# version of the JSON result format
+RESULT_FORMAT_VERSION = 1
+
+# a benchmark regressed if it takes this fraction longer than in the baseline
+DEFAULT_THRESHOLD = 0.25
+
+# size of the notification fragments received over bluetooth low energy
+_FRAGMENT_SIZE = 20
+
+# modules needed to encode and parse messages without talking to a device
+CODEC_MODULES = ['sem6000.util', 'sem6000.message', 'sem6000.parser', 'sem6000.encoder']
+
+_DEVICE_ADDRESS = '00:11:22:33:44:55'
+_PIN = '0000'
+
+# run in a new interpreter, so no module is imported already
+_COLD_IMPORT_SCRIPT = '''
+import json
+import sys
+import time
+
+start = time.perf_counter()
+for module_name in sys.argv[1:]:
+    __import__(module_name)
+seconds = time.perf_counter() - start
+
+print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules.keys())}))
+'''
+
+
+def create_sample_commands():
+    weekdays = [util.Weekday.MONDAY, util.Weekday.WEDNESDAY, util.Weekday.FRIDAY]
+
+    return [
+        AuthorizeCommand(pin="0000"),
+        ChangePinCommand(pin="0000", new_pin="1234"),
+        ResetPinCommand(),
+        PowerSwitchCommand(on=True),
+        ChangeNightmodeCommand(on=True),
+        SynchronizeDateAndTimeCommand(isodatetime="2020-01-01T12:00:00"),
+        RequestSettingsCommand(),
+        ChangePowerLimitCommand(power_limit_in_watt=500),
+        ChangePricesCommand(normal_price_in_cent=30, reduced_period_price_in_cent=20),
+        ChangeReducedPeriodCommand(is_active=True, start_isotime="22:00", end_isotime="05:00"),
+        RequestTimerStatusCommand(),
+        SetTimerCommand(is_reset_timer=False, is_action_turn_on=True, target_isodatetime="2020-01-01T12:00:00"),
+        RequestSchedulerCommand(page_number=0),
+        AddSchedulerCommand(scheduler=RepeatedScheduler(is_active=True, is_action_turn_on=True, repeat_on_weekdays=weekdays, isotime="12:34")),
+        RemoveSchedulerCommand(slot_id=1),
+        RequestRandomModeStatusCommand(),
+        ChangeRandomModeCommand(is_active=True, active_on_weekdays=weekdays, start_isotime="22:00", end_isotime="04:00"),
+        RequestMeasurementCommand(),
+        RequestConsumptionOfLast12MonthsCommand(),
+        RequestConsumptionOfLast30DaysCommand(),
+        RequestConsumptionOfLast23HoursCommand(),
+        ResetConsumptionCommand(),
+        FactoryResetCommand(),
+        ChangeDeviceNameCommand(new_name="Voltcraft"),
+        RequestDeviceSerialCommand(),
+    ]
+
+
+def create_sample_notifications():
+    weekdays = [util.Weekday.MONDAY, util.Weekday.WEDNESDAY, util.Weekday.FRIDAY]
+
+    scheduler_entries = []
+    for i in range(4):
+        scheduler = RepeatedScheduler(is_active=True, is_action_turn_on=True, repeat_on_weekdays=weekdays, isotime="12:34")
+        scheduler_entries.append(SchedulerEntry(slot_id=i, scheduler=scheduler))
+
+    return [
+        AuthorizedNotification(was_successful=True),
+        PinChangedNotification(was_successful=True),
+        PinResetNotification(was_successful=True),
+        PowerSwitchedNotification(was_successful=True),
+        NightmodeChangedNotification(was_successful=True),
+        DateAndTimeChangedNotification(was_successful=True),
+        SettingsRequestedNotification(is_reduced_period=True, normal_price_in_cent=100, reduced_period_price_in_cent=50, reduced_period_start_isotime="22:00", reduced_period_end_isotime="05:00", is_nightmode_active=True, power_limit_in_watt=500),
+        PowerLimitChangedNotification(was_successful=True),
+        PricesChangedNotification(was_successful=True),
+        ReducedPeriodChangedNotification(was_successful=True),
+        TimerStatusRequestedNotification(is_active=True, is_action_turn_on=True, target_isodatetime="2020-03-12T12:34:12", original_timer_length_in_seconds=42),
+        TimerSetNotification(was_successful=True),
+        SchedulerRequestedNotification(number_of_schedulers=4, scheduler_entries=scheduler_entries),
+        SchedulerChangedNotification(was_successful=True),
+        RandomModeStatusRequestedNotification(is_active=True, active_on_weekdays=weekdays, start_isotime="22:00", end_isotime="04:00"),
+        RandomModeChangedNotification(was_successful=True),
+        MeasurementRequestedNotification(is_power_active=True, power_in_milliwatt=1234, voltage_in_volt=230, current_in_milliampere=10, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=42),
+        ConsumptionOfLast12MonthsRequestedNotification(consumption_n_months_ago_in_watt_hour=[None] + list(range(1, 13))),
+        ConsumptionOfLast30DaysRequestedNotification(consumption_n_days_ago_in_watt_hour=[None] + list(range(1, 31))),
+        ConsumptionOfLast23HoursRequestedNotification(consumption_n_hours_ago_in_watt_hour=list(range(0, 24))),
+        ConsumptionResetNotification(was_successful=True),
+        FactoryResetNotification(was_successful=True),
+        DeviceNameChangedNotification(was_successful=True),
+        DeviceSerialRequestedNotification(serial="ML01D10012000000"),
+    ]
+
+
+def measure_cold_import(module_names):
+    """
+    Import modules in a new python interpreter.
+
+    Returns a dictionary having keys 'seconds', the time the imports took, and 'modules', the names of all modules loaded afterwards.
+    """
+    environment = dict(os.environ)
+    package_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment['PYTHONPATH'] = os.pathsep.join([package_directory] + [path for path in [environment.get('PYTHONPATH')] if path])
+
+    output = subprocess.run([sys.executable, '-c', _COLD_IMPORT_SCRIPT] + list(module_names), stdout=subprocess.PIPE, env=environment, check=True).stdout
+
+    return json.loads(output.decode('utf-8'))
+
+
+def measure_allocated_bytes(create, number):
+    """
+    Create objects while tracing memory allocations with tracemalloc.
+
+    Parameters:
+        create      - Callable called with the index of the object, returning the object
+        number      - Number of objects created and kept alive until all are created
+
+    Returns the number of bytes still allocated per object after all objects were created.
+    """
+    # allocated before tracing, so the list holding the objects is not counted
+    objects = [None] * number
+
+    tracemalloc.start()
+    try:
+        for i in range(number):
+            objects[i] = create(i)
+
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return size / number
+
+
+class Benchmark:
+    def __init__(self, name, setup, number, threshold=DEFAULT_THRESHOLD, create=None, memory_number=None):
+        """ Create a new Benchmark() instance
+
+            Parameters:
+                name            - Unique name, i.e. 'parse/MeasurementRequestedNotification'
+                setup           - Callable returning (operation, cleanup), operation being the callable to measure, cleanup a callable or None
+                number          - Number of calls of the operation for each repetition
+                threshold       - Optional, fraction the time per operation may exceed the baseline before it is reported as regression. Default: DEFAULT_THRESHOLD
+                create          - Optional, callable called with an index and returning an object. If given, the memory of memory_number objects created by it is measured as well.
+                memory_number   - Optional, number of objects created to measure the memory. Default: number
+        """
+        self.name = name
+        self.setup = setup
+        self.number = number
+        self.threshold = threshold
+        self.create = create
+        self.memory_number = memory_number
+
+    def run(self, repeat):
+        """
+        Returns a dictionary of the result.
+        """
+        operation, cleanup = self.setup()
+
+        try:
+            # first call outside of the measurement, i.e. for imports and caches
+            operation()
+
+            durations = []
+            for i in range(repeat):
+                start = time.perf_counter()
+                for j in range(self.number):
+                    operation()
+                durations.append((time.perf_counter() - start) / self.number)
+        finally:
+            if not cleanup is None:
+                cleanup()
+
+        # the minimum is least disturbed by other processes
+        seconds_per_operation = min(durations)
+
+        result = {
+            'seconds_per_operation': seconds_per_operation,
+            'median_seconds_per_operation': statistics.median(durations),
+            'operations_per_second': 1 / seconds_per_operation,
+            'number': self.number,
+            'repeat': repeat,
+            'threshold': self.threshold,
+        }
+
+        if not self.create is None:
+            memory_number = self.memory_number
+            if memory_number is None:
+                memory_number = self.number
+
+            # measured after the time, tracemalloc slows down allocations
+            result['allocated_bytes_per_operation'] = measure_allocated_bytes(self.create, memory_number)
+            result['memory_number'] = memory_number
+
+        return result
+
+
+def _setup_encode(command):
+    encoder = MessageEncoder()
+
+    return lambda: encoder.encode(command), None
+
+
+def _setup_parse(notification):
+    parser = MessageParser(year_diff=2000)
+    data = MessageEncoder().encode(notification)
+
+    return lambda: parser.parse(data), None
+
+
+def _setup_delegate(notification):
+    data = MessageEncoder().encode(notification)
+
+    fragments = []
+    for i in range(0, len(data), _FRAGMENT_SIZE):
+        fragments.append(data[i:i + _FRAGMENT_SIZE])
+
+    delegate = SEM6000Delegate(message_parser=MessageParser(year_diff=2000))
+
+    def reassemble():
+        for fragment in fragments:
+            delegate(None, fragment)
+            if delegate.has_final_raw_notification():
+                delegate.consume_notification()
+
+    return reassemble, None
+
+
+def _setup_round_trip(operation):
+    simulator = SimulatedSEM6000Interface(seed=0)
+    device = SEM6000('00:11:22:33:44:55', '0000', timeout=0.1, bluetooth_lowenergy_interface=simulator)
+
+    return lambda: operation(device), device.disconnect
+
+
+def _setup_fleet_sweep(number_of_devices, number_of_bluetooth_devices):
+    devices = []
+    for i in range(number_of_devices):
+        devices.append({'address': '00:11:22:33:44:{:02X}'.format(i), 'pin': '0000', 'bluetooth_device': 'hci' + str(i % number_of_bluetooth_devices)})
+
+    def create_session(device, timeout, debug):
+        simulator = SimulatedSEM6000Interface(mac_address=device['address'], bluetooth_device=device['bluetooth_device'], seed=0)
+        return SEM6000(device['address'], device['pin'], timeout=timeout, bluetooth_lowenergy_interface=simulator)
+
+    poller = FleetPoller(devices, timeout=0.1, session_factory=create_session)
+
+    def sweep():
+        for result in poller.sweep():
+            if not result.was_successful():
+                raise result.exception
+
+    return sweep, poller.close
+
+
+def _setup_session_per_call():
+    # what sem6000-cli-demo.py does without a daemon: connect, authorize and request for every call
+    def request_measurement():
+        device = SEM6000(_DEVICE_ADDRESS, bluetooth_lowenergy_interface=SimulatedSEM6000Interface(mac_address=_DEVICE_ADDRESS, pin=_PIN))
+        device.authorize(_PIN)
+        device.request_measurement()
+        device.disconnect()
+
+    return request_measurement, None
+
+
+def _setup_daemon_call():
+    directory = tempfile.mkdtemp()
+
+    def create_session(device, timeout, debug):
+        simulator = SimulatedSEM6000Interface(mac_address=device['address'], pin=_PIN)
+        return SEM6000(device['address'], device['pin'], timeout=timeout, bluetooth_lowenergy_interface=simulator)
+
+    daemon = SEM6000Daemon(os.path.join(directory, 'sem6000d.sock'), timeout=0.1, session_factory=create_session)
+    daemon.start()
+
+    def request_measurement():
+        device = SEM6000DaemonClient(_DEVICE_ADDRESS, socket_path=daemon.socket_path)
+        device.authorize(_PIN)
+        device.request_measurement()
+        device.close()
+
+    def cleanup():
+        daemon.shutdown()
+        shutil.rmtree(directory)
+
+    return request_measurement, cleanup
+
+
+def _setup_request_measurement_with_capture():
+    directory = tempfile.mkdtemp()
+    capture = CaptureWriter(os.path.join(directory, 'capture.bin'))
+
+    simulator = SimulatedSEM6000Interface(seed=0)
+    device = SEM6000(_DEVICE_ADDRESS, _PIN, timeout=0.1, bluetooth_lowenergy_interface=simulator, capture=capture)
+
+    def cleanup():
+        device.disconnect()
+        capture.close()
+        shutil.rmtree(directory)
+
+    return device.request_measurement, cleanup
+
+
+def _setup_record_received():
+    directory = tempfile.mkdtemp()
+    capture = CaptureWriter(os.path.join(directory, 'capture.bin'))
+
+    notification = MeasurementRequestedNotification(is_power_active=True, power_in_milliwatt=1234, voltage_in_volt=230, current_in_milliampere=10, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=42)
+    fragment = MessageEncoder().encode(notification)[:_FRAGMENT_SIZE]
+
+    def cleanup():
+        capture.close()
+        shutil.rmtree(directory)
+
+    return lambda: capture.record_received(_DEVICE_ADDRESS, fragment), cleanup
+
+
+def _create_measurement_notification(i):
+    return MeasurementRequestedNotification(is_power_active=True, power_in_milliwatt=i * 1234, voltage_in_volt=230, current_in_milliampere=i * 5 % 16000, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=42)
+
+
+class _DictMeasurementRequestedNotification:
+    # MeasurementRequestedNotification as it was before messages had __slots__
+    def __init__(self, is_power_active, power_in_milliwatt, voltage_in_volt, current_in_milliampere, frequency_in_hertz, total_consumption_in_kilowatt_hour):
+        self.is_power_active = is_power_active
+        self.power_in_milliwatt = power_in_milliwatt
+        self.voltage_in_volt = voltage_in_volt
+        self.current_in_milliampere = current_in_milliampere
+        self.frequency_in_hertz = frequency_in_hertz
+        self.total_consumption_in_kilowatt_hour = total_consumption_in_kilowatt_hour
+
+
+def _create_dict_measurement_notification(i):
+    return _DictMeasurementRequestedNotification(is_power_active=True, power_in_milliwatt=i * 1234, voltage_in_volt=230, current_in_milliampere=i * 5 % 16000, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=42)
+
+
+def _setup_store_append():
+    directory = tempfile.mkdtemp()
+    store = MeasurementStore(directory)
+    notification = _create_measurement_notification(1)
+    timestamps = iter(range(1600000000, sys.maxsize))
+
+    def cleanup():
+        store.close()
+        shutil.rmtree(directory)
+
+    return lambda: store.append(notification, timestamp=next(timestamps)), cleanup
+
+
+def _setup_store_read_range(number_of_seconds):
+    # a day of 1 Hz samples of one plug
+    directory = tempfile.mkdtemp()
+    store = MeasurementStore(directory)
+
+    notification = _create_measurement_notification(1)
+    for i in range(86400):
+        store.append(notification, timestamp=1600000000.0 + i)
+    store.flush()
+
+    start_timestamp = 1600000000.0 + (86400 - number_of_seconds) // 2
+
+    def cleanup():
+        store.close()
+        shutil.rmtree(directory)
+
+    return lambda: store.read_range(start_timestamp, start_timestamp + number_of_seconds), cleanup
+
+
+def _create_capture_data(number_of_frames):
+    # frames as captured while streaming measurements with other requests in between
+    encoder = MessageEncoder()
+
+    measurement_frames = [encoder.encode(_create_measurement_notification(i)) for i in range(1000)]
+    other_frames = [encoder.encode(notification) for notification in create_sample_notifications()]
+
+    generator = random.Random(0)
+
+    frames = []
+    for i in range(number_of_frames):
+        if i % 1000 < 900:
+            frames.append(measurement_frames[i % 1000])
+        else:
+            frames.append(generator.choice(other_frames))
+
+    return frames
+
+
+def _setup_parse_frames():
+    parser = MessageParser(year_diff=2000)
+    frames = _create_capture_data(10000)
+
+    def parse_frames():
+        for frame in frames:
+            parser.parse(frame)
+
+    return parse_frames, None
+
+
+def _setup_parse_many(use_numpy):
+    parser = MessageParser(year_diff=2000)
+    data = b''.join(_create_capture_data(10000))
+
+    return lambda: batch_parser.parse_many(data, parser=parser, use_numpy=use_numpy), None
+
+
+def get_benchmarks():
+    """
+    Returns a list of all Benchmark instances.
+    """
+    benchmarks = []
+
+    for command in create_sample_commands():
+        benchmarks.append(Benchmark('encode/' + command.__class__.__name__, lambda command=command: _setup_encode(command), number=2000))
+
+    for notification in create_sample_notifications():
+        benchmarks.append(Benchmark('parse/' + notification.__class__.__name__, lambda notification=notification: _setup_parse(notification), number=2000))
+
+    for notification in create_sample_notifications():
+        benchmarks.append(Benchmark('delegate/' + notification.__class__.__name__, lambda notification=notification: _setup_delegate(notification), number=2000))
+
+    round_trips = [
+        ('request_measurement', lambda device: device.request_measurement()),
+        ('request_settings', lambda device: device.request_settings()),
+        ('request_scheduler', lambda device: device.request_scheduler()),
+        ('power_on', lambda device: device.power_on()),
+        ('send_many', lambda device: device.send_many([RequestSettingsCommand(), RequestTimerStatusCommand(), RequestRandomModeStatusCommand(), RequestMeasurementCommand()])),
+        # what a settings backup requests, one command after the other and pipelined
+        ('backup_sequential', lambda device: [device.request_settings(), device.request_timer_status(), device.request_random_mode_status(), device.request_scheduler()]),
+        ('backup_send_many', lambda device: device.send_many([RequestSettingsCommand(), RequestTimerStatusCommand(), RequestRandomModeStatusCommand(), RequestSchedulerCommand(page_number=0)])),
+    ]
+    for name, operation in round_trips:
+        # round trips include thread switches of the simulator and vary more
+        benchmarks.append(Benchmark('sem6000/' + name, lambda operation=operation: _setup_round_trip(operation), number=500, threshold=0.5))
+
+    benchmarks.append(Benchmark('sem6000/request_measurement_with_capture', _setup_request_measurement_with_capture, number=500, threshold=0.5))
+
+    # a new session for each call compared to a session kept open by the daemon
+    benchmarks.append(Benchmark('sem6000/request_measurement_new_session', _setup_session_per_call, number=100, threshold=0.5))
+    benchmarks.append(Benchmark('daemon/request_measurement', _setup_daemon_call, number=100, threshold=0.5))
+
+    benchmarks.append(Benchmark('fleet/sweep_32_devices', lambda: _setup_fleet_sweep(32, 2), number=20, threshold=0.5))
+
+    # memory of a million measurements kept in memory, compared to messages having a __dict__
+    benchmarks.append(Benchmark('message/create/MeasurementRequestedNotification', lambda: (lambda: _create_measurement_notification(1), None), number=20000, create=_create_measurement_notification, memory_number=1000000))
+    benchmarks.append(Benchmark('message/create_with_dict/MeasurementRequestedNotification', lambda: (lambda: _create_dict_measurement_notification(1), None), number=20000, create=_create_dict_measurement_notification, memory_number=1000000))
+
+    benchmarks.append(Benchmark('capture/record_received', _setup_record_received, number=20000))
+
+    benchmarks.append(Benchmark('storage/append', _setup_store_append, number=20000))
+    benchmarks.append(Benchmark('storage/read_range_1_hour', lambda: _setup_store_read_range(3600), number=200))
+    benchmarks.append(Benchmark('storage/read_range_1_day', lambda: _setup_store_read_range(86400), number=20))
+
+    benchmarks.append(Benchmark('batch_parser/parse', _setup_parse_frames, number=5))
+    benchmarks.append(Benchmark('batch_parser/parse_many', lambda: _setup_parse_many(False), number=5))
+    if not batch_parser.numpy is None:
+        benchmarks.append(Benchmark('batch_parser/parse_many_numpy', lambda: _setup_parse_many(True), number=5))
+
+    # includes the start of the interpreter, so a slow import of a transport shows up as regression
+    benchmarks.append(Benchmark('import/codec', lambda: (lambda: measure_cold_import(CODEC_MODULES), None), number=5, threshold=0.5))
+    benchmarks.append(Benchmark('import/sem6000', lambda: (lambda: measure_cold_import(['sem6000.sem6000']), None), number=5, threshold=0.5))
+
+    return benchmarks
+
+
+def _get_git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout.decode('utf-8').strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(benchmarks=None, name_filter=None, repeat=5, progress=None):
+    """
+    Run benchmarks.
+
+    Parameters:
+        benchmarks  - Optional, list of Benchmark instances. Default: get_benchmarks()
+        name_filter - Optional, only benchmarks having this string in their name are run
+        repeat      - Optional, number of repetitions of each benchmark, the fastest one is reported. Default: 5
+        progress    - Optional, callable being called with (name, result) after each benchmark
+
+    Returns a dictionary which can be stored as JSON.
+    """
+    if benchmarks is None:
+        benchmarks = get_benchmarks()
+
+    results = {}
+    for benchmark in benchmarks:
+        if not name_filter is None and not name_filter in benchmark.name:
+            continue
+
+        result = benchmark.run(repeat)
+        results[benchmark.name] = result
+
+        if not progress is None:
+            progress(benchmark.name, result)
+
+    return {
+        'version': RESULT_FORMAT_VERSION,
+        'git_commit': _get_git_commit(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def load_results(filename):
+    with open(filename, "r") as f:
+        results = json.load(f)
+
+    if results.get('version') != RESULT_FORMAT_VERSION:
+        raise Exception("Unsupported benchmark result version " + str(results.get('version')) + " in " + str(filename))
+
+    return results
+
+
+def save_results(results, filename):
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_results(baseline, results):
+    """
+    Compare results with a baseline, i.e. of the previous commit.
+
+    Benchmarks only contained in one of both are ignored.
+
+    Returns a list of (name, baseline seconds per operation, seconds per operation, ratio) of all benchmarks exceeding their threshold.
+    """
+    regressions = []
+
+    for name, result in sorted(results['results'].items()):
+        baseline_result = baseline['results'].get(name)
+        if baseline_result is None:
+            continue
+
+        ratio = result['seconds_per_operation'] / baseline_result['seconds_per_operation']
+        if ratio > 1 + result['threshold']:
+            regressions.append((name, baseline_result['seconds_per_operation'], result['seconds_per_operation'], ratio))
+
+    return regressions
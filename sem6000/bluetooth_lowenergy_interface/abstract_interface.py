@@ -33,6 +33,21 @@ class AbstractBluetoothInterface(ABC):
 
         pass
 
+    def discover_incrementally(self, timeout, service_uuids=[]):
+        '''
+        Yields each discovered device as soon as it is known.
+
+        Parameters:
+            timeout (int):              Maximum amount of seconds to wait for device advertisements
+            service_uuds (list of str): When given only devices advertising one of these services are yielded
+
+        Returns:
+            A generator of dictionaries having keys 'address' and 'name'
+        '''
+
+        for device in self.discover(timeout, service_uuids):
+            yield device
+
     @abstractmethod
     def connect(self, mac_address):
         '''Connects to the given device'''
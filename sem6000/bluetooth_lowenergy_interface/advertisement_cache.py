@@ -0,0 +1,189 @@
+import queue
+import threading
+import time
+
+
+# 16 and 32 bit uuids are shortened forms of uuids based on the bluetooth base uuid
+_BASE_UUID_SUFFIX = '-0000-1000-8000-00805f9b34fb'
+
+
+def normalize_uuid(uuid):
+    '''Returns the 128 bit uuid in lower case with dashes, i.e. 'fff0' -> '0000fff0-0000-1000-8000-00805f9b34fb' '''
+
+    uuid = str(uuid).lower()
+
+    if len(uuid) <= 8:
+        return uuid.rjust(8, '0') + _BASE_UUID_SUFFIX
+
+    if len(uuid) == 32:
+        return '-'.join([uuid[0:8], uuid[8:12], uuid[12:16], uuid[16:20], uuid[20:32]])
+
+    return uuid
+
+
+class Advertisement:
+    def __init__(self, address, name, rssi, service_uuids, last_seen):
+        self.address = address
+        self.name = name
+        self.rssi = rssi
+        # set of normalized uuids, so matching is a set lookup
+        self.service_uuids = frozenset(service_uuids)
+        self.last_seen = last_seen
+
+    def is_matching(self, service_uuids):
+        '''Returns True if one of the normalized service_uuids is advertised or no service_uuids are given'''
+
+        return not service_uuids or not self.service_uuids.isdisjoint(service_uuids)
+
+    def to_dict(self):
+        return {'address': self.address, 'name': self.name, 'rssi': self.rssi, 'last_seen': self.last_seen}
+
+    def __str__(self):
+        name = self.__class__.__name__
+        return name + "(address=" + str(self.address) + ", name=" + str(self.name) + ", rssi=" + str(self.rssi) + ", service_uuids=" + str(sorted(self.service_uuids)) + ", last_seen=" + str(self.last_seen) + ")"
+
+
+class AdvertisementCache:
+    def __init__(self, clock=time.monotonic):
+        """ Create a new AdvertisementCache() instance keeping the latest advertisement of each device
+
+            Subscribers get every advertisement as soon as it is put, so discoveries can yield devices without waiting for the end of a scan.
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._advertisement_by_address = {}
+        self._subscriptions = []
+
+    def put(self, address, name, rssi, service_uuids):
+        """
+        Store an advertisement and pass it to all subscribers.
+
+        Parameters:
+            address         - MAC address of the advertising device
+            name            - Advertised name or None if the advertisement had no name
+            rssi            - Received signal strength in dBm
+            service_uuids   - Iterable of advertised service uuids or None if the advertisement had no service uuids
+
+        Returns the Advertisement, having name and service uuids of a previous advertisement if they are missing.
+        """
+        with self._lock:
+            previous_advertisement = self._advertisement_by_address.get(address)
+
+            # advertisement and scan response of a device carry different data
+            if not previous_advertisement is None:
+                if name is None:
+                    name = previous_advertisement.name
+                if service_uuids is None:
+                    service_uuids = previous_advertisement.service_uuids
+
+            if service_uuids is None:
+                service_uuids = []
+
+            advertisement = Advertisement(address=address, name=name, rssi=rssi, service_uuids=[normalize_uuid(uuid) for uuid in service_uuids], last_seen=self._clock())
+            self._advertisement_by_address[address] = advertisement
+
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            subscription.put(advertisement)
+
+        return advertisement
+
+    def get_advertisements(self, service_uuids=None, max_age_in_seconds=None):
+        """
+        Returns a list of the latest Advertisement of all devices, ordered by address.
+
+        Parameters:
+            service_uuids       - Optional, only devices advertising one of these services are returned
+            max_age_in_seconds  - Optional, only devices having advertised within this time are returned
+        """
+        normalized_service_uuids = None
+        if service_uuids:
+            normalized_service_uuids = set([normalize_uuid(uuid) for uuid in service_uuids])
+
+        oldest_last_seen = None
+        if not max_age_in_seconds is None:
+            oldest_last_seen = self._clock() - max_age_in_seconds
+
+        with self._lock:
+            advertisements = list(self._advertisement_by_address.values())
+
+        result = []
+        for advertisement in advertisements:
+            if not oldest_last_seen is None and advertisement.last_seen < oldest_last_seen:
+                continue
+            if not advertisement.is_matching(normalized_service_uuids):
+                continue
+
+            result.append(advertisement)
+
+        result.sort(key=lambda advertisement: advertisement.address)
+        return result
+
+    def subscribe(self):
+        """
+        Returns a queue.Queue receiving each Advertisement being put from now on. It must be passed to unsubscribe() when it is not used anymore.
+        """
+        subscription = queue.Queue()
+
+        with self._lock:
+            self._subscriptions.append(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.remove(subscription)
+
+    def clear(self):
+        with self._lock:
+            self._advertisement_by_address.clear()
+
+    def __len__(self):
+        return len(self._advertisement_by_address)
+
+
+def discover_incrementally(advertisement_cache, timeout, service_uuids=[], max_age_in_seconds=None, clock=time.monotonic):
+    """
+    Yields a dictionary having keys 'address', 'name', 'rssi' and 'last_seen' for each matching device once.
+
+    Devices already in the cache are yielded first, then devices as soon as their advertisement is put into the cache until timeout.
+    Something else, i.e. a scanner, has to put the advertisements.
+
+    Parameters:
+        advertisement_cache - AdvertisementCache being filled by a scanner
+        timeout             - Time in seconds to wait for further advertisements
+        service_uuids       - Optional, only devices advertising one of these services are yielded
+        max_age_in_seconds  - Optional, maximum age of advertisements in the cache being yielded. Default: none of the cache
+    """
+    normalized_service_uuids = set([normalize_uuid(uuid) for uuid in service_uuids])
+
+    # subscribe before reading the cache, so no advertisement falls in between
+    subscription = advertisement_cache.subscribe()
+    try:
+        yielded_addresses = set()
+
+        if not max_age_in_seconds is None:
+            for advertisement in advertisement_cache.get_advertisements(service_uuids, max_age_in_seconds):
+                yielded_addresses.add(advertisement.address)
+                yield advertisement.to_dict()
+
+        deadline = clock() + timeout
+        while True:
+            remaining = deadline - clock()
+            if remaining <= 0:
+                break
+
+            try:
+                advertisement = subscription.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if advertisement.address in yielded_addresses or not advertisement.is_matching(normalized_service_uuids):
+                continue
+
+            yielded_addresses.add(advertisement.address)
+            yield advertisement.to_dict()
+    finally:
+        advertisement_cache.unsubscribe(subscription)
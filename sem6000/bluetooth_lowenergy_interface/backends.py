@@ -0,0 +1,93 @@
+import importlib
+import threading
+
+
+DEFAULT_BACKEND = 'bluepy'
+
+# backend name -> factory or 'module:attribute' of the factory, the module is only imported when the backend is used
+_factory_by_backend = {
+    'bluepy': 'sem6000.bluetooth_lowenergy_interface.bluepy_interface:BluePyBtLeInterface',
+    'simulator': 'sem6000.simulator:SimulatedSEM6000Interface',
+}
+_default_backend = DEFAULT_BACKEND
+_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    """
+    Register a bluetooth low energy backend.
+
+    Parameters:
+        name    - Name of the backend, i.e. 'bluepy'. A backend of the same name is replaced
+        factory - Callable creating an AbstractBluetoothInterface with keyword argument bluetooth_device, or
+                  'module:attribute' of such a callable, so the module is imported when the backend is used first
+    """
+    with _lock:
+        _factory_by_backend[name] = factory
+
+
+def get_backend_names():
+    with _lock:
+        return sorted(_factory_by_backend.keys())
+
+
+def set_default_backend(name):
+    """
+    Set the backend used if no backend name is given, i.e. by SEM6000() without a bluetooth_lowenergy_interface.
+    """
+    global _default_backend
+
+    with _lock:
+        if not name in _factory_by_backend:
+            raise Exception("Unknown bluetooth backend: " + str(name))
+
+        _default_backend = name
+
+
+def get_default_backend():
+    return _default_backend
+
+
+def get_backend(name=None):
+    """
+    Returns the factory of the backend, importing its module if it was registered by name.
+
+    Parameters:
+        name    - Optional, name of the backend. Default: the default backend
+    """
+    with _lock:
+        if name is None:
+            name = _default_backend
+
+        factory = _factory_by_backend.get(name)
+        if factory is None:
+            raise Exception("Unknown bluetooth backend: " + str(name))
+
+    if not isinstance(factory, str):
+        return factory
+
+    module_name, attribute = factory.split(':')
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        raise Exception("Bluetooth backend " + name + " is not available: " + str(e)) from e
+
+    factory = getattr(module, attribute)
+
+    with _lock:
+        # keep the resolved factory unless the backend was replaced in the meantime
+        if _factory_by_backend.get(name) == module_name + ':' + attribute:
+            _factory_by_backend[name] = factory
+
+    return factory
+
+
+def create_bluetooth_lowenergy_interface(bluetooth_device='hci0', backend=None):
+    """
+    Returns a new AbstractBluetoothInterface of the backend.
+
+    Parameters:
+        bluetooth_device    - Optional, bluetooth device name to use. Default: 'hci0'
+        backend             - Optional, name of the backend. Default: the default backend
+    """
+    return get_backend(backend)(bluetooth_device=bluetooth_device)
@@ -1,9 +1,135 @@
 from . import abstract_interface
+from .advertisement_cache import AdvertisementCache, discover_incrementally
+from .gatt_cache import GattCharacteristicCache
 from .timeout_decorator import *
 
 from bluepy import btle
 
 import sys
+import threading
+import time
+
+
+_SERVICE_UUID_TYPES = [
+    btle.ScanEntry.INCOMPLETE_16B_SERVICES,
+    btle.ScanEntry.COMPLETE_16B_SERVICES,
+    btle.ScanEntry.INCOMPLETE_32B_SERVICES,
+    btle.ScanEntry.COMPLETE_32B_SERVICES,
+    btle.ScanEntry.INCOMPLETE_128B_SERVICES,
+    btle.ScanEntry.COMPLETE_128B_SERVICES,
+]
+
+# bluetooth device -> AdvertisementCache, shared by all interfaces of a bluetooth device
+_advertisement_cache_by_bluetooth_device = {}
+# bluetooth device -> BluePyAdvertisementScanner running in the background
+_advertisement_scanner_by_bluetooth_device = {}
+_advertisement_lock = threading.Lock()
+
+
+def _get_advertisement_cache(bluetooth_device):
+    with _advertisement_lock:
+        advertisement_cache = _advertisement_cache_by_bluetooth_device.get(bluetooth_device)
+        if advertisement_cache is None:
+            advertisement_cache = AdvertisementCache()
+            _advertisement_cache_by_bluetooth_device[bluetooth_device] = advertisement_cache
+
+        return advertisement_cache
+
+
+def _get_running_advertisement_scanner(bluetooth_device):
+    with _advertisement_lock:
+        advertisement_scanner = _advertisement_scanner_by_bluetooth_device.get(bluetooth_device)
+
+    if advertisement_scanner is None or not advertisement_scanner.is_running():
+        return None
+
+    return advertisement_scanner
+
+
+class BluePyScanDelegate(btle.DefaultDelegate):
+    def __init__(self, advertisement_cache):
+        btle.DefaultDelegate.__init__(self)
+
+        self._advertisement_cache = advertisement_cache
+
+    def handleDiscovery(self, scanEntry, isNewDev, isNewData):
+        name = None
+        service_uuids = None
+
+        # name and uuids are only decoded if they changed, otherwise the cache keeps the previous ones
+        if isNewDev or isNewData:
+            name = scanEntry.getValueText(btle.ScanEntry.COMPLETE_LOCAL_NAME)
+
+            for service_uuid_type in _SERVICE_UUID_TYPES:
+                uuids = scanEntry.getValue(service_uuid_type)
+                if not uuids is None:
+                    if service_uuids is None:
+                        service_uuids = []
+                    service_uuids.extend([str(uuid) for uuid in uuids])
+
+        self._advertisement_cache.put(scanEntry.addr, name, scanEntry.rssi, service_uuids)
+
+
+class BluePyAdvertisementScanner:
+    def __init__(self, bluetooth_device='hci0', advertisement_cache=None, debug=False):
+        """ Create a new BluePyAdvertisementScanner() instance putting all received advertisements into an AdvertisementCache
+
+            Parameters:
+                bluetooth_device    - Optional, bluetooth device to use. Default: 'hci0'
+                advertisement_cache - Optional, AdvertisementCache to fill. Default: the cache shared by all interfaces of the bluetooth device
+                debug               - Optional, if set to true a failing scan is printed to sys.stderr
+        """
+        self.bluetooth_device = bluetooth_device
+        self.debug = debug
+
+        self.advertisement_cache = advertisement_cache
+        if self.advertisement_cache is None:
+            self.advertisement_cache = _get_advertisement_cache(bluetooth_device)
+
+        self.exception = None
+
+        self._start_time = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._start_time = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name="sem6000-scanner-" + self.bluetooth_device, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            iface = int(self.bluetooth_device.replace("hci", ""))
+            scanner = btle.Scanner(iface).withDelegate(BluePyScanDelegate(self.advertisement_cache))
+
+            scanner.start()
+            try:
+                # advertisements are put into the cache while processing, the interval only limits the time stop() waits
+                while not self._stop_event.is_set():
+                    scanner.process(0.5)
+            finally:
+                scanner.stop()
+        except Exception as e:
+            self.exception = e
+
+            if self.debug:
+                print("scan on " + self.bluetooth_device + " failed: " + repr(e), file=sys.stderr)
+
+    def is_running(self):
+        return not self._thread is None and self._thread.is_alive()
+
+    def get_running_time(self):
+        '''Returns the time in seconds since the scanner was started'''
+
+        return time.monotonic() - self._start_time
+
+    def stop(self):
+        self._stop_event.set()
+
+        if not self._thread is None:
+            self._thread.join()
 
 class BluePyBtLeDelegate(btle.DefaultDelegate):
     def __init__(self, bluepy_bluetooth_interface):
@@ -16,15 +142,89 @@ class BluePyBtLeDelegate(btle.DefaultDelegate):
 
 
 class BluePyBtLeInterface(abstract_interface.AbstractBluetoothInterface):
-    def __init__(self, mac_address=None, bluetooth_device='hci0'):
+    def __init__(self, mac_address=None, bluetooth_device='hci0', use_gatt_cache=True, gatt_cache_filename=None, firmware_version=None):
+        """ Create a new BluePyBtLeInterface() instance
+
+            Parameters:
+                mac_address         - Optional, MAC address of the device
+                bluetooth_device    - Optional, bluetooth device to use. Default: 'hci0'
+                use_gatt_cache      - Optional, if set to true characteristics are persisted per device, so a reconnect does not need a GATT discovery. Default: True
+                gatt_cache_filename - Optional, path of the cache file. Default: $XDG_CACHE_HOME/sem6000/gatt_cache.json
+                firmware_version    - Optional, firmware version of the device. If set, characteristics cached for another firmware version are discovered again.
+        """
         abstract_interface.AbstractBluetoothInterface.__init__(self, mac_address, bluetooth_device)
 
         self._peripheral = None
         self._delegate = BluePyBtLeDelegate(self)
 
+        self._connected_mac_address = None
+
         self._characteristic_by_uuid = {}
         self._characteristic_by_bluepy_handle = {}
 
+        self.firmware_version = firmware_version
+
+        self._gatt_cache = None
+        if use_gatt_cache:
+            self._gatt_cache = GattCharacteristicCache(gatt_cache_filename)
+
+        # uuids of characteristics loaded from the cache and not yet confirmed by a successful operation
+        self._unconfirmed_cached_uuids = set()
+
+    def _add_characteristic(self, characteristic):
+        self._characteristic_by_uuid[str(characteristic.uuid)] = characteristic
+        self._characteristic_by_bluepy_handle[characteristic.valHandle] = characteristic
+
+    def _load_characteristics_from_gatt_cache(self):
+        if self._gatt_cache is None:
+            return
+
+        cached_characteristics = self._gatt_cache.load(self._connected_mac_address, self.firmware_version)
+        if cached_characteristics is None:
+            return
+
+        for c in cached_characteristics:
+            characteristic = btle.Characteristic(self._peripheral, c["uuid"], c["handle"], c["properties"], c["valHandle"])
+            self._add_characteristic(characteristic)
+            self._unconfirmed_cached_uuids.add(str(characteristic.uuid))
+
+    def _store_characteristics_in_gatt_cache(self):
+        if self._gatt_cache is None:
+            return
+
+        cached_characteristics = []
+        for uuid, characteristic in sorted(self._characteristic_by_uuid.items()):
+            cached_characteristics.append({'uuid': uuid, 'handle': characteristic.handle, 'properties': characteristic.properties, 'valHandle': characteristic.valHandle})
+
+        self._gatt_cache.store(self._connected_mac_address, cached_characteristics, self.firmware_version)
+
+    def _invalidate_gatt_cache(self):
+        self._characteristic_by_uuid.clear()
+        self._characteristic_by_bluepy_handle.clear()
+        self._unconfirmed_cached_uuids.clear()
+
+        if not self._gatt_cache is None:
+            self._gatt_cache.invalidate(self._connected_mac_address)
+
+    def _call_with_characteristic(self, uuid, function):
+        characteristic = self._get_characteristic(uuid)
+
+        try:
+            return_value = function(characteristic)
+        except btle.BTLEGattError as e:
+            if not uuid in self._unconfirmed_cached_uuids:
+                raise e
+
+            # the cached handle does not belong to the characteristic anymore
+            self._invalidate_gatt_cache()
+
+            characteristic = self._get_characteristic(uuid)
+            return_value = function(characteristic)
+
+        self._unconfirmed_cached_uuids.discard(uuid)
+
+        return return_value
+
     @DisconnectAfterTimeout(300)
     def _get_characteristic(self, uuid):
         if uuid in self._characteristic_by_uuid:
@@ -32,8 +232,8 @@ class BluePyBtLeInterface(abstract_interface.AbstractBluetoothInterface):
         else:
             characteristic = self._peripheral.getCharacteristics(uuid=uuid)[0]
 
-            self._characteristic_by_uuid[str(characteristic.uuid)] = characteristic
-            self._characteristic_by_bluepy_handle[characteristic.valHandle] = characteristic
+            self._add_characteristic(characteristic)
+            self._store_characteristics_in_gatt_cache()
 
         return characteristic
 
@@ -50,8 +250,13 @@ class BluePyBtLeInterface(abstract_interface.AbstractBluetoothInterface):
                     characteristic = c
                     break
 
-            self._characteristic_by_uuid[str(characteristic.uuid)] = characteristic
-            self._characteristic_by_bluepy_handle[characteristic.valHandle] = characteristic
+            uuid = str(characteristic.uuid)
+            if uuid in self._unconfirmed_cached_uuids and self._characteristic_by_uuid[uuid].valHandle != characteristic.valHandle:
+                self._invalidate_gatt_cache()
+
+            self._add_characteristic(characteristic)
+            self._unconfirmed_cached_uuids.discard(uuid)
+            self._store_characteristics_in_gatt_cache()
 
         return characteristic
 
@@ -61,50 +266,61 @@ class BluePyBtLeInterface(abstract_interface.AbstractBluetoothInterface):
 
         self._send_notification_to_handlers(uuid, data)
 
-    def discover(self, timeout, service_uuids=[]):
-        result = []
+    def start_advertisement_scanner(self):
+        """
+        Start scanning for advertisements in the background, so discover() can answer from the advertisement cache right away.
+        The scanner is shared by all interfaces of the bluetooth device and keeps running until stop_advertisement_scanner() is called.
+        """
+        with _advertisement_lock:
+            advertisement_scanner = _advertisement_scanner_by_bluetooth_device.get(self.bluetooth_device)
+            if not advertisement_scanner is None and advertisement_scanner.is_running():
+                return
 
-        scanner = btle.Scanner()
-        scanner_results = scanner.scan(timeout)
+            advertisement_scanner = BluePyAdvertisementScanner(self.bluetooth_device, _advertisement_cache_by_bluetooth_device.get(self.bluetooth_device))
+            _advertisement_scanner_by_bluetooth_device[self.bluetooth_device] = advertisement_scanner
 
-        for device in scanner_results:
-            address = device.addr
+        advertisement_scanner.start()
 
-            scanned_incomplete_16b_service_uuids = device.getValueText(btle.ScanEntry.INCOMPLETE_16B_SERVICES)
-            scanned_complete_16b_service_uuids = device.getValueText(btle.ScanEntry.COMPLETE_16B_SERVICES)
+    def stop_advertisement_scanner(self):
+        with _advertisement_lock:
+            advertisement_scanner = _advertisement_scanner_by_bluetooth_device.pop(self.bluetooth_device, None)
 
-            scanned_incomplete_32b_service_uuids = device.getValueText(btle.ScanEntry.INCOMPLETE_32B_SERVICES)
-            scanned_complete_32b_service_uuids = device.getValueText(btle.ScanEntry.COMPLETE_32B_SERVICES)
+        if not advertisement_scanner is None:
+            advertisement_scanner.stop()
+
+    def discover(self, timeout, service_uuids=[]):
+        advertisement_scanner = _get_running_advertisement_scanner(self.bluetooth_device)
+        if advertisement_scanner is None:
+            return list(self.discover_incrementally(timeout, service_uuids))
 
-            scanned_incomplete_128b_service_uuids = device.getValueText(btle.ScanEntry.INCOMPLETE_128B_SERVICES)
-            scanned_complete_128b_service_uuids = device.getValueText(btle.ScanEntry.COMPLETE_128B_SERVICES)
+        # a scanner running for at least timeout seconds has seen all devices a scan of timeout seconds would find
+        remaining = timeout - advertisement_scanner.get_running_time()
+        if remaining > 0:
+            time.sleep(remaining)
 
-            complete_local_name = device.getValueText(btle.ScanEntry.COMPLETE_LOCAL_NAME)
+        advertisement_cache = _get_advertisement_cache(self.bluetooth_device)
 
-            if len(service_uuids) > 0:
-                is_services_matching = False
-                for uuid in service_uuids:
-                    if not scanned_incomplete_16b_service_uuids is None and uuid in scanned_incomplete_16b_service_uuids:
-                        is_services_matching = True
-                    if not scanned_complete_16b_service_uuids is None and uuid in scanned_complete_16b_service_uuids:
-                        is_services_matching = True
+        result = []
+        for advertisement in advertisement_cache.get_advertisements(service_uuids, max_age_in_seconds=timeout):
+            result.append(advertisement.to_dict())
 
-                    if not scanned_incomplete_32b_service_uuids is None and uuid in scanned_incomplete_32b_service_uuids:
-                        is_services_matching = True
-                    if not scanned_complete_32b_service_uuids is None and uuid in scanned_complete_32b_service_uuids:
-                        is_services_matching = True
+        return result
 
-                    if not scanned_incomplete_128b_service_uuids is None and uuid in scanned_incomplete_128b_service_uuids:
-                        is_services_matching = True
-                    if not scanned_complete_128b_service_uuids is None and uuid in scanned_complete_128b_service_uuids:
-                        is_services_matching = True
+    def discover_incrementally(self, timeout, service_uuids=[]):
+        advertisement_cache = _get_advertisement_cache(self.bluetooth_device)
 
-                if not is_services_matching:
-                    continue
-                
-            result.append({'address': address, 'name': complete_local_name})
+        temporary_advertisement_scanner = None
+        if _get_running_advertisement_scanner(self.bluetooth_device) is None:
+            temporary_advertisement_scanner = BluePyAdvertisementScanner(self.bluetooth_device, advertisement_cache)
+            temporary_advertisement_scanner.start()
 
-        return result
+        try:
+            # devices having advertised within timeout are yielded from the cache right away
+            for device in discover_incrementally(advertisement_cache, timeout, service_uuids, max_age_in_seconds=timeout):
+                yield device
+        finally:
+            if not temporary_advertisement_scanner is None:
+                temporary_advertisement_scanner.stop()
 
     def connect(self, mac_address):
         self._peripheral = btle.Peripheral().withDelegate(self._delegate)
@@ -115,9 +331,13 @@ class BluePyBtLeInterface(abstract_interface.AbstractBluetoothInterface):
             self._peripheral = None
             raise e
 
+        self._connected_mac_address = mac_address
+        self._load_characteristics_from_gatt_cache()
+
     def disconnect(self):
         self._characteristic_by_uuid.clear()
         self._characteristic_by_bluepy_handle.clear()
+        self._unconfirmed_cached_uuids.clear()
 
         if self.is_connected():
             self._peripheral.disconnect()
@@ -136,15 +356,11 @@ class BluePyBtLeInterface(abstract_interface.AbstractBluetoothInterface):
 
     @DisconnectAfterTimeout(300)
     def write_to_characteristic(self, uuid, data):
-        characteristic = self._get_characteristic(uuid)
-
-        return characteristic.write(data, self._is_notifications_enabled)
+        return self._call_with_characteristic(uuid, lambda characteristic: characteristic.write(data, self._is_notifications_enabled))
 
     @DisconnectAfterTimeout(300)
     def read_from_characteristic(self, uuid):
-        characteristic = self._get_characteristic(uuid)
-
-        return characteristic.read()
+        return self._call_with_characteristic(uuid, lambda characteristic: characteristic.read())
 
     @DisconnectAfterTimeout(300)
     def wait_for_notifications(self, timeout=None):
@@ -0,0 +1,144 @@
+import contextlib
+import fcntl
+import json
+import os
+import sys
+import tempfile
+
+
+def _get_default_cache_filename():
+    cache_directory = os.environ.get("XDG_CACHE_HOME")
+    if not cache_directory:
+        cache_directory = os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(cache_directory, "sem6000", "gatt_cache.json")
+
+
+class GattCharacteristicCache:
+    '''
+    Persists the characteristics of devices, so a reconnect does not need a GATT discovery.
+
+    Characteristics are stored per MAC address as dictionaries having keys 'uuid', 'handle', 'properties' and 'valHandle'.
+    An entry is dropped if the firmware version stored with it differs from the one of the device connected.
+    '''
+
+    def __init__(self, filename=None, debug=False):
+        """ Create a new GattCharacteristicCache() instance
+
+            Parameters:
+                filename    - Optional, path of the JSON cache file. Default: $XDG_CACHE_HOME/sem6000/gatt_cache.json
+                debug       - Optional, if set to true failures to read or write the cache file are printed to sys.stderr
+        """
+        self.filename = filename
+        if self.filename is None:
+            self.filename = _get_default_cache_filename()
+
+        self.debug = debug
+
+    @contextlib.contextmanager
+    def _locked_file(self):
+        # several sessions, threads or processes may share the cache file, so every change re-reads it under the lock
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+
+        with open(self.filename + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_file(self):
+        try:
+            with open(self.filename, "r") as f:
+                entry_by_mac_address = json.load(f)
+
+            if isinstance(entry_by_mac_address, dict):
+                return entry_by_mac_address
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # a broken cache file is ignored and replaced on the next store
+            if self.debug:
+                print("reading GATT cache " + self.filename + " failed: " + repr(e), file=sys.stderr)
+
+        return {}
+
+    def _write_file(self, entry_by_mac_address):
+        temporary_filename = None
+
+        try:
+            file_descriptor, temporary_filename = tempfile.mkstemp(dir=os.path.dirname(self.filename), suffix=".tmp")
+            with os.fdopen(file_descriptor, "w") as f:
+                json.dump(entry_by_mac_address, f, indent=2, sort_keys=True)
+
+            os.replace(temporary_filename, self.filename)
+        except Exception as e:
+            if self.debug:
+                print("writing GATT cache " + self.filename + " failed: " + repr(e), file=sys.stderr)
+
+            if not temporary_filename is None and os.path.exists(temporary_filename):
+                os.unlink(temporary_filename)
+
+    def load(self, mac_address, firmware_version=None):
+        """
+        Returns the list of cached characteristics of the device or None if nothing is cached.
+
+        Parameters:
+            mac_address         - MAC address of the device, i.e. '00:11:22:33:44:55'
+            firmware_version    - Optional, firmware version of the device if known
+        """
+        mac_address = mac_address.upper()
+
+        with self._locked_file():
+            entry_by_mac_address = self._read_file()
+
+            entry = entry_by_mac_address.get(mac_address)
+            if entry is None:
+                return None
+
+            cached_firmware_version = entry.get("firmware_version")
+            if not firmware_version is None and not cached_firmware_version is None and firmware_version != cached_firmware_version:
+                del entry_by_mac_address[mac_address]
+                self._write_file(entry_by_mac_address)
+                return None
+
+            return [dict(characteristic) for characteristic in entry["characteristics"]]
+
+    def store(self, mac_address, characteristics, firmware_version=None):
+        """
+        Stores the characteristics of the device, replacing the ones cached before.
+
+        Parameters:
+            mac_address         - MAC address of the device, i.e. '00:11:22:33:44:55'
+            characteristics     - List of dictionaries having keys 'uuid', 'handle', 'properties' and 'valHandle'
+            firmware_version    - Optional, firmware version of the device if known
+        """
+        mac_address = mac_address.upper()
+
+        entry = {"characteristics": [dict(characteristic) for characteristic in characteristics]}
+        if not firmware_version is None:
+            entry["firmware_version"] = firmware_version
+
+        with self._locked_file():
+            entry_by_mac_address = self._read_file()
+
+            if entry_by_mac_address.get(mac_address) == entry:
+                return
+
+            entry_by_mac_address[mac_address] = entry
+            self._write_file(entry_by_mac_address)
+
+    def invalidate(self, mac_address):
+        """
+        Removes the cached characteristics of the device.
+        """
+        mac_address = mac_address.upper()
+
+        with self._locked_file():
+            entry_by_mac_address = self._read_file()
+
+            if not mac_address in entry_by_mac_address:
+                return
+
+            del entry_by_mac_address[mac_address]
+            self._write_file(entry_by_mac_address)
@@ -0,0 +1,60 @@
+from . import abstract_async_interface
+
+import asyncio
+
+class ThreadedAsyncBluetoothInterface(abstract_async_interface.AbstractAsyncBluetoothInterface):
+    '''
+    Adapts a blocking AbstractBluetoothInterface to AbstractAsyncBluetoothInterface.
+
+    Every blocking call is run in an executor, so waiting for a device does not block the event loop.
+    Calls for the same device are serialized since the wrapped interface is not thread safe.
+    '''
+
+    def __init__(self, bluetooth_interface, executor=None):
+        abstract_async_interface.AbstractAsyncBluetoothInterface.__init__(self, bluetooth_interface.mac_addess, bluetooth_interface.bluetooth_device)
+
+        self._bluetooth_interface = bluetooth_interface
+        self._bluetooth_interface.add_notification_handler(self._send_notification_to_handlers)
+
+        self._executor = executor
+        self._lock = None
+
+    async def _run(self, function, *args):
+        # the lock must be created on the event loop it is used with
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, function, *args)
+
+    async def enable_notifications(self):
+        await abstract_async_interface.AbstractAsyncBluetoothInterface.enable_notifications(self)
+        self._bluetooth_interface.enable_notifications()
+
+    async def disable_notifications(self):
+        await abstract_async_interface.AbstractAsyncBluetoothInterface.disable_notifications(self)
+        self._bluetooth_interface.disable_notifications()
+
+    async def discover(self, timeout, service_uuids=[]):
+        return await self._run(self._bluetooth_interface.discover, timeout, service_uuids)
+
+    async def connect(self, mac_address):
+        self.mac_address = mac_address
+
+        return await self._run(self._bluetooth_interface.connect, mac_address)
+
+    async def disconnect(self):
+        return await self._run(self._bluetooth_interface.disconnect)
+
+    async def is_connected(self):
+        return await self._run(self._bluetooth_interface.is_connected)
+
+    async def write_to_characteristic(self, uuid, data):
+        return await self._run(self._bluetooth_interface.write_to_characteristic, uuid, data)
+
+    async def read_from_characteristic(self, uuid):
+        return await self._run(self._bluetooth_interface.read_from_characteristic, uuid)
+
+    async def wait_for_notifications(self, timeout):
+        return await self._run(self._bluetooth_interface.wait_for_notifications, timeout)
@@ -1,24 +1,158 @@
+import concurrent.futures
+import heapq
+import itertools
+import sys
 import threading
+import time
 
-def DisconnectAfterTimeout(timeout):
+
+class Watchdog:
+    '''
+    Runs callbacks after their deadline passed unless they were cancelled before.
+
+    All deadlines are kept in one heap served by a single thread, so guarding an operation costs
+    a heap push and a flag instead of starting an OS thread.
+    Callbacks which are due run in a small pool of threads, so a callback blocking i.e. in a disconnect
+    does not delay the deadlines of other operations.
+    '''
+
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(self, clock=time.monotonic, max_workers=DEFAULT_MAX_WORKERS):
+        self._clock = clock
+        self._max_workers = max_workers
+
+        # heap of [deadline, sequence, callback, is_cancelled]
+        self._deadlines = []
+        self._sequence = itertools.count()
+        self._number_of_cancelled_entries_in_heap = 0
+
+        self._condition = threading.Condition()
+        self._thread = None
+        # created by the watchdog thread once the first callback is due
+        self._executor = None
+
+        self.number_of_registered_deadlines = 0
+        self.number_of_cancelled_deadlines = 0
+        self.number_of_fired_deadlines = 0
+
+    def _start_thread(self):
+        if not self._thread is None and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name="sem6000-watchdog", daemon=True)
+        self._thread.start()
+
+    def register(self, timeout, callback):
+        """
+        Call callback once timeout seconds passed.
+
+        Parameters:
+            timeout     - Time in seconds until callback is called
+            callback    - Callable without arguments, being called in a thread of the watchdog
+
+        Returns a handle to pass to cancel().
+        """
+        with self._condition:
+            entry = [self._clock() + timeout, next(self._sequence), callback, False]
+            heapq.heappush(self._deadlines, entry)
+            self.number_of_registered_deadlines += 1
+
+            self._start_thread()
+
+            # wake up the watchdog thread only if it has to wait for a shorter time now
+            if self._deadlines[0] is entry:
+                self._condition.notify()
+
+        return entry
+
+    def cancel(self, handle):
+        """
+        Do not call the callback of handle. Nothing happens if it was called or cancelled already.
+        """
+        with self._condition:
+            if handle[3]:
+                return
+
+            handle[3] = True
+            handle[2] = None
+            self.number_of_cancelled_deadlines += 1
+            self._number_of_cancelled_entries_in_heap += 1
+
+            # cancelled entries are removed lazily, the heap is only rebuilt if most entries are cancelled
+            if self._number_of_cancelled_entries_in_heap > 64 and self._number_of_cancelled_entries_in_heap > len(self._deadlines) // 2:
+                self._deadlines = [entry for entry in self._deadlines if not entry[3]]
+                heapq.heapify(self._deadlines)
+                self._number_of_cancelled_entries_in_heap = 0
+
+    def _pop_due_callback(self):
+        with self._condition:
+            while True:
+                while len(self._deadlines) and self._deadlines[0][3]:
+                    heapq.heappop(self._deadlines)
+                    self._number_of_cancelled_entries_in_heap -= 1
+
+                if not len(self._deadlines):
+                    self._condition.wait()
+                    continue
+
+                delay = self._deadlines[0][0] - self._clock()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                entry = heapq.heappop(self._deadlines)
+                callback = entry[2]
+                entry[2] = None
+                entry[3] = True
+                self.number_of_fired_deadlines += 1
+
+                return callback
+
+    def _call(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            print("watchdog callback failed: " + repr(e), file=sys.stderr)
+
+    def _run(self):
+        while True:
+            callback = self._pop_due_callback()
+
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="sem6000-watchdog-callback")
+
+            self._executor.submit(self._call, callback)
+
+    def __len__(self):
+        with self._condition:
+            return len(self._deadlines) - self._number_of_cancelled_entries_in_heap
+
+
+default_watchdog = Watchdog()
+
+
+def DisconnectAfterTimeout(timeout, watchdog=None):
     def Decorator(function):
         def decorated_function(*s, **d):
             def disconnect():
                 disconnectable = s[0]
                 disconnectable.disconnect()
 
-            timer = threading.Timer(timeout, disconnect)
-            timer.start()
-   
-            return_value = None 
+            used_watchdog = watchdog
+            if used_watchdog is None:
+                used_watchdog = default_watchdog
+
+            handle = used_watchdog.register(timeout, disconnect)
+
+            return_value = None
             try:
                 return_value = function(*s, **d)
             finally:
-                timer.cancel()
-    
+                used_watchdog.cancel(handle)
+
             return return_value
 
         return decorated_function
 
     return Decorator
-
@@ -0,0 +1,61 @@
+import time
+
+from .message import *
+
+
+DEFAULT_TTL_IN_SECONDS_BY_NOTIFICATION_CLASS = {
+    SettingsRequestedNotification: 300,
+    TimerStatusRequestedNotification: 10,
+    SchedulerRequestedNotification: 300,
+    RandomModeStatusRequestedNotification: 300,
+    DeviceNameRequestedNotification: 3600,
+    DeviceSerialRequestedNotification: 86400,
+}
+
+
+class NotificationCache:
+    def __init__(self, ttl_in_seconds_by_notification_class=None, clock=time.monotonic):
+        """ Create a new NotificationCache() instance keeping responses of read requests for a limited time
+
+            Parameters:
+                ttl_in_seconds_by_notification_class    - Optional, dictionary of notification class -> time in seconds a notification is valid. Notifications of other classes are not cached. Default: DEFAULT_TTL_IN_SECONDS_BY_NOTIFICATION_CLASS
+        """
+        self.ttl_in_seconds_by_notification_class = ttl_in_seconds_by_notification_class
+        if self.ttl_in_seconds_by_notification_class is None:
+            self.ttl_in_seconds_by_notification_class = dict(DEFAULT_TTL_IN_SECONDS_BY_NOTIFICATION_CLASS)
+
+        self.number_of_hits = 0
+        self.number_of_misses = 0
+
+        self._clock = clock
+
+        # notification class -> (expiry time, notification)
+        self._entry_by_notification_class = {}
+
+    def get(self, notification_class):
+        """
+        Returns the cached notification of the class or None if it is not cached or expired.
+        """
+        entry = self._entry_by_notification_class.get(notification_class)
+
+        if entry is None or entry[0] <= self._clock():
+            self.number_of_misses += 1
+            return None
+
+        self.number_of_hits += 1
+        return entry[1]
+
+    def put(self, notification):
+        notification_class = type(notification)
+
+        ttl_in_seconds = self.ttl_in_seconds_by_notification_class.get(notification_class)
+        if ttl_in_seconds is None or ttl_in_seconds <= 0:
+            return
+
+        self._entry_by_notification_class[notification_class] = (self._clock() + ttl_in_seconds, notification)
+
+    def invalidate(self, notification_class):
+        self._entry_by_notification_class.pop(notification_class, None)
+
+    def clear(self):
+        self._entry_by_notification_class.clear()
@@ -0,0 +1,218 @@
+import collections
+import struct
+import threading
+import time
+
+from .delegate import SEM6000Delegate
+from . import parser
+
+
+DIRECTION_SENT = 0
+DIRECTION_RECEIVED = 1
+
+# identifies capture files and the version of the record format
+_MAGIC = b'SEM6CAP\x01'
+
+# monotonic timestamp, direction, device address, length of data
+_RECORD_HEADER = struct.Struct('<dB6sH')
+
+_UNKNOWN_DEVICE_ADDRESS = bytes(6)
+
+
+CaptureRecord = collections.namedtuple('CaptureRecord', ['timestamp', 'device_address', 'direction', 'data'])
+
+ReplayedMessage = collections.namedtuple('ReplayedMessage', ['timestamp', 'device_address', 'direction', 'message'])
+
+
+def _pack_device_address(device_address):
+    if device_address is None:
+        return _UNKNOWN_DEVICE_ADDRESS
+
+    return bytes.fromhex(device_address.replace(':', ''))
+
+
+def _unpack_device_address(packed_device_address):
+    if packed_device_address == _UNKNOWN_DEVICE_ADDRESS:
+        return None
+
+    return ':'.join(['{:02X}'.format(b) for b in packed_device_address])
+
+
+class CaptureWriter:
+    def __init__(self, filename, flush_interval_in_seconds=1, clock=time.monotonic):
+        """ Create a new CaptureWriter() instance appending sent command frames and received notification fragments to a binary log
+
+            Recording only appends to an in memory queue, packing and writing the records is done by a background thread.
+
+            Parameters:
+                filename                    - Path of the capture file, records are appended if it exists
+                flush_interval_in_seconds   - Optional, time in seconds between writes of the queued records. Default: 1
+        """
+        self.filename = filename
+        self.flush_interval_in_seconds = flush_interval_in_seconds
+
+        self.number_of_records = 0
+
+        self._clock = clock
+
+        # (timestamp, direction, device address, data), deque.append() and popleft() are thread safe
+        self._records = collections.deque()
+        self._packed_device_address_by_device_address = {}
+
+        self._lock = threading.Lock()
+        self._file = open(self.filename, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sem6000-capture-writer", daemon=True)
+        self._thread.start()
+
+    def record_sent(self, device_address, data):
+        self._records.append((self._clock(), DIRECTION_SENT, device_address, bytes(data)))
+
+    def record_received(self, device_address, data):
+        self._records.append((self._clock(), DIRECTION_RECEIVED, device_address, bytes(data)))
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval_in_seconds):
+            self.flush()
+
+    def _get_packed_device_address(self, device_address):
+        packed_device_address = self._packed_device_address_by_device_address.get(device_address)
+        if packed_device_address is None:
+            packed_device_address = _pack_device_address(device_address)
+            self._packed_device_address_by_device_address[device_address] = packed_device_address
+
+        return packed_device_address
+
+    def flush(self):
+        """
+        Write all queued records to the capture file.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+
+            chunks = []
+            number_of_records = 0
+
+            pack = _RECORD_HEADER.pack
+            while True:
+                try:
+                    timestamp, direction, device_address, data = self._records.popleft()
+                except IndexError:
+                    break
+
+                chunks.append(pack(timestamp, direction, self._get_packed_device_address(device_address), len(data)))
+                chunks.append(data)
+                number_of_records += 1
+
+            if not number_of_records:
+                return
+
+            self._file.write(b''.join(chunks))
+            self._file.flush()
+
+            self.number_of_records += number_of_records
+
+    def close(self):
+        """
+        Stop the background thread, write all queued records and close the capture file.
+        """
+        self._stop_event.set()
+        self._thread.join()
+
+        self.flush()
+
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_capture(filename):
+    """
+    Read the records of a capture file.
+
+    Returns a generator of CaptureRecord.
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise Exception("Not a capture file: " + str(filename))
+
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                # a record being cut off by an interrupted write is ignored
+                break
+
+            timestamp, direction, packed_device_address, length = _RECORD_HEADER.unpack(header)
+
+            data = f.read(length)
+            if len(data) < length:
+                break
+
+            yield CaptureRecord(timestamp=timestamp, device_address=_unpack_device_address(packed_device_address), direction=direction, data=data)
+
+
+def replay(filename, real_time=False, year_diff=None, debug=False, clock=time.monotonic, sleep=time.sleep):
+    """
+    Feed a capture file through the command parser and the notification delegate.
+
+    Received fragments of each device are passed to its own SEM6000Delegate, so notifications are
+    reassembled the same way as on reception.
+
+    Parameters:
+        filename    - Path of the capture file
+        real_time   - Optional, if set to true records are replayed with the delays they were captured with. Default: replay at maximum speed
+        year_diff   - Optional, see MessageParser
+        debug       - Optional, if set to true received data is printed to sys.stderr by the delegates
+
+    Returns a generator of ReplayedMessage, message being the parsed command or notification or the exception raised while parsing.
+    """
+    command_parser = parser.CommandParser(year_diff=year_diff)
+    notification_parser = parser.MessageParser(year_diff=year_diff)
+
+    delegate_by_device_address = {}
+
+    first_timestamp = None
+    replay_start = None
+
+    for record in read_capture(filename):
+        if real_time:
+            if first_timestamp is None:
+                first_timestamp = record.timestamp
+                replay_start = clock()
+
+            delay = (record.timestamp - first_timestamp) - (clock() - replay_start)
+            if delay > 0:
+                sleep(delay)
+
+        if record.direction == DIRECTION_SENT:
+            try:
+                command = command_parser.parse(record.data)
+            except Exception as e:
+                command = e
+
+            yield ReplayedMessage(timestamp=record.timestamp, device_address=record.device_address, direction=record.direction, message=command)
+            continue
+
+        delegate = delegate_by_device_address.get(record.device_address)
+        if delegate is None:
+            delegate = SEM6000Delegate(debug, message_parser=notification_parser)
+            delegate_by_device_address[record.device_address] = delegate
+
+        delegate(None, record.data)
+
+        while delegate.has_final_raw_notification():
+            try:
+                notification = delegate.consume_notification()
+            except Exception as e:
+                notification = e
+
+            yield ReplayedMessage(timestamp=record.timestamp, device_address=record.device_address, direction=record.direction, message=notification)
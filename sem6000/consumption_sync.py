@@ -0,0 +1,188 @@
+import datetime
+import sqlite3
+import sys
+import threading
+
+
+GRANULARITY_HOUR = 'hour'
+GRANULARITY_DAY = 'day'
+GRANULARITY_MONTH = 'month'
+
+
+def _get_hour_bucket_start(now, n_hours_ago):
+    d = now.replace(minute=0, second=0, microsecond=0) - datetime.timedelta(hours=n_hours_ago)
+    return d.isoformat(timespec='minutes')
+
+
+def _get_day_bucket_start(now, n_days_ago):
+    d = now.date() - datetime.timedelta(days=n_days_ago)
+    return d.isoformat()
+
+
+def _get_month_bucket_start(now, n_months_ago):
+    month_index = now.year * 12 + (now.month - 1) - n_months_ago
+    return "{:04d}-{:02d}".format(month_index // 12, month_index % 12 + 1)
+
+
+def _request_hours(device):
+    return device.request_consumption_of_last_23_hours().consumption_n_hours_ago_in_watt_hour
+
+
+def _request_days(device):
+    return device.request_consumption_of_last_30_days().consumption_n_days_ago_in_watt_hour
+
+
+def _request_months(device):
+    return device.request_consumption_of_last_12_months().consumption_n_months_ago_in_watt_hour
+
+
+# granularity -> (function returning the bucket start n buckets ago, function requesting the "n ago" list from a device)
+_WINDOWS = [
+    (GRANULARITY_HOUR, _get_hour_bucket_start, _request_hours),
+    (GRANULARITY_DAY, _get_day_bucket_start, _request_days),
+    (GRANULARITY_MONTH, _get_month_bucket_start, _request_months),
+]
+
+
+class ConsumptionHistory:
+    def __init__(self, filename):
+        """ Create a new ConsumptionHistory() instance storing consumption buckets in a sqlite database
+
+            Buckets are keyed by (device, granularity, bucket start), bucket starts are ISO formatted:
+            'YYYY-MM-DDTHH:00' for hours, 'YYYY-MM-DD' for days and 'YYYY-MM' for months.
+
+            Parameters:
+                filename    - Path of the sqlite database, ':memory:' for a database in memory
+        """
+        self.filename = filename
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS consumption (device TEXT NOT NULL, granularity TEXT NOT NULL, bucket_start TEXT NOT NULL, consumption_in_watt_hour INTEGER NOT NULL, PRIMARY KEY (device, granularity, bucket_start))")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS high_water_mark (device TEXT NOT NULL, granularity TEXT NOT NULL, bucket_start TEXT NOT NULL, PRIMARY KEY (device, granularity))")
+
+    def merge(self, device, granularity, consumption_by_bucket_start):
+        """
+        Stores buckets which are new or have a different consumption.
+
+        Returns the number of inserted or updated buckets.
+        """
+        with self._lock, self._connection:
+            stored_consumption_by_bucket_start = dict(self._connection.execute(
+                "SELECT bucket_start, consumption_in_watt_hour FROM consumption WHERE device = ? AND granularity = ? AND bucket_start >= ?",
+                (device, granularity, min(consumption_by_bucket_start, default=''))))
+
+            changed_rows = []
+            for bucket_start, consumption_in_watt_hour in consumption_by_bucket_start.items():
+                if stored_consumption_by_bucket_start.get(bucket_start) != consumption_in_watt_hour:
+                    changed_rows.append((device, granularity, bucket_start, consumption_in_watt_hour))
+
+            self._connection.executemany("INSERT OR REPLACE INTO consumption (device, granularity, bucket_start, consumption_in_watt_hour) VALUES (?, ?, ?, ?)", changed_rows)
+
+        return len(changed_rows)
+
+    def get_consumptions(self, device, granularity, start=None, end=None):
+        """
+        Returns a list of (bucket start, consumption in watt hour) with start <= bucket start < end, ordered by bucket start.
+        """
+        query = "SELECT bucket_start, consumption_in_watt_hour FROM consumption WHERE device = ? AND granularity = ?"
+        parameters = [device, granularity]
+
+        if not start is None:
+            query += " AND bucket_start >= ?"
+            parameters.append(start)
+        if not end is None:
+            query += " AND bucket_start < ?"
+            parameters.append(end)
+
+        query += " ORDER BY bucket_start"
+
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchall()
+
+    def get_high_water_mark(self, device, granularity):
+        """
+        Returns the newest bucket start of the last sync or None if the device was never synced.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT bucket_start FROM high_water_mark WHERE device = ? AND granularity = ?", (device, granularity)).fetchone()
+
+        if row is None:
+            return None
+
+        return row[0]
+
+    def set_high_water_mark(self, device, granularity, bucket_start):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO high_water_mark (device, granularity, bucket_start) VALUES (?, ?, ?)", (device, granularity, bucket_start))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class ConsumptionSync:
+    def __init__(self, history, clock=datetime.datetime.now, debug=False):
+        """ Create a new ConsumptionSync() instance merging the consumption windows of devices into a ConsumptionHistory
+
+            The "n ago" lists of request_consumption_of_last_23_hours(), _30_days() and _12_months() are anchored to the
+            wall clock time of the request. A window is only requested if a bucket was completed since its last sync.
+
+            Parameters:
+                history - ConsumptionHistory to merge into
+                debug   - Optional, if set to true skipped requests are printed to sys.stderr
+        """
+        self.history = history
+        self.debug = debug
+
+        self.number_of_requests = 0
+        self.number_of_skipped_requests = 0
+
+        self._clock = clock
+
+    def sync(self, device, device_id, force=False):
+        """
+        Request the consumption windows having new buckets and merge them.
+
+        Parameters:
+            device      - Connected and authorized SEM6000 instance
+            device_id   - Key of the device in the history, i.e. its MAC address
+            force       - Optional, if set to true all windows are requested
+
+        Returns a dictionary of granularity -> number of inserted or updated buckets.
+        """
+        number_of_changed_buckets_by_granularity = {}
+
+        for granularity, get_bucket_start, request in _WINDOWS:
+            now = self._clock()
+
+            # the window ends with the current bucket, it only gains a completed bucket once the current one changed
+            current_bucket_start = get_bucket_start(now, 0)
+            if not force and self.history.get_high_water_mark(device_id, granularity) == current_bucket_start:
+                if self.debug:
+                    print("skipped " + granularity + " consumption of " + str(device_id) + ", no new bucket since " + current_bucket_start, file=sys.stderr)
+
+                self.number_of_skipped_requests += 1
+                number_of_changed_buckets_by_granularity[granularity] = 0
+                continue
+
+            consumptions = request(device)
+            self.number_of_requests += 1
+
+            # the device answers relative to the time it received the request
+            now = self._clock()
+            current_bucket_start = get_bucket_start(now, 0)
+
+            consumption_by_bucket_start = {}
+            for n_ago, consumption_in_watt_hour in enumerate(consumptions):
+                if consumption_in_watt_hour is None:
+                    continue
+
+                consumption_by_bucket_start[get_bucket_start(now, n_ago)] = consumption_in_watt_hour
+
+            number_of_changed_buckets_by_granularity[granularity] = self.history.merge(device_id, granularity, consumption_by_bucket_start)
+            self.history.set_high_water_mark(device_id, granularity, current_bucket_start)
+
+        return number_of_changed_buckets_by_granularity
@@ -0,0 +1,384 @@
+import inspect
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+from . import message
+from .message import *
+from .sem6000 import SEM6000
+from . import util
+
+
+# methods of SEM6000 which can be called through the daemon
+METHODS = set([
+    'authorize', 'change_pin', 'reset_pin',
+    'power_on', 'power_off', 'nightmode_on', 'nightmode_off',
+    'change_date_and_time',
+    'request_settings', 'change_power_limit', 'change_prices', 'change_reduced_period',
+    'request_timer_status', 'activate_timer', 'activate_timer_at', 'reset_timer',
+    'request_scheduler', 'add_onetime_scheduler', 'edit_onetime_scheduler', 'add_repeated_scheduler', 'edit_repeated_scheduler', 'remove_scheduler',
+    'request_random_mode_status', 'change_random_mode', 'reset_random_mode',
+    'request_measurement',
+    'request_consumption_of_last_12_months', 'request_consumption_of_last_30_days', 'request_consumption_of_last_23_hours', 'reset_consumption',
+    'request_device_name', 'change_device_name', 'factory_reset', 'request_device_serial',
+])
+
+# methods the device answers without being authorized, i.e. to reset a forgotten pin
+METHODS_WITHOUT_PIN = set(['reset_pin', 'request_device_name'])
+
+
+def get_default_socket_path():
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return os.path.join(runtime_directory, "sem6000d.sock")
+
+    return os.path.join("/tmp", "sem6000d-" + str(os.getuid()) + ".sock")
+
+
+def is_daemon_running(socket_path=None):
+    """
+    Returns True if a daemon accepts connections on socket_path.
+    """
+    if socket_path is None:
+        socket_path = get_default_socket_path()
+
+    if not os.path.exists(socket_path):
+        return False
+
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        s.close()
+
+    return True
+
+
+def _create_sem6000_session(device, timeout, debug):
+    return SEM6000(device["address"], device["pin"], bluetooth_device=device["bluetooth_device"], timeout=timeout, debug=debug)
+
+
+def _to_json_value(value):
+    if isinstance(value, message._ValueObject):
+        return {'class': type(value).__name__, 'values': [_to_json_value(v) for v in value._get_values()]}
+
+    if isinstance(value, util.Weekday):
+        return {'weekday': value.value}
+
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(v) for v in value]
+
+    return value
+
+
+def _from_json_value(value):
+    if isinstance(value, list):
+        return [_from_json_value(v) for v in value]
+
+    if not isinstance(value, dict):
+        return value
+
+    if 'weekday' in value:
+        return util.Weekday(value['weekday'])
+
+    message_class = getattr(message, value['class'], None)
+    if not isinstance(message_class, type) or not issubclass(message_class, message._ValueObject):
+        raise Exception("Unsupported message class " + str(value['class']))
+
+    # the attributes are restored as they are, running __new__ again could change them, i.e. the year of a date
+    return message_class._make([_from_json_value(v) for v in value['values']])
+
+
+def _encode_response(notification):
+    return {'notification': _to_json_value(notification)}
+
+
+def _decode_response(response):
+    if 'error' in response:
+        raise Exception(response['error'])
+
+    return _from_json_value(response['notification'])
+
+
+class _SEM6000DaemonSession:
+    def __init__(self, sem6000):
+        self.sem6000 = sem6000
+        self.lock = threading.Lock()
+
+
+class _SEM6000DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+                response = self.server.daemon.handle_request(request)
+            except Exception as e:
+                response = {'error': str(e)}
+
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _SEM6000DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class SEM6000Daemon:
+    def __init__(self, socket_path=None, timeout=3, session_factory=None, debug=False):
+        """ Create a new SEM6000Daemon() instance keeping authorized sessions open and serving them on a unix domain socket
+
+            Each request is one line of JSON having keys 'address', 'pin', 'method', 'arguments' and optionally 'bluetooth_device'.
+            Each request has to contain the pin of the device, also if the session was authorized by another client already.
+            Each response is one line of JSON having key 'notification' (class name and attribute values of the notification) or 'error'.
+
+            Parameters:
+                socket_path         - Optional, path of the unix domain socket. Default: $XDG_RUNTIME_DIR/sem6000d.sock
+                timeout             - Optional, maximum time in seconds to wait for a response from a device. Default: 3
+                session_factory     - Optional, callable being called with (device, timeout, debug) returning a connected and authorized SEM6000 like session. Default: creates a SEM6000 instance
+                debug               - Optional, if set to true requests and failures are printed to sys.stderr
+        """
+        self.socket_path = socket_path
+        if self.socket_path is None:
+            self.socket_path = get_default_socket_path()
+
+        self.timeout = timeout
+        self.debug = debug
+
+        self._session_factory = session_factory
+        if self._session_factory is None:
+            self._session_factory = _create_sem6000_session
+
+        self._sessions_lock = threading.Lock()
+        self._session_by_device = {}
+
+        self._server = None
+
+    def _get_session(self, address, bluetooth_device):
+        key = (bluetooth_device, address.upper())
+
+        with self._sessions_lock:
+            session = self._session_by_device.get(key)
+            if session is None:
+                session = _SEM6000DaemonSession(None)
+                self._session_by_device[key] = session
+
+        return session
+
+    def _call(self, session, device, method, arguments):
+        # an authorized session must not be usable without knowing its pin
+        if device["pin"] is None and not method in METHODS_WITHOUT_PIN:
+            raise Exception("A pin is required to call " + method)
+
+        if session.sem6000 is None:
+            session.sem6000 = self._session_factory(device, self.timeout, self.debug)
+
+        sem6000 = session.sem6000
+
+        # the session is authorized already, repeating it would cost a round trip
+        if method == 'authorize' and sem6000.pin == device["pin"]:
+            return AuthorizedNotification(was_successful=True)
+
+        if method != 'authorize' and not method in METHODS_WITHOUT_PIN and sem6000.pin != device["pin"]:
+            sem6000.authorize(device["pin"])
+
+        notification = getattr(sem6000, method)(**arguments)
+
+        # reconnects have to use the new pin, a session which was not authorized stays unauthorized
+        if method == 'change_pin':
+            sem6000.pin = arguments['new_pin']
+        elif method == 'reset_pin' and not sem6000.pin is None:
+            sem6000.pin = '0000'
+
+        return notification
+
+    def handle_request(self, request):
+        """
+        Executes a request on the session of the device and returns the response.
+        """
+        method = request['method']
+        if not method in METHODS:
+            raise Exception("Unsupported method " + str(method))
+
+        arguments = request.get('arguments', {})
+        device = {'address': request['address'], 'pin': request.get('pin'), 'bluetooth_device': request.get('bluetooth_device', 'hci0')}
+        if method == 'authorize':
+            device['pin'] = arguments.get('pin')
+
+        if self.debug:
+            print("request: " + device['address'] + " " + method + " " + str(arguments), file=sys.stderr)
+
+        session = self._get_session(device['address'], device['bluetooth_device'])
+
+        with session.lock:
+            try:
+                notification = self._call(session, device, method, arguments)
+            except Exception as e:
+                if self.debug:
+                    print(method + " on " + device['address'] + " failed: " + repr(e), file=sys.stderr)
+
+                # a session which failed to connect or authorize is created again on the next request
+                if not session.sem6000 is None and session.sem6000.pin is None:
+                    self._close_session(session)
+
+                raise e
+
+        return _encode_response(notification)
+
+    def _close_session(self, session):
+        if session.sem6000 is None:
+            return
+
+        try:
+            session.sem6000.disconnect()
+        except Exception as e:
+            if self.debug:
+                print("disconnect failed: " + repr(e), file=sys.stderr)
+
+        session.sem6000 = None
+
+    def _create_server(self):
+        if os.path.exists(self.socket_path):
+            if is_daemon_running(self.socket_path):
+                raise Exception("Daemon is already running on " + self.socket_path)
+
+            # left over by a daemon which was not shut down cleanly
+            os.unlink(self.socket_path)
+
+        self._server = _SEM6000DaemonServer(self.socket_path, _SEM6000DaemonRequestHandler)
+        self._server.daemon = self
+
+        os.chmod(self.socket_path, 0o600)
+
+    def _close(self):
+        if not self._server is None:
+            self._server.server_close()
+            self._server = None
+
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+        with self._sessions_lock:
+            for session in self._session_by_device.values():
+                with session.lock:
+                    self._close_session(session)
+
+            self._session_by_device.clear()
+
+    def serve_forever(self):
+        """
+        Serve requests until the process is interrupted, i.e. by KeyboardInterrupt.
+        """
+        self._create_server()
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._close()
+
+    def start(self):
+        """
+        Start serving requests in a background thread until shutdown() is called.
+        """
+        self._create_server()
+
+        thread = threading.Thread(target=self._server.serve_forever, name="sem6000d", daemon=True)
+        thread.start()
+
+    def shutdown(self):
+        """
+        Stop serving requests started by start() and disconnect all sessions.
+        """
+        if not self._server is None:
+            self._server.shutdown()
+
+        self._close()
+
+
+class SEM6000DaemonClient:
+    def __init__(self, deviceAddr, pin=None, bluetooth_device='hci0', socket_path=None):
+        """ Create a new SEM6000DaemonClient() instance calling SEM6000 methods through a running SEM6000Daemon
+
+            Methods have the same names, parameters and return values as the ones of SEM6000.
+
+            Parameters:
+                deviceAddr          - MAC address of the remote device, i.e. '00:11:22:33:44:55'.
+                pin                 - Optional, 4 digit numeric pin, i.e. '0000'.
+                bluetooth_device    - Optional, bluetooth device name to use. Default: 'hci0'
+                socket_path         - Optional, path of the unix domain socket. Default: $XDG_RUNTIME_DIR/sem6000d.sock
+        """
+        self.device_address = deviceAddr
+        self.pin = pin
+        self.bluetooth_device = bluetooth_device
+
+        self.socket_path = socket_path
+        if self.socket_path is None:
+            self.socket_path = get_default_socket_path()
+
+        self._socket = None
+        self._file = None
+
+    def _connect(self):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(self.socket_path)
+        self._file = self._socket.makefile('rwb')
+
+    def close(self):
+        if not self._file is None:
+            self._file.close()
+            self._file = None
+
+        if not self._socket is None:
+            self._socket.close()
+            self._socket = None
+
+    def _call(self, method, arguments):
+        if self._socket is None:
+            self._connect()
+
+        request = {'address': self.device_address, 'pin': self.pin, 'bluetooth_device': self.bluetooth_device, 'method': method, 'arguments': arguments}
+
+        self._file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            self.close()
+            raise Exception("Connection to daemon closed")
+
+        return _decode_response(json.loads(line))
+
+    def authorize(self, pin):
+        notification = self._call('authorize', {'pin': pin})
+        self.pin = pin
+
+        return notification
+
+    def change_pin(self, new_pin):
+        notification = self._call('change_pin', {'new_pin': new_pin})
+        self.pin = new_pin
+
+        return notification
+
+    def __getattr__(self, name):
+        if not name in METHODS:
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            bound_arguments = inspect.signature(getattr(SEM6000, name)).bind(self, *args, **kwargs)
+
+            arguments = dict(bound_arguments.arguments)
+            del arguments['self']
+
+            return self._call(name, arguments)
+
+        return method
@@ -0,0 +1,109 @@
+import binascii
+import sys
+
+from . import parser
+
+
+class SEM6000Delegate():
+    # a frame is 0x0f, length, payload and checksum (length bytes) and an optional suffix b'\xff\xff'
+    _FRAME_START = 0x0f
+    _SUFFIX = b'\xff\xff'
+
+    # large enough for the longest frame (2 + 255 + 2 bytes); grows if more data is buffered
+    _INITIAL_BUFFER_SIZE = 512
+
+    def __init__(self, debug=False, message_parser=None):
+        self.debug = False
+        if debug:
+            self.debug = True
+
+        self._buffer = bytearray(SEM6000Delegate._INITIAL_BUFFER_SIZE)
+        self._buffer_length = 0
+
+        if message_parser is None:
+            message_parser = parser.MessageParser()
+
+        self._parser = message_parser
+
+    def __call__(self, characteristic_uuid, data):
+        self._handle_notification(characteristic_uuid, data)
+
+    def _handle_notification(self, characteristic_uuid, data):
+        start = self._buffer_length
+        end = start + len(data)
+
+        if end > len(self._buffer):
+            self._buffer.extend(bytes(end - len(self._buffer)))
+
+        self._buffer[start:end] = data
+        self._buffer_length = end
+
+    def _get_frame_start(self):
+        # skip a b'\xff\xff' suffix which arrived after its frame was consumed already
+        start = 0
+        while start < self._buffer_length and self._buffer[start] == 0xff:
+            start += 1
+
+        return start
+
+    def _get_frame_end(self, start):
+        '''Returns the end of the frame starting at start including its suffix or None if the frame is incomplete'''
+
+        if start >= self._buffer_length:
+            return None
+
+        # not a frame, hand everything to the parser to report the error
+        if self._buffer[start] != SEM6000Delegate._FRAME_START:
+            return self._buffer_length
+
+        if self._buffer_length - start < 2:
+            return None
+
+        end = start + 2 + self._buffer[start+1]
+        if end > self._buffer_length:
+            return None
+
+        if self._buffer[end:end+2] == SEM6000Delegate._SUFFIX:
+            end += 2
+
+        return end
+
+    def _discard(self, end):
+        remaining = self._buffer_length - end
+        self._buffer[0:remaining] = self._buffer[end:self._buffer_length]
+        self._buffer_length = remaining
+
+    def has_final_raw_notification(self):
+        return self._get_frame_end(self._get_frame_start()) is not None
+
+    def consume_notification(self):
+        """
+        Parse the first complete frame received and remove it from the buffer.
+        Data of following frames is kept for the next call.
+        """
+        start = self._get_frame_start()
+        end = self._get_frame_end(start)
+
+        if end is None:
+            if self.debug:
+                print("received data: " + str(binascii.hexlify(self._buffer[start:self._buffer_length])) + " (Unknown Notification)", file=sys.stderr)
+            raise Exception("Incomplete notification data")
+
+        # one copy through a view of the buffer, the parser and exceptions raised by it may keep references to the data while the buffer is resized
+        data = bytes(memoryview(self._buffer)[start:end])
+        self._discard(end)
+
+        try:
+            notification = self._parser.parse(data)
+
+            if self.debug:
+                print("received data: " + str(binascii.hexlify(data)) + " (" + str(notification) + ")", file=sys.stderr)
+        except Exception as e:
+            if self.debug:
+                print("received data: " + str(binascii.hexlify(data)) + " (Unknown Notification)", file=sys.stderr)
+            raise e
+
+        return notification
+
+    def reset_notification_data(self):
+        self._buffer_length = 0
@@ -0,0 +1,151 @@
+import concurrent.futures
+import sys
+import threading
+import time
+
+from .adaptive_timeout import AdaptiveTimeout
+
+
+def _create_sem6000_session(device, timeout, debug):
+    # bluepy is only needed if sessions are created for real devices
+    from .sem6000 import SEM6000
+
+    return SEM6000(device["address"], device["pin"], bluetooth_device=device.get("bluetooth_device", "hci0"), timeout=timeout, debug=debug)
+
+
+def _request_measurement(session):
+    return session.request_measurement()
+
+
+class FleetPollResult:
+    def __init__(self, address, bluetooth_device, notification, exception, latency_in_seconds):
+        self.address = address
+        self.bluetooth_device = bluetooth_device
+        self.notification = notification
+        self.exception = exception
+        self.latency_in_seconds = latency_in_seconds
+
+    def was_successful(self):
+        return self.exception is None
+
+    def __str__(self):
+        name = self.__class__.__name__
+        return name + "(address=" + str(self.address) + ", bluetooth_device=" + str(self.bluetooth_device) + ", notification=" + str(self.notification) + ", exception=" + repr(self.exception) + ", latency_in_seconds=" + "{:.3f}".format(self.latency_in_seconds) + ")"
+
+
+class FleetPoller:
+    def __init__(self, devices, max_workers_per_bluetooth_device=4, timeout=3, session_factory=None, debug=False, minimum_timeout=None, retry_policy_factory=None):
+        """ Create a new FleetPoller() instance polling many devices concurrently
+
+            Parameters:
+                devices                             - List of dictionaries having keys 'address', 'pin' and optionally 'bluetooth_device' (Default: 'hci0')
+                max_workers_per_bluetooth_device    - Optional, maximum number of devices being polled at the same time on each bluetooth device. Default: 4
+                timeout                             - Optional, maximum time in seconds to wait for a response from a device. Default: 3
+                session_factory                     - Optional, callable being called with (device, timeout, debug) returning a connected and authorized SEM6000 like session. Default: creates a SEM6000 instance
+                debug                               - Optional, if set to true failed polls are printed to sys.stderr
+                minimum_timeout                     - Optional, if set each session gets its own AdaptiveTimeout between minimum_timeout and timeout as timeout,
+                                                      so a device which stopped responding blocks a worker only as long as it used to take to respond
+                retry_policy_factory                - Optional, callable returning a new RetryPolicy, being set as retry_policy of each session, i.e. RetryPolicy
+        """
+        self.timeout = timeout
+        self.minimum_timeout = minimum_timeout
+        self.debug = debug
+
+        self._retry_policy_factory = retry_policy_factory
+
+        self.last_sweep_duration_in_seconds = None
+
+        self._devices = []
+        for device in devices:
+            device = dict(device)
+            device.setdefault("bluetooth_device", "hci0")
+            self._devices.append(device)
+
+        self._session_factory = session_factory
+        if self._session_factory is None:
+            self._session_factory = _create_sem6000_session
+
+        self._session_by_address = {}
+        # a session must not be used by two workers at the same time
+        self._lock_by_address = {}
+        for device in self._devices:
+            self._lock_by_address[device["address"]] = threading.Lock()
+
+        self._executor_by_bluetooth_device = {}
+        for device in self._devices:
+            bluetooth_device = device["bluetooth_device"]
+            if not bluetooth_device in self._executor_by_bluetooth_device:
+                self._executor_by_bluetooth_device[bluetooth_device] = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers_per_bluetooth_device, thread_name_prefix="sem6000-" + bluetooth_device)
+
+    def _create_timeout(self):
+        if self.minimum_timeout is None:
+            return self.timeout
+
+        # the round trip times are tracked per device
+        return AdaptiveTimeout(minimum_timeout_in_seconds=self.minimum_timeout, maximum_timeout_in_seconds=self.timeout)
+
+    def _poll_device(self, device, poll_function):
+        address = device["address"]
+
+        start = time.monotonic()
+        notification = None
+        exception = None
+
+        with self._lock_by_address[address]:
+            try:
+                session = self._session_by_address.get(address)
+                if session is None:
+                    session = self._session_factory(device, self._create_timeout(), self.debug)
+                    # the retry budget is tracked per device
+                    if not self._retry_policy_factory is None:
+                        session.retry_policy = self._retry_policy_factory()
+                    self._session_by_address[address] = session
+
+                notification = poll_function(session)
+            except Exception as e:
+                exception = e
+
+                if self.debug:
+                    print("poll of " + address + " failed: " + repr(e), file=sys.stderr)
+
+        latency_in_seconds = time.monotonic() - start
+
+        return FleetPollResult(address=address, bluetooth_device=device["bluetooth_device"], notification=notification, exception=exception, latency_in_seconds=latency_in_seconds)
+
+    def sweep(self, poll_function=_request_measurement):
+        """
+        Poll all devices once, concurrently per bluetooth device.
+
+        Parameters:
+            poll_function   - Optional, callable being called with the session of each device. Default: request_measurement()
+
+        Yields a FleetPollResult for each device as soon as its poll completed.
+        The wall time of the whole sweep is stored in last_sweep_duration_in_seconds once all results were yielded.
+        """
+        start = time.monotonic()
+
+        futures = []
+        for device in self._devices:
+            executor = self._executor_by_bluetooth_device[device["bluetooth_device"]]
+            futures.append(executor.submit(self._poll_device, device, poll_function))
+
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+        self.last_sweep_duration_in_seconds = time.monotonic() - start
+
+    def close(self):
+        """
+        Disconnect all sessions and stop the worker threads.
+        """
+        for executor in self._executor_by_bluetooth_device.values():
+            executor.shutdown(wait=True)
+
+        for session in self._session_by_address.values():
+            try:
+                session.disconnect()
+            except Exception as e:
+                if self.debug:
+                    print("disconnect failed: " + repr(e), file=sys.stderr)
+
+        self._session_by_address.clear()
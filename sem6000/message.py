@@ -1,44 +1,174 @@
 from . import util
 
 import datetime
+import operator
+
+
+# bypasses the __new__ of a message, only to be used in __new__ and _ValueObject._make()
+_create = tuple.__new__
+
+
+def _to_hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_to_hashable(v) for v in value)
+
+    return value
+
+
+class _ImmutableList(tuple):
+    '''
+    Tuple of values that compares equal to a list having the same values.
+
+    Used for the list attributes of messages, so these can not change after a message was created
+    while comparing and slicing them works as it did when they were lists.
+    '''
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            other = tuple(other)
+
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        if isinstance(other, list):
+            other = tuple(other)
+
+        return tuple.__ne__(self, other)
+
+    __hash__ = tuple.__hash__
+
+    def __getitem__(self, index):
+        value = tuple.__getitem__(self, index)
+        if isinstance(index, slice):
+            return _ImmutableList(value)
+
+        return value
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _ValueObject(tuple):
+    '''
+    Base class of all messages.
+
+    Attribute values are stored in the tuple a message is, in the order given by the _fields of its class,
+    and are read through properties named after these fields. A message is created in one call to _create() in __new__.
+    Messages having the same class and attribute values are equal and have the same hash.
+    Lists of values are stored as _ImmutableList, so neither can change after a message was created.
+    '''
+
+    __slots__ = ()
+
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if '_fields' in cls.__dict__:
+            for index, name in enumerate(cls._fields):
+                setattr(cls, name, property(operator.itemgetter(index)))
+
+    @classmethod
+    def _make(cls, values):
+        return _create(cls, tuple(values))
+
+    def _get_values(self):
+        return tuple(self)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(self.__class__.__name__ + " is immutable, " + name + " can not be changed")
+
+    def __delattr__(self, name):
+        raise AttributeError(self.__class__.__name__ + " is immutable, " + name + " can not be deleted")
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+
+        return tuple.__ne__(self, other)
+
+    # messages are not ordered
+    __lt__ = object.__lt__
+    __le__ = object.__le__
+    __gt__ = object.__gt__
+    __ge__ = object.__ge__
+
+    def __hash__(self):
+        return hash((type(self), _to_hashable(tuple(self))))
+
+    # messages without attributes are empty tuples
+    def __bool__(self):
+        return True
+
+    __repr__ = object.__repr__
+
+    def __reduce__(self):
+        return (_restore, (type(self), tuple(self)))
+
+
+def _restore(message_class, values):
+    return message_class._make(values)
+
+
+class AbstractCommand(_ValueObject):
+    __slots__ = ()
 
-class AbstractCommand:
     def __str__(self):
         name = self.__class__.__name__
         return name + "()"
 
 
-class AbstractSwitchCommand():
-    def __init__(self, on):
-        self.on = on
+class AbstractSwitchCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('on',)
+
+    def __new__(cls, on):
+        return _create(cls, (on,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(on=" + str(self.on) + ")"
 
 
-class AbstractCommandConfirmationNotification:
-    def __init__(self, was_successful):
-        self.was_successful = was_successful
+class AbstractCommandConfirmationNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('was_successful',)
+
+    def __new__(cls, was_successful):
+        return _create(cls, (was_successful,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(was_successful=" + str(self.was_successful) + ")"
 
 
-class AuthorizeCommand():
-    def __init__(self, pin):
-        self.pin = pin
+class AuthorizeCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('pin',)
+
+    def __new__(cls, pin):
+        return _create(cls, (pin,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(pin=" + str(self.pin) + ")"
 
 
-class ChangePinCommand():
-    def __init__(self, pin, new_pin):
-        self.pin = pin
-        self.new_pin = new_pin
+class ChangePinCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('pin', 'new_pin')
+
+    def __new__(cls, pin, new_pin):
+        return _create(cls, (pin, new_pin))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -46,21 +176,26 @@ class ChangePinCommand():
 
 
 class ResetPinCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
 class PowerSwitchCommand(AbstractSwitchCommand):
-    pass
+    __slots__ = ()
 
 
 class ChangeNightmodeCommand(AbstractSwitchCommand):
-    pass
+    __slots__ = ()
 
 
-class SynchronizeDateAndTimeCommand():
-    def __init__(self, isodatetime):
+class SynchronizeDateAndTimeCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('isodatetime',)
+
+    def __new__(cls, isodatetime):
         d = datetime.datetime.fromisoformat(isodatetime)
-        self.isodatetime = d.isoformat(timespec='seconds')
+        isodatetime = d.isoformat(timespec='seconds')
+
+        return _create(cls, (isodatetime,))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -68,33 +203,39 @@ class SynchronizeDateAndTimeCommand():
 
 
 class RequestSettingsCommand(AbstractCommand):
-    pass
+    __slots__ = ()
+
 
+class ChangePowerLimitCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('power_limit_in_watt',)
 
-class ChangePowerLimitCommand():
-    def __init__(self, power_limit_in_watt):
-        self.power_limit_in_watt = power_limit_in_watt 
+    def __new__(cls, power_limit_in_watt):
+        return _create(cls, (power_limit_in_watt,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(power_limit_in_watt=" + str(self.power_limit_in_watt) + ")"
 
 
-class ChangePricesCommand():
-    def __init__(self, normal_price_in_cent, reduced_period_price_in_cent):
-        self.normal_price_in_cent = normal_price_in_cent
-        self.reduced_period_price_in_cent = reduced_period_price_in_cent
+class ChangePricesCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('normal_price_in_cent', 'reduced_period_price_in_cent')
+
+    def __new__(cls, normal_price_in_cent, reduced_period_price_in_cent):
+        return _create(cls, (normal_price_in_cent, reduced_period_price_in_cent))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(normal_price_in_cent=" + str(self.normal_price_in_cent) + ", reduced_period_price_in_cent=" + str(self.reduced_period_price_in_cent) + ")"
 
 
-class ChangeReducedPeriodCommand():
-    def __init__(self, is_active, start_isotime, end_isotime):
-        self.is_active = is_active
-        self.start_isotime = start_isotime
-        self.end_isotime = end_isotime
+class ChangeReducedPeriodCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_active', 'start_isotime', 'end_isotime')
+
+    def __new__(cls, is_active, start_isotime, end_isotime):
+        return _create(cls, (is_active, start_isotime, end_isotime))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -102,65 +243,77 @@ class ChangeReducedPeriodCommand():
 
 
 class RequestTimerStatusCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
-class SetTimerCommand:
-    def __init__(self, is_reset_timer, is_action_turn_on, target_isodatetime=None):
+class SetTimerCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_reset_timer', 'is_action_turn_on', 'target_isodatetime')
+
+    def __new__(cls, is_reset_timer, is_action_turn_on, target_isodatetime=None):
         if not is_reset_timer and target_isodatetime is None:
             raise Exception("target_isodatetime parameter is None")
 
         if is_reset_timer and not target_isodatetime is None:
             raise Exception("target_isodatetime parameter is expected to be None if timer is being reset")
 
-        self.is_reset_timer = is_reset_timer
-        self.is_action_turn_on = is_action_turn_on
-        self.target_isodatetime = None
-
         if not is_reset_timer:
             d = datetime.datetime.fromisoformat(target_isodatetime)
-            self.target_isodatetime = d.isoformat(timespec='seconds')
+            target_isodatetime = d.isoformat(timespec='seconds')
+
+        return _create(cls, (is_reset_timer, is_action_turn_on, target_isodatetime))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(is_reset_timer=" + str(self.is_reset_timer) + ", is_action_turn_on=" + str(self.is_action_turn_on) + ", target_isodatetime=" + str(self.target_isodatetime) + ")"
 
 
-class RequestSchedulerCommand:
-    def __init__(self, page_number):
-        self.page_number = page_number
+class RequestSchedulerCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('page_number',)
+
+    def __new__(cls, page_number):
+        return _create(cls, (page_number,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(page_number=" + str(self.page_number) + ")"
 
 
-class AddSchedulerCommand:
-    def __init__(self, scheduler):
+class AddSchedulerCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('scheduler',)
+
+    def __new__(cls, scheduler):
         assert isinstance(scheduler, Scheduler)
 
-        self.scheduler = scheduler
+        return _create(cls, (scheduler,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(scheduler=" + str(self.scheduler) + ")"
 
 
-class EditSchedulerCommand:
-    def __init__(self, slot_id, scheduler):
+class EditSchedulerCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('slot_id', 'scheduler')
+
+    def __new__(cls, slot_id, scheduler):
         assert isinstance(scheduler, Scheduler)
 
-        self.slot_id = slot_id
-        self.scheduler = scheduler
+        return _create(cls, (slot_id, scheduler))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(slot_id=" + str(self.slot_id) + ", scheduler=" + str(self.scheduler) + ")"
 
 
-class RemoveSchedulerCommand:
-    def __init__(self, slot_id):
-        self.slot_id = slot_id
+class RemoveSchedulerCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('slot_id',)
+
+    def __new__(cls, slot_id):
+        return _create(cls, (slot_id,))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -168,21 +321,23 @@ class RemoveSchedulerCommand:
 
 
 class RequestRandomModeStatusCommand(AbstractCommand):
-    pass 
+    __slots__ = ()
 
 
-class ChangeRandomModeCommand:
-    def __init__(self, is_active, active_on_weekdays, start_isotime, end_isotime):
-        active_on_weekdays = util._list_values_to_enum(util.Weekday, active_on_weekdays)
+class ChangeRandomModeCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_active', 'active_on_weekdays', 'start_isotime', 'end_isotime')
 
-        self.is_active = is_active
-        self.active_on_weekdays = active_on_weekdays
+    def __new__(cls, is_active, active_on_weekdays, start_isotime, end_isotime):
+        active_on_weekdays = _ImmutableList(util._list_values_to_enum(util.Weekday, active_on_weekdays))
 
         start_time = datetime.time.fromisoformat(start_isotime)
         end_time = datetime.time.fromisoformat(end_isotime)
 
-        self.start_isotime = start_time.isoformat(timespec='minutes')
-        self.end_isotime = end_time.isoformat(timespec='minutes')
+        start_isotime = start_time.isoformat(timespec='minutes')
+        end_isotime = end_time.isoformat(timespec='minutes')
+
+        return _create(cls, (is_active, active_on_weekdays, start_isotime, end_isotime))
 
     def __str__(self):
         weekday_formatter = lambda w: w.name
@@ -193,80 +348,81 @@ class ChangeRandomModeCommand:
 
 
 class RequestMeasurementCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
 class RequestConsumptionOfLast12MonthsCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
 class RequestConsumptionOfLast30DaysCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
 class RequestConsumptionOfLast23HoursCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
 class ResetConsumptionCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
 class FactoryResetCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
-class ChangeDeviceNameCommand:
-        def __init__(self, new_name):
-            self.new_name = new_name
+class ChangeDeviceNameCommand(_ValueObject):
+    __slots__ = ()
+    _fields = ('new_name',)
 
-        def __str__(self):
-            command = self.__class__.__name__
-            return command + "(new_name=" + str(self.new_name) + ")"
+    def __new__(cls, new_name):
+        return _create(cls, (new_name,))
+
+    def __str__(self):
+        command = self.__class__.__name__
+        return command + "(new_name=" + str(self.new_name) + ")"
 
 
 class RequestDeviceSerialCommand(AbstractCommand):
-    pass
+    __slots__ = ()
 
 
 class AuthorizedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class PinChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class PinResetNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class PowerSwitchedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class NightmodeChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class DateAndTimeChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
-class SettingsRequestedNotification:
-    def __init__(self, is_reduced_period, normal_price_in_cent, reduced_period_price_in_cent, reduced_period_start_isotime, reduced_period_end_isotime, is_nightmode_active, power_limit_in_watt):
-        self.is_reduced_period = is_reduced_period
-        self.normal_price_in_cent = normal_price_in_cent
-        self.reduced_period_price_in_cent = reduced_period_price_in_cent
+class SettingsRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_reduced_period', 'normal_price_in_cent', 'reduced_period_price_in_cent', 'reduced_period_start_isotime', 'reduced_period_end_isotime', 'is_nightmode_active', 'power_limit_in_watt')
 
+    def __new__(cls, is_reduced_period, normal_price_in_cent, reduced_period_price_in_cent, reduced_period_start_isotime, reduced_period_end_isotime, is_nightmode_active, power_limit_in_watt):
         start_time = datetime.time.fromisoformat(reduced_period_start_isotime)
         end_time = datetime.time.fromisoformat(reduced_period_end_isotime)
 
-        self.reduced_period_start_isotime = start_time.isoformat(timespec='minutes')
-        self.reduced_period_end_isotime = end_time.isoformat(timespec='minutes')
+        reduced_period_start_isotime = start_time.isoformat(timespec='minutes')
+        reduced_period_end_isotime = end_time.isoformat(timespec='minutes')
 
-        self.is_nightmode_active = is_nightmode_active
-        self.power_limit_in_watt = power_limit_in_watt
+        return _create(cls, (is_reduced_period, normal_price_in_cent, reduced_period_price_in_cent, reduced_period_start_isotime, reduced_period_end_isotime, is_nightmode_active, power_limit_in_watt))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -274,25 +430,27 @@ class SettingsRequestedNotification:
 
 
 class PowerLimitChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class PricesChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class ReducedPeriodChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
-class TimerStatusRequestedNotification:
-    def __init__(self, is_active, is_action_turn_on, target_isodatetime, original_timer_length_in_seconds):
+class TimerStatusRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_active', 'is_action_turn_on', 'target_isodatetime', 'original_timer_length_in_seconds')
+
+    def __new__(cls, is_active, is_action_turn_on, target_isodatetime, original_timer_length_in_seconds):
         d = datetime.datetime.fromisoformat(target_isodatetime)
 
-        self.is_active = is_active
-        self.is_action_turn_on = is_action_turn_on
-        self.target_isodatetime = d.isoformat(timespec='seconds')
-        self.original_timer_length_in_seconds = original_timer_length_in_seconds
+        target_isodatetime = d.isoformat(timespec='seconds')
+
+        return _create(cls, (is_active, is_action_turn_on, target_isodatetime, original_timer_length_in_seconds))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -300,25 +458,27 @@ class TimerStatusRequestedNotification:
 
 
 class TimerSetNotification(AbstractCommandConfirmationNotification):
-    pass
-
+    __slots__ = ()
 
-class Scheduler:
-    def __init__(self, is_active, is_action_turn_on, repeat_on_weekdays, isodatetime):
 
-        repeat_on_weekdays = util._list_values_to_enum(util.Weekday, repeat_on_weekdays)
+class Scheduler(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_active', 'is_action_turn_on', 'repeat_on_weekdays', 'isodatetime')
 
-        self.is_active = is_active
-        self.is_action_turn_on = is_action_turn_on
-        self.repeat_on_weekdays = repeat_on_weekdays
+    def __new__(cls, is_active, is_action_turn_on, repeat_on_weekdays, isodatetime):
+        repeat_on_weekdays = _ImmutableList(util._list_values_to_enum(util.Weekday, repeat_on_weekdays))
 
         d = datetime.datetime.fromisoformat(isodatetime)
-        self.isodatetime = d.isoformat(timespec='minutes')
+        isodatetime = d.isoformat(timespec='minutes')
+
+        return _create(cls, (is_active, is_action_turn_on, repeat_on_weekdays, isodatetime))
 
 
 class OneTimeScheduler(Scheduler):
-    def __init__(self, is_active, is_action_turn_on, isodatetime):
-        Scheduler.__init__(self, 
+    __slots__ = ()
+
+    def __new__(cls, is_active, is_action_turn_on, isodatetime):
+        return Scheduler.__new__(cls, 
             is_active=is_active, 
             is_action_turn_on=is_action_turn_on,
             repeat_on_weekdays=[], 
@@ -334,8 +494,10 @@ class OneTimeScheduler(Scheduler):
 
 
 class RepeatedScheduler(Scheduler):
-    def __init__(self, is_active, is_action_turn_on, repeat_on_weekdays, isotime):
-        Scheduler.__init__(self, 
+    __slots__ = ()
+
+    def __new__(cls, is_active, is_action_turn_on, repeat_on_weekdays, isotime):
+        return Scheduler.__new__(cls, 
             is_active=is_active, 
             is_action_turn_on=is_action_turn_on,
             repeat_on_weekdays=repeat_on_weekdays, 
@@ -352,25 +514,31 @@ class RepeatedScheduler(Scheduler):
         return name + "(is_active=" + str(self.is_active) + ", is_action_turn_on=" + str(self.is_action_turn_on) + ", repeat_on_weekdays=" + repeat_on_weekdays + ", isotime=" + isotime + ")"
 
 
-class SchedulerEntry:
-    def __init__(self, slot_id, scheduler):
+class SchedulerEntry(_ValueObject):
+    __slots__ = ()
+    _fields = ('slot_id', 'scheduler')
+
+    def __new__(cls, slot_id, scheduler):
         assert isinstance(scheduler, Scheduler)
 
-        self.slot_id = slot_id
-        self.scheduler = scheduler
+        return _create(cls, (slot_id, scheduler))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(slot_id=" + str(self.slot_id) + ", scheduler=" + str(self.scheduler) + ")"
 
 
-class SchedulerRequestedNotification:
-    def __init__(self, number_of_schedulers, scheduler_entries):
+class SchedulerRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('number_of_schedulers', 'scheduler_entries')
+
+    def __new__(cls, number_of_schedulers, scheduler_entries):
         for scheduler_entry in scheduler_entries:
             assert isinstance(scheduler_entry, SchedulerEntry)
 
-        self.number_of_schedulers = number_of_schedulers
-        self.scheduler_entries = scheduler_entries
+        scheduler_entries = _ImmutableList(scheduler_entries)
+
+        return _create(cls, (number_of_schedulers, scheduler_entries))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -381,21 +549,23 @@ class SchedulerRequestedNotification:
 
 
 class SchedulerChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
-class RandomModeStatusRequestedNotification:
-    def __init__(self, is_active, active_on_weekdays, start_isotime, end_isotime):
-        active_on_weekdays = util._list_values_to_enum(util.Weekday, active_on_weekdays)
+class RandomModeStatusRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_active', 'active_on_weekdays', 'start_isotime', 'end_isotime')
 
-        self.is_active = is_active
-        self.active_on_weekdays = active_on_weekdays
+    def __new__(cls, is_active, active_on_weekdays, start_isotime, end_isotime):
+        active_on_weekdays = _ImmutableList(util._list_values_to_enum(util.Weekday, active_on_weekdays))
 
         start_time = datetime.time.fromisoformat(start_isotime)
         end_time = datetime.time.fromisoformat(end_isotime)
 
-        self.start_isotime = start_time.isoformat(timespec='minutes')
-        self.end_isotime = end_time.isoformat(timespec='minutes')
+        start_isotime = start_time.isoformat(timespec='minutes')
+        end_isotime = end_time.isoformat(timespec='minutes')
+
+        return _create(cls, (is_active, active_on_weekdays, start_isotime, end_isotime))
 
     def __str__(self):
         weekday_formatter = lambda w: w.name
@@ -406,44 +576,57 @@ class RandomModeStatusRequestedNotification:
 
 
 class RandomModeChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
-class MeasurementRequestedNotification:
-    def __init__(self, is_power_active, power_in_milliwatt, voltage_in_volt, current_in_milliampere, frequency_in_hertz, total_consumption_in_kilowatt_hour):
-        self.is_power_active = is_power_active
-        self.power_in_milliwatt = power_in_milliwatt
-        self.voltage_in_volt = voltage_in_volt
-        self.current_in_milliampere = current_in_milliampere
-        self.frequency_in_hertz = frequency_in_hertz
-        self.total_consumption_in_kilowatt_hour = total_consumption_in_kilowatt_hour
+class MeasurementRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('is_power_active', 'power_in_milliwatt', 'voltage_in_volt', 'current_in_milliampere', 'frequency_in_hertz', 'total_consumption_in_kilowatt_hour')
+
+    def __new__(cls, is_power_active, power_in_milliwatt, voltage_in_volt, current_in_milliampere, frequency_in_hertz, total_consumption_in_kilowatt_hour):
+        return _create(cls, (is_power_active, power_in_milliwatt, voltage_in_volt, current_in_milliampere, frequency_in_hertz, total_consumption_in_kilowatt_hour))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(is_power_active=" + str(self.is_power_active) + ", power_in_milliwatt=" + str(self.power_in_milliwatt) + ", voltage_in_volt=" + str(self.voltage_in_volt) + ", current_in_milliampere=" + str(self.current_in_milliampere) + ", frequency_in_hertz=" + str(self.frequency_in_hertz) + ", total_consumption_in_kilowatt_hour=" + str(self.total_consumption_in_kilowatt_hour) + ")"
 
 
-class ConsumptionOfLast12MonthsRequestedNotification:
-    def __init__(self, consumption_n_months_ago_in_watt_hour):
-        self.consumption_n_months_ago_in_watt_hour = consumption_n_months_ago_in_watt_hour
+class ConsumptionOfLast12MonthsRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('consumption_n_months_ago_in_watt_hour',)
+
+    def __new__(cls, consumption_n_months_ago_in_watt_hour):
+        consumption_n_months_ago_in_watt_hour = _ImmutableList(consumption_n_months_ago_in_watt_hour)
+
+        return _create(cls, (consumption_n_months_ago_in_watt_hour,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(consumption_n_months_ago_in_watt_hour=" + util._format_list_of_objects(str, self.consumption_n_months_ago_in_watt_hour) + ")"
 
 
-class ConsumptionOfLast30DaysRequestedNotification:
-    def __init__(self, consumption_n_days_ago_in_watt_hour):
-        self.consumption_n_days_ago_in_watt_hour = consumption_n_days_ago_in_watt_hour
+class ConsumptionOfLast30DaysRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('consumption_n_days_ago_in_watt_hour',)
+
+    def __new__(cls, consumption_n_days_ago_in_watt_hour):
+        consumption_n_days_ago_in_watt_hour = _ImmutableList(consumption_n_days_ago_in_watt_hour)
+
+        return _create(cls, (consumption_n_days_ago_in_watt_hour,))
 
     def __str__(self):
         name = self.__class__.__name__
         return name + "(consumption_n_days_ago_in_watt_hour=" + util._format_list_of_objects(str, self.consumption_n_days_ago_in_watt_hour) + ")"
 
 
-class ConsumptionOfLast23HoursRequestedNotification:
-    def __init__(self, consumption_n_hours_ago_in_watt_hour):
-        self.consumption_n_hours_ago_in_watt_hour = consumption_n_hours_ago_in_watt_hour
+class ConsumptionOfLast23HoursRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('consumption_n_hours_ago_in_watt_hour',)
+
+    def __new__(cls, consumption_n_hours_ago_in_watt_hour):
+        consumption_n_hours_ago_in_watt_hour = _ImmutableList(consumption_n_hours_ago_in_watt_hour)
+
+        return _create(cls, (consumption_n_hours_ago_in_watt_hour,))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -451,29 +634,35 @@ class ConsumptionOfLast23HoursRequestedNotification:
 
 
 class ConsumptionResetNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class FactoryResetNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
 
 
 class DeviceNameChangedNotification(AbstractCommandConfirmationNotification):
-    pass
+    __slots__ = ()
+
 
+class DeviceNameRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('device_name',)
 
-class DeviceNameRequestedNotification:
-    def __init__(self, device_name):
-        self.device_name = device_name
+    def __new__(cls, device_name):
+        return _create(cls, (device_name,))
 
     def __str__(self):
-        name = self.__class__.name
+        name = self.__class__.__name__
         return name + "(device_name=" + self.device_name + ")"
 
 
-class DeviceSerialRequestedNotification:
-    def __init__(self, serial):
-        self.serial = serial
+class DeviceSerialRequestedNotification(_ValueObject):
+    __slots__ = ()
+    _fields = ('serial',)
+
+    def __new__(cls, serial):
+        return _create(cls, (serial,))
 
     def __str__(self):
         name = self.__class__.__name__
@@ -0,0 +1,200 @@
+import bisect
+import threading
+import time
+
+
+# upper bounds of the histogram buckets, from a notification of the simulator up to a command timing out
+DEFAULT_BUCKETS_IN_SECONDS = (0.0001, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+PHASE_CONNECT = 'connect'
+PHASE_AUTHORIZE = 'authorize'
+PHASE_WRITE = 'write'
+PHASE_WAIT = 'wait'
+PHASE_COMMAND = 'command'
+
+
+def _format_labels(labels):
+    if not len(labels):
+        return ''
+
+    formatted_labels = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        formatted_labels.append(name + '="' + value + '"')
+
+    return '{' + ','.join(formatted_labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _append_histogram_lines(lines, name, labels, histogram):
+    for upper_bound, count in histogram.get_cumulative_counts():
+        lines.append(name + "_bucket" + _format_labels(labels + [('le', _format_value(upper_bound))]) + " " + str(count))
+
+    lines.append(name + "_sum" + _format_labels(labels) + " " + _format_value(histogram.sum_in_seconds))
+    lines.append(name + "_count" + _format_labels(labels) + " " + str(histogram.count))
+
+
+class Histogram:
+    def __init__(self, buckets_in_seconds=DEFAULT_BUCKETS_IN_SECONDS):
+        self.buckets_in_seconds = tuple(buckets_in_seconds)
+
+        # number of values per bucket, the last one counts values above the largest bucket
+        self.counts = [0] * (len(self.buckets_in_seconds) + 1)
+        self.sum_in_seconds = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets_in_seconds, seconds)] += 1
+        self.sum_in_seconds += seconds
+        self.count += 1
+
+    def get_cumulative_counts(self):
+        '''Returns a list of (upper bound, number of values less or equal to the upper bound), the last upper bound is infinity'''
+
+        cumulative_counts = []
+
+        count = 0
+        for upper_bound, bucket_count in zip(self.buckets_in_seconds + (float('inf'),), self.counts):
+            count += bucket_count
+            cumulative_counts.append((upper_bound, count))
+
+        return cumulative_counts
+
+
+class SEM6000Metrics:
+    def __init__(self, buckets_in_seconds=DEFAULT_BUCKETS_IN_SECONDS, clock=time.perf_counter):
+        """ Create a new SEM6000Metrics() instance recording latencies and transport counters of SEM6000 instances
+
+            Latencies are recorded in a histogram for each phase ('connect', 'authorize', 'write', 'wait' and 'command'
+            for the whole command) and command class, the timeouts chosen for the commands in a histogram for each command class.
+            One instance may be shared by several SEM6000 instances.
+
+            Parameters:
+                buckets_in_seconds  - Optional, upper bounds of the histogram buckets. Default: DEFAULT_BUCKETS_IN_SECONDS
+        """
+        self.buckets_in_seconds = tuple(buckets_in_seconds)
+        self.clock = clock
+
+        self.number_of_timeouts = 0
+        self.number_of_reconnects = 0
+        self.number_of_incomplete_frames = 0
+        self.number_of_parse_failures = 0
+        self.number_of_retries = 0
+
+        self._lock = threading.Lock()
+
+        # (phase, command class name or None) -> Histogram
+        self._histogram_by_key = {}
+        # command class name -> Histogram of the timeouts
+        self._timeout_histogram_by_command_name = {}
+
+    def observe(self, phase, command_class, seconds):
+        """
+        Record the latency of a phase.
+
+        Parameters:
+            phase           - One of 'connect', 'authorize', 'write', 'wait' or 'command'
+            command_class   - Class of the command or None for phases not belonging to a command, i.e. 'connect'
+            seconds         - Latency in seconds
+        """
+        key = (phase, None if command_class is None else command_class.__name__)
+
+        with self._lock:
+            histogram = self._histogram_by_key.get(key)
+            if histogram is None:
+                histogram = Histogram(self.buckets_in_seconds)
+                self._histogram_by_key[key] = histogram
+
+            histogram.observe(seconds)
+
+    def observe_timeout(self, command_class, seconds):
+        """
+        Record the timeout a command was sent with, i.e. the one chosen by an AdaptiveTimeout.
+        """
+        command_name = command_class.__name__
+
+        with self._lock:
+            histogram = self._timeout_histogram_by_command_name.get(command_name)
+            if histogram is None:
+                histogram = Histogram(self.buckets_in_seconds)
+                self._timeout_histogram_by_command_name[command_name] = histogram
+
+            histogram.observe(seconds)
+
+    def get_timeout_histogram(self, command_class):
+        """
+        Returns the Histogram of the timeouts of the command class or None if nothing was recorded.
+        """
+        return self._timeout_histogram_by_command_name.get(command_class.__name__)
+
+    def get_histogram(self, phase, command_class=None):
+        """
+        Returns the Histogram of the phase and command class or None if nothing was recorded.
+        """
+        return self._histogram_by_key.get((phase, None if command_class is None else command_class.__name__))
+
+    def count_timeout(self):
+        with self._lock:
+            self.number_of_timeouts += 1
+
+    def count_reconnect(self):
+        with self._lock:
+            self.number_of_reconnects += 1
+
+    def count_incomplete_frame(self):
+        with self._lock:
+            self.number_of_incomplete_frames += 1
+
+    def count_parse_failure(self):
+        with self._lock:
+            self.number_of_parse_failures += 1
+
+    def count_retry(self):
+        with self._lock:
+            self.number_of_retries += 1
+
+    def to_prometheus_text(self, labels=None):
+        """
+        Returns all metrics in the Prometheus text exposition format.
+
+        Parameters:
+            labels  - Optional, dictionary of label name -> value added to each sample, i.e. {'device': '00:11:22:33:44:55'}
+        """
+        constant_labels = []
+        if not labels is None:
+            constant_labels = sorted(labels.items())
+
+        lines = []
+
+        with self._lock:
+            lines.append("# HELP sem6000_phase_duration_seconds Latency of the phases of commands sent to SEM6000 devices")
+            lines.append("# TYPE sem6000_phase_duration_seconds histogram")
+
+            for (phase, command_name), histogram in sorted(self._histogram_by_key.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+                _append_histogram_lines(lines, "sem6000_phase_duration_seconds", constant_labels + [('phase', phase), ('command', command_name or '')], histogram)
+
+            lines.append("# HELP sem6000_command_timeout_seconds Timeout commands sent to SEM6000 devices were given for their response")
+            lines.append("# TYPE sem6000_command_timeout_seconds histogram")
+
+            for command_name, histogram in sorted(self._timeout_histogram_by_command_name.items()):
+                _append_histogram_lines(lines, "sem6000_command_timeout_seconds", constant_labels + [('command', command_name)], histogram)
+
+            counters = [
+                ('sem6000_timeouts_total', 'Number of waits for a notification having timed out', self.number_of_timeouts),
+                ('sem6000_reconnects_total', 'Number of reconnects after the connection was lost', self.number_of_reconnects),
+                ('sem6000_incomplete_frames_total', 'Number of notifications being incomplete when they were consumed', self.number_of_incomplete_frames),
+                ('sem6000_parse_failures_total', 'Number of notifications which could not be parsed', self.number_of_parse_failures),
+                ('sem6000_retries_total', 'Number of commands being sent again by a RetryPolicy', self.number_of_retries),
+            ]
+            for name, description, value in counters:
+                lines.append("# HELP " + name + " " + description)
+                lines.append("# TYPE " + name + " counter")
+                lines.append(name + _format_labels(constant_labels) + " " + str(value))
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+
+from .message import *
+
+
+# commands which do not change the state of the device, they are always safe to send again
+RETRY_CLASS_READ = 'read'
+# commands setting an absolute state, sending them twice has the same effect as sending them once
+RETRY_CLASS_IDEMPOTENT = 'idempotent'
+# commands which must not be applied twice, they are only sent again if reading back the state shows they were not applied
+RETRY_CLASS_VERIFIED = 'verified'
+# commands which are never sent again, i.e. as the pin is changed or the device is reset
+RETRY_CLASS_NONE = 'none'
+
+# command class -> retry class, subclasses are retried like their base class
+RETRY_CLASS_BY_COMMAND_CLASS = {
+    RequestSettingsCommand: RETRY_CLASS_READ,
+    RequestTimerStatusCommand: RETRY_CLASS_READ,
+    RequestSchedulerCommand: RETRY_CLASS_READ,
+    RequestRandomModeStatusCommand: RETRY_CLASS_READ,
+    RequestMeasurementCommand: RETRY_CLASS_READ,
+    RequestConsumptionOfLast12MonthsCommand: RETRY_CLASS_READ,
+    RequestConsumptionOfLast30DaysCommand: RETRY_CLASS_READ,
+    RequestConsumptionOfLast23HoursCommand: RETRY_CLASS_READ,
+    RequestDeviceSerialCommand: RETRY_CLASS_READ,
+
+    AuthorizeCommand: RETRY_CLASS_IDEMPOTENT,
+    PowerSwitchCommand: RETRY_CLASS_IDEMPOTENT,
+    ChangeNightmodeCommand: RETRY_CLASS_IDEMPOTENT,
+    SynchronizeDateAndTimeCommand: RETRY_CLASS_IDEMPOTENT,
+    ChangePowerLimitCommand: RETRY_CLASS_IDEMPOTENT,
+    ChangePricesCommand: RETRY_CLASS_IDEMPOTENT,
+    ChangeReducedPeriodCommand: RETRY_CLASS_IDEMPOTENT,
+    # the timer is set to an absolute target date and time
+    SetTimerCommand: RETRY_CLASS_IDEMPOTENT,
+    EditSchedulerCommand: RETRY_CLASS_IDEMPOTENT,
+    ChangeRandomModeCommand: RETRY_CLASS_IDEMPOTENT,
+    ChangeDeviceNameCommand: RETRY_CLASS_IDEMPOTENT,
+
+    AddSchedulerCommand: RETRY_CLASS_VERIFIED,
+    RemoveSchedulerCommand: RETRY_CLASS_VERIFIED,
+
+    ChangePinCommand: RETRY_CLASS_NONE,
+    ResetPinCommand: RETRY_CLASS_NONE,
+    ResetConsumptionCommand: RETRY_CLASS_NONE,
+    FactoryResetCommand: RETRY_CLASS_NONE,
+}
+
+
+def get_retry_class(command):
+    """
+    Returns the retry class of the command, RETRY_CLASS_NONE for unknown commands.
+    """
+    for command_class in type(command).__mro__:
+        retry_class = RETRY_CLASS_BY_COMMAND_CLASS.get(command_class)
+        if not retry_class is None:
+            return retry_class
+
+    return RETRY_CLASS_NONE
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, initial_backoff_in_seconds=0.05, maximum_backoff_in_seconds=1, budget=5, budget_per_success=0.1, seed=None, sleep=time.sleep):
+        """ Create a new RetryPolicy() instance deciding if and when a command without response is sent again
+
+            Retries wait a random time between 0 and initial_backoff_in_seconds * 2**retry (exponential backoff with full jitter).
+            Each retry costs one unit of the retry budget, each command succeeding at the first attempt earns budget_per_success,
+            so a device which fails permanently is only retried until the budget is used up. An instance belongs to one device.
+
+            Parameters:
+                max_attempts                - Optional, maximum number of times a command is sent. Default: 3
+                initial_backoff_in_seconds  - Optional, upper limit of the wait before the first retry. Default: 0.05
+                maximum_backoff_in_seconds  - Optional, upper limit of the wait before any retry. Default: 1
+                budget                      - Optional, maximum number of retries without commands succeeding in between. Default: 5
+                budget_per_success          - Optional, budget earned by each command succeeding at the first attempt. Default: 0.1
+                seed                        - Optional, seed for the random number generator of the jitter
+        """
+        self.max_attempts = max_attempts
+        self.initial_backoff_in_seconds = initial_backoff_in_seconds
+        self.maximum_backoff_in_seconds = maximum_backoff_in_seconds
+        self.budget = budget
+        self.budget_per_success = budget_per_success
+
+        self.remaining_budget = budget
+
+        self.number_of_retries = 0
+        self.number_of_retries_denied_by_budget = 0
+        self.number_of_verified_commands = 0
+
+        self._random = random.Random(seed)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self.remaining_budget = min(self.budget, self.remaining_budget + self.budget_per_success)
+
+    def record_verified_command(self):
+        with self._lock:
+            self.number_of_verified_commands += 1
+
+    def acquire_retry(self, command, attempt):
+        """
+        Returns True if the command may be sent again and takes the retry from the budget.
+
+        Parameters:
+            command - Command which was not answered
+            attempt - Number of times the command was sent already
+        """
+        if attempt >= self.max_attempts or get_retry_class(command) == RETRY_CLASS_NONE:
+            return False
+
+        with self._lock:
+            if self.remaining_budget < 1:
+                self.number_of_retries_denied_by_budget += 1
+                return False
+
+            self.remaining_budget -= 1
+            self.number_of_retries += 1
+
+        return True
+
+    def get_backoff(self, attempt):
+        """
+        Returns the time in seconds to wait before the command is sent again.
+
+        Parameters:
+            attempt - Number of times the command was sent already
+        """
+        return self._random.uniform(0, min(self.maximum_backoff_in_seconds, self.initial_backoff_in_seconds * 2**(attempt-1)))
+
+    def backoff(self, attempt):
+        self._sleep(self.get_backoff(attempt))
@@ -0,0 +1,884 @@
+from .message import *
+from . import util
+
+import datetime
+import operator
+import struct
+
+
+class InvalidPayloadLengthException(Exception):
+    def __init__(self, message_class, expected_payload_length, actual_payload_length):
+        self.message_class = message_class
+        self.expected_payload_length = expected_payload_length
+        self.actual_payload_length = actual_payload_length
+
+    def __str__(self):
+        return "message has invalid payload length for " + self.message_class.__name__ +  " (expected: " + str(self.expected_payload_length) + ", actual=" + str(self.actual_payload_length) + ")"
+
+
+def _get_number_of_values(format):
+    empty_struct = struct.Struct('>' + format)
+    return len(empty_struct.unpack(bytes(empty_struct.size)))
+
+
+class Field:
+    '''
+    Describes how attributes of a message are stored in the payload.
+
+    format is the struct format of the bytes without byte order, encode() converts the attributes to the values being packed
+    and decode() converts the unpacked values back to the attributes. Fields of one attribute packed as one value may also
+    implement encode_value() and decode_value(), which the codec of a MessageSchema calls without building tuples.
+    '''
+
+    format = 'B'
+    # the attribute is packed as it is
+    is_identity = True
+
+    def __init__(self, name=None):
+        self.names = ()
+        if not name is None:
+            self.names = (name,)
+
+    def encode(self, value):
+        '''Returns a tuple of values to pack for the attributes'''
+        return (value,)
+
+    def decode(self, parser, values):
+        '''Returns the attribute, or a tuple of attributes if the field has several names'''
+        return values[0]
+
+    def encode_many(self, attribute_values):
+        '''Returns a tuple of values to pack for a list of attributes'''
+        if self.is_identity:
+            return tuple(attribute_values)
+
+        values = []
+        for value in attribute_values:
+            values.extend(self.encode(value))
+
+        return tuple(values)
+
+    def decode_many(self, parser, values):
+        '''Returns a list of attributes from the values of several consecutive fields'''
+        if self.is_identity:
+            return list(values)
+
+        number_of_values = _get_number_of_values(self.format)
+
+        result = []
+        for i in range(0, len(values), number_of_values):
+            result.append(self.decode(parser, values[i:i + number_of_values]))
+
+        return result
+
+
+class Constant(Field):
+    '''
+    Bytes not belonging to an attribute, i.e. the opcode or padding.
+    '''
+
+    is_identity = False
+
+    def __init__(self, value, is_checked=False):
+        """ Create a new Constant() instance
+
+            Parameters:
+                value       - bytes of the payload
+                is_checked  - Optional, if set to true a payload having other bytes is an unsupported message
+        """
+        Field.__init__(self)
+
+        self.value = bytes(value)
+        self.is_checked = is_checked
+        self.format = str(len(self.value)) + 's'
+
+
+class Padding(Constant):
+    def __init__(self, size):
+        Constant.__init__(self, bytes(size))
+
+
+class UInt8(Field):
+    format = 'B'
+
+
+class UInt16(Field):
+    format = 'H'
+
+
+class UInt32(Field):
+    format = 'I'
+
+
+class UInt24(Field):
+    format = 'BH'
+    is_identity = False
+
+    def encode(self, value):
+        return (value >> 16, value & 0xffff)
+
+    def decode(self, parser, values):
+        return (values[0] << 16) | values[1]
+
+    def decode_many(self, parser, values):
+        return [(high << 16) | low for high, low in zip(values[0::2], values[1::2])]
+
+
+class PaddedUInt24(Field):
+    '''
+    24 bit value followed by a padding byte, unpacked as one 32 bit value.
+    '''
+
+    format = 'I'
+    is_identity = False
+
+    def encode_value(self, value):
+        return value << 8
+
+    def decode_value(self, value):
+        return value >> 8
+
+    def encode(self, value):
+        return (value << 8,)
+
+    def decode(self, parser, values):
+        return values[0] >> 8
+
+    def encode_many(self, attribute_values):
+        return tuple([value << 8 for value in attribute_values])
+
+    def decode_many(self, parser, values):
+        return [value >> 8 for value in values]
+
+
+class Flag(Field):
+    is_identity = False
+
+    def __init__(self, name, true_value=0x01, false_value=0x00, is_true_unless_false=False):
+        """ Create a new Flag() instance for a boolean attribute stored as one byte
+
+            Parameters:
+                name                    - Name of the attribute
+                true_value              - Optional, byte stored for True. Default: 0x01
+                false_value             - Optional, byte stored for False. Default: 0x00
+                is_true_unless_false    - Optional, if set to true all bytes except false_value are decoded as True. Default: only true_value is True
+        """
+        Field.__init__(self, name)
+
+        self.true_value = true_value
+        self.false_value = false_value
+        self.is_true_unless_false = is_true_unless_false
+
+    def encode(self, value):
+        return (self.encode_value(value),)
+
+    def decode(self, parser, values):
+        return self.decode_value(values[0])
+
+    def encode_value(self, value):
+        if value:
+            return self.true_value
+
+        return self.false_value
+
+    def decode_value(self, value):
+        if self.is_true_unless_false:
+            return value != self.false_value
+
+        return value == self.true_value
+
+
+class Pin(Field):
+    '''
+    4 digit pin, one byte per digit.
+    '''
+
+    format = '4B'
+    is_identity = False
+
+    def encode(self, value):
+        return tuple([int(digit) for digit in value])
+
+    def decode(self, parser, values):
+        return ''.join([str(digit) for digit in values])
+
+
+class Weekdays(Field):
+    '''
+    List of weekdays stored as bit mask, bit 0 being sunday.
+    '''
+
+    is_identity = False
+
+    def encode(self, value):
+        return (self.encode_value(value),)
+
+    def decode(self, parser, values):
+        return self.decode_value(values[0])
+
+    def encode_value(self, value):
+        mask = 0
+        for weekday in value:
+            mask += 2**weekday.value
+
+        return mask
+
+    def decode_value(self, mask):
+        weekdays = []
+        for w in range(7):
+            if mask & 2**w:
+                weekdays.append(w)
+
+        return weekdays
+
+
+class TimeInMinutes(Field):
+    '''
+    Time of day as ISO string, stored as minutes since midnight.
+    '''
+
+    format = 'H'
+    is_identity = False
+
+    def encode(self, value):
+        return (self.encode_value(value),)
+
+    def decode(self, parser, values):
+        return self.decode_value(values[0])
+
+    def encode_value(self, value):
+        t = datetime.time.fromisoformat(value)
+        return t.hour*60 + t.minute
+
+    def decode_value(self, value):
+        return util._parse_time_from_minutes(value).isoformat(timespec='minutes')
+
+
+class HourAndMinute(Field):
+    '''
+    Time of day as ISO string, stored as one byte for the hour and one for the minute.
+    '''
+
+    format = 'BB'
+    is_identity = False
+
+    def encode(self, value):
+        t = datetime.time.fromisoformat(value)
+        return (t.hour, t.minute)
+
+    def decode(self, parser, values):
+        return datetime.time(values[0], values[1]).isoformat(timespec='minutes')
+
+
+class DateTime(Field):
+    '''
+    Date and time as ISO string, stored as one byte per component.
+    '''
+
+    is_identity = False
+
+    # component -> struct format
+    _format_by_component = {
+        's': 'B',
+        'm': 'B',
+        'h': 'B',
+        'd': 'B',
+        'M': 'B',
+        # only the last two digits of the year, the parser adds its year_diff
+        'y': 'B',
+        'Y': 'H',
+    }
+
+    def __init__(self, name, components, timespec='seconds', default_date=None, is_optional=False):
+        """ Create a new DateTime() instance
+
+            Parameters:
+                name            - Name of the attribute
+                components      - Order of the components in the payload, 's'econd, 'm'inute, 'h'our, 'd'ay, 'M'onth,
+                                  'y'ear with two digits or 'Y'ear with four digits, i.e. 'smhdMy'
+                timespec        - Optional, precision of the decoded ISO string. Default: 'seconds'
+                default_date    - Optional, date being decoded if year, month or day is 0, i.e. if the device reports a time only
+                is_optional     - Optional, if set to true None is stored as zeros and zeros are decoded as None
+        """
+        Field.__init__(self, name)
+
+        self.components = components
+        self.timespec = timespec
+        self.default_date = default_date
+        self.is_optional = is_optional
+
+        self.format = ''.join([self._format_by_component[component] for component in components])
+
+        # index of the value of each component, the year is converted by decode() if it has two digits only
+        self._indexes = tuple([components.find(component) for component in 'smhdM'])
+        self._year_index = components.find('Y')
+        self._is_year_with_two_digits = self._year_index < 0
+        if self._is_year_with_two_digits:
+            self._year_index = components.find('y')
+
+    def encode(self, value):
+        if value is None and self.is_optional:
+            return (0,) * len(self.components)
+
+        d = datetime.datetime.fromisoformat(value)
+
+        value_by_component = {
+            's': d.second,
+            'm': d.minute,
+            'h': d.hour,
+            'd': d.day,
+            'M': d.month,
+            'y': d.year % 100,
+            'Y': d.year,
+        }
+
+        return tuple([value_by_component[component] for component in self.components])
+
+    def decode(self, parser, values):
+        if self.is_optional and not any(values):
+            return None
+
+        second_index, minute_index, hour_index, day_index, month_index = self._indexes
+
+        second = 0
+        if second_index >= 0:
+            second = values[second_index]
+        minute = values[minute_index]
+        hour = values[hour_index]
+        day = values[day_index]
+        month = values[month_index]
+        year = values[self._year_index]
+        if self._is_year_with_two_digits:
+            year += parser.year_diff
+
+        if not self.default_date is None and not (year and month and day):
+            year = self.default_date.year
+            month = self.default_date.month
+            day = self.default_date.day
+
+        return datetime.datetime(year, month, day, hour, minute, second).isoformat(timespec=self.timespec)
+
+
+class TimerAction(Field):
+    '''
+    State of the timer stored as one byte: 0x00 - no timer, 0x01 - turn on, 0x02 - turn off.
+    '''
+
+    is_identity = False
+
+    def __init__(self, name, is_action_turn_on_name='is_action_turn_on', is_reset=False):
+        """ Create a new TimerAction() instance
+
+            Parameters:
+                name                    - Name of the attribute being true for an active timer, or for a reset timer if is_reset is set
+                is_action_turn_on_name  - Optional, name of the attribute being true if the timer turns the power on
+                is_reset                - Optional, if set to true the attribute name is true if there is no timer
+        """
+        Field.__init__(self)
+
+        self.names = (name, is_action_turn_on_name)
+        self.is_reset = is_reset
+
+    def encode(self, value, is_action_turn_on):
+        is_active = value
+        if self.is_reset:
+            is_active = not value
+
+        if not is_active:
+            return (0x00,)
+        if is_action_turn_on:
+            return (0x01,)
+
+        return (0x02,)
+
+    def decode(self, parser, values):
+        action = values[0]
+
+        if self.is_reset:
+            return (action == 0x00, action == 0x01)
+
+        return (action == 0x01 or action == 0x02, action == 0x01)
+
+
+class SchedulerField(Field):
+    '''
+    Scheduler stored as active flag, action, weekday mask, year, month, day, hour and minute.
+    '''
+
+    format = '8B'
+    is_identity = False
+
+    def encode(self, scheduler):
+        repeat_on_weekdays = 0
+        for weekday in scheduler.repeat_on_weekdays:
+            repeat_on_weekdays += 2**weekday.value
+
+        d = datetime.datetime.fromisoformat(scheduler.isodatetime)
+
+        return (int(bool(scheduler.is_active)), int(bool(scheduler.is_action_turn_on)), repeat_on_weekdays, d.year % 100, d.month, d.day, d.hour, d.minute)
+
+    def decode(self, parser, values):
+        is_active = values[0] == 0x01
+        is_action_turn_on = values[1] == 0x01
+
+        repeat_on_weekdays_mask = values[2]
+        repeat_on_weekdays = []
+        for w in range(7):
+            if repeat_on_weekdays_mask & 2**w:
+                repeat_on_weekdays.append(w)
+
+        # only the last two digits are stored for the year
+        d = datetime.datetime(values[3] + parser.year_diff, values[4], values[5], values[6], values[7])
+
+        if len(repeat_on_weekdays):
+            return RepeatedScheduler(is_active=is_active, is_action_turn_on=is_action_turn_on, repeat_on_weekdays=repeat_on_weekdays, isotime=d.time().isoformat(timespec='minutes'))
+
+        return OneTimeScheduler(is_active=is_active, is_action_turn_on=is_action_turn_on, isodatetime=d.isoformat(timespec='minutes'))
+
+
+class SchedulerEntryField(Field):
+    '''
+    Entry of a scheduler page: slot id, scheduler, two unknown bytes and a checksum of scheduler and unknown bytes.
+    '''
+
+    format = 'B' + SchedulerField.format + 'BBB'
+    is_identity = False
+
+    def __init__(self, name=None):
+        Field.__init__(self, name)
+
+        self._scheduler_field = SchedulerField()
+
+    def encode(self, scheduler_entry):
+        scheduler_values = self._scheduler_field.encode(scheduler_entry.scheduler)
+        checksum = (sum(scheduler_values)+0x14) & 0xff
+
+        return (scheduler_entry.slot_id,) + scheduler_values + (0x00, 0x00, checksum)
+
+    def decode(self, parser, values):
+        # the checksum is not verified, how the device calculates it is not known for all entries
+        return SchedulerEntry(slot_id=values[0], scheduler=self._scheduler_field.decode(parser, values[1:9]))
+
+
+class String(Field):
+    '''
+    UTF-8 string. A string having a size is padded with zeros, otherwise it takes the bytes not used by the other fields.
+    '''
+
+    is_identity = False
+
+    def __init__(self, name, size=None):
+        Field.__init__(self, name)
+
+        self.size = size
+        self.is_variable = size is None
+        if not self.is_variable:
+            self.format = str(size) + 's'
+
+    def get_count(self, value):
+        return len(self._to_bytes(value))
+
+    def get_format(self, count):
+        return str(count) + 's'
+
+    def _to_bytes(self, value):
+        if isinstance(value, str):
+            return value.encode()
+
+        return value
+
+    def encode(self, value):
+        return (self.encode_value(value),)
+
+    def decode(self, parser, values):
+        return self.decode_value(values[0])
+
+    def encode_value(self, value):
+        value = self._to_bytes(value)
+
+        if not self.size is None and len(value) > self.size:
+            raise Exception('name is too long - actual number of character: ' + str(len(value)) + ', maximum characters possible: ' + str(self.size))
+
+        return value
+
+    def decode_value(self, value):
+        if self.is_variable:
+            return value.decode('utf-8')
+
+        return value.rstrip(b'\x00').decode('utf-8')
+
+
+class List(Field):
+    '''
+    List of values taking the bytes not used by the other fields.
+    '''
+
+    is_identity = False
+    is_variable = True
+
+    def __init__(self, name, element, is_reversed=False, number_of_missing_values=0):
+        """ Create a new List() instance
+
+            Parameters:
+                name                        - Name of the attribute
+                element                     - Field describing one element
+                is_reversed                 - Optional, if set to true the last element of the attribute is stored first
+                number_of_missing_values    - Optional, number of leading None values of the attribute not being stored
+        """
+        Field.__init__(self, name)
+
+        self.element = element
+        self.is_reversed = is_reversed
+        self.number_of_missing_values = number_of_missing_values
+
+        self.element_size = struct.calcsize('>' + element.format)
+
+    def get_count(self, value):
+        return len(value) - self.number_of_missing_values
+
+    def get_format(self, count):
+        return self.element.format * count
+
+    def encode(self, value):
+        value = value[self.number_of_missing_values:]
+        if self.is_reversed:
+            value = value[::-1]
+
+        return self.element.encode_many(value)
+
+    def decode(self, parser, values):
+        value = self.element.decode_many(parser, values)
+        if self.is_reversed:
+            value.reverse()
+
+        if self.number_of_missing_values:
+            value = [None] * self.number_of_missing_values + value
+
+        return value
+
+
+# kinds of fields when encoding: constant bytes, attribute packed as it is, attribute packed as one value or as several values
+_CONSTANT = 0
+_IDENTITY = 1
+_VALUE = 2
+_VALUES = 3
+
+
+class _Codec:
+    '''
+    Parser and encoder of a MessageSchema, for schemas having a variable field one for each number of elements.
+
+    The layout of the fields is resolved once into tables of value indexes, so a message is decoded by one call of
+    struct.unpack_from() and the constructor of the message, and encoded by one call of struct.Struct.pack().
+    '''
+
+    def __init__(self, schema, fields, is_length_checked):
+        self.struct = struct.Struct('>' + ''.join([field.format for field in fields]))
+        self.size = self.struct.size
+
+        self.decode = self._create_decode(schema, fields, is_length_checked)
+        self.encode = self._create_encode(schema, fields)
+
+    def _create_decode(self, schema, fields, is_length_checked):
+        # (index of the value, bytes) of constants which have to match
+        checked_constants = []
+        # (attribute name, index of the value, decode_value() of the field or None if it is stored as it is) of attributes stored as one value
+        value_attributes = []
+        # (attribute name or None for several names, decode() of the field, index of the first value, index after the last value, attribute names)
+        converted_attributes = []
+
+        decode_formats = []
+        number_of_values = 0
+        for field in fields:
+            if isinstance(field, Constant) and not field.is_checked:
+                # skipped when decoding, so no bytes object is created for it
+                decode_formats.append(str(len(field.value)) + 'x')
+                continue
+
+            decode_formats.append(field.format)
+
+            start = number_of_values
+            number_of_values += _get_number_of_values(field.format)
+
+            if isinstance(field, Constant):
+                checked_constants.append((start, field.value))
+            elif field.is_identity and len(field.names) == 1 and number_of_values - start == 1:
+                value_attributes.append((field.names[0], start, None))
+            elif hasattr(field, 'decode_value') and len(field.names) == 1 and number_of_values - start == 1:
+                value_attributes.append((field.names[0], start, field.decode_value))
+            elif len(field.names) == 1:
+                converted_attributes.append((field.names[0], field.decode, start, number_of_values, field.names))
+            else:
+                converted_attributes.append((None, field.decode, start, number_of_values, field.names))
+
+        # the decode struct ends with the last field being decoded, so trailing padding is optional
+        while len(decode_formats) and decode_formats[-1].endswith('x'):
+            decode_formats.pop()
+
+        decode_struct = struct.Struct('>' + ''.join(decode_formats))
+        unpack_from = decode_struct.unpack_from
+        # shorter payloads can not be unpacked even if their length is not checked
+        minimum_size = decode_struct.size
+        message_class = schema.message_class
+        attributes = schema.attributes
+        size = self.size
+
+        def decode(parser, payload):
+            length_of_payload = len(payload)
+            if length_of_payload < minimum_size or (is_length_checked and length_of_payload != size):
+                raise InvalidPayloadLengthException(message_class=message_class, expected_payload_length=size, actual_payload_length=length_of_payload)
+
+            values = unpack_from(payload)
+
+            if checked_constants:
+                for i, value in checked_constants:
+                    if values[i] != value:
+                        raise Exception('Unsupported message')
+
+            arguments = {}
+            if attributes:
+                arguments.update(attributes)
+
+            for name, i, decode_value in value_attributes:
+                if decode_value is None:
+                    arguments[name] = values[i]
+                else:
+                    arguments[name] = decode_value(values[i])
+
+            if converted_attributes:
+                for name, decode_field, start, end, names in converted_attributes:
+                    if name is None:
+                        arguments.update(zip(names, decode_field(parser, values[start:end])))
+                    else:
+                        arguments[name] = decode_field(parser, values[start:end])
+
+            return message_class(**arguments)
+
+        return decode
+
+    def _create_encode(self, schema, fields):
+        # (kind, constant bytes or attribute getter, encode function of the field) in the order of the payload
+        encoded_fields = []
+        for field in fields:
+            if isinstance(field, Constant):
+                encoded_fields.append((_CONSTANT, field.value, None))
+            elif field.is_identity and len(field.names) == 1:
+                encoded_fields.append((_IDENTITY, operator.attrgetter(field.names[0]), None))
+            elif hasattr(field, 'encode_value') and len(field.names) == 1:
+                encoded_fields.append((_VALUE, operator.attrgetter(field.names[0]), field.encode_value))
+            elif len(field.names) == 1:
+                encoded_fields.append((_VALUES, operator.attrgetter(field.names[0]), field.encode))
+            else:
+                # the getter returns a tuple of the attributes, passed to encode() as separate arguments
+                encoded_fields.append((_VALUES, operator.attrgetter(*field.names), lambda attributes, encode=field.encode: encode(*attributes)))
+
+        pack = self.struct.pack
+        # the whole frame is packed at once: header, payload, checksum and suffix
+        pack_frame = struct.Struct('>BB' + str(self.size) + 'sB' + str(len(schema.suffix)) + 's').pack
+        length = self.size + 1
+        suffix = schema.suffix
+
+        def encode(encoder, message):
+            values = []
+            for kind, value, encode_field in encoded_fields:
+                if kind is _CONSTANT:
+                    values.append(value)
+                elif kind is _IDENTITY:
+                    values.append(value(message))
+                elif kind is _VALUE:
+                    values.append(encode_field(value(message)))
+                else:
+                    values += encode_field(value(message))
+
+            payload = pack(*values)
+
+            return pack_frame(0x0f, length, payload, (1 + sum(payload)) & 0xff, suffix)
+
+        return encode
+
+
+class MessageSchema:
+    def __init__(self, message_class, fields, attributes=None, suffix=b'\xff\xff', is_length_checked=False):
+        """ Create a new MessageSchema() instance describing the payload of a message
+
+            The encoder and the parser of the message are derived from the schema, both use precompiled struct.Struct instances.
+
+            Parameters:
+                message_class       - Class of the message
+                fields              - List of Field in the order of the payload, starting with the opcode. At most one field may be variable, i.e. a List
+                attributes          - Optional, dictionary of attributes of the message not being stored in the payload, i.e. {'was_successful': True}
+                suffix              - Optional, bytes following the checksum of an encoded frame. Default: b'\\xff\\xff'
+                is_length_checked   - Optional, if set to true InvalidPayloadLengthException is raised if the payload does not fit the fields
+        """
+        self.message_class = message_class
+        self.fields = list(fields)
+        self.attributes = {}
+        if not attributes is None:
+            self.attributes = dict(attributes)
+        self.suffix = suffix
+        self.is_length_checked = is_length_checked
+
+        self.variable_field = None
+        for field in self.fields:
+            if getattr(field, 'is_variable', False):
+                if not self.variable_field is None:
+                    raise Exception("Only one variable field is supported in " + message_class.__name__)
+                self.variable_field = field
+
+        self._codec = None
+        # number of elements of the variable field -> _Codec
+        self._codec_by_count = {}
+        self._fixed_size = 0
+
+        if self.variable_field is None:
+            self._codec = _Codec(self, self.fields, is_length_checked)
+
+            # the functions of the codec are used directly, they take the same arguments as the methods
+            self.decode = self._codec.decode
+            self.encode = self._codec.encode
+        else:
+            for field in self.fields:
+                if not field is self.variable_field:
+                    self._fixed_size += struct.calcsize('>' + field.format)
+
+            # size of one element of a list, strings are counted in bytes
+            self._element_size = getattr(self.variable_field, 'element_size', 1)
+
+    def _get_codec(self, count):
+        codec = self._codec_by_count.get(count)
+        if codec is None:
+            variable_field = self.variable_field
+
+            # a copy of the variable field with a fixed number of elements
+            fields = []
+            for field in self.fields:
+                if field is variable_field:
+                    field = _FixedCountField(variable_field, count)
+                fields.append(field)
+
+            # the length is checked before the codec is chosen
+            codec = _Codec(self, fields, False)
+            self._codec_by_count[count] = codec
+
+        return codec
+
+    def _get_codec_for_payload(self, payload):
+        length_of_payload = len(payload)
+        element_size = self._element_size
+
+        if length_of_payload < self._fixed_size:
+            if self.is_length_checked:
+                raise InvalidPayloadLengthException(message_class=self.message_class, expected_payload_length=self._fixed_size, actual_payload_length=length_of_payload)
+            count = 0
+        else:
+            count, remainder = divmod(length_of_payload - self._fixed_size, element_size)
+            if remainder and self.is_length_checked:
+                raise InvalidPayloadLengthException(message_class=self.message_class, expected_payload_length=length_of_payload + element_size - remainder, actual_payload_length=length_of_payload)
+
+        return self._get_codec(count)
+
+    def decode(self, parser, payload):
+        """
+        Returns the message decoded from the payload, can be registered with MessageParser.register_decoder().
+        """
+        return self._get_codec_for_payload(payload).decode(parser, payload)
+
+    def encode(self, encoder, message):
+        """
+        Returns the frame encoded from the message, can be registered with MessageEncoder.register_encoder().
+        """
+        return self._get_codec(self.variable_field.get_count(getattr(message, self.variable_field.names[0]))).encode(encoder, message)
+
+
+class _FixedCountField(Field):
+    '''
+    Variable field with a fixed number of elements, used by the codec of a MessageSchema for that number of elements.
+    '''
+
+    is_identity = False
+
+    def __init__(self, variable_field, count):
+        Field.__init__(self)
+
+        self.names = variable_field.names
+        self.format = variable_field.get_format(count)
+        self._variable_field = variable_field
+
+    def encode(self, value):
+        return self._variable_field.encode(value)
+
+    def decode(self, parser, values):
+        return self._variable_field.decode(parser, values)
+
+
+def _was_successful(name='was_successful'):
+    # the device sends 0x00 on success
+    return Flag(name, true_value=0x00, false_value=0x01)
+
+
+# message class -> MessageSchema
+SCHEMA_BY_MESSAGE_CLASS = {}
+
+
+def register_schema(schema):
+    SCHEMA_BY_MESSAGE_CLASS[schema.message_class] = schema
+    return schema
+
+
+register_schema(MessageSchema(AuthorizeCommand, [Constant(b'\x17\x00\x00'), Pin('pin'), Padding(4)]))
+register_schema(MessageSchema(ChangePinCommand, [Constant(b'\x17\x00\x01'), Pin('new_pin'), Pin('pin')]))
+register_schema(MessageSchema(ResetPinCommand, [Constant(b'\x17\x00\x02'), Padding(8)]))
+register_schema(MessageSchema(PowerSwitchCommand, [Constant(b'\x03\x00'), Flag('on'), Padding(2)]))
+# 0x00 activates the nightmode
+register_schema(MessageSchema(ChangeNightmodeCommand, [Constant(b'\x0f\x00\x05'), Flag('on', true_value=0x00, false_value=0x01), Padding(4)]))
+register_schema(MessageSchema(SynchronizeDateAndTimeCommand, [Constant(b'\x01\x00'), DateTime('isodatetime', 'smhdMY'), Padding(2)]))
+register_schema(MessageSchema(RequestSettingsCommand, [Constant(b'\x10\x00'), Padding(2)]))
+register_schema(MessageSchema(ChangePowerLimitCommand, [Constant(b'\x05\x00'), UInt16('power_limit_in_watt'), Padding(2)]))
+register_schema(MessageSchema(ChangePricesCommand, [Constant(b'\x0f\x00\x04'), UInt8('normal_price_in_cent'), UInt8('reduced_period_price_in_cent'), Padding(4)]))
+register_schema(MessageSchema(ChangeReducedPeriodCommand, [Constant(b'\x0f\x00\x01'), Flag('is_active'), TimeInMinutes('start_isotime'), TimeInMinutes('end_isotime')]))
+register_schema(MessageSchema(RequestTimerStatusCommand, [Constant(b'\x09\x00\x00'), Padding(1)]))
+register_schema(MessageSchema(SetTimerCommand, [Constant(b'\x08\x00'), TimerAction('is_reset_timer', is_reset=True), DateTime('target_isodatetime', 'smhdMy', is_optional=True), Padding(2)]))
+register_schema(MessageSchema(RequestSchedulerCommand, [Constant(b'\x14\x00'), UInt8('page_number'), Padding(2)]))
+register_schema(MessageSchema(AddSchedulerCommand, [Constant(b'\x13\x00\x00\x00'), SchedulerField('scheduler'), Padding(2)]))
+register_schema(MessageSchema(EditSchedulerCommand, [Constant(b'\x13\x00\x01'), UInt8('slot_id'), SchedulerField('scheduler'), Padding(2)]))
+register_schema(MessageSchema(RemoveSchedulerCommand, [Constant(b'\x13\x00\x02'), UInt8('slot_id'), Padding(10)]))
+register_schema(MessageSchema(RequestRandomModeStatusCommand, [Constant(b'\x16\x00'), Padding(2)]))
+register_schema(MessageSchema(ChangeRandomModeCommand, [Constant(b'\x15\x00'), Flag('is_active'), Weekdays('active_on_weekdays'), HourAndMinute('start_isotime'), HourAndMinute('end_isotime'), Padding(2)]))
+register_schema(MessageSchema(RequestMeasurementCommand, [Constant(b'\x04\x00'), Padding(2)]))
+register_schema(MessageSchema(RequestConsumptionOfLast12MonthsCommand, [Constant(b'\x0c\x00'), Padding(2)]))
+register_schema(MessageSchema(RequestConsumptionOfLast30DaysCommand, [Constant(b'\x0b\x00'), Padding(2)]))
+register_schema(MessageSchema(RequestConsumptionOfLast23HoursCommand, [Constant(b'\x0a\x00'), Padding(2)]))
+register_schema(MessageSchema(ResetConsumptionCommand, [Constant(b'\x0f\x00\x02'), Padding(5)]))
+register_schema(MessageSchema(FactoryResetCommand, [Constant(b'\x0f\x00\x00'), Padding(5)]))
+register_schema(MessageSchema(ChangeDeviceNameCommand, [Constant(b'\x02\x00'), String('new_name', size=18), Padding(2)]))
+register_schema(MessageSchema(RequestDeviceSerialCommand, [Constant(b'\x11\x00'), Padding(2)]))
+
+register_schema(MessageSchema(AuthorizedNotification, [Constant(b'\x17\x00'), _was_successful(), Constant(b'\x00'), Padding(1)], is_length_checked=True))
+register_schema(MessageSchema(PinChangedNotification, [Constant(b'\x17\x00'), _was_successful(), Constant(b'\x01'), Padding(1)], is_length_checked=True))
+register_schema(MessageSchema(PinResetNotification, [Constant(b'\x17\x00'), _was_successful(), Constant(b'\x02'), Padding(1)], is_length_checked=True))
+register_schema(MessageSchema(PowerSwitchedNotification, [Constant(b'\x03\x00'), _was_successful()], is_length_checked=True))
+register_schema(MessageSchema(NightmodeChangedNotification, [Constant(b'\x0f\x00\x05'), Padding(1)], attributes={'was_successful': True}, is_length_checked=True))
+register_schema(MessageSchema(DateAndTimeChangedNotification, [Constant(b'\x01\x00'), _was_successful()], is_length_checked=True))
+# 0x00 means the nightmode is active
+register_schema(MessageSchema(SettingsRequestedNotification, [Constant(b'\x10\x00'), Flag('is_reduced_period'), UInt8('normal_price_in_cent'), UInt8('reduced_period_price_in_cent'), TimeInMinutes('reduced_period_start_isotime'), TimeInMinutes('reduced_period_end_isotime'), Flag('is_nightmode_active', true_value=0x00, false_value=0x01, is_true_unless_false=True), Padding(1), UInt16('power_limit_in_watt')], is_length_checked=True))
+register_schema(MessageSchema(PowerLimitChangedNotification, [Constant(b'\x05\x00'), Constant(b'\x00', is_checked=True)], attributes={'was_successful': True}, is_length_checked=True))
+register_schema(MessageSchema(PricesChangedNotification, [Constant(b'\x0f\x00\x04'), Padding(1)], attributes={'was_successful': True}, is_length_checked=True))
+register_schema(MessageSchema(ReducedPeriodChangedNotification, [Constant(b'\x0f\x00\x01'), Padding(1)], attributes={'was_successful': True}, is_length_checked=True))
+# the target date is 0 if the timer is not active
+register_schema(MessageSchema(TimerStatusRequestedNotification, [Constant(b'\x09\x00'), TimerAction('is_active'), DateTime('target_isodatetime', 'smhdMy', default_date=datetime.date(1970, 1, 1)), UInt24('original_timer_length_in_seconds'), Padding(1)], is_length_checked=True))
+register_schema(MessageSchema(TimerSetNotification, [Constant(b'\x08\x00\x00')], attributes={'was_successful': True}, is_length_checked=True))
+# a page contains only some of the scheduler entries, but reports the total number of schedulers
+register_schema(MessageSchema(SchedulerRequestedNotification, [Constant(b'\x14\x00'), UInt8('number_of_schedulers'), List('scheduler_entries', SchedulerEntryField())], is_length_checked=True))
+register_schema(MessageSchema(SchedulerChangedNotification, [Constant(b'\x13\x00'), _was_successful(), Padding(2)]))
+register_schema(MessageSchema(RandomModeStatusRequestedNotification, [Constant(b'\x16\x00'), Flag('is_active'), Weekdays('active_on_weekdays'), HourAndMinute('start_isotime'), HourAndMinute('end_isotime'), Padding(2)]))
+register_schema(MessageSchema(RandomModeChangedNotification, [Constant(b'\x15\x00'), _was_successful(), Padding(1)]))
+# suffix=b'\xff\xff' is missing in this notification
+register_schema(MessageSchema(MeasurementRequestedNotification, [Constant(b'\x04\x00'), Flag('is_power_active'), UInt24('power_in_milliwatt'), UInt8('voltage_in_volt'), UInt16('current_in_milliampere'), UInt8('frequency_in_hertz'), Padding(2), UInt32('total_consumption_in_kilowatt_hour')], suffix=b''))
+# the notifications do not contain the consumption of the current month and today, the oldest consumption is stored first
+register_schema(MessageSchema(ConsumptionOfLast12MonthsRequestedNotification, [Constant(b'\x0c\x00'), List('consumption_n_months_ago_in_watt_hour', PaddedUInt24(), is_reversed=True, number_of_missing_values=1)]))
+register_schema(MessageSchema(ConsumptionOfLast30DaysRequestedNotification, [Constant(b'\x0b\x00'), List('consumption_n_days_ago_in_watt_hour', PaddedUInt24(), is_reversed=True, number_of_missing_values=1)]))
+register_schema(MessageSchema(ConsumptionOfLast23HoursRequestedNotification, [Constant(b'\x0a\x00'), List('consumption_n_hours_ago_in_watt_hour', UInt16(), is_reversed=True)]))
+register_schema(MessageSchema(ConsumptionResetNotification, [Constant(b'\x0f\x00\x02'), Padding(1)], attributes={'was_successful': True}))
+register_schema(MessageSchema(FactoryResetNotification, [Constant(b'\x0f\x00\x00'), Padding(1)], attributes={'was_successful': True}))
+register_schema(MessageSchema(DeviceNameChangedNotification, [Constant(b'\x02\x00'), Padding(1)], attributes={'was_successful': True}))
+register_schema(MessageSchema(DeviceSerialRequestedNotification, [Constant(b'\x11\x00'), String('serial'), Padding(2)]))
@@ -1,104 +1,140 @@
 import binascii
-import datetime
 import sys
+import time
 
-from .bluetooth_lowenergy_interface.bluepy_interface import *
+from .abstract_sem6000 import AbstractSEM6000, NOTIFICATION_CLASS_BY_COMMAND_CLASS, READ_COMMAND_CLASSES, check_scheduler_page, merge_scheduler_pages
+from .adaptive_timeout import AdaptiveTimeout
+from .bluetooth_lowenergy_interface import backends
+from .delegate import SEM6000Delegate
 from . import encoder
 from .message import *
-from . import parser
-from . import util
-
-
-class SEM6000Delegate():
-    def __init__(self, debug=False):
-        self.debug = False
-        if debug:
-            self.debug = True
-
-        self._raw_notifications = []
-
-        self._parser = parser.MessageParser()
-
-    def __call__(self, characteristic_uuid, data):
-        self._handle_notification(characteristic_uuid, data)
-
-    def _handle_notification(self, characteristic_uuid, data):
-        self._raw_notifications.append(data)
-
-    def has_final_raw_notification(self):
-        if len(self._raw_notifications) == 0:
-            return False
-
-        last_notification = self._raw_notifications[-1]
-
-        if len(last_notification) < 2:
-            return False
+from .metrics import PHASE_CONNECT, PHASE_AUTHORIZE, PHASE_WRITE, PHASE_WAIT, PHASE_COMMAND
+from . import retry
+
+
+# responses which may change by each command class, no notification class means all responses may change
+_CHANGED_NOTIFICATION_CLASSES_BY_COMMAND_CLASS = {
+    ChangeNightmodeCommand: (SettingsRequestedNotification,),
+    SynchronizeDateAndTimeCommand: (TimerStatusRequestedNotification,),
+    ChangePowerLimitCommand: (SettingsRequestedNotification,),
+    ChangePricesCommand: (SettingsRequestedNotification,),
+    ChangeReducedPeriodCommand: (SettingsRequestedNotification,),
+    SetTimerCommand: (TimerStatusRequestedNotification,),
+    AddSchedulerCommand: (SchedulerRequestedNotification,),
+    EditSchedulerCommand: (SchedulerRequestedNotification,),
+    RemoveSchedulerCommand: (SchedulerRequestedNotification,),
+    ChangeRandomModeCommand: (RandomModeStatusRequestedNotification,),
+    FactoryResetCommand: (),
+    ChangeDeviceNameCommand: (DeviceNameRequestedNotification,),
+}
+
+
+def _is_same_scheduler(scheduler, other_scheduler):
+    if scheduler.is_active != other_scheduler.is_active or scheduler.is_action_turn_on != other_scheduler.is_action_turn_on:
+        return False
+    if scheduler.repeat_on_weekdays != other_scheduler.repeat_on_weekdays:
+        return False
 
-        # command b'\x04\x00' lacks suffix b'\xff\xff'
-        if last_notification[2:4] == b'\x04\x00':
-            return True
+    # repeated schedulers carry the date they were created at
+    if len(scheduler.repeat_on_weekdays):
+        return scheduler.isodatetime[10:] == other_scheduler.isodatetime[10:]
 
-        return ( last_notification[-2:] == b'\xff\xff' )
+    return scheduler.isodatetime == other_scheduler.isodatetime
 
-    def consume_notification(self):
-        exception = None
-        notification = None
 
-        data = b''
-        for n in self._raw_notifications:
-            data += n
+def _is_command_applied(command, previous_scheduler_entries, scheduler_entries):
+    """
+    Returns True if the scheduler entries read back show the command was applied, False if not and None if this is unknown.
 
-        try:
-            if not self.has_final_raw_notification():
-                raise Exception("Incomplete notification data")
+    Parameters:
+        command                     - AddSchedulerCommand or RemoveSchedulerCommand which was not answered
+        previous_scheduler_entries  - Scheduler entries before the command was sent, None if they are unknown
+        scheduler_entries           - Scheduler entries after the command was sent, None if they are unknown
+    """
+    if scheduler_entries is None:
+        return None
 
-            notification = self._parser.parse(data)
-        except Exception as e:
-            if self.debug:
-                print("received data: " + str(binascii.hexlify(data)) + " (Unknown Notification)", file=sys.stderr)
-            raise e
+    if isinstance(command, AddSchedulerCommand):
+        if previous_scheduler_entries is None:
+            return None
 
-        if self.debug:
-            print("received data: " + str(binascii.hexlify(data)) + " (" + str(notification) + ")", file=sys.stderr)
+        # an identical scheduler added before does not show this command was applied, only one in a new slot does
+        previous_slot_ids = set([scheduler_entry.slot_id for scheduler_entry in previous_scheduler_entries])
+        for scheduler_entry in scheduler_entries:
+            if not scheduler_entry.slot_id in previous_slot_ids and _is_same_scheduler(scheduler_entry.scheduler, command.scheduler):
+                return True
+        return False
 
+    if isinstance(command, RemoveSchedulerCommand):
+        for scheduler_entry in scheduler_entries:
+            if scheduler_entry.slot_id == command.slot_id:
+                return False
+        return True
 
-        while len(self._raw_notifications):
-            self._raw_notifications.pop(0)
+    return None
 
-        return notification
 
-    def reset_notification_data(self):
-        self._raw_notifications.clear()
+def _create_bluetooth_lowenergy_interface(bluetooth_device):
+    # the module of the backend, i.e. bluepy, is only imported if no other interface is provided
+    return backends.create_bluetooth_lowenergy_interface(bluetooth_device)
 
 
-class SEM6000():
+class SEM6000(AbstractSEM6000):
     SERVICECLASS_UUID='0000fff0-0000-1000-8000-00805f9b34fb'
     CHARACTERISTIC_UUID_NAME='00002a00-0000-1000-8000-00805f9b34fb'
     CHARACTERISTIC_UUID_CONTROL='0000fff3-0000-1000-8000-00805f9b34fb'
     CHARACTERISTIC_UUID_RESPONSE='0000fff4-0000-1000-8000-00805f9b34fb'
 
-    def __init__(self, deviceAddr=None, pin=None, bluetooth_device='hci0', timeout=3, debug=False):
+    def __init__(self, deviceAddr=None, pin=None, bluetooth_device='hci0', timeout=3, debug=False, bluetooth_lowenergy_interface=None, cache=None, capture=None, metrics=None, retry_policy=None):
         """ Create a new SEM6000() instance
         
             Parameters:
-                deviceAddr          - Optional, MAC address of a remote device to connect to immediately, i.e. '00:11:22:33:44:55'.
-                pin                 - Optional, 4 digit numeric pin, i.e. '0000'.
-                bluetooth_device    - Optional, bluetooth device name to use. Default: 'hci0'
-                timeout             - Optional, maximum time in seconds to wait for a response from the device. Default: 3
-                debug               - Optional, if set to true commands and responses are printed to sys.stderr
+                deviceAddr                      - Optional, MAC address of a remote device to connect to immediately, i.e. '00:11:22:33:44:55'.
+                pin                             - Optional, 4 digit numeric pin, i.e. '0000'.
+                bluetooth_device                - Optional, bluetooth device name to use. Default: 'hci0'
+                timeout                         - Optional, maximum time in seconds to wait for the complete response to a command, all notification fragments
+                                                  included, or an AdaptiveTimeout deriving the time from the round trip times of the device. Default: 3
+                debug                           - Optional, if set to true commands and responses are printed to sys.stderr
+                bluetooth_lowenergy_interface   - Optional, AbstractBluetoothInterface to use instead of one of the default backend, i.e. a SimulatedSEM6000Interface
+                cache                           - Optional, NotificationCache keeping responses of request_settings(), request_timer_status(), ... for a limited time
+                capture                         - Optional, CaptureWriter recording sent commands and received notification fragments
+                metrics                         - Optional, SEM6000Metrics recording latencies of the command phases, timeouts, reconnects and parse failures
+                retry_policy                    - Optional, RetryPolicy of this device sending commands again which were not answered or could not be sent.
+                                                  Adding or removing a scheduler is only sent again if reading back the schedulers shows it was not applied,
+                                                  if it was applied the method returns a SchedulerChangedNotification(was_successful=True) created without
+                                                  a response of the device.
         """
         self.timeout = timeout
+        self.adaptive_timeout = None
+        if isinstance(timeout, AdaptiveTimeout):
+            self.timeout = timeout.maximum_timeout_in_seconds
+            self.adaptive_timeout = timeout
+
         self.debug = debug
 
+        self.cache = cache
+        self.capture = capture
+        self.metrics = metrics
+        self.retry_policy = retry_policy
+
         self.connection_settings = {}
 
+        # response of a command whose effect was verified by reading back the state of the device
+        self._verified_notification = None
+
         self.pin = None
 
         self._encoder = encoder.MessageEncoder()
 
         self._delegate = SEM6000Delegate(self.debug)
-        self._bluetooth_lowenergy_interface = BluePyBtLeInterface(bluetooth_device=bluetooth_device)
+
+        if bluetooth_lowenergy_interface is None:
+            bluetooth_lowenergy_interface = _create_bluetooth_lowenergy_interface(bluetooth_device)
+
+        self._bluetooth_lowenergy_interface = bluetooth_lowenergy_interface
         self._bluetooth_lowenergy_interface.add_notification_handler(self._delegate._handle_notification)
+        if not self.capture is None:
+            self._bluetooth_lowenergy_interface.add_notification_handler(self._capture_notification)
 
         if not deviceAddr is None:
             self.connect(deviceAddr)
@@ -115,6 +151,10 @@ class SEM6000():
         return False
 
     def _reconnect(self):
+        metrics = self.metrics
+        if not metrics is None:
+            start = metrics.clock()
+
         self._disconnect()
 
         try:
@@ -125,6 +165,10 @@ class SEM6000():
 
         self._bluetooth_lowenergy_interface.enable_notifications()
 
+        if not metrics is None:
+            connected = metrics.clock()
+            metrics.observe(PHASE_CONNECT, None, connected - start)
+
         if self.pin:
             try:
                 self.authorize(self.pin)
@@ -132,715 +176,538 @@ class SEM6000():
                 self._disconnect()
                 raise e
 
+            if not metrics is None:
+                metrics.observe(PHASE_AUTHORIZE, None, metrics.clock() - connected)
+
     def _is_connected(self):
         if self._bluetooth_lowenergy_interface is None:
             return False
 
         return self._bluetooth_lowenergy_interface.is_connected()
 
-    def _send_command(self, command):
-        encoded_command = self._encoder.encode(command)
-
-        if self.debug:
-            print("sent data: " + str(binascii.hexlify(encoded_command)) + " (" + str(command) + ")", file=sys.stderr)
-
-        self._delegate.reset_notification_data()
-
+    def _ensure_connected(self):
         if not self._is_connected():
             if self.connection_settings["device_address"] and self.pin:
+                if not self.metrics is None:
+                    self.metrics.count_reconnect()
+
                 self._reconnect()
             else:
                 raise Exception("Not connected and no deviceAddress / pin set")
 
-        self._bluetooth_lowenergy_interface.write_to_characteristic(SEM6000.CHARACTERISTIC_UUID_CONTROL, encoded_command)
-        self._wait_for_notifications()
-
-    def _wait_for_notifications(self):
-        while True:
-            if not self._bluetooth_lowenergy_interface.wait_for_notifications(self.timeout):
-                break
-
-            if self._delegate.has_final_raw_notification():
-                break
-
-    def _consume_notification(self):
-        return self._delegate.consume_notification()
-
-    def connect(self, device_address):
-        """
-        Connect to a remote device.
-
-        Parameters:
-            device_address  - MAC address to connect to, i.e. '00:11:22:33:44:55'.
-        """
-        self.connection_settings["device_address"] = device_address
-
-        return self._reconnect()
-
-    def disconnect(self):
-        """
-        Disconnect from the current remote device.
-        """
-        return self._disconnect()
-
-    def discover(timeout=5, bluetooth_device='hci0'):
-        """
-        Discover remote devices.
-
-        This method needs special permissions.
-        
-        Parameters:
-            timeout             - Optional, time in seconds to wait for devices to respond. Default: 5
-            bluetooth_device    - Optional, bluetooth device name to use. Default: 'hciß'
-        """
-        bluetooth_lowenergy_interface = BluePyBtLeInterface(bluetooth_device=bluetooth_device)
-
-        return bluetooth_lowenergy_interface.discover(timeout, service_uuids=[SEM6000.SERVICECLASS_UUID])
+    def _write_command(self, command):
+        metrics = self.metrics
+        if not metrics is None:
+            start = metrics.clock()
 
-    def request_device_name(self):
-        """
-        Request the name of the remote device.
-
-        Returns a DeviceNameRequestedNotification.
-        """
-        data = self._bluetooth_lowenergy_interface.read_from_characteristic(SEM6000.CHARACTERISTIC_UUID_NAME)
+        encoded_command = self._encoder.encode(command)
 
         if self.debug:
-            print("received data: " + str(binascii.hexlify(data)), file=sys.stderr)
-
-        device_name = data.decode(encoding='utf-8')
-
-        return DeviceNameRequestedNotification(device_name)
-
-    def authorize(self, pin):
-        """
-        Authorize on the connected device.
+            print("sent data: " + str(binascii.hexlify(encoded_command)) + " (" + str(command) + ")", file=sys.stderr)
 
-        Parameters:
-            pin - 4 digit PIN, i.e. '0000'
+        if not self.capture is None:
+            self.capture.record_sent(self.connection_settings.get("device_address"), encoded_command)
 
-        Returns an AuthorizedNotification.
-        """
-        command = AuthorizeCommand(pin)
-        self._send_command(command)
-        notification = self._consume_notification()
+        self._bluetooth_lowenergy_interface.write_to_characteristic(SEM6000.CHARACTERISTIC_UUID_CONTROL, encoded_command)
 
-        if not isinstance(notification, AuthorizedNotification):
-            raise Exception("Authentication failed")
+        if not metrics is None:
+            metrics.observe(PHASE_WRITE, type(command), metrics.clock() - start)
 
-        if notification.was_successful:
-            self.pin = pin
-        else:
-            self.pin = None
-            raise Exception("Authentication failed")
+    def _capture_notification(self, characteristic_uuid, data):
+        self.capture.record_received(self.connection_settings.get("device_address"), data)
 
-        return notification
+    def _get_timeout(self):
+        if self.adaptive_timeout is None:
+            return self.timeout
 
-    def change_pin(self, new_pin):
-        """
-        Change the pin on the remote device.
+        return self.adaptive_timeout.get_timeout()
 
-        Parameters:
-            new_pin - 4 digit PIN to change the current PIN to, i.e. '0000'
+    def _send_command(self, command):
+        self._verified_notification = None
 
-        Returns a PinChangedNotification.
-        """
-        command = ChangePinCommand(self.pin, new_pin)
-        self._send_command(command)
-        notification = self._consume_notification()
+        retry_policy = self.retry_policy
+        if retry_policy is None:
+            self._send_command_once(command)
+            return
 
-        if not isinstance(notification, PinChangedNotification) or not notification.was_successful:
-            raise Exception("Change PIN failed")
+        # an added scheduler is only known to be applied if it is in a slot which was not used before
+        scheduler_entries = None
+        if isinstance(command, AddSchedulerCommand):
+            scheduler_entries = self._read_scheduler_entries(command)
 
-        return notification
+        attempt = 1
+        while True:
+            exception = None
+            try:
+                is_complete = self._send_command_once(command, attempt)
+            except Exception as e:
+                is_complete = False
+                exception = e
+
+            if is_complete:
+                if attempt == 1:
+                    retry_policy.record_success()
+                return
+
+            if retry.get_retry_class(command) == retry.RETRY_CLASS_VERIFIED:
+                # a command being applied twice is worse than a failed command, so it is only retried if the device shows it was not applied
+                previous_scheduler_entries = scheduler_entries
+                scheduler_entries = self._read_scheduler_entries(command)
+
+                is_applied = _is_command_applied(command, previous_scheduler_entries, scheduler_entries)
+                if is_applied is None:
+                    break
+                if is_applied:
+                    retry_policy.record_verified_command()
+                    # there is no response of the device, the notification is created from the state which was read back
+                    self._verified_notification = NOTIFICATION_CLASS_BY_COMMAND_CLASS[type(command)](was_successful=True)
+                    return
+
+            if not retry_policy.acquire_retry(command, attempt):
+                break
 
-    def reset_pin(self):
-        """
-        Reset the pin to 0000 on the remote device.
+            if self.debug:
+                print("retrying " + str(command) + " after attempt " + str(attempt), file=sys.stderr)
 
-        Returns a PinResetNotification.
-        """
-        command = ResetPinCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
+            if not self.metrics is None:
+                self.metrics.count_retry()
 
-        if not isinstance(notification, PinResetNotification) or not notification.was_successful:
-            raise Exception("Reset PIN failed")
+            retry_policy.backoff(attempt)
+            attempt += 1
 
-        return notification
+        # the caller reports the missing response like without retries
+        if not exception is None:
+            raise exception
 
-    def power_on(self):
+    def _read_scheduler_entries(self, command):
         """
-        Tell the remote device to turn the power on.
-
-        Returns a PowerSwitchedNotification.
+        Returns the scheduler entries of the device or None if they could not be read.
         """
-        command = PowerSwitchCommand(True)
-        self._send_command(command)
-        notification = self._consume_notification()
-        
-        if not isinstance(notification, PowerSwitchedNotification) or not notification.was_successful:
-            raise Exception("Power on failed")
-
-        return notification
+        try:
+            return self.request_scheduler(force_refresh=True).scheduler_entries
+        except Exception as e:
+            if self.debug:
+                print("reading schedulers for " + str(command) + " failed: " + repr(e), file=sys.stderr)
+            return None
+        finally:
+            # the command may change the schedulers after they were read
+            self._invalidate_cached_notification(SchedulerRequestedNotification)
 
-    def power_off(self):
-        """
-        Tell the remote device to turn the power off.
+    def _send_command_once(self, command, attempt=1):
+        metrics = self.metrics
+        if not metrics is None:
+            start = metrics.clock()
 
-        Returns a PowerSwitchedNotification.
-        """
-        command = PowerSwitchCommand(False)
-        self._send_command(command)
-        notification = self._consume_notification()
-        
-        if not isinstance(notification, PowerSwitchedNotification) or not notification.was_successful:
-            raise Exception("Power off failed")
+        self._delegate.reset_notification_data()
 
-        return notification
+        self._ensure_connected()
 
-    def nightmode_on(self):
-        """
-        Activate nightmode on the remote device.
+        timeout = self._get_timeout()
+        if not metrics is None:
+            metrics.observe_timeout(type(command), timeout)
 
-        Returns a NightmodeChangedNotification.
-        """
-        command = ChangeNightmodeCommand(True)
-        self._send_command(command)
-        notification = self._consume_notification()
-        
-        if not isinstance(notification, NightmodeChangedNotification) or not notification.was_successful:
-            raise Exception("Nightmode on failed")
+        # the deadline covers writing the command and all fragments of the response
+        write_start = time.monotonic()
+        deadline = write_start + timeout
 
-        return notification
+        self._write_command(command)
+        is_complete = self._wait_for_notifications(command, deadline)
 
-    def nightmode_off(self):
-        """
-        Disable nightmode on the remote device.
+        # a response to a retry may be the late response to an earlier attempt, so only first attempts are observed (Karn's rule)
+        if is_complete and attempt == 1 and not self.adaptive_timeout is None:
+            self.adaptive_timeout.observe(time.monotonic() - write_start)
 
-        Returns a NightmodeChangedNotification.
-        """
-        command = ChangeNightmodeCommand(False)
-        self._send_command(command)
-        notification = self._consume_notification()
-        
-        if not isinstance(notification, NightmodeChangedNotification) or not notification.was_successful:
-            raise Exception("Nightmode off failed")
+        if not metrics is None:
+            metrics.observe(PHASE_COMMAND, type(command), metrics.clock() - start)
 
-        return notification
+        return is_complete
 
-    def change_date_and_time(self, isodatetime):
+    def _wait_for_notifications(self, command=None, deadline=None):
         """
-        Set date and time on the remote device.
+        Waits until a complete notification arrived or the deadline passed. Returns True if a complete notification arrived.
 
         Parameters:
-            isodatetime - ISO string representing date and time, i.e. '2020-01-01T10:00'
+            command     - Optional, command the response is waited for, used for the metrics
+            deadline    - Optional, time.monotonic() until the response has to be complete. Default: the timeout from now on
+        """
+        metrics = self.metrics
+        if not metrics is None:
+            start = metrics.clock()
+
+        if deadline is None:
+            deadline = time.monotonic() + self._get_timeout()
+
+        # a device sending fragments which do not complete a notification must not extend the wait
+        is_complete = self._delegate.has_final_raw_notification()
+        while not is_complete:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._bluetooth_lowenergy_interface.wait_for_notifications(remaining):
+                is_complete = self._delegate.has_final_raw_notification()
+                if not metrics is None and not is_complete:
+                    metrics.count_timeout()
+                break
 
-        Returns a DateAndTimeChangedNotification.
-        """
-        command = SynchronizeDateAndTimeCommand(isodatetime)
-        self._send_command(command)
-        notification = self._consume_notification()
+            is_complete = self._delegate.has_final_raw_notification()
 
-        if not isinstance(notification, DateAndTimeChangedNotification) or not notification.was_successful:
-            raise Exception("Set date and time failed")
+        if not metrics is None:
+            metrics.observe(PHASE_WAIT, None if command is None else type(command), metrics.clock() - start)
 
-        return notification
+        return is_complete
 
-    def request_settings(self):
-        """
-        Request the current settings from the remote device.
-
-        Returns a SettingsRequestedNotification.
-        """
-        command = RequestSettingsCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
+    def _consume_notification(self):
+        if not self._verified_notification is None:
+            notification = self._verified_notification
+            self._verified_notification = None
+            return notification
 
-        if not isinstance(notification, SettingsRequestedNotification):
-            raise Exception("Request settings failed")
+        if self.metrics is None:
+            return self._delegate.consume_notification()
 
-        return notification
+        is_complete = self._delegate.has_final_raw_notification()
+        try:
+            return self._delegate.consume_notification()
+        except Exception as e:
+            if is_complete:
+                self.metrics.count_parse_failure()
+            else:
+                self.metrics.count_incomplete_frame()
+            raise e
 
-    def change_power_limit(self, power_limit_in_watt):
-        """
-        Set the power limit when the remote device should be automatically turn off.
+    def _get_cached_notification(self, notification_class, force_refresh):
+        if self.cache is None or force_refresh:
+            return None
 
-        Returns a PowerLimitChangedNotification.
-        """
-        command = ChangePowerLimitCommand(power_limit_in_watt=int(power_limit_in_watt))
-        self._send_command(command)
-        notification = self._consume_notification()
+        return self.cache.get(notification_class)
 
-        if not isinstance(notification, PowerLimitChangedNotification) or not notification.was_successful:
-            raise Exception("Set power limit failed")
+    def _cache_notification(self, notification):
+        if not self.cache is None:
+            self.cache.put(notification)
 
-        return notification
-
-    def change_prices(self, normal_price_in_cent, reduced_period_price_in_cent):
+    def _invalidate_cached_notification(self, *notification_classes):
         """
-        Set the power prices.
-
-        Parameters:
-            normal_price_in_cent            - Power price in cents.
-            reduced_period_price_in_cent    - Power price in cents during reduced period.
-
-        Returns a PricesChangedNotification.
+        Drops cached responses of the given classes or all cached responses if no class is given.
         """
-        command = ChangePricesCommand(normal_price_in_cent=int(normal_price_in_cent), reduced_period_price_in_cent=int(reduced_period_price_in_cent))
-        self._send_command(command)
-        notification = self._consume_notification()
+        if self.cache is None:
+            return
 
-        if not isinstance(notification, PricesChangedNotification) or not notification.was_successful:
-            raise Exception("Set prices failed")
+        if not len(notification_classes):
+            self.cache.clear()
 
-        return notification
+        for notification_class in notification_classes:
+            self.cache.invalidate(notification_class)
 
-    def change_reduced_period(self, is_active, start_isotime, end_isotime):
-        """
-        Sets start and end time of the reduced period.
-
-        Parameters:
-            is_active       - True if reduced prices should be used, False if not.
-            start_isotime   - ISO start time of the reduced period, i.e. '10:00'
-            end_isotime     - ISO end time of the reduced period, i.e. '20:00'
-
-        Returns a ReducedPeriodChangedNotification.
-        """
-        command = ChangeReducedPeriodCommand(
-            is_active=util._parse_boolean(is_active), 
-            start_isotime=start_isotime, 
-            end_isotime=end_isotime)
+    def _call(self, command, error_message):
+        changed_notification_classes = _CHANGED_NOTIFICATION_CLASSES_BY_COMMAND_CLASS.get(type(command))
+        if not changed_notification_classes is None:
+            self._invalidate_cached_notification(*changed_notification_classes)
 
         self._send_command(command)
-        notification = self._consume_notification()
 
-        if not isinstance(notification, ReducedPeriodChangedNotification) or not notification.was_successful:
-            raise Exception("Set reduced period failed")
+        return self._check_response(command, self._consume_notification(), error_message)
 
-        return notification
+    def _request(self, command, error_message, force_refresh):
+        notification = self._get_cached_notification(NOTIFICATION_CLASS_BY_COMMAND_CLASS[type(command)], force_refresh)
+        if not notification is None:
+            return notification
 
-    def request_timer_status(self):
-        """
-        Request the current status of the timer.
+        notification = self._call(command, error_message)
 
-        Returns a TimerStatusRequestedNotification.
-        """
-        command = RequestTimerStatusCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, TimerStatusRequestedNotification):
-            raise Exception("Request timer status failed")
+        self._cache_notification(notification)
 
         return notification
 
-    def activate_timer(self, is_action_turn_on, delay_isotime):
+    def _send_many_incrementally(self, commands):
         """
-        Activate the timer.
-
-        Parameters:
-            is_action_turn_on   - True if the power should be turned on after the delay has passed, False if the power should be turned off.
-            delay_isotime       - Delay in iso time format, i.e. '00:00:05' for 5 seconds.
+        Writes all commands and yields (index of command, notification or Exception) in the order the results are available.
 
-        Returns a TimerSetNotification.
+        If a RetryPolicy is set, commands of the retry classes read and idempotent which were not answered are sent again.
         """
-        time = datetime.time.fromisoformat(delay_isotime)
-        timedelta = datetime.timedelta(hours=time.hour, minutes=time.minute, seconds=time.second)
-        dt = datetime.datetime.now() + timedelta
+        retry_policy = self.retry_policy
 
-        command = SetTimerCommand(
-            is_reset_timer=False, 
-            is_action_turn_on=util._parse_boolean(is_action_turn_on), 
-            target_isodatetime=dt.isoformat(timespec='seconds'))
-
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, TimerSetNotification) or not notification.was_successful:
-            raise Exception("Set timer failed")
+        indices = []
+        for i, command in enumerate(commands):
+            if NOTIFICATION_CLASS_BY_COMMAND_CLASS.get(type(command)) is None:
+                yield (i, Exception("Unsupported command " + str(command)))
+            else:
+                indices.append(i)
 
-        return notification
+        attempt = 1
+        while len(indices):
+            # index of command -> Exception of the commands which failed or were not answered
+            exception_by_index = {}
 
-    def activate_timer_at(self, is_action_turn_on, target_isodatetime):
-        """
-        Activate the timer at the specified date and time.
+            for result in self._send_many_once(commands, indices, attempt, exception_by_index):
+                yield result
 
-        Parameters:
-            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
-            target_isodatetime  - iso date and time format, i.e. '2020-01-01T00:00:05'.
+            indices = []
+            for i in sorted(exception_by_index.keys()):
+                command = commands[i]
 
-        Returns a TimerSetNotification.
-        """
-        command = SetTimerCommand(
-            is_reset_timer=False, 
-            is_action_turn_on=util._parse_boolean(is_action_turn_on), 
-            target_isodatetime=target_isodatetime)
+                if not retry_policy is None and retry.get_retry_class(command) in [retry.RETRY_CLASS_READ, retry.RETRY_CLASS_IDEMPOTENT] and retry_policy.acquire_retry(command, attempt):
+                    if self.debug:
+                        print("retrying " + str(command) + " after attempt " + str(attempt), file=sys.stderr)
 
-        self._send_command(command)
-        notification = self._consume_notification()
+                    if not self.metrics is None:
+                        self.metrics.count_retry()
 
-        if not isinstance(notification, TimerSetNotification) or not notification.was_successful:
-            raise Exception("Set timer failed")
+                    indices.append(i)
+                else:
+                    yield (i, exception_by_index[i])
 
-        return notification
+            if len(indices):
+                retry_policy.backoff(attempt)
+                attempt += 1
 
-    def reset_timer(self):
+    def _send_many_once(self, commands, indices, attempt, exception_by_index):
         """
-        Stop and reset the timer.
-
-        Returns a TimerSetNotification.
+        Writes the commands of the indices and yields (index of command, notification) in the order the responses are available.
+        Commands which failed or were not answered are added to exception_by_index.
         """
-        command = SetTimerCommand(is_reset_timer=True, is_action_turn_on=False)
-        self._send_command(command)
-        notification = self._consume_notification()
+        # indices of commands waiting for a response by notification class
+        pending_indices_by_notification_class = {}
+        number_of_pending_commands = 0
 
-        if not isinstance(notification, TimerSetNotification) or not notification.was_successful:
-            raise Exception("Reset timer failed")
+        # time.monotonic() each command was written at, to observe the round trip times
+        write_time_by_index = {}
 
-        return notification
-
-    def request_scheduler(self):
-        """
-        Request all currently set schedulers.
-
-        Returns a SchedulerRequestedNotification.
-        """
-        command = RequestSchedulerCommand(page_number=0)
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, SchedulerRequestedNotification):
-            raise Exception('Request scheduler 1st page failed')
-
-        max_page_number = notification.number_of_schedulers // 4
-        for page_number in range(1, max_page_number+1):
-            command = RequestSchedulerCommand(page_number=page_number)
-            self._send_command(command)
-            further_notification = self._consume_notification()
+        self._delegate.reset_notification_data()
 
-            if not isinstance(further_notification, SchedulerRequestedNotification):
-                raise Exception('Request scheduler 2nd page failed')
+        self._ensure_connected()
 
-            notification.scheduler_entries.extend(further_notification.scheduler_entries)
+        # one deadline for the whole batch, responses and fragments arriving do not extend it
+        timeout = self._get_timeout()
+        deadline = time.monotonic() + timeout
 
-        return notification
+        for i in indices:
+            command = commands[i]
+            notification_class = NOTIFICATION_CLASS_BY_COMMAND_CLASS[type(command)]
 
-    def add_onetime_scheduler(self, is_active, is_action_turn_on, isodatetime):
-        """
-        Add a scheduler entry occuring at a specific date and time.
+            if not isinstance(command, READ_COMMAND_CLASSES):
+                self._invalidate_cached_notification()
 
-        Parameters:
-            is_active           - True if the scheduler entry should be active, else False.
-            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
-            isodatetime         - ISO date and time for when the scheduler entry should be executed, i.e. '2020-01-01T10:00'
+            try:
+                self._write_command(command)
+            except Exception as e:
+                exception_by_index[i] = e
+                continue
 
-        Returns a SchedulerChangedNotification.
-        """
-        command = AddSchedulerCommand(
-            OneTimeScheduler(
-                is_active=util._parse_boolean(is_active), 
-                is_action_turn_on=util._parse_boolean(is_action_turn_on), 
-                isodatetime=isodatetime
-            ))
+            if not self.metrics is None:
+                self.metrics.observe_timeout(type(command), timeout)
 
-        self._send_command(command)
-        notification = self._consume_notification()
+            write_time_by_index[i] = time.monotonic()
+            pending_indices_by_notification_class.setdefault(notification_class, []).append(i)
+            number_of_pending_commands += 1
 
-        if not isinstance(notification, SchedulerChangedNotification) or not notification.was_successful:
-            raise Exception("Add scheduler failed")
+        while number_of_pending_commands > 0:
+            while number_of_pending_commands > 0 and self._delegate.has_final_raw_notification():
+                try:
+                    notification = self._consume_notification()
+                except Exception as e:
+                    if self.debug:
+                        print("dropped unparsable response: " + repr(e), file=sys.stderr)
+                    continue
 
-        return notification
+                pending_indices = pending_indices_by_notification_class.get(type(notification))
+                if not pending_indices:
+                    if self.debug:
+                        print("dropped unexpected response: " + str(notification), file=sys.stderr)
+                    continue
 
-    def edit_onetime_scheduler(self, slot_id, is_active, is_action_turn_on, isodatetime):
-        """
-        Edit an existing scheduler entry occuring at a specific date and time.
+                i = pending_indices.pop(0)
 
-        Parameters:
-            slot_id             - id of the slot where the scheduler entry is currently stored at.
-            is_active           - True if the scheduler entry should be active, else False.
-            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
-            isodatetime         - ISO date and time for when the scheduler entry should be executed, i.e. '2020-01-01T10:00'
+                # a response to a retry may be the late response to an earlier attempt, so only first attempts are observed (Karn's rule)
+                if attempt == 1:
+                    if not self.adaptive_timeout is None:
+                        self.adaptive_timeout.observe(time.monotonic() - write_time_by_index[i])
 
-        Returns a SchedulerChangedNotification.
-        """
-        command = EditSchedulerCommand(
-            slot_id=int(slot_id), 
-            scheduler=OneTimeScheduler(
-                is_active=util._parse_boolean(is_active), 
-                is_action_turn_on=util._parse_boolean(is_action_turn_on), 
-                isodatetime=isodatetime
-            ))
+                    if not self.retry_policy is None:
+                        self.retry_policy.record_success()
 
-        self._send_command(command)
-        notification = self._consume_notification()
+                number_of_pending_commands -= 1
+                yield (i, notification)
 
-        if not isinstance(notification, SchedulerChangedNotification) or not notification.was_successful:
-            raise Exception("Edit scheduler failed")
+            if number_of_pending_commands == 0:
+                break
 
-        return notification
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._bluetooth_lowenergy_interface.wait_for_notifications(remaining):
+                # responses completed by the last fragment are still consumed
+                if self._delegate.has_final_raw_notification():
+                    continue
 
-    def add_repeated_scheduler(self, is_active, is_action_turn_on, repeat_on_weekdays, isotime):
-        """
-        Add a scheduler entry that will be repeated regulary.
+                if not self.metrics is None:
+                    self.metrics.count_timeout()
+                break
 
-        Parameters:
-            is_active           - True if the scheduler entry should be active, else False.
-            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
-            repeat_on_weekdays  - Comma separated list of Weekdays the scheduler should be repeated on, i.e. 'Mon,Wed,Fri'
-            isotime             - ISO time for when the scheduler entry should be executed, i.e. '10:00'
+        for pending_indices in pending_indices_by_notification_class.values():
+            for i in pending_indices:
+                exception_by_index[i] = Exception("No response to " + str(commands[i]))
 
-        Returns a SchedulerChangedNotification.
+    def send_many(self, commands):
         """
-        command = AddSchedulerCommand(
-            RepeatedScheduler(
-                is_active=util._parse_boolean(is_active), 
-                is_action_turn_on=util._parse_boolean(is_action_turn_on), 
-                repeat_on_weekdays=util._parse_weekdays_list(repeat_on_weekdays), 
-                isotime=isotime
-            ))
-
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, SchedulerChangedNotification) or not notification.was_successful:
-            raise Exception("Add scheduler failed")
-
-        return notification
+        Send several commands without waiting for the responses in between.
 
-    def edit_repeated_scheduler(self, slot_id, is_active, is_action_turn_on, repeat_on_weekdays, isotime):
-        """
-        Edit an existing scheduler entry that will be repeated regulary.
+        Responses are assigned to the commands by their notification type. Commands having the same
+        notification type get their responses in the order the commands were sent.
 
         Parameters:
-            slot_id             - id of the slot where the scheduler entry is currently stored at.
-            is_active           - True if the scheduler entry should be active, else False.
-            is_action_turn_on   - True if the power should be turned on, False if the power should be turned off.
-            repeat_on_weekdays  - Comma separated list of Weekdays the scheduler should be repeated on, i.e. 'Mon,Wed,Fri'
-            isotime             - ISO time for when the scheduler entry should be executed, i.e. '10:00'
+            commands    - List of command objects, i.e. [RequestSettingsCommand(), RequestTimerStatusCommand()]
 
-        Returns a SchedulerChangedNotification.
+        Returns a list having for each command either its notification or an Exception if the command failed or was not answered in time.
         """
-        command = EditSchedulerCommand(
-            slot_id=int(slot_id), 
-            scheduler=RepeatedScheduler(
-                is_active=util._parse_boolean(is_active), 
-                is_action_turn_on=util._parse_boolean(is_action_turn_on), 
-                repeat_on_weekdays=util._parse_weekdays_list(repeat_on_weekdays), 
-                isotime=isotime
-            ))
+        results = [None] * len(commands)
 
-        self._send_command(command)
-        notification = self._consume_notification()
+        for i, result in self._send_many_incrementally(commands):
+            results[i] = result
 
-        if not isinstance(notification, SchedulerChangedNotification) or not notification.was_successful:
-            raise Exception("Edit scheduler failed")
-
-        return notification
+        return results
 
-    def remove_scheduler(self, slot_id):
+    def connect(self, device_address):
         """
-        Remove an existing scheduler entry.
+        Connect to a remote device.
 
         Parameters:
-            slot_id             - id of the slot where the scheduler entry is currently stored at.
-
-        Returns a SchedulerChangedNotification.
+            device_address  - MAC address to connect to, i.e. '00:11:22:33:44:55'.
         """
-        command = RemoveSchedulerCommand(slot_id=int(slot_id))
-        self._send_command(command)
-        notification = self._consume_notification()
+        # cached responses belong to the previous device
+        previous_device_address = self.connection_settings.get("device_address")
+        if previous_device_address is None or previous_device_address.upper() != device_address.upper():
+            self._invalidate_cached_notification()
 
-        if not isinstance(notification, SchedulerChangedNotification) or not notification.was_successful:
-            raise Exception("Remove scheduler failed")
+        self.connection_settings["device_address"] = device_address
 
-        return notification
+        return self._reconnect()
 
-    def request_random_mode_status(self):
+    def disconnect(self):
         """
-        Request the current status of the random mode from the remote device.
-
-        Returns a RandomModeStatusRequestedNotification.
+        Disconnect from the current remote device.
         """
-        command = RequestRandomModeStatusCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, RandomModeStatusRequestedNotification):
-            raise Exception("Request random mode status failed")
-
-        return notification
+        return self._disconnect()
 
-    def change_random_mode(self, active_on_weekdays, start_isotime, end_isotime):
+    def discover(timeout=5, bluetooth_device='hci0'):
         """
-        Activate random mode on the remote device.
+        Discover remote devices.
 
+        This method needs special permissions.
+        
         Parameters:
-            active_on_weekdays  - Comma separated list of Weekdays the scheduler should be repeated on, i.e. 'Mon,Wed,Fri'
-            start_isotime       - ISO time of when random mode should start, i.e. '10:00'
-            end_isotime         - ISO time of when random mode should stop, i.e. '20:00'
-
-        Returns a RandomModeChangedNotification.
+            timeout             - Optional, time in seconds to wait for devices to respond. Default: 5
+            bluetooth_device    - Optional, bluetooth device name to use. Default: 'hciß'
         """
-        command = ChangeRandomModeCommand(
-            is_active=True, 
-            active_on_weekdays=util._parse_weekdays_list(active_on_weekdays), 
-            start_isotime=start_isotime, 
-            end_isotime=end_isotime)
+        bluetooth_lowenergy_interface = _create_bluetooth_lowenergy_interface(bluetooth_device)
 
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, RandomModeChangedNotification) or not notification.was_successful:
-            raise Exception("Set random mode failed")
-
-        return notification
-
-    def reset_random_mode(self):
-        """
-        Disable random mode on the remote device.
+        return bluetooth_lowenergy_interface.discover(timeout, service_uuids=[SEM6000.SERVICECLASS_UUID])
 
-        Returns a RandomModeChangedNotification.
+    def discover_incrementally(timeout=5, bluetooth_device='hci0', bluetooth_lowenergy_interface=None):
         """
-        command = ChangeRandomModeCommand(
-            is_active=False, 
-            active_on_weekdays=[], 
-            start_isotime="00:00", 
-            end_isotime="00:00")
-
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, RandomModeChangedNotification) or not notification.was_successful:
-            raise Exception("Set random mode failed")
+        Discover remote devices, yielding each device as soon as its advertisement was received.
 
-        return notification
+        This method needs special permissions.
 
-    def request_measurement(self):
-        """
-        Request current measurement values.
+        Parameters:
+            timeout                         - Optional, time in seconds to wait for devices to respond. Default: 5
+            bluetooth_device                - Optional, bluetooth device name to use. Default: 'hci0'
+            bluetooth_lowenergy_interface   - Optional, AbstractBluetoothInterface to use instead of one of the default backend
 
-        Returns a MeasurementRequestedNotification.
+        Yields dictionaries having keys 'address' and 'name'.
         """
-        command = RequestMeasurementCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
+        if bluetooth_lowenergy_interface is None:
+            bluetooth_lowenergy_interface = _create_bluetooth_lowenergy_interface(bluetooth_device)
 
-        if not isinstance(notification, MeasurementRequestedNotification):
-            raise Exception("Request measurement failed")
+        for device in bluetooth_lowenergy_interface.discover_incrementally(timeout, service_uuids=[SEM6000.SERVICECLASS_UUID]):
+            yield device
 
-        return notification
-
-    def request_consumption_of_last_12_months(self):
+    def request_device_name(self, force_refresh=False):
         """
-        Request consumption values of last 12 months.
+        Request the name of the remote device.
 
-        Date and time need to be set for the device to start collecting these data.
+        Parameters:
+            force_refresh   - Optional, if set to true the device is asked even if a cached response exists
 
-        Returns a ConsumptionOfLast12MonthsRequestedNotification.
+        Returns a DeviceNameRequestedNotification.
         """
-        command = RequestConsumptionOfLast12MonthsCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
+        notification = self._get_cached_notification(DeviceNameRequestedNotification, force_refresh)
+        if not notification is None:
+            return notification
 
-        if not isinstance(notification, ConsumptionOfLast12MonthsRequestedNotification):
-            raise("Request consumption of last 12 months failed")
+        data = self._bluetooth_lowenergy_interface.read_from_characteristic(SEM6000.CHARACTERISTIC_UUID_NAME)
 
-        return notification
+        if self.debug:
+            print("received data: " + str(binascii.hexlify(data)), file=sys.stderr)
 
-    def request_consumption_of_last_30_days(self):
-        """
-        Request consumption values of last 30 days.
+        device_name = data.decode(encoding='utf-8')
 
-        Date and time need to be set for the device to start collecting these data.
+        notification = DeviceNameRequestedNotification(device_name)
 
-        Returns a ConsumptionOfLast30DaysRequestedNotification.
-        """
-        command = RequestConsumptionOfLast30DaysCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
-
-        if not isinstance(notification, ConsumptionOfLast30DaysRequestedNotification):
-            raise("Request consumption of last 30 days failed")
+        self._cache_notification(notification)
 
         return notification
 
-    def request_consumption_of_last_23_hours(self):
+    def request_scheduler(self, force_refresh=False):
         """
-        Request consumption values of curent hour and last 23 hours.
+        Request all currently set schedulers.
 
-        Date and time need to be set for the device to start collecting these data.
+        Parameters:
+            force_refresh   - Optional, if set to true the device is asked even if a cached response exists
 
-        Returns a ConsumptionOfLast23HoursRequestedNotification.
+        Returns a SchedulerRequestedNotification.
         """
-        command = RequestConsumptionOfLast23HoursCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
+        notification = self._get_cached_notification(SchedulerRequestedNotification, force_refresh)
+        if not notification is None:
+            return notification
 
-        if not isinstance(notification, ConsumptionOfLast23HoursRequestedNotification):
-            raise("Request consumption of last 23 hours failed")
+        notification = merge_scheduler_pages(self._request_scheduler_pages())
 
-        return notification
+        self._cache_notification(notification)
 
-    def reset_consumption(self):
-        """
-        Reset consumption data.
+        return notification
 
-        Returns a ResetConsumptionNoticiation.
-        """
-        command = ResetConsumptionCommand()
+    def _request_scheduler_pages(self):
+        command = RequestSchedulerCommand(page_number=0)
         self._send_command(command)
-        notification = self._consume_notification()
+        notification = check_scheduler_page(self._consume_notification(), command.page_number)
 
-        if not isinstance(notification, ConsumptionResetNotification) or not notification.was_successful:
-            raise("Reset consumption failed")
+        yield notification
 
-        return notification
+        # the following pages are requested at once instead of waiting for each page
+        max_page_number = notification.number_of_schedulers // 4
+        commands = [RequestSchedulerCommand(page_number=page_number) for page_number in range(1, max_page_number+1)]
 
-    def factory_reset(self):
-        """
-        Reset the remote device to factory state.
+        slot_ids = set([scheduler_entry.slot_id for scheduler_entry in notification.scheduler_entries])
+        for i, further_notification in self._send_many_incrementally(commands):
+            further_notification = check_scheduler_page(further_notification, commands[i].page_number)
+            slot_ids.update([scheduler_entry.slot_id for scheduler_entry in further_notification.scheduler_entries])
 
-        Returns a FactoryResetNotification.
-        """
-        command = FactoryResetCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
+            yield further_notification
 
-        if not isinstance(notification, FactoryResetNotification) or not notification.was_successful:
-            raise("Factory reset failed")
+        # responses do not tell their page, so a lost page which was retried may have been answered by another page again
+        if self.retry_policy is None:
+            return
 
-        return notification
+        for command in commands:
+            if len(slot_ids) >= notification.number_of_schedulers:
+                break
 
-    def change_device_name(self, new_name):
-        """
-        Set the name of the remote device.
+            self._send_command(command)
+            further_notification = check_scheduler_page(self._consume_notification(), command.page_number)
+            slot_ids.update([scheduler_entry.slot_id for scheduler_entry in further_notification.scheduler_entries])
 
-        Parameters:
-            new_name    - Name to be set.
+            yield further_notification
 
-        Returns a DeviceNameChangedNotification.
+    def iter_scheduler_entries(self):
         """
-        command = ChangeDeviceNameCommand(new_name=new_name)
-        self._send_command(command)
-        notification = self._consume_notification()
+        Request all currently set schedulers page by page.
 
-        if not isinstance(notification, DeviceNameChangedNotification) or not notification.was_successful:
-            raise Exception("Set device name failed")
-
-        return notification
+        The first page is requested alone, so callers stopping within its entries save requesting the other pages.
 
-    def request_device_serial(self):
+        Yields a SchedulerEntry as soon as the page containing it was received.
         """
-        Request the serial number of the remote device.
+        yielded_slot_ids = set()
 
-        Returns a DeviceSerialRequestedNotification.
-        """
-        command = RequestDeviceSerialCommand()
-        self._send_command(command)
-        notification = self._consume_notification()
+        for notification in self._request_scheduler_pages():
+            for scheduler_entry in notification.scheduler_entries:
+                if scheduler_entry.slot_id in yielded_slot_ids:
+                    continue
 
-        if not isinstance(notification, DeviceSerialRequestedNotification):
-            raise Exception("Request device serial failed")
-
-        return notification
+                yielded_slot_ids.add(scheduler_entry.slot_id)
+                yield scheduler_entry
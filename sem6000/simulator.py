@@ -0,0 +1,414 @@
+from .bluetooth_lowenergy_interface import abstract_interface
+from . import encoder
+from .message import *
+from . import parser
+
+import datetime
+import random
+import threading
+import time
+
+
+class SimulatedSEM6000Interface(abstract_interface.AbstractBluetoothInterface):
+    '''
+    In-process simulation of a SEM6000 device implementing AbstractBluetoothInterface.
+
+    Commands written to the control characteristic are decoded with CommandParser, applied to the simulated device state
+    and answered with notifications encoded by MessageEncoder. Responses can be delayed, fragmented and dropped.
+    '''
+
+    SERVICECLASS_UUID='0000fff0-0000-1000-8000-00805f9b34fb'
+    CHARACTERISTIC_UUID_NAME='00002a00-0000-1000-8000-00805f9b34fb'
+    CHARACTERISTIC_UUID_CONTROL='0000fff3-0000-1000-8000-00805f9b34fb'
+    CHARACTERISTIC_UUID_RESPONSE='0000fff4-0000-1000-8000-00805f9b34fb'
+
+    MAXIMUM_NUMBER_OF_SCHEDULERS = 20
+    SCHEDULERS_PER_PAGE = 4
+
+    def __init__(self, mac_address='00:00:00:00:00:00', bluetooth_device='hci0', pin='0000', device_name='Voltcraft', serial='ML01D10012000000', load_in_milliwatt=60000, latency_in_seconds=0, connect_latency_in_seconds=0, fragment_size=20, drop_probability=0, seed=None):
+        """ Create a new SimulatedSEM6000Interface() instance
+
+            Parameters:
+                mac_address                 - Optional, MAC address the simulated device is advertised with. Default: '00:00:00:00:00:00'
+                bluetooth_device            - Optional, bluetooth device name. Default: 'hci0'
+                pin                         - Optional, 4 digit PIN of the simulated device. Default: '0000'
+                device_name                 - Optional, name of the simulated device. Default: 'Voltcraft'
+                serial                      - Optional, serial number of the simulated device.
+                load_in_milliwatt           - Optional, power drawn by the simulated load while the power is on. Default: 60000
+                latency_in_seconds          - Optional, delay between writing a command and the response being available. Default: 0
+                connect_latency_in_seconds  - Optional, time it takes to connect. Default: 0
+                fragment_size               - Optional, maximum number of bytes per notification. Default: 20
+                drop_probability            - Optional, probability of a response being lost. Default: 0
+                seed                        - Optional, seed for the random number generator deciding on dropped responses
+        """
+        abstract_interface.AbstractBluetoothInterface.__init__(self, mac_address, bluetooth_device)
+
+        self.mac_address = mac_address
+        self.latency_in_seconds = latency_in_seconds
+        self.connect_latency_in_seconds = connect_latency_in_seconds
+        self.fragment_size = fragment_size
+        self.drop_probability = drop_probability
+
+        self.number_of_received_commands = 0
+        self.number_of_dropped_responses = 0
+
+        self._random = random.Random(seed)
+        self._encoder = encoder.MessageEncoder()
+        self._command_parser = parser.CommandParser()
+
+        self._is_connected = False
+        self._is_authorized = False
+        # list of (due time, fragment) in order of arrival
+        self._pending_fragments = []
+        self._lock = threading.Lock()
+
+        self._serial = serial
+        self._load_in_milliwatt = load_in_milliwatt
+
+        self._factory_reset(pin=pin, device_name=device_name)
+
+    def _factory_reset(self, pin='0000', device_name='Voltcraft'):
+        self._pin = pin
+        self._device_name = device_name
+
+        self._clock_offset = datetime.timedelta()
+
+        self._is_power_on = False
+        self._is_nightmode_active = False
+        self._power_limit_in_watt = 0
+
+        self._normal_price_in_cent = 0
+        self._reduced_period_price_in_cent = 0
+        self._is_reduced_period = False
+        self._reduced_period_start_isotime = "00:00"
+        self._reduced_period_end_isotime = "00:00"
+
+        self._timer = None
+        self._original_timer_length_in_seconds = 0
+
+        self._scheduler_by_slot_id = {}
+
+        self._random_mode = RandomModeStatusRequestedNotification(is_active=False, active_on_weekdays=[], start_isotime="00:00", end_isotime="00:00")
+
+        self._reset_consumption()
+
+    def _reset_consumption(self):
+        self._total_consumption_in_watt_hour = 0.0
+        self._consumption_by_hour = {}
+        self._consumption_by_day = {}
+        self._consumption_by_month = {}
+        self._last_consumption_update = time.monotonic()
+
+    def _now(self):
+        return datetime.datetime.now() + self._clock_offset
+
+    def _update_state(self):
+        now = self._now()
+
+        if not self._timer is None:
+            target_datetime, is_action_turn_on = self._timer
+            if target_datetime <= now:
+                self._is_power_on = is_action_turn_on
+                self._timer = None
+
+        elapsed_seconds = time.monotonic() - self._last_consumption_update
+        self._last_consumption_update = time.monotonic()
+
+        if self._is_power_on:
+            consumption_in_watt_hour = self._load_in_milliwatt / 1000 * elapsed_seconds / 3600
+
+            hour = now.replace(minute=0, second=0, microsecond=0)
+            day = now.date()
+            month = (now.year, now.month)
+
+            self._total_consumption_in_watt_hour += consumption_in_watt_hour
+            self._consumption_by_hour[hour] = self._consumption_by_hour.get(hour, 0) + consumption_in_watt_hour
+            self._consumption_by_day[day] = self._consumption_by_day.get(day, 0) + consumption_in_watt_hour
+            self._consumption_by_month[month] = self._consumption_by_month.get(month, 0) + consumption_in_watt_hour
+
+    def set_load(self, load_in_milliwatt):
+        '''Changes the power drawn by the simulated load while the power is on'''
+
+        with self._lock:
+            self._update_state()
+            self._load_in_milliwatt = load_in_milliwatt
+
+    def add_consumption(self, start_datetime, hourly_consumption_in_watt_hour):
+        '''
+        Adds consumption history as if it was measured by the device
+
+        Parameters:
+            start_datetime (datetime):                      Start of the hour the first value belongs to
+            hourly_consumption_in_watt_hour (list of int):  Consumption of consecutive hours
+        '''
+
+        with self._lock:
+            hour = start_datetime.replace(minute=0, second=0, microsecond=0)
+            for consumption_in_watt_hour in hourly_consumption_in_watt_hour:
+                month = (hour.year, hour.month)
+
+                self._total_consumption_in_watt_hour += consumption_in_watt_hour
+                self._consumption_by_hour[hour] = self._consumption_by_hour.get(hour, 0) + consumption_in_watt_hour
+                self._consumption_by_day[hour.date()] = self._consumption_by_day.get(hour.date(), 0) + consumption_in_watt_hour
+                self._consumption_by_month[month] = self._consumption_by_month.get(month, 0) + consumption_in_watt_hour
+
+                hour += datetime.timedelta(hours=1)
+
+    def discover(self, timeout, service_uuids=[]):
+        if len(service_uuids) > 0 and not SimulatedSEM6000Interface.SERVICECLASS_UUID in service_uuids:
+            return []
+
+        return [{'address': self.mac_address, 'name': self._device_name}]
+
+    def connect(self, mac_address):
+        if self.connect_latency_in_seconds:
+            time.sleep(self.connect_latency_in_seconds)
+
+        with self._lock:
+            self._is_connected = True
+            self._is_authorized = False
+            self._pending_fragments.clear()
+
+    def disconnect(self):
+        with self._lock:
+            self._is_connected = False
+            self._is_authorized = False
+            self._pending_fragments.clear()
+
+    def is_connected(self):
+        return self._is_connected
+
+    def write_to_characteristic(self, uuid, data):
+        if not self._is_connected:
+            raise Exception("Not connected")
+
+        if uuid != SimulatedSEM6000Interface.CHARACTERISTIC_UUID_CONTROL:
+            raise Exception("Characteristic " + str(uuid) + " is not writable")
+
+        with self._lock:
+            self.number_of_received_commands += 1
+
+            self._update_state()
+
+            command = self._command_parser.parse(data)
+            response = self._handle_command(command)
+
+            if response is None:
+                return
+
+            if self.drop_probability and self._random.random() < self.drop_probability:
+                self.number_of_dropped_responses += 1
+                return
+
+            due_time = time.monotonic() + self.latency_in_seconds
+            for i in range(0, len(response), self.fragment_size):
+                self._pending_fragments.append((due_time, response[i:i+self.fragment_size]))
+
+    def read_from_characteristic(self, uuid):
+        if not self._is_connected:
+            raise Exception("Not connected")
+
+        if uuid != SimulatedSEM6000Interface.CHARACTERISTIC_UUID_NAME:
+            raise Exception("Characteristic " + str(uuid) + " is not readable")
+
+        if self.latency_in_seconds:
+            time.sleep(self.latency_in_seconds)
+
+        return self._device_name.encode('utf-8')
+
+    def wait_for_notifications(self, timeout):
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            if len(self._pending_fragments) == 0:
+                due_time = None
+            else:
+                due_time = self._pending_fragments[0][0]
+
+        if due_time is None or due_time > deadline:
+            time.sleep(max(0, deadline - time.monotonic()))
+            return False
+
+        delay = due_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            if len(self._pending_fragments) == 0:
+                return False
+
+            due_time, fragment = self._pending_fragments.pop(0)
+
+        if self._is_notifications_enabled:
+            self._send_notification_to_handlers(SimulatedSEM6000Interface.CHARACTERISTIC_UUID_RESPONSE, fragment)
+
+        return True
+
+    def _handle_command(self, command):
+        if isinstance(command, AuthorizeCommand):
+            self._is_authorized = (command.pin == self._pin)
+            return self._encoder.encode(AuthorizedNotification(was_successful=self._is_authorized))
+
+        if isinstance(command, ResetPinCommand):
+            self._pin = '0000'
+            return self._encoder.encode(PinResetNotification(was_successful=True))
+
+        # an unauthorized device does not respond to any other command
+        if not self._is_authorized:
+            return None
+
+        if isinstance(command, ChangePinCommand):
+            was_successful = (command.pin == self._pin)
+            if was_successful:
+                self._pin = command.new_pin
+
+            return self._encoder.encode(PinChangedNotification(was_successful=was_successful))
+
+        if isinstance(command, PowerSwitchCommand):
+            self._is_power_on = command.on
+            return self._encoder.encode(PowerSwitchedNotification(was_successful=True))
+
+        if isinstance(command, ChangeNightmodeCommand):
+            self._is_nightmode_active = command.on
+            return self._encoder.encode(NightmodeChangedNotification(was_successful=True))
+
+        if isinstance(command, SynchronizeDateAndTimeCommand):
+            self._clock_offset = datetime.datetime.fromisoformat(command.isodatetime) - datetime.datetime.now()
+            return self._encoder.encode(DateAndTimeChangedNotification(was_successful=True))
+
+        if isinstance(command, RequestSettingsCommand):
+            return self._encoder.encode(SettingsRequestedNotification(is_reduced_period=self._is_reduced_period, normal_price_in_cent=self._normal_price_in_cent, reduced_period_price_in_cent=self._reduced_period_price_in_cent, reduced_period_start_isotime=self._reduced_period_start_isotime, reduced_period_end_isotime=self._reduced_period_end_isotime, is_nightmode_active=self._is_nightmode_active, power_limit_in_watt=self._power_limit_in_watt))
+
+        if isinstance(command, ChangePowerLimitCommand):
+            self._power_limit_in_watt = command.power_limit_in_watt
+            return self._encoder.encode(PowerLimitChangedNotification(was_successful=True))
+
+        if isinstance(command, ChangePricesCommand):
+            self._normal_price_in_cent = command.normal_price_in_cent
+            self._reduced_period_price_in_cent = command.reduced_period_price_in_cent
+            return self._encoder.encode(PricesChangedNotification(was_successful=True))
+
+        if isinstance(command, ChangeReducedPeriodCommand):
+            self._is_reduced_period = command.is_active
+            self._reduced_period_start_isotime = command.start_isotime
+            self._reduced_period_end_isotime = command.end_isotime
+            return self._encoder.encode(ReducedPeriodChangedNotification(was_successful=True))
+
+        if isinstance(command, RequestTimerStatusCommand):
+            if self._timer is None:
+                # the device reports an inactive timer without any target date
+                return self._encoder._encode_message(b'\x09\x00\x00' + b'\x00\x00\x00\x00\x00\x00' + self._original_timer_length_in_seconds.to_bytes(3, 'big') + b'\x00')
+
+            target_datetime, is_action_turn_on = self._timer
+            return self._encoder.encode(TimerStatusRequestedNotification(is_active=True, is_action_turn_on=is_action_turn_on, target_isodatetime=target_datetime.isoformat(timespec='seconds'), original_timer_length_in_seconds=self._original_timer_length_in_seconds))
+
+        if isinstance(command, SetTimerCommand):
+            if command.is_reset_timer:
+                self._timer = None
+            else:
+                target_datetime = datetime.datetime.fromisoformat(command.target_isodatetime)
+                self._timer = (target_datetime, command.is_action_turn_on)
+                self._original_timer_length_in_seconds = max(0, int((target_datetime - self._now()).total_seconds()))
+
+            return self._encoder.encode(TimerSetNotification(was_successful=True))
+
+        if isinstance(command, RequestSchedulerCommand):
+            scheduler_entries = []
+            for slot_id in sorted(self._scheduler_by_slot_id.keys()):
+                scheduler_entries.append(SchedulerEntry(slot_id=slot_id, scheduler=self._scheduler_by_slot_id[slot_id]))
+
+            first = command.page_number * SimulatedSEM6000Interface.SCHEDULERS_PER_PAGE
+            page = scheduler_entries[first:first + SimulatedSEM6000Interface.SCHEDULERS_PER_PAGE]
+
+            return self._encoder.encode(SchedulerRequestedNotification(number_of_schedulers=len(scheduler_entries), scheduler_entries=page))
+
+        if isinstance(command, AddSchedulerCommand):
+            for slot_id in range(SimulatedSEM6000Interface.MAXIMUM_NUMBER_OF_SCHEDULERS):
+                if not slot_id in self._scheduler_by_slot_id:
+                    self._scheduler_by_slot_id[slot_id] = command.scheduler
+                    return self._encoder.encode(SchedulerChangedNotification(was_successful=True))
+
+            return self._encoder.encode(SchedulerChangedNotification(was_successful=False))
+
+        if isinstance(command, EditSchedulerCommand):
+            was_successful = command.slot_id in self._scheduler_by_slot_id
+            if was_successful:
+                self._scheduler_by_slot_id[command.slot_id] = command.scheduler
+
+            return self._encoder.encode(SchedulerChangedNotification(was_successful=was_successful))
+
+        if isinstance(command, RemoveSchedulerCommand):
+            was_successful = command.slot_id in self._scheduler_by_slot_id
+            self._scheduler_by_slot_id.pop(command.slot_id, None)
+
+            return self._encoder.encode(SchedulerChangedNotification(was_successful=was_successful))
+
+        if isinstance(command, RequestRandomModeStatusCommand):
+            return self._encoder.encode(self._random_mode)
+
+        if isinstance(command, ChangeRandomModeCommand):
+            self._random_mode = RandomModeStatusRequestedNotification(is_active=command.is_active, active_on_weekdays=command.active_on_weekdays, start_isotime=command.start_isotime, end_isotime=command.end_isotime)
+            return self._encoder.encode(RandomModeChangedNotification(was_successful=True))
+
+        if isinstance(command, RequestMeasurementCommand):
+            power_in_milliwatt = 0
+            if self._is_power_on:
+                power_in_milliwatt = self._load_in_milliwatt
+
+            voltage_in_volt = 230
+            current_in_milliampere = power_in_milliwatt // voltage_in_volt
+            total_consumption_in_kilowatt_hour = int(self._total_consumption_in_watt_hour // 1000)
+
+            return self._encoder.encode(MeasurementRequestedNotification(is_power_active=self._is_power_on, power_in_milliwatt=power_in_milliwatt, voltage_in_volt=voltage_in_volt, current_in_milliampere=current_in_milliampere, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=total_consumption_in_kilowatt_hour))
+
+        if isinstance(command, RequestConsumptionOfLast12MonthsCommand):
+            now = self._now()
+
+            consumptions = []
+            for n in range(13):
+                month_index = now.year * 12 + now.month - 1 - n
+                month = (month_index // 12, month_index % 12 + 1)
+                consumptions.append(int(self._consumption_by_month.get(month, 0)))
+
+            # notification does not contain measurement for current month
+            consumptions[0] = None
+
+            return self._encoder.encode(ConsumptionOfLast12MonthsRequestedNotification(consumption_n_months_ago_in_watt_hour=consumptions))
+
+        if isinstance(command, RequestConsumptionOfLast30DaysCommand):
+            today = self._now().date()
+
+            consumptions = []
+            for n in range(31):
+                consumptions.append(int(self._consumption_by_day.get(today - datetime.timedelta(days=n), 0)))
+
+            # notification does not contain measurement for today
+            consumptions[0] = None
+
+            return self._encoder.encode(ConsumptionOfLast30DaysRequestedNotification(consumption_n_days_ago_in_watt_hour=consumptions))
+
+        if isinstance(command, RequestConsumptionOfLast23HoursCommand):
+            hour = self._now().replace(minute=0, second=0, microsecond=0)
+
+            consumptions = []
+            for n in range(24):
+                consumptions.append(int(self._consumption_by_hour.get(hour - datetime.timedelta(hours=n), 0)))
+
+            return self._encoder.encode(ConsumptionOfLast23HoursRequestedNotification(consumption_n_hours_ago_in_watt_hour=consumptions))
+
+        if isinstance(command, ResetConsumptionCommand):
+            self._reset_consumption()
+            return self._encoder.encode(ConsumptionResetNotification(was_successful=True))
+
+        if isinstance(command, FactoryResetCommand):
+            self._factory_reset(device_name=self._device_name)
+            return self._encoder.encode(FactoryResetNotification(was_successful=True))
+
+        if isinstance(command, ChangeDeviceNameCommand):
+            self._device_name = command.new_name
+            return self._encoder.encode(DeviceNameChangedNotification(was_successful=True))
+
+        if isinstance(command, RequestDeviceSerialCommand):
+            return self._encoder.encode(DeviceSerialRequestedNotification(serial=self._serial))
+
+        return None
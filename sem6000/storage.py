@@ -0,0 +1,228 @@
+import array
+import bisect
+import mmap
+import os
+import time
+
+
+# column name -> array typecode, timestamp must be the first column
+COLUMNS = [
+    ('timestamp', 'd'),
+    ('is_power_active', 'B'),
+    ('power_in_milliwatt', 'I'),
+    ('voltage_in_volt', 'H'),
+    ('current_in_milliampere', 'H'),
+    ('frequency_in_hertz', 'H'),
+    ('total_consumption_in_kilowatt_hour', 'I'),
+]
+
+
+class _Column:
+    def __init__(self, directory, name, typecode):
+        self.name = name
+        self.typecode = typecode
+        self.itemsize = array.array(typecode).itemsize
+
+        self.filename = os.path.join(directory, name + "." + typecode)
+
+        # samples not yet written to the file
+        self.buffer = array.array(typecode)
+
+        self._file = open(self.filename, "ab+")
+        self._mmap = None
+        self._bytes_view = None
+        self._view = None
+
+    def get_number_of_stored_samples(self):
+        return os.fstat(self._file.fileno()).st_size // self.itemsize
+
+    def truncate(self, number_of_samples):
+        self._release_view()
+        self._file.truncate(number_of_samples * self.itemsize)
+
+    def flush(self):
+        if not len(self.buffer):
+            return
+
+        self.buffer.tofile(self._file)
+        self._file.flush()
+
+        del self.buffer[:]
+
+    def _release_view(self):
+        if not self._view is None:
+            self._view.release()
+            self._view = None
+
+        if not self._bytes_view is None:
+            self._bytes_view.release()
+            self._bytes_view = None
+
+        if not self._mmap is None:
+            self._mmap.close()
+            self._mmap = None
+
+    def get_view(self, number_of_samples):
+        '''Returns a memoryview of the stored samples, valid until the next flush or truncate'''
+
+        if number_of_samples == 0:
+            return memoryview(array.array(self.typecode))
+
+        if self._view is None or len(self._view) != number_of_samples:
+            self._release_view()
+
+            self._mmap = mmap.mmap(self._file.fileno(), number_of_samples * self.itemsize, access=mmap.ACCESS_READ)
+            self._bytes_view = memoryview(self._mmap)
+            self._view = self._bytes_view.cast(self.typecode)
+
+        return self._view
+
+    def read(self, start, end, number_of_samples):
+        '''Returns an array of the stored samples from index start to end (exclusive)'''
+
+        values = array.array(self.typecode)
+
+        if start < end:
+            self.get_view(number_of_samples)
+            values.frombytes(self._bytes_view[start * self.itemsize:end * self.itemsize])
+
+        return values
+
+    def close(self):
+        self.flush()
+        self._release_view()
+        self._file.close()
+
+
+class MeasurementStore:
+    def __init__(self, directory, chunk_size=4096):
+        """ Create a new MeasurementStore() instance storing measurements in one file per column
+
+            Each column is a contiguous array of native typed values, so ranges are read through a memory map without parsing.
+            Samples have to be appended in order of their timestamp.
+
+            Samples are buffered in memory until chunk_size of them were appended or flush() is called, buffered samples are lost
+            if the process crashes. With the default chunk_size and one measurement per second these are up to 68 minutes of data,
+            a smaller chunk_size or calling flush() periodically limits the loss at the cost of more writes.
+
+            Parameters:
+                directory   - Directory for the column files of one device, created if missing
+                chunk_size  - Optional, number of samples kept in memory before they are written. Default: 4096
+        """
+        self.directory = directory
+        self.chunk_size = chunk_size
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._columns = []
+        for name, typecode in COLUMNS:
+            self._columns.append(_Column(self.directory, name, typecode))
+
+        self._timestamp_column = self._columns[0]
+
+        # columns are written before the timestamp column, so an interrupted write leaves samples without timestamp only
+        self._number_of_stored_samples = min([column.get_number_of_stored_samples() for column in self._columns])
+        for column in self._columns:
+            if column.get_number_of_stored_samples() != self._number_of_stored_samples:
+                column.truncate(self._number_of_stored_samples)
+
+        self._last_timestamp = None
+        if self._number_of_stored_samples > 0:
+            self._last_timestamp = self._timestamp_column.get_view(self._number_of_stored_samples)[-1]
+
+    def __len__(self):
+        return self._number_of_stored_samples + len(self._timestamp_column.buffer)
+
+    def append(self, notification, timestamp=None):
+        """
+        Append a measurement.
+
+        Parameters:
+            notification    - MeasurementRequestedNotification or MeasurementSample
+            timestamp       - Optional, seconds since the epoch. Default: timestamp of a MeasurementSample or the current time
+        """
+        if timestamp is None:
+            timestamp = getattr(notification, 'timestamp', None)
+        if timestamp is None:
+            timestamp = time.time()
+
+        if not self._last_timestamp is None and timestamp < self._last_timestamp:
+            raise Exception("timestamp " + str(timestamp) + " is before the last stored timestamp " + str(self._last_timestamp))
+
+        row = (
+            timestamp,
+            1 if notification.is_power_active else 0,
+            notification.power_in_milliwatt,
+            notification.voltage_in_volt,
+            notification.current_in_milliampere,
+            notification.frequency_in_hertz,
+            notification.total_consumption_in_kilowatt_hour,
+        )
+
+        columns = self._columns
+        number_of_buffered_samples = len(columns[0].buffer)
+        try:
+            for column, value in zip(columns, row):
+                column.buffer.append(value)
+        except Exception as e:
+            # a value which does not fit its column must not leave the row in some columns only
+            for column in columns:
+                del column.buffer[number_of_buffered_samples:]
+            raise e
+
+        self._last_timestamp = timestamp
+
+        if len(columns[0].buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered samples to the column files.
+        """
+        number_of_buffered_samples = len(self._timestamp_column.buffer)
+        if not number_of_buffered_samples:
+            return
+
+        for column in self._columns[1:]:
+            column.flush()
+        self._timestamp_column.flush()
+
+        self._number_of_stored_samples += number_of_buffered_samples
+
+    def read_range(self, start_timestamp=None, end_timestamp=None):
+        """
+        Read all samples having start_timestamp <= timestamp < end_timestamp.
+
+        Parameters:
+            start_timestamp - Optional, seconds since the epoch. Default: first sample
+            end_timestamp   - Optional, seconds since the epoch. Default: after last sample
+
+        Returns a dictionary of column name -> array.array.
+        """
+        self.flush()
+
+        number_of_samples = self._number_of_stored_samples
+        timestamps = self._timestamp_column.get_view(number_of_samples)
+
+        start = 0
+        if not start_timestamp is None:
+            start = bisect.bisect_left(timestamps, start_timestamp)
+
+        end = number_of_samples
+        if not end_timestamp is None:
+            end = bisect.bisect_left(timestamps, end_timestamp, start)
+
+        result = {}
+        for column in self._columns:
+            result[column.name] = column.read(start, end, number_of_samples)
+
+        return result
+
+    def close(self):
+        """
+        Write all buffered samples and close the column files.
+        """
+        self.flush()
+
+        for column in self._columns:
+            column.close()
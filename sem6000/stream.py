@@ -0,0 +1,173 @@
+import array
+import collections
+import sys
+import time
+
+
+MeasurementSample = collections.namedtuple('MeasurementSample', ['timestamp', 'is_power_active', 'power_in_milliwatt', 'voltage_in_volt', 'current_in_milliampere', 'frequency_in_hertz', 'total_consumption_in_kilowatt_hour'])
+
+
+class MeasurementRingBuffer:
+    '''
+    Fixed-size history of measurement samples.
+
+    Every field is stored in its own preallocated array, so the memory used does not grow with the number of samples appended.
+    Once the buffer is full the oldest sample is overwritten.
+    '''
+
+    # typecode for each field of MeasurementSample
+    _TYPECODES = ['d', 'B', 'I', 'H', 'H', 'H', 'I']
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise Exception("capacity must be at least 1")
+
+        self.capacity = capacity
+
+        self._columns = []
+        for typecode in MeasurementRingBuffer._TYPECODES:
+            self._columns.append(array.array(typecode, [0]) * capacity)
+
+        self._next_index = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def append(self, sample):
+        index = self._next_index
+        for column, value in zip(self._columns, sample):
+            column[index] = value
+
+        self._next_index = (index + 1) % self.capacity
+        if self._length < self.capacity:
+            self._length += 1
+
+    def _get_sample(self, index):
+        timestamp, is_power_active, power_in_milliwatt, voltage_in_volt, current_in_milliampere, frequency_in_hertz, total_consumption_in_kilowatt_hour = [column[index] for column in self._columns]
+
+        return MeasurementSample(timestamp, bool(is_power_active), power_in_milliwatt, voltage_in_volt, current_in_milliampere, frequency_in_hertz, total_consumption_in_kilowatt_hour)
+
+    def __getitem__(self, position):
+        '''Returns the sample at position, 0 being the oldest and -1 the latest sample'''
+
+        if position < 0:
+            position += self._length
+        if position < 0 or position >= self._length:
+            raise IndexError("sample index out of range")
+
+        oldest_index = (self._next_index - self._length) % self.capacity
+
+        return self._get_sample((oldest_index + position) % self.capacity)
+
+    def __iter__(self):
+        for position in range(self._length):
+            yield self[position]
+
+    def latest(self):
+        '''Returns the latest sample or None if the buffer is empty'''
+
+        if self._length == 0:
+            return None
+
+        return self[-1]
+
+    def clear(self):
+        self._next_index = 0
+        self._length = 0
+
+
+class MeasurementStream:
+    def __init__(self, device, samples_per_second=1, history_size=3600, debug=False, clock=time.monotonic, wall_clock=time.time, sleep=time.sleep):
+        """ Create a new MeasurementStream() instance sampling measurements of a device on a fixed schedule
+
+            Samples are requested at absolute deadlines (start + n / samples_per_second), so the time needed for a request
+            does not delay the following samples. Deadlines which already passed when the previous request returned are skipped
+            and counted in number_of_missed_deadlines.
+
+            Parameters:
+                device              - Connected and authorized SEM6000 instance or any object providing request_measurement()
+                samples_per_second  - Optional, sampling rate. Default: 1
+                history_size        - Optional, number of samples kept in history. Default: 3600
+                debug               - Optional, if set to true failed requests are printed to sys.stderr
+        """
+        if samples_per_second <= 0:
+            raise Exception("samples_per_second must be greater than 0")
+
+        self.device = device
+        self.interval_in_seconds = 1 / samples_per_second
+        self.debug = debug
+
+        self.history = MeasurementRingBuffer(history_size)
+
+        self.number_of_samples = 0
+        self.number_of_failed_requests = 0
+        self.number_of_missed_deadlines = 0
+
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._sleep = sleep
+
+        self._is_stopped = False
+
+    def stop(self):
+        '''Stops the stream after the current sample'''
+
+        self._is_stopped = True
+
+    def _request_sample(self):
+        try:
+            notification = self.device.request_measurement()
+        except Exception as e:
+            self.number_of_failed_requests += 1
+
+            if self.debug:
+                print("request measurement failed: " + repr(e), file=sys.stderr)
+
+            return None
+
+        return MeasurementSample(self._wall_clock(), notification.is_power_active, notification.power_in_milliwatt, notification.voltage_in_volt, notification.current_in_milliampere, notification.frequency_in_hertz, notification.total_consumption_in_kilowatt_hour)
+
+    def samples(self, max_number_of_samples=None):
+        """
+        Request measurements on schedule until stop() is called.
+
+        Parameters:
+            max_number_of_samples   - Optional, stop after this number of samples was yielded
+
+        Yields a MeasurementSample for each successful request. Each sample is also appended to history.
+        """
+        self._is_stopped = False
+
+        number_of_yielded_samples = 0
+        deadline = self._clock()
+
+        while not self._is_stopped:
+            if not max_number_of_samples is None and number_of_yielded_samples >= max_number_of_samples:
+                break
+
+            delay = deadline - self._clock()
+            if delay > 0:
+                self._sleep(delay)
+
+            sample = self._request_sample()
+
+            deadline += self.interval_in_seconds
+
+            overrun = self._clock() - deadline
+            if overrun > 0:
+                number_of_missed_deadlines = int(overrun // self.interval_in_seconds) + 1
+                self.number_of_missed_deadlines += number_of_missed_deadlines
+                deadline += number_of_missed_deadlines * self.interval_in_seconds
+
+            if sample is None:
+                continue
+
+            self.number_of_samples += 1
+            self.history.append(sample)
+
+            number_of_yielded_samples += 1
+            yield sample
+
+    def __iter__(self):
+        return self.samples()
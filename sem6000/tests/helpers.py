@@ -0,0 +1,53 @@
+from sem6000.message import MeasurementRequestedNotification
+from sem6000.sem6000 import SEM6000
+from sem6000.simulator import SimulatedSEM6000Interface
+
+
+DEVICE_ADDRESS = '00:11:22:33:44:55'
+PIN = '0000'
+
+
+class FakeClock:
+    """
+    Clock returning the time set as now, to be passed where a clock function like time.monotonic is expected.
+    """
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def create_measurement(power_in_milliwatt=80, **values):
+    """
+    Returns a MeasurementRequestedNotification, values replace the defaults of the other attributes.
+    """
+    arguments = {
+        'is_power_active': True,
+        'power_in_milliwatt': power_in_milliwatt,
+        'voltage_in_volt': 230,
+        'current_in_milliampere': power_in_milliwatt // 230,
+        'frequency_in_hertz': 50,
+        'total_consumption_in_kilowatt_hour': 12,
+    }
+    arguments.update(values)
+
+    return MeasurementRequestedNotification(**arguments)
+
+
+def create_device(simulator=None, timeout=0.1, **arguments):
+    """
+    Returns a SEM6000 connected to and authorized on the simulator.
+
+    Parameters:
+        simulator   - Optional, SimulatedSEM6000Interface to connect to. Default: a new SimulatedSEM6000Interface()
+        timeout     - Optional, timeout of the SEM6000. Default: 0.1
+        arguments   - Optional, further arguments of the SEM6000, i.e. cache
+    """
+    if simulator is None:
+        simulator = SimulatedSEM6000Interface()
+
+    return SEM6000(DEVICE_ADDRESS, PIN, timeout=timeout, bluetooth_lowenergy_interface=simulator, **arguments)
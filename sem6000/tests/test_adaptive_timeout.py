@@ -0,0 +1,133 @@
+import time
+import unittest
+
+from sem6000.adaptive_timeout import AdaptiveTimeout
+from sem6000.fleet import FleetPoller
+from sem6000.message import *
+from sem6000.metrics import SEM6000Metrics
+from sem6000.sem6000 import SEM6000
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import create_device
+
+
+class ChattySimulatedSEM6000Interface(SimulatedSEM6000Interface):
+    def __init__(self, **simulator_arguments):
+        SimulatedSEM6000Interface.__init__(self, **simulator_arguments)
+
+        self.is_chatty = False
+
+    def wait_for_notifications(self, timeout):
+        if not self.is_chatty:
+            return SimulatedSEM6000Interface.wait_for_notifications(self, timeout)
+
+        # a fragment which never completes a notification
+        time.sleep(min(timeout, 0.01))
+        self._send_notification_to_handlers(SimulatedSEM6000Interface.CHARACTERISTIC_UUID_RESPONSE, b'\xff')
+
+        return True
+
+
+class AdaptiveTimeoutTest(unittest.TestCase):
+    def test_initial_timeout(self):
+        self.assertEqual(3, AdaptiveTimeout(maximum_timeout_in_seconds=3).get_timeout(), 'timeout differs')
+        self.assertEqual(1, AdaptiveTimeout(maximum_timeout_in_seconds=3, initial_timeout_in_seconds=1).get_timeout(), 'timeout differs')
+
+    def test_timeout_follows_round_trip_times(self):
+        adaptive_timeout = AdaptiveTimeout(minimum_timeout_in_seconds=0.01, maximum_timeout_in_seconds=3)
+
+        adaptive_timeout.observe(0.1)
+        # 0.1 + 4 * 0.05
+        self.assertAlmostEqual(0.3, adaptive_timeout.get_timeout(), msg='timeout differs')
+
+        for i in range(50):
+            adaptive_timeout.observe(0.1)
+        self.assertLess(adaptive_timeout.get_timeout(), 0.11, 'timeout did not converge')
+
+        adaptive_timeout.observe(1)
+        self.assertGreater(adaptive_timeout.get_timeout(), 0.5, 'timeout did not grow')
+        self.assertEqual(52, adaptive_timeout.number_of_round_trip_times, 'number_of_round_trip_times differs')
+
+    def test_limits(self):
+        adaptive_timeout = AdaptiveTimeout(minimum_timeout_in_seconds=0.25, maximum_timeout_in_seconds=1)
+
+        adaptive_timeout.observe(0.01)
+        self.assertEqual(0.25, adaptive_timeout.get_timeout(), 'timeout differs')
+
+        adaptive_timeout.observe(10)
+        self.assertEqual(1, adaptive_timeout.get_timeout(), 'timeout differs')
+
+        with self.assertRaises(Exception):
+            AdaptiveTimeout(minimum_timeout_in_seconds=2, maximum_timeout_in_seconds=1)
+
+
+class CommandDeadlineTest(unittest.TestCase):
+    def test_fragments_do_not_extend_the_deadline(self):
+        simulator = ChattySimulatedSEM6000Interface()
+        device = create_device(simulator)
+
+        simulator.is_chatty = True
+
+        start = time.monotonic()
+        with self.assertRaises(Exception):
+            device.request_measurement()
+
+        self.assertLess(time.monotonic() - start, 0.5, 'command was not stopped at its deadline')
+
+    def test_fragments_do_not_extend_the_deadline_of_pipelined_commands(self):
+        simulator = ChattySimulatedSEM6000Interface()
+        device = create_device(simulator)
+
+        simulator.is_chatty = True
+
+        start = time.monotonic()
+        results = device.send_many([RequestMeasurementCommand(), RequestSettingsCommand()])
+
+        self.assertLess(time.monotonic() - start, 0.5, 'commands were not stopped at their deadline')
+        self.assertTrue(all([isinstance(result, Exception) for result in results]), 'commands should not be answered')
+
+    def test_adaptive_timeout_observes_pipelined_commands(self):
+        simulator = SimulatedSEM6000Interface(latency_in_seconds=0.01)
+        device = create_device(simulator, timeout=AdaptiveTimeout(minimum_timeout_in_seconds=0.05, maximum_timeout_in_seconds=2))
+
+        number_of_round_trip_times = device.adaptive_timeout.number_of_round_trip_times
+        results = device.send_many([RequestMeasurementCommand(), RequestSettingsCommand(), RequestTimerStatusCommand()])
+
+        self.assertFalse(any([isinstance(result, Exception) for result in results]), 'commands failed')
+        self.assertEqual(3, device.adaptive_timeout.number_of_round_trip_times - number_of_round_trip_times, 'number_of_round_trip_times differs')
+
+    def test_adaptive_timeout(self):
+        metrics = SEM6000Metrics()
+        simulator = SimulatedSEM6000Interface(latency_in_seconds=0.01)
+        device = create_device(simulator, timeout=AdaptiveTimeout(minimum_timeout_in_seconds=0.05, maximum_timeout_in_seconds=2), metrics=metrics)
+
+        self.assertEqual(2, device.timeout, 'timeout differs')
+
+        for i in range(5):
+            device.request_measurement()
+        self.assertLess(device.adaptive_timeout.get_timeout(), 0.5, 'timeout was not adapted')
+
+        simulator.drop_probability = 1
+        start = time.monotonic()
+        with self.assertRaises(Exception):
+            device.request_measurement()
+        self.assertLess(time.monotonic() - start, 1, 'unresponsive device was waited for with the maximum timeout')
+
+        self.assertEqual(6, metrics.get_timeout_histogram(RequestMeasurementCommand).count, 'number of timeouts differs')
+        self.assertIn('sem6000_command_timeout_seconds_count{command="RequestMeasurementCommand"} 6', metrics.to_prometheus_text(), 'timeout histogram missing')
+
+    def test_fleet_creates_adaptive_timeout_per_device(self):
+        timeouts = []
+
+        def create_session(device, timeout, debug):
+            timeouts.append(timeout)
+            return SEM6000(device["address"], device["pin"], timeout=timeout, bluetooth_lowenergy_interface=SimulatedSEM6000Interface(mac_address=device["address"]))
+
+        devices = [{"address": "00:11:22:33:44:00", "pin": "0000"}, {"address": "00:11:22:33:44:01", "pin": "0000"}]
+        poller = FleetPoller(devices, timeout=1, session_factory=create_session, minimum_timeout=0.1)
+        results = list(poller.sweep())
+        poller.close()
+
+        self.assertTrue(all([result.was_successful() for result in results]), 'poll failed')
+        self.assertEqual(2, len(timeouts), 'number of sessions differs')
+        self.assertIsNot(timeouts[0], timeouts[1], 'devices share an AdaptiveTimeout')
+        self.assertEqual(1, timeouts[0].maximum_timeout_in_seconds, 'maximum_timeout_in_seconds differs')
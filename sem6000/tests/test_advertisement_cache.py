@@ -0,0 +1,121 @@
+import threading
+import unittest
+
+from sem6000.bluetooth_lowenergy_interface.advertisement_cache import AdvertisementCache, discover_incrementally, normalize_uuid
+from sem6000.sem6000 import SEM6000
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import FakeClock
+
+
+SEM6000_SERVICE_UUID = '0000fff0-0000-1000-8000-00805f9b34fb'
+OTHER_SERVICE_UUID = '0000180f-0000-1000-8000-00805f9b34fb'
+
+
+class AdvertisementCacheTest(unittest.TestCase):
+    def test_normalize_uuid(self):
+        self.assertEqual(SEM6000_SERVICE_UUID, normalize_uuid('FFF0'), '16 bit uuid differs')
+        self.assertEqual(SEM6000_SERVICE_UUID, normalize_uuid('0000fff0'), '32 bit uuid differs')
+        self.assertEqual(SEM6000_SERVICE_UUID, normalize_uuid('0000FFF000001000800000805F9B34FB'), 'uuid without dashes differs')
+        self.assertEqual(SEM6000_SERVICE_UUID, normalize_uuid(SEM6000_SERVICE_UUID.upper()), '128 bit uuid differs')
+
+    def test_put_and_get_advertisements(self):
+        clock = FakeClock(1000.0)
+        cache = AdvertisementCache(clock=clock)
+
+        cache.put('66:77:88:99:aa:bb', 'Other', -70, [OTHER_SERVICE_UUID])
+        cache.put('00:11:22:33:44:55', 'Voltcraft', -50, ['fff0'])
+
+        advertisements = cache.get_advertisements()
+        self.assertEqual(['00:11:22:33:44:55', '66:77:88:99:aa:bb'], [a.address for a in advertisements], 'addresses differ')
+
+        advertisements = cache.get_advertisements([SEM6000_SERVICE_UUID])
+        self.assertEqual(['00:11:22:33:44:55'], [a.address for a in advertisements], 'matching addresses differ')
+        self.assertEqual({'address': '00:11:22:33:44:55', 'name': 'Voltcraft', 'rssi': -50, 'last_seen': 1000.0}, advertisements[0].to_dict(), 'advertisement differs')
+
+    def test_put_keeps_name_and_service_uuids_of_previous_advertisement(self):
+        cache = AdvertisementCache(clock=FakeClock(1000.0))
+
+        cache.put('00:11:22:33:44:55', 'Voltcraft', -50, [SEM6000_SERVICE_UUID])
+        advertisement = cache.put('00:11:22:33:44:55', None, -60, None)
+
+        self.assertEqual('Voltcraft', advertisement.name, 'name differs')
+        self.assertEqual(-60, advertisement.rssi, 'rssi differs')
+        self.assertTrue(advertisement.is_matching({SEM6000_SERVICE_UUID}), 'service uuids were not kept')
+        self.assertEqual(1, len(cache), 'number of advertisements differs')
+
+    def test_get_advertisements_by_age(self):
+        clock = FakeClock(1000.0)
+        cache = AdvertisementCache(clock=clock)
+
+        cache.put('00:11:22:33:44:55', 'Voltcraft', -50, [SEM6000_SERVICE_UUID])
+        clock.now += 10
+        cache.put('66:77:88:99:aa:bb', 'Voltcraft', -70, [SEM6000_SERVICE_UUID])
+
+        advertisements = cache.get_advertisements(max_age_in_seconds=5)
+        self.assertEqual(['66:77:88:99:aa:bb'], [a.address for a in advertisements], 'addresses of recent advertisements differ')
+
+        cache.clear()
+        self.assertEqual([], cache.get_advertisements(), 'cleared cache should be empty')
+
+
+class DiscoverIncrementallyTest(unittest.TestCase):
+    def test_yields_cached_advertisements_first(self):
+        cache = AdvertisementCache()
+        cache.put('00:11:22:33:44:55', 'Voltcraft', -50, [SEM6000_SERVICE_UUID])
+        cache.put('66:77:88:99:aa:bb', 'Other', -70, [OTHER_SERVICE_UUID])
+
+        devices = list(discover_incrementally(cache, 0, [SEM6000_SERVICE_UUID], max_age_in_seconds=5))
+
+        self.assertEqual(['00:11:22:33:44:55'], [device['address'] for device in devices], 'discovered addresses differ')
+
+    def test_yields_each_device_once_as_it_is_put(self):
+        cache = AdvertisementCache()
+        # advertisements put before the discovery started are not yielded without max_age_in_seconds
+        cache.put('00:11:22:33:44:77', 'Voltcraft', -50, [SEM6000_SERVICE_UUID])
+
+        def scan():
+            for i in range(3):
+                cache.put('00:11:22:33:44:55', 'Voltcraft', -50 - i, [SEM6000_SERVICE_UUID])
+                cache.put('66:77:88:99:aa:bb', 'Other', -70, [OTHER_SERVICE_UUID])
+            cache.put('00:11:22:33:44:66', 'Voltcraft', -60, ['fff0'])
+
+        # the scan starts after the generator subscribed on its first iteration
+        scanner = threading.Timer(0.05, scan)
+        scanner.start()
+        devices = list(discover_incrementally(cache, 0.5, [SEM6000_SERVICE_UUID]))
+        scanner.join()
+
+        self.assertEqual(['00:11:22:33:44:55', '00:11:22:33:44:66'], [device['address'] for device in devices], 'discovered addresses differ')
+        self.assertEqual([], cache._subscriptions, 'subscription was not removed')
+
+    def test_close_unsubscribes(self):
+        cache = AdvertisementCache()
+
+        devices = discover_incrementally(cache, 5, [SEM6000_SERVICE_UUID])
+        scanner = threading.Timer(0.05, cache.put, args=('00:11:22:33:44:55', 'Voltcraft', -50, [SEM6000_SERVICE_UUID]))
+        scanner.start()
+        self.assertEqual('00:11:22:33:44:55', next(devices)['address'], 'discovered address differs')
+        scanner.join()
+
+        devices.close()
+        self.assertEqual([], cache._subscriptions, 'subscription was not removed')
+
+    def test_timeout(self):
+        cache = AdvertisementCache()
+
+        self.assertEqual([], list(discover_incrementally(cache, 0.01, [SEM6000_SERVICE_UUID])), 'nothing should be discovered')
+        self.assertEqual([], cache._subscriptions, 'subscription was not removed')
+
+
+class SEM6000DiscoverIncrementallyTest(unittest.TestCase):
+    def test_discover_incrementally_with_simulator(self):
+        interface = SimulatedSEM6000Interface(mac_address='00:11:22:33:44:55')
+
+        devices = list(SEM6000.discover_incrementally(timeout=1, bluetooth_lowenergy_interface=interface))
+
+        self.assertEqual(interface.discover(1, [SEM6000_SERVICE_UUID]), devices, 'discovered devices differ')
+        self.assertEqual(1, len(devices), 'number of discovered devices differs')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import time
+import unittest
+
+from sem6000.async_sem6000 import AsyncSEM6000
+from sem6000.bluetooth_lowenergy_interface.abstract_async_interface import AbstractAsyncBluetoothInterface
+from sem6000.encoder import MessageEncoder
+from sem6000.message import *
+from sem6000.tests.helpers import create_measurement
+
+
+class FakeAsyncBluetoothInterface(AbstractAsyncBluetoothInterface):
+    def __init__(self, response_delay=0):
+        AbstractAsyncBluetoothInterface.__init__(self)
+
+        self.response_delay = response_delay
+        self.responses = []
+        self.written_data = []
+
+        self._is_connected = False
+        self._pending_fragments = []
+
+    async def discover(self, timeout, service_uuids=[]):
+        return []
+
+    async def connect(self, mac_address):
+        self._is_connected = True
+
+    async def disconnect(self):
+        self._is_connected = False
+
+    async def is_connected(self):
+        return self._is_connected
+
+    async def write_to_characteristic(self, uuid, data):
+        self.written_data.append(data)
+
+        encoded_response = MessageEncoder().encode(self.responses.pop(0))
+        # notifications are limited to 20 bytes
+        for i in range(0, len(encoded_response), 20):
+            self._pending_fragments.append(encoded_response[i:i+20])
+
+    async def read_from_characteristic(self, uuid):
+        return b'Voltcraft'
+
+    async def wait_for_notifications(self, timeout):
+        if not self._pending_fragments:
+            await asyncio.sleep(timeout)
+            return False
+
+        await asyncio.sleep(self.response_delay)
+        self._send_notification_to_handlers(AsyncSEM6000.CHARACTERISTIC_UUID_RESPONSE, self._pending_fragments.pop(0))
+
+        return True
+
+
+class AsyncSEM6000Test(unittest.TestCase):
+    async def _create_authorized_device(self, interface):
+        device = AsyncSEM6000(bluetooth_lowenergy_interface=interface, timeout=0.1)
+
+        interface.responses.append(AuthorizedNotification(was_successful=True))
+        await device.connect('00:11:22:33:44:55')
+        await device.authorize('0000')
+
+        return device
+
+    def test_request_measurement(self):
+        async def run():
+            interface = FakeAsyncBluetoothInterface()
+            device = await self._create_authorized_device(interface)
+
+            interface.responses.append(create_measurement(1234))
+            return (interface, await device.request_measurement())
+
+        interface, notification = asyncio.run(run())
+
+        self.assertEqual(1234, notification.power_in_milliwatt, 'power_in_milliwatt value differs')
+        self.assertEqual(MessageEncoder().encode(RequestMeasurementCommand()), interface.written_data[-1], 'written command differs')
+
+    def test_request_scheduler_with_several_pages(self):
+        async def run():
+            interface = FakeAsyncBluetoothInterface()
+            device = await self._create_authorized_device(interface)
+
+            scheduler_entries = []
+            for i in range(6):
+                scheduler = OneTimeScheduler(is_active=True, is_action_turn_on=True, isodatetime="2020-12-03T12:34")
+                scheduler_entries.append(SchedulerEntry(slot_id=i, scheduler=scheduler))
+
+            interface.responses.append(SchedulerRequestedNotification(number_of_schedulers=6, scheduler_entries=scheduler_entries[0:4]))
+            interface.responses.append(SchedulerRequestedNotification(number_of_schedulers=6, scheduler_entries=scheduler_entries[4:6]))
+
+            return await device.request_scheduler()
+
+        notification = asyncio.run(run())
+
+        self.assertEqual([0, 1, 2, 3, 4, 5], [e.slot_id for e in notification.scheduler_entries], 'slot_id values differ')
+
+    def test_failed_authorization(self):
+        async def run():
+            interface = FakeAsyncBluetoothInterface()
+            device = AsyncSEM6000(bluetooth_lowenergy_interface=interface, timeout=0.1)
+            await device.connect('00:11:22:33:44:55')
+
+            interface.responses.append(AuthorizedNotification(was_successful=False))
+            await device.authorize('1234')
+
+        with self.assertRaises(Exception):
+            asyncio.run(run())
+
+    def test_unsuccessful_response(self):
+        async def run():
+            interface = FakeAsyncBluetoothInterface()
+            device = await self._create_authorized_device(interface)
+
+            interface.responses.append(PowerSwitchedNotification(was_successful=False))
+            try:
+                await device.power_off()
+            except Exception as e:
+                return (interface, e)
+
+        interface, exception = asyncio.run(run())
+
+        self.assertEqual("Power off failed", str(exception), 'exception message differs')
+        self.assertEqual(MessageEncoder().encode(PowerSwitchCommand(False)), interface.written_data[-1], 'written command differs')
+
+    def test_devices_are_polled_concurrently(self):
+        response_delay = 0.05
+        number_of_devices = 10
+
+        async def poll(power_in_milliwatt):
+            interface = FakeAsyncBluetoothInterface(response_delay=response_delay)
+            device = await self._create_authorized_device(interface)
+
+            interface.responses.append(create_measurement(power_in_milliwatt))
+            return await device.request_measurement()
+
+        async def run():
+            return await asyncio.gather(*[poll(i) for i in range(number_of_devices)])
+
+        start = time.monotonic()
+        notifications = asyncio.run(run())
+        duration = time.monotonic() - start
+
+        self.assertEqual(list(range(number_of_devices)), [n.power_in_milliwatt for n in notifications], 'power_in_milliwatt values differ')
+        # authorization and measurement take 2 delays per device if being run one after another
+        self.assertLess(duration, number_of_devices * response_delay, 'devices were not polled concurrently')
@@ -0,0 +1,85 @@
+import importlib.util
+import unittest
+
+from sem6000 import benchmark
+from sem6000.bluetooth_lowenergy_interface import backends
+from sem6000.sem6000 import SEM6000
+from sem6000.simulator import SimulatedSEM6000Interface
+
+
+class BackendRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.factory_by_backend = dict(backends._factory_by_backend)
+        self.default_backend = backends.get_default_backend()
+
+    def tearDown(self):
+        backends._factory_by_backend.clear()
+        backends._factory_by_backend.update(self.factory_by_backend)
+        backends.set_default_backend(self.default_backend)
+
+    def test_builtin_backends(self):
+        self.assertEqual(['bluepy', 'simulator'], backends.get_backend_names(), 'backend names differ')
+        self.assertEqual('bluepy', backends.get_default_backend(), 'default backend differs')
+
+    def test_backend_registered_by_module_name(self):
+        backends._factory_by_backend['simulator'] = 'sem6000.simulator:SimulatedSEM6000Interface'
+
+        interface = backends.create_bluetooth_lowenergy_interface('hci1', backend='simulator')
+
+        self.assertIsInstance(interface, SimulatedSEM6000Interface, 'interface type differs')
+        self.assertEqual('hci1', interface.bluetooth_device, 'bluetooth device differs')
+        self.assertIs(SimulatedSEM6000Interface, backends._factory_by_backend['simulator'], 'resolved factory should be kept')
+
+    def test_register_backend(self):
+        created_bluetooth_devices = []
+
+        def create_interface(bluetooth_device):
+            created_bluetooth_devices.append(bluetooth_device)
+            return SimulatedSEM6000Interface(mac_address='00:11:22:33:44:55', bluetooth_device=bluetooth_device)
+
+        backends.register_backend('test', create_interface)
+        backends.set_default_backend('test')
+
+        device = SEM6000('00:11:22:33:44:55', '0000', bluetooth_device='hci2', timeout=1)
+        try:
+            self.assertEqual(230, device.request_measurement().voltage_in_volt, 'voltage differs')
+        finally:
+            device.disconnect()
+
+        self.assertEqual(['hci2'], created_bluetooth_devices, 'bluetooth devices of created interfaces differ')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(Exception):
+            backends.get_backend('unknown')
+
+        with self.assertRaises(Exception):
+            backends.set_default_backend('unknown')
+
+    @unittest.skipIf(importlib.util.find_spec('bluepy'), 'bluepy is installed')
+    def test_unavailable_backend(self):
+        with self.assertRaisesRegex(Exception, 'bluepy is not available'):
+            backends.create_bluetooth_lowenergy_interface('hci0', backend='bluepy')
+
+
+class ImportTest(unittest.TestCase):
+    def test_codec_modules_do_not_import_transports(self):
+        modules = benchmark.measure_cold_import(benchmark.CODEC_MODULES)['modules']
+
+        for module_name in benchmark.CODEC_MODULES:
+            self.assertIn(module_name, modules, 'codec module was not imported')
+
+        for module_name in modules:
+            self.assertFalse(module_name.startswith('bluepy'), 'bluepy should not be imported')
+            self.assertFalse(module_name.startswith('sem6000.bluetooth_lowenergy_interface'), 'bluetooth low energy interfaces should not be imported')
+            self.assertNotIn(module_name, ['sem6000.sem6000', 'sem6000.simulator'], 'transports should not be imported')
+
+    def test_sem6000_does_not_import_bluepy(self):
+        modules = benchmark.measure_cold_import(['sem6000.sem6000', 'sem6000.async_sem6000'])['modules']
+
+        for module_name in modules:
+            self.assertFalse(module_name.startswith('bluepy'), 'bluepy should not be imported')
+            self.assertNotEqual('sem6000.bluetooth_lowenergy_interface.bluepy_interface', module_name, 'bluepy interface should not be imported')
+
+
+if __name__ == '__main__':
+    unittest.main()
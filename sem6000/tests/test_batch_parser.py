@@ -0,0 +1,116 @@
+import unittest
+
+from sem6000 import batch_parser
+from sem6000.batch_parser import parse_many
+from sem6000.encoder import MessageEncoder
+from sem6000.parser import MessageParser
+from sem6000.message import *
+from sem6000.tests.helpers import create_measurement
+
+
+class ParseManyTest(unittest.TestCase):
+    use_numpy = False
+
+    def setUp(self):
+        self.encoder = MessageEncoder()
+        self.parser = MessageParser(year_diff=2000)
+
+    def _parse_many(self, frames):
+        return parse_many(b''.join(frames), parser=self.parser, use_numpy=self.use_numpy)
+
+    def test_measurements_are_decoded_into_columns(self):
+        frames = []
+        for i in range(100):
+            frames.append(self.encoder.encode(create_measurement(i * 1001, is_power_active=(i % 2 == 0), current_in_milliampere=i, total_consumption_in_kilowatt_hour=70000 + i)))
+        frames.insert(50, self.encoder.encode(PowerSwitchedNotification(was_successful=True)))
+
+        result = self._parse_many(frames)
+
+        self.assertEqual(101, result.number_of_frames, 'number_of_frames value differs')
+        self.assertEqual(0, sum(result.error_mask), 'error_mask value differs')
+        self.assertEqual({50: PowerSwitchedNotification(was_successful=True)}, result.notifications, 'notifications value differs')
+
+        measurements = result.measurements
+        self.assertEqual(100, len(measurements['index']), 'number of measurements differs')
+        for j in range(100):
+            i = j
+            frame_number = j if j < 50 else j + 1
+
+            self.assertEqual(frame_number, measurements['index'][j], 'index value differs')
+            self.assertEqual(1 if i % 2 == 0 else 0, measurements['is_power_active'][j], 'is_power_active value differs')
+            self.assertEqual(i * 1001, measurements['power_in_milliwatt'][j], 'power_in_milliwatt value differs')
+            self.assertEqual(230, measurements['voltage_in_volt'][j], 'voltage_in_volt value differs')
+            self.assertEqual(i, measurements['current_in_milliampere'][j], 'current_in_milliampere value differs')
+            self.assertEqual(50, measurements['frequency_in_hertz'][j], 'frequency_in_hertz value differs')
+            self.assertEqual(70000 + i, measurements['total_consumption_in_kilowatt_hour'][j], 'total_consumption_in_kilowatt_hour value differs')
+
+        offset = 0
+        for frame_number, frame in enumerate(frames):
+            self.assertEqual(offset, result.offsets[frame_number], 'offsets value differs')
+            offset += len(frame)
+
+    def test_consumptions_are_decoded_into_columns(self):
+        hours = list(range(100, 124))
+        days = [None] + list(range(200, 230))
+        months = [None] + list(range(300000, 300012))
+
+        frames = [
+            self.encoder.encode(ConsumptionOfLast23HoursRequestedNotification(consumption_n_hours_ago_in_watt_hour=hours)),
+            self.encoder.encode(ConsumptionOfLast30DaysRequestedNotification(consumption_n_days_ago_in_watt_hour=days)),
+            self.encoder.encode(ConsumptionOfLast12MonthsRequestedNotification(consumption_n_months_ago_in_watt_hour=months)),
+        ]
+
+        result = self._parse_many(frames * 20)
+
+        consumptions = result.consumptions_of_last_23_hours
+        self.assertEqual(list(range(0, 60, 3)), list(consumptions['index']), 'index value differs')
+        for n in range(24):
+            self.assertEqual([hours[n]] * 20, list(consumptions['consumption_n_hours_ago_in_watt_hour'][n]), 'consumption ' + str(n) + ' hours ago differs')
+
+        consumptions = result.consumptions_of_last_30_days
+        self.assertEqual(list(range(1, 60, 3)), list(consumptions['index']), 'index value differs')
+        self.assertEqual([0] * 20, list(consumptions['consumption_n_days_ago_in_watt_hour'][0]), 'consumption today differs')
+        for n in range(1, 31):
+            self.assertEqual([days[n]] * 20, list(consumptions['consumption_n_days_ago_in_watt_hour'][n]), 'consumption ' + str(n) + ' days ago differs')
+
+        consumptions = result.consumptions_of_last_12_months
+        self.assertEqual(list(range(2, 60, 3)), list(consumptions['index']), 'index value differs')
+        for n in range(1, 13):
+            self.assertEqual([months[n]] * 20, list(consumptions['consumption_n_months_ago_in_watt_hour'][n]), 'consumption ' + str(n) + ' months ago differs')
+
+    def test_malformed_frames_are_masked(self):
+        measurement = self.encoder.encode(create_measurement(1001))
+        invalid_checksum = measurement[:-1] + bytes([(measurement[-1] + 1) & 0xff])
+        authorized = self.encoder.encode(AuthorizedNotification(was_successful=True))
+
+        frames = [measurement] * 20 + [invalid_checksum] + [measurement] * 20 + [b'\x00\x01', authorized, authorized[:-3]]
+        result = self._parse_many(frames)
+
+        self.assertEqual(44, result.number_of_frames, 'number_of_frames value differs')
+        self.assertEqual([0] * 20 + [1] + [0] * 20 + [1, 0, 1], list(result.error_mask), 'error_mask value differs')
+        self.assertEqual(set([20, 41, 43]), set(result.errors.keys()), 'frame numbers of errors differ')
+        self.assertTrue(result.errors[20].startswith('Invalid checksum'), 'error message differs')
+        self.assertEqual(40, len(result.measurements['index']), 'number of measurements differs')
+        self.assertEqual({42: AuthorizedNotification(was_successful=True)}, result.notifications, 'notifications value differs')
+
+    def test_result_matches_parse(self):
+        notifications = [
+            create_measurement(3003),
+            SettingsRequestedNotification(is_reduced_period=True, normal_price_in_cent=100, reduced_period_price_in_cent=50, reduced_period_start_isotime="22:00", reduced_period_end_isotime="05:00", is_nightmode_active=True, power_limit_in_watt=500),
+            DeviceSerialRequestedNotification(serial="ML01D10012000000"),
+        ]
+
+        frames = []
+        for notification in notifications:
+            frames.append(self.encoder.encode(notification))
+
+        result = self.parser.parse_many(b''.join(frames * 3), use_numpy=self.use_numpy)
+
+        for frame_number, notification in result.notifications.items():
+            self.assertEqual(self.parser.parse(frames[frame_number % 3]), notification, 'notification differs')
+        self.assertEqual(6, len(result.notifications), 'number of notifications differs')
+
+
+@unittest.skipIf(batch_parser.numpy is None, 'numpy is not installed')
+class ParseManyWithNumpyTest(ParseManyTest):
+    use_numpy = True
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from sem6000 import benchmark
+
+
+def _create_results(seconds_per_operation_by_name, threshold=0.25):
+    results = {}
+    for name, seconds_per_operation in seconds_per_operation_by_name.items():
+        results[name] = {'seconds_per_operation': seconds_per_operation, 'threshold': threshold}
+
+    return {'version': benchmark.RESULT_FORMAT_VERSION, 'results': results}
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_benchmark_names_are_unique(self):
+        names = [b.name for b in benchmark.get_benchmarks()]
+
+        self.assertEqual(len(names), len(set(names)), 'benchmark names are not unique')
+        for prefix in ['encode/', 'parse/', 'delegate/', 'sem6000/', 'daemon/', 'fleet/', 'message/', 'capture/', 'storage/', 'batch_parser/', 'import/']:
+            self.assertTrue(any([name.startswith(prefix) for name in names]), 'no benchmark for ' + prefix)
+
+    def test_run_benchmarks(self):
+        benchmarks = benchmark.get_benchmarks()
+        for b in benchmarks:
+            b.memory_number = 1000
+
+        names = []
+        results = benchmark.run_benchmarks(benchmarks, name_filter='MeasurementRequestedNotification', repeat=1, progress=lambda name, result: names.append(name))
+
+        self.assertEqual(['parse/MeasurementRequestedNotification', 'delegate/MeasurementRequestedNotification', 'message/create/MeasurementRequestedNotification', 'message/create_with_dict/MeasurementRequestedNotification'], names, 'benchmarks run differ')
+        self.assertEqual(set(names), set(results['results'].keys()), 'names of results differ')
+        self.assertTrue(results['results'][names[0]]['seconds_per_operation'] > 0, 'seconds_per_operation value differs')
+        self.assertFalse('allocated_bytes_per_operation' in results['results'][names[0]], 'memory measured without create')
+
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'results.json')
+            benchmark.save_results(results, filename)
+            self.assertEqual(results, benchmark.load_results(filename), 'loaded results differ')
+        finally:
+            shutil.rmtree(directory)
+
+    def test_run_round_trip_and_fleet_benchmarks(self):
+        benchmarks = [b for b in benchmark.get_benchmarks() if b.name in ['sem6000/request_measurement', 'fleet/sweep_32_devices']]
+        for b in benchmarks:
+            b.number = 1
+
+        results = benchmark.run_benchmarks(benchmarks, repeat=1)
+
+        self.assertEqual(2, len(results['results']), 'number of results differs')
+
+    def test_run_daemon_storage_and_batch_parser_benchmarks(self):
+        names = ['daemon/request_measurement', 'capture/record_received', 'storage/append', 'storage/read_range_1_hour', 'batch_parser/parse_many']
+        benchmarks = [b for b in benchmark.get_benchmarks() if b.name in names]
+        for b in benchmarks:
+            b.number = 1
+
+        results = benchmark.run_benchmarks(benchmarks, repeat=1)
+
+        self.assertEqual(set(names), set(results['results'].keys()), 'names of results differ')
+
+    def test_measure_allocated_bytes(self):
+        bytes_per_object = benchmark.measure_allocated_bytes(lambda i: bytearray(1000), 100)
+
+        self.assertTrue(1000 <= bytes_per_object < 1200, 'allocated bytes differ: ' + str(bytes_per_object))
+
+    def test_slotted_message_needs_less_memory(self):
+        results = {}
+        for b in benchmark.get_benchmarks():
+            if b.name.startswith('message/'):
+                b.number = 1
+                b.memory_number = 10000
+                results[b.name] = b.run(1)
+
+        slotted = results['message/create/MeasurementRequestedNotification']['allocated_bytes_per_operation']
+        with_dict = results['message/create_with_dict/MeasurementRequestedNotification']['allocated_bytes_per_operation']
+        self.assertTrue(slotted < with_dict, 'message with __slots__ needs ' + str(slotted) + ' bytes, with __dict__ ' + str(with_dict) + ' bytes')
+
+    def test_compare_results(self):
+        baseline = _create_results({'a': 1.0, 'b': 1.0, 'c': 1.0})
+        results = _create_results({'a': 1.2, 'b': 1.3, 'd': 5.0})
+
+        regressions = benchmark.compare_results(baseline, results)
+
+        self.assertEqual(1, len(regressions), 'number of regressions differs')
+        self.assertEqual('b', regressions[0][0], 'name of regression differs')
+        self.assertAlmostEqual(1.3, regressions[0][3], msg='ratio value differs')
@@ -0,0 +1,56 @@
+import unittest
+
+from sem6000.cache import NotificationCache
+from sem6000.message import *
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import FakeClock, create_device
+
+
+class NotificationCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = NotificationCache({SettingsRequestedNotification: 60, TimerStatusRequestedNotification: 10}, clock=self.clock)
+
+        self.simulator = SimulatedSEM6000Interface()
+        self.device = create_device(self.simulator, cache=self.cache)
+
+    def test_hits_and_expiry(self):
+        number_of_received_commands = self.simulator.number_of_received_commands
+
+        first = self.device.request_settings()
+        self.assertIs(first, self.device.request_settings(), 'cached notification expected')
+        self.assertEqual(number_of_received_commands + 1, self.simulator.number_of_received_commands, 'number of sent commands differs')
+        self.assertEqual(1, self.cache.number_of_hits, 'number_of_hits value differs')
+        self.assertEqual(1, self.cache.number_of_misses, 'number_of_misses value differs')
+
+        self.clock.now = 61
+        self.assertIsNot(first, self.device.request_settings(), 'expired notification returned')
+
+        self.assertIsNot(self.device.request_settings(), self.device.request_settings(force_refresh=True), 'force_refresh returned cached notification')
+
+    def test_write_invalidates(self):
+        self.assertEqual(False, self.device.request_settings().is_nightmode_active, 'is_nightmode_active value differs')
+        self.device.nightmode_on()
+        self.assertEqual(True, self.device.request_settings().is_nightmode_active, 'is_nightmode_active value differs')
+
+        self.device.request_timer_status()
+        self.device.activate_timer(is_action_turn_on=True, delay_isotime="01:00")
+        self.assertEqual(True, self.device.request_timer_status().is_active, 'is_active value differs')
+
+        self.device.send_many([ChangePowerLimitCommand(power_limit_in_watt=1000)])
+        self.assertEqual(1000, self.device.request_settings().power_limit_in_watt, 'power_limit_in_watt value differs')
+
+    def test_connect_to_other_device_clears(self):
+        first = self.device.request_settings()
+
+        self.device.connect('00:11:22:33:44:55')
+        self.assertIs(first, self.device.request_settings(), 'cached notification expected')
+
+        self.device.connect('00:11:22:33:44:66')
+        self.assertIsNot(first, self.device.request_settings(), 'notification of other device returned')
+
+    def test_uncached_notification_class(self):
+        self.device.request_random_mode_status()
+        self.device.request_random_mode_status()
+
+        self.assertEqual(0, self.cache.number_of_hits, 'number_of_hits value differs')
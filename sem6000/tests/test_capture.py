@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from sem6000.capture import CaptureWriter, read_capture, replay, DIRECTION_SENT, DIRECTION_RECEIVED
+from sem6000.message import *
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import FakeClock, create_device
+
+
+class CaptureTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'capture.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_records_are_written(self):
+        clock = FakeClock()
+
+        with CaptureWriter(self.filename, clock=clock) as capture:
+            clock.now = 1.5
+            capture.record_sent('00:11:22:33:44:AA', b'\x0f\x01')
+            clock.now = 2.5
+            capture.record_received(None, bytearray(b'\x0f\x02\x03'))
+
+        records = list(read_capture(self.filename))
+
+        self.assertEqual(2, len(records), 'number of records differs')
+        self.assertEqual((1.5, '00:11:22:33:44:AA', DIRECTION_SENT, b'\x0f\x01'), tuple(records[0]), 'first record differs')
+        self.assertEqual((2.5, None, DIRECTION_RECEIVED, b'\x0f\x02\x03'), tuple(records[1]), 'second record differs')
+
+        with CaptureWriter(self.filename, clock=clock) as capture:
+            capture.record_sent('00:11:22:33:44:AA', b'\x01')
+
+        self.assertEqual(3, len(list(read_capture(self.filename))), 'number of appended records differs')
+
+    def test_incomplete_record_is_ignored(self):
+        with CaptureWriter(self.filename) as capture:
+            capture.record_sent('00:11:22:33:44:AA', b'\x0f\x01\x02')
+
+        with open(self.filename, 'ab') as f:
+            f.write(b'\x00' * 5)
+
+        self.assertEqual(1, len(list(read_capture(self.filename))), 'number of records differs')
+
+    def test_replay_reassembles_fragments(self):
+        simulator = SimulatedSEM6000Interface(fragment_size=7)
+
+        with CaptureWriter(self.filename) as capture:
+            device = create_device(simulator, capture=capture)
+            settings = device.request_settings()
+            measurement = device.request_measurement()
+
+        received_records = [record for record in read_capture(self.filename) if record.direction == DIRECTION_RECEIVED]
+        self.assertTrue(len(received_records) > 3, 'notifications were not captured as fragments')
+        self.assertEqual('00:11:22:33:44:55', received_records[0].device_address, 'device_address value differs')
+
+        messages = [replayed.message for replayed in replay(self.filename)]
+
+        self.assertEqual([AuthorizeCommand(pin='0000'), AuthorizedNotification(was_successful=True), RequestSettingsCommand(), settings, RequestMeasurementCommand(), measurement], messages, 'replayed messages differ')
+
+    def test_replay_in_real_time(self):
+        clock = FakeClock()
+
+        with CaptureWriter(self.filename, clock=clock) as capture:
+            clock.now = 100
+            capture.record_sent('00:11:22:33:44:AA', b'\x0f\x05\x04\x00\x00\x00\x05\xff\xff')
+            clock.now = 102
+            capture.record_received('00:11:22:33:44:AA', b'\x0f')
+
+        replay_clock = FakeClock()
+        list(replay(self.filename, real_time=True, clock=replay_clock, sleep=replay_clock.sleep))
+
+        self.assertEqual(2, replay_clock.now, 'replay duration differs')
+
+    def test_replay_reports_malformed_frames(self):
+        with CaptureWriter(self.filename) as capture:
+            capture.record_received('00:11:22:33:44:AA', b'\x0f\x03\x03\x00\x00\xff\xff')
+
+        messages = [replayed.message for replayed in replay(self.filename)]
+
+        self.assertEqual(1, len(messages), 'number of replayed messages differs')
+        self.assertIsInstance(messages[0], Exception, 'malformed frame not reported')
@@ -0,0 +1,90 @@
+import unittest
+
+from sem6000.encoder import MessageEncoder
+from sem6000.parser import CommandParser
+from sem6000.message import *
+from sem6000 import util
+
+class CommandsTest(unittest.TestCase):
+    def test_AuthorizeCommand(self):
+        message = AuthorizeCommand(pin="1234")
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser().parse(encoded_message)
+
+        self.assertEqual("1234", parsed_message.pin, 'pin value differs')
+
+    def test_ChangePinCommand(self):
+        message = ChangePinCommand(pin="1234", new_pin="5678")
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser().parse(encoded_message)
+
+        self.assertEqual("1234", parsed_message.pin, 'pin value differs')
+        self.assertEqual("5678", parsed_message.new_pin, 'new_pin value differs')
+
+    def test_ChangeNightmodeCommand(self):
+        for on in [True, False]:
+            message = ChangeNightmodeCommand(on=on)
+            encoded_message = MessageEncoder().encode(message)
+            parsed_message = CommandParser().parse(encoded_message)
+
+            self.assertEqual(on, parsed_message.on, 'on value differs')
+
+    def test_SynchronizeDateAndTimeCommand(self):
+        message = SynchronizeDateAndTimeCommand(isodatetime="2020-03-12T12:34:56")
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser().parse(encoded_message)
+
+        self.assertEqual("2020-03-12T12:34:56", parsed_message.isodatetime, 'isodatetime value differs')
+
+    def test_ChangeReducedPeriodCommand(self):
+        message = ChangeReducedPeriodCommand(is_active=True, start_isotime="22:00", end_isotime="05:30")
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser().parse(encoded_message)
+
+        self.assertEqual(True, parsed_message.is_active, 'is_active value differs')
+        self.assertEqual("22:00", parsed_message.start_isotime, 'start_isotime value differs')
+        self.assertEqual("05:30", parsed_message.end_isotime, 'end_isotime value differs')
+
+    def test_SetTimerCommand(self):
+        message = SetTimerCommand(is_reset_timer=False, is_action_turn_on=True, target_isodatetime="2020-03-12T12:34:56")
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser(year_diff=2000).parse(encoded_message)
+
+        self.assertEqual(False, parsed_message.is_reset_timer, 'is_reset_timer value differs')
+        self.assertEqual(True, parsed_message.is_action_turn_on, 'is_action_turn_on value differs')
+        self.assertEqual("2020-03-12T12:34:56", parsed_message.target_isodatetime, 'target_isodatetime value differs')
+
+    def test_EditSchedulerCommand(self):
+        scheduler = RepeatedScheduler(is_active=True, is_action_turn_on=False, repeat_on_weekdays=[util.Weekday.MONDAY, util.Weekday.FRIDAY], isotime="12:34")
+        message = EditSchedulerCommand(slot_id=3, scheduler=scheduler)
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser(year_diff=2000).parse(encoded_message)
+
+        self.assertEqual(3, parsed_message.slot_id, 'slot_id value differs')
+        self.assertEqual(True, parsed_message.scheduler.is_active, 'is_active value differs')
+        self.assertEqual(False, parsed_message.scheduler.is_action_turn_on, 'is_action_turn_on value differs')
+        self.assertEqual([util.Weekday.MONDAY, util.Weekday.FRIDAY], parsed_message.scheduler.repeat_on_weekdays, 'repeat_on_weekdays value differs')
+
+    def test_ChangeRandomModeCommand(self):
+        message = ChangeRandomModeCommand(is_active=True, active_on_weekdays=[util.Weekday.SUNDAY], start_isotime="22:00", end_isotime="04:00")
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser().parse(encoded_message)
+
+        self.assertEqual(True, parsed_message.is_active, 'is_active value differs')
+        self.assertEqual([util.Weekday.SUNDAY], parsed_message.active_on_weekdays, 'active_on_weekdays value differs')
+        self.assertEqual("22:00", parsed_message.start_isotime, 'start_isotime value differs')
+        self.assertEqual("04:00", parsed_message.end_isotime, 'end_isotime value differs')
+
+    def test_ChangeDeviceNameCommand(self):
+        message = ChangeDeviceNameCommand(new_name="Voltcraft")
+        encoded_message = MessageEncoder().encode(message)
+        parsed_message = CommandParser().parse(encoded_message)
+
+        self.assertEqual("Voltcraft", parsed_message.new_name, 'new_name value differs')
+
+    def test_parameterless_commands(self):
+        for message in [ResetPinCommand(), RequestSettingsCommand(), RequestTimerStatusCommand(), RequestRandomModeStatusCommand(), RequestMeasurementCommand(), RequestConsumptionOfLast12MonthsCommand(), RequestConsumptionOfLast30DaysCommand(), RequestConsumptionOfLast23HoursCommand(), ResetConsumptionCommand(), FactoryResetCommand(), RequestDeviceSerialCommand()]:
+            encoded_message = MessageEncoder().encode(message)
+            parsed_message = CommandParser().parse(encoded_message)
+
+            self.assertEqual(message.__class__, parsed_message.__class__, 'command class differs')
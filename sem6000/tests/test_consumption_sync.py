@@ -0,0 +1,96 @@
+import datetime
+import unittest
+
+from sem6000.consumption_sync import ConsumptionHistory, ConsumptionSync
+from sem6000.message import *
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import FakeClock, create_device
+
+
+class FakeDevice:
+    def __init__(self):
+        self.hours = [0] * 24
+        self.days = [None] + [0] * 30
+        self.months = [None] + [0] * 12
+
+        self.number_of_requests = 0
+
+    def request_consumption_of_last_23_hours(self):
+        self.number_of_requests += 1
+        return ConsumptionOfLast23HoursRequestedNotification(consumption_n_hours_ago_in_watt_hour=list(self.hours))
+
+    def request_consumption_of_last_30_days(self):
+        self.number_of_requests += 1
+        return ConsumptionOfLast30DaysRequestedNotification(consumption_n_days_ago_in_watt_hour=list(self.days))
+
+    def request_consumption_of_last_12_months(self):
+        self.number_of_requests += 1
+        return ConsumptionOfLast12MonthsRequestedNotification(consumption_n_months_ago_in_watt_hour=list(self.months))
+
+
+class ConsumptionSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.history = ConsumptionHistory(':memory:')
+        self.clock = FakeClock(datetime.datetime(2020, 3, 1, 10, 30))
+        self.sync = ConsumptionSync(self.history, clock=self.clock)
+        self.device = FakeDevice()
+
+    def tearDown(self):
+        self.history.close()
+
+    def test_buckets_are_anchored_to_wall_clock(self):
+        self.device.hours[0] = 5
+        self.device.hours[1] = 7
+        self.device.days[1] = 100
+        self.device.months[1] = 3000
+
+        self.assertEqual({'hour': 24, 'day': 30, 'month': 12}, self.sync.sync(self.device, 'AA'), 'number of changed buckets differs')
+
+        hours = self.history.get_consumptions('AA', 'hour', start='2020-03-01T09:00')
+        self.assertEqual([('2020-03-01T09:00', 7), ('2020-03-01T10:00', 5)], hours, 'hour buckets differ')
+
+        self.assertEqual([('2020-02-29', 100)], self.history.get_consumptions('AA', 'day', start='2020-02-29'), 'day buckets differ')
+        self.assertEqual(('2019-03', 0), self.history.get_consumptions('AA', 'month')[0], 'first month bucket differs')
+        self.assertEqual(('2020-02', 3000), self.history.get_consumptions('AA', 'month')[-1], 'last month bucket differs')
+
+    def test_requests_are_skipped_until_a_new_bucket_exists(self):
+        self.sync.sync(self.device, 'AA')
+        self.assertEqual(3, self.device.number_of_requests, 'number of requests differs')
+
+        self.clock.now = datetime.datetime(2020, 3, 1, 10, 59)
+        self.assertEqual({'hour': 0, 'day': 0, 'month': 0}, self.sync.sync(self.device, 'AA'), 'number of changed buckets differs')
+        self.assertEqual(3, self.device.number_of_requests, 'number of requests differs')
+        self.assertEqual(3, self.sync.number_of_skipped_requests, 'number_of_skipped_requests value differs')
+
+        self.clock.now = datetime.datetime(2020, 3, 1, 11, 0)
+        self.device.hours = [2, 9] + [0] * 22
+        self.assertEqual({'hour': 2, 'day': 0, 'month': 0}, self.sync.sync(self.device, 'AA'), 'number of changed buckets differs')
+        self.assertEqual(4, self.sync.number_of_requests, 'number_of_requests value differs')
+
+        self.sync.sync(self.device, 'AA', force=True)
+        self.assertEqual(7, self.sync.number_of_requests, 'number_of_requests value differs')
+
+    def test_devices_are_kept_apart(self):
+        self.device.months[1] = 1
+        self.sync.sync(self.device, 'AA')
+        self.device.months[1] = 2
+        self.sync.sync(self.device, 'BB')
+
+        self.assertEqual(('2020-02', 1), self.history.get_consumptions('AA', 'month')[-1], 'month bucket of AA differs')
+        self.assertEqual(('2020-02', 2), self.history.get_consumptions('BB', 'month')[-1], 'month bucket of BB differs')
+
+    def test_sync_with_simulator(self):
+        simulator = SimulatedSEM6000Interface(load_in_milliwatt=0)
+        device = create_device(simulator)
+
+        two_days_ago = datetime.date.today() - datetime.timedelta(days=2)
+        simulator.add_consumption(datetime.datetime.combine(two_days_ago, datetime.time()), [10] * 24)
+
+        history = ConsumptionHistory(':memory:')
+        sync = ConsumptionSync(history)
+        sync.sync(device, '00:11:22:33:44:55')
+
+        days = history.get_consumptions('00:11:22:33:44:55', 'day', start=two_days_ago.isoformat())
+        self.assertEqual((two_days_ago.isoformat(), 240), days[0], 'consumption of day differs')
+
+        history.close()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+from sem6000.daemon import SEM6000Daemon, SEM6000DaemonClient, is_daemon_running
+from sem6000.message import *
+from sem6000.sem6000 import SEM6000
+from sem6000.simulator import SimulatedSEM6000Interface
+
+
+class SEM6000DaemonTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, 'sem6000d.sock')
+
+        self.number_of_created_sessions = 0
+
+        def session_factory(device, timeout, debug):
+            self.number_of_created_sessions += 1
+            return SEM6000(device["address"], device["pin"], timeout=0.1, bluetooth_lowenergy_interface=SimulatedSEM6000Interface(pin='0000', device_name='Daemon'))
+
+        self.daemon = SEM6000Daemon(self.socket_path, session_factory=session_factory)
+        self.daemon.start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.directory.cleanup()
+
+    def _create_client(self):
+        client = SEM6000DaemonClient('00:11:22:33:44:55', socket_path=self.socket_path)
+        self.addCleanup(client.close)
+
+        return client
+
+    def test_session_is_kept_open(self):
+        self.assertTrue(is_daemon_running(self.socket_path), 'daemon should be running')
+
+        for i in range(3):
+            client = self._create_client()
+            client.authorize('0000')
+
+            self.assertIsInstance(client.power_on(), PowerSwitchedNotification)
+
+            notification = client.request_measurement()
+            self.assertIsInstance(notification, MeasurementRequestedNotification)
+            self.assertTrue(notification.is_power_active, 'is_power_active value differs')
+
+        self.assertEqual(1, self.number_of_created_sessions, 'number of created sessions differs')
+
+    def test_arguments_and_device_name(self):
+        client = self._create_client()
+        client.authorize('0000')
+
+        client.change_power_limit(power_limit_in_watt=1500)
+        client.change_date_and_time('2020-01-01T12:00:00')
+
+        self.assertEqual(1500, client.request_settings().power_limit_in_watt, 'power_limit_in_watt value differs')
+        self.assertEqual('Daemon', client.request_device_name().device_name, 'device_name value differs')
+
+    def test_notifications_are_not_changed(self):
+        client = self._create_client()
+        client.authorize('0000')
+
+        # a frame of an inactive timer would be parsed as 2070-01-01 again
+        notification = client.request_timer_status()
+        self.assertFalse(notification.is_active, 'is_active value differs')
+        self.assertEqual('1970-01-01T00:00:00', notification.target_isodatetime, 'target_isodatetime value differs')
+
+        client.add_repeated_scheduler(True, True, ['Monday', 'Friday'], '10:00')
+        notification = client.request_scheduler()
+        self.assertEqual(1, notification.number_of_schedulers, 'number_of_schedulers value differs')
+        self.assertIsInstance(notification.scheduler_entries[0].scheduler, RepeatedScheduler)
+        self.assertEqual(self.daemon._session_by_device[('hci0', '00:11:22:33:44:55')].sem6000.request_scheduler(), notification, 'notification differs')
+
+    def test_pin_is_required(self):
+        client = self._create_client()
+        client.authorize('0000')
+
+        other_client = self._create_client()
+        with self.assertRaises(Exception):
+            other_client.request_measurement()
+
+        other_client.pin = '1234'
+        with self.assertRaises(Exception):
+            other_client.request_measurement()
+
+        client.authorize('0000')
+        self.assertIsInstance(client.request_measurement(), MeasurementRequestedNotification)
+
+    def test_methods_without_pin(self):
+        # what sem6000-cli-demo.py does for reset_pin, it does not know the pin of the device
+        client = self._create_client()
+
+        self.assertEqual('Daemon', client.request_device_name().device_name, 'device_name value differs')
+        self.assertIsInstance(client.reset_pin(), PinResetNotification)
+
+        with self.assertRaises(Exception):
+            client.request_measurement()
+
+        client.authorize('0000')
+        self.assertIsInstance(client.request_measurement(), MeasurementRequestedNotification)
+
+    def test_errors(self):
+        client = self._create_client()
+
+        with self.assertRaises(Exception):
+            client.authorize('1234')
+
+        client.authorize('0000')
+
+        with self.assertRaises(AttributeError):
+            client.connect('00:11:22:33:44:55')
+
+    def test_not_running(self):
+        self.daemon.shutdown()
+
+        self.assertFalse(is_daemon_running(self.socket_path), 'daemon should not be running')
@@ -0,0 +1,98 @@
+import unittest
+
+from sem6000.delegate import SEM6000Delegate
+from sem6000.encoder import MessageEncoder
+from sem6000.message import *
+from sem6000.tests.helpers import create_measurement
+
+
+class SEM6000DelegateTest(unittest.TestCase):
+    def setUp(self):
+        self.delegate = SEM6000Delegate()
+        self.encoder = MessageEncoder()
+
+    def _receive(self, data, fragment_size=20):
+        for i in range(0, len(data), fragment_size):
+            self.delegate(None, data[i:i+fragment_size])
+
+    def test_frame_is_complete_once_last_byte_arrived(self):
+        data = self.encoder.encode(SettingsRequestedNotification(is_reduced_period=True, normal_price_in_cent=30, reduced_period_price_in_cent=20, reduced_period_start_isotime="22:00", reduced_period_end_isotime="06:00", is_nightmode_active=False, power_limit_in_watt=2000))
+
+        self.delegate(None, data[:-3])
+        self.assertFalse(self.delegate.has_final_raw_notification(), 'frame should be incomplete')
+
+        self.delegate(None, data[-3:])
+        self.assertTrue(self.delegate.has_final_raw_notification(), 'frame should be complete')
+
+        notification = self.delegate.consume_notification()
+        self.assertEqual(2000, notification.power_limit_in_watt, 'power_limit_in_watt value differs')
+        self.assertFalse(self.delegate.has_final_raw_notification(), 'buffer should be empty')
+
+    def test_measurement_without_suffix(self):
+        data = self.encoder.encode(create_measurement(80))
+
+        self._receive(data, fragment_size=7)
+
+        self.assertEqual(80, self.delegate.consume_notification().power_in_milliwatt, 'power_in_milliwatt value differs')
+
+    def test_back_to_back_frames(self):
+        data = self.encoder.encode(PowerSwitchedNotification(was_successful=True))
+        data += self.encoder.encode(create_measurement(80))
+        data += self.encoder.encode(NightmodeChangedNotification(was_successful=True))
+
+        self._receive(data)
+
+        self.assertIsInstance(self.delegate.consume_notification(), PowerSwitchedNotification)
+        self.assertIsInstance(self.delegate.consume_notification(), MeasurementRequestedNotification)
+        self.assertIsInstance(self.delegate.consume_notification(), NightmodeChangedNotification)
+
+        with self.assertRaises(Exception):
+            self.delegate.consume_notification()
+
+    def test_late_suffix_is_skipped(self):
+        data = self.encoder.encode(PowerSwitchedNotification(was_successful=True))
+
+        self.delegate(None, data[:-2])
+        self.assertIsInstance(self.delegate.consume_notification(), PowerSwitchedNotification)
+
+        self.delegate(None, data[-2:])
+        self.assertFalse(self.delegate.has_final_raw_notification(), 'suffix should not be a frame')
+
+        self._receive(data)
+        self.assertIsInstance(self.delegate.consume_notification(), PowerSwitchedNotification)
+
+    def test_invalid_frame_is_discarded(self):
+        self.delegate(None, b'\x00\x01\x02')
+
+        with self.assertRaises(Exception):
+            self.delegate.consume_notification()
+
+        self.assertFalse(self.delegate.has_final_raw_notification(), 'buffer should be empty')
+
+    def test_buffer_grows_while_parse_error_is_kept(self):
+        self.delegate(None, b'\x0f\x03\xff\x00\x02')
+
+        # callers keep the exception and its traceback, i.e. to report it later
+        exception = None
+        try:
+            self.delegate.consume_notification()
+        except Exception as e:
+            exception = e
+
+        data = self.encoder.encode(PowerSwitchedNotification(was_successful=True)) * 100
+        self.assertGreater(len(data), SEM6000Delegate._INITIAL_BUFFER_SIZE, 'data does not grow the buffer')
+
+        self._receive(data)
+
+        self.assertIsInstance(self.delegate.consume_notification(), PowerSwitchedNotification)
+        self.assertIsNotNone(exception.__traceback__, 'exception was not kept')
+
+    def test_buffer_grows_while_notifications_are_kept(self):
+        self._receive(self.encoder.encode(DeviceSerialRequestedNotification(serial='ML01D10012000000')))
+        notification = self.delegate.consume_notification()
+
+        data = self.encoder.encode(PowerSwitchedNotification(was_successful=True)) * 100
+        self._receive(data)
+
+        self.assertIsInstance(self.delegate.consume_notification(), PowerSwitchedNotification)
+        self.assertEqual('ML01D10012000000', notification.serial, 'serial value differs')
@@ -0,0 +1,162 @@
+import threading
+import time
+import unittest
+
+from sem6000.fleet import FleetPoller
+from sem6000.message import MeasurementRequestedNotification
+from sem6000.sem6000 import SEM6000
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import create_measurement
+
+
+class FakeSession:
+    def __init__(self, device, delay):
+        self.device = device
+        self.delay = delay
+        self.number_of_requests = 0
+        self.is_disconnected = False
+
+    def request_measurement(self):
+        self.number_of_requests += 1
+        time.sleep(self.delay)
+
+        if self.device.get("is_broken"):
+            raise Exception("Request measurement failed")
+
+        return create_measurement(1000)
+
+    def disconnect(self):
+        self.is_disconnected = True
+
+
+class FleetPollerTest(unittest.TestCase):
+    def setUp(self):
+        self.delay = 0.05
+        self.sessions = []
+
+    def _create_session(self, device, timeout, debug):
+        session = FakeSession(device, self.delay)
+        self.sessions.append(session)
+        return session
+
+    def _create_devices(self, number_of_devices, bluetooth_devices):
+        devices = []
+        for i in range(number_of_devices):
+            devices.append({"address": "00:11:22:33:44:{:02x}".format(i), "pin": "0000", "bluetooth_device": bluetooth_devices[i % len(bluetooth_devices)]})
+        return devices
+
+    def test_sweep_polls_concurrently_per_bluetooth_device(self):
+        devices = self._create_devices(16, ["hci0", "hci1"])
+        poller = FleetPoller(devices, max_workers_per_bluetooth_device=4, session_factory=self._create_session)
+
+        results = list(poller.sweep())
+        poller.close()
+
+        self.assertEqual(16, len(results))
+        self.assertEqual(set([d["address"] for d in devices]), set([r.address for r in results]))
+        for result in results:
+            self.assertTrue(result.was_successful())
+            self.assertGreaterEqual(result.latency_in_seconds, self.delay)
+
+        # 16 devices on 2 adapters with 4 workers each need 2 rounds
+        self.assertLess(poller.last_sweep_duration_in_seconds, 16 * self.delay / 2)
+
+    def test_sessions_are_kept_between_sweeps(self):
+        devices = self._create_devices(3, ["hci0"])
+        poller = FleetPoller(devices, session_factory=self._create_session)
+
+        list(poller.sweep())
+        list(poller.sweep())
+        poller.close()
+
+        self.assertEqual(3, len(self.sessions))
+        for session in self.sessions:
+            self.assertEqual(2, session.number_of_requests)
+            self.assertTrue(session.is_disconnected)
+
+    def test_failed_poll_is_reported(self):
+        devices = self._create_devices(2, ["hci0"])
+        devices[1]["is_broken"] = True
+
+        poller = FleetPoller(devices, session_factory=self._create_session)
+        results = dict([(r.address, r) for r in poller.sweep()])
+        poller.close()
+
+        self.assertTrue(results[devices[0]["address"]].was_successful())
+        self.assertFalse(results[devices[1]["address"]].was_successful())
+        self.assertIsNone(results[devices[1]["address"]].notification)
+
+
+class SimulatedFleetPollerTest(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.number_of_polls_by_key = {}
+        self.maximum_number_of_polls_by_key = {}
+        self.sessions = []
+        self.address_by_session = {}
+
+    def _create_session(self, device, timeout, debug):
+        simulator = SimulatedSEM6000Interface(mac_address=device["address"], bluetooth_device=device["bluetooth_device"], latency_in_seconds=0.02)
+        session = SEM6000(device["address"], device["pin"], bluetooth_device=device["bluetooth_device"], timeout=timeout, bluetooth_lowenergy_interface=simulator)
+
+        with self.lock:
+            self.sessions.append(session)
+            self.address_by_session[session] = device["address"]
+
+        return session
+
+    def _count_poll(self, key, increment):
+        with self.lock:
+            number_of_polls = self.number_of_polls_by_key.get(key, 0) + increment
+            self.number_of_polls_by_key[key] = number_of_polls
+            self.maximum_number_of_polls_by_key[key] = max(number_of_polls, self.maximum_number_of_polls_by_key.get(key, 0))
+
+    def _poll(self, session):
+        # the worker threads are named after the bluetooth device of their pool
+        keys = [threading.current_thread().name.rsplit("_", 1)[0], self.address_by_session[session]]
+
+        for key in keys:
+            self._count_poll(key, 1)
+        try:
+            return session.request_measurement()
+        finally:
+            for key in keys:
+                self._count_poll(key, -1)
+
+    def _create_devices(self, number_of_devices, bluetooth_devices):
+        devices = []
+        for i in range(number_of_devices):
+            devices.append({"address": "00:11:22:33:44:{:02x}".format(i), "pin": "0000", "bluetooth_device": bluetooth_devices[i % len(bluetooth_devices)]})
+        return devices
+
+    def test_sweep_polls_simulated_devices_per_bluetooth_device(self):
+        devices = self._create_devices(8, ["hci0", "hci1"])
+        poller = FleetPoller(devices, max_workers_per_bluetooth_device=2, session_factory=self._create_session)
+
+        results = list(poller.sweep(self._poll))
+        results += list(poller.sweep(self._poll))
+        poller.close()
+
+        self.assertEqual(16, len(results), 'number of results differs')
+        for result in results:
+            self.assertTrue(result.was_successful(), 'poll of ' + result.address + ' failed: ' + repr(result.exception))
+            self.assertIsInstance(result.notification, MeasurementRequestedNotification)
+
+        self.assertEqual(8, len(self.sessions), 'sessions were not kept between sweeps')
+        for bluetooth_device in ["hci0", "hci1"]:
+            self.assertLessEqual(self.maximum_number_of_polls_by_key["sem6000-" + bluetooth_device], 2, 'too many polls on ' + bluetooth_device + ' at the same time')
+
+    def test_device_is_polled_by_one_worker_at_a_time(self):
+        # the same device reachable by two bluetooth devices is polled in both pools, sharing its session
+        devices = self._create_devices(1, ["hci0"]) + self._create_devices(1, ["hci1"])
+        poller = FleetPoller(devices, session_factory=self._create_session)
+
+        for i in range(5):
+            results = list(poller.sweep(self._poll))
+
+            for result in results:
+                self.assertTrue(result.was_successful(), 'poll of ' + result.address + ' failed: ' + repr(result.exception))
+        poller.close()
+
+        self.assertEqual(1, len(self.sessions), 'number of sessions differs')
+        self.assertEqual(1, self.maximum_number_of_polls_by_key[devices[0]["address"]], 'device was polled by two workers at the same time')
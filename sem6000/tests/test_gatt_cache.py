@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from sem6000.bluetooth_lowenergy_interface.gatt_cache import GattCharacteristicCache
+
+
+CHARACTERISTICS = [
+    {'uuid': '0000fff3-0000-1000-8000-00805f9b34fb', 'handle': 0x2a, 'properties': 0x08, 'valHandle': 0x2b},
+    {'uuid': '0000fff4-0000-1000-8000-00805f9b34fb', 'handle': 0x2d, 'properties': 0x10, 'valHandle': 0x2e},
+]
+
+
+class GattCharacteristicCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'sem6000', 'gatt_cache.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_store_and_load(self):
+        GattCharacteristicCache(self.filename).store('00:11:22:33:44:55', CHARACTERISTICS)
+
+        # a new instance reads the persisted file
+        cache = GattCharacteristicCache(self.filename)
+
+        self.assertEqual(CHARACTERISTICS, cache.load('00:11:22:33:44:55'), 'characteristics differ')
+        self.assertEqual(CHARACTERISTICS, cache.load('00:11:22:33:44:55'.lower()), 'characteristics differ')
+        self.assertIsNone(cache.load('66:77:88:99:AA:BB'), 'unknown device should not be cached')
+
+    def test_invalidate(self):
+        cache = GattCharacteristicCache(self.filename)
+        cache.store('00:11:22:33:44:55', CHARACTERISTICS)
+        cache.invalidate('00:11:22:33:44:55')
+
+        self.assertIsNone(GattCharacteristicCache(self.filename).load('00:11:22:33:44:55'), 'invalidated device should not be cached')
+
+    def test_instances_share_the_file(self):
+        # i.e. sessions of a FleetPoller or sem6000d, each having its own interface
+        first = GattCharacteristicCache(self.filename)
+        second = GattCharacteristicCache(self.filename)
+
+        first.store('00:11:22:33:44:55', CHARACTERISTICS)
+        second.store('66:77:88:99:AA:BB', CHARACTERISTICS)
+
+        self.assertEqual(CHARACTERISTICS, first.load('66:77:88:99:AA:BB'), 'characteristics of the other instance differ')
+        self.assertEqual(CHARACTERISTICS, second.load('00:11:22:33:44:55'), 'characteristics were overwritten by the other instance')
+
+    def test_concurrent_stores(self):
+        mac_addresses = ['00:11:22:33:44:{:02X}'.format(i) for i in range(16)]
+
+        threads = [threading.Thread(target=lambda mac_address=mac_address: GattCharacteristicCache(self.filename).store(mac_address, CHARACTERISTICS)) for mac_address in mac_addresses]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        cache = GattCharacteristicCache(self.filename)
+        for mac_address in mac_addresses:
+            self.assertEqual(CHARACTERISTICS, cache.load(mac_address), 'characteristics of ' + mac_address + ' differ')
+
+        self.assertEqual([], [name for name in os.listdir(os.path.dirname(self.filename)) if name.endswith('.tmp')], 'temporary files are left over')
+
+    def test_firmware_version_mismatch(self):
+        cache = GattCharacteristicCache(self.filename)
+        cache.store('00:11:22:33:44:55', CHARACTERISTICS, firmware_version='1.0')
+
+        self.assertEqual(CHARACTERISTICS, cache.load('00:11:22:33:44:55'), 'characteristics differ')
+        self.assertEqual(CHARACTERISTICS, cache.load('00:11:22:33:44:55', firmware_version='1.0'), 'characteristics differ')
+        self.assertIsNone(cache.load('00:11:22:33:44:55', firmware_version='1.1'), 'cache of other firmware version should be dropped')
+        self.assertIsNone(cache.load('00:11:22:33:44:55'), 'cache of other firmware version should be dropped')
+
+    def test_broken_file_is_ignored(self):
+        os.makedirs(os.path.dirname(self.filename))
+        with open(self.filename, 'w') as f:
+            f.write('{ broken')
+
+        cache = GattCharacteristicCache(self.filename)
+        self.assertIsNone(cache.load('00:11:22:33:44:55'), 'broken cache should be empty')
+
+        cache.store('00:11:22:33:44:55', CHARACTERISTICS)
+        with open(self.filename) as f:
+            self.assertIn('00:11:22:33:44:55', json.load(f), 'cache file was not replaced')
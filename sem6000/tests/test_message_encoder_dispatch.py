@@ -0,0 +1,25 @@
+import unittest
+
+from sem6000.encoder import MessageEncoder
+from sem6000.message import *
+
+
+class MessageEncoderDispatchTest(unittest.TestCase):
+    def test_constant_frames(self):
+        encoder = MessageEncoder()
+
+        self.assertEqual(b'\x0f\x05\x04\x00\x00\x00\x05\xff\xff', encoder.encode(RequestMeasurementCommand()), 'frame differs')
+        self.assertEqual(b'\x0f\x05\x10\x00\x00\x00\x11\xff\xff', encoder.encode(RequestSettingsCommand()), 'frame differs')
+        self.assertIs(encoder.encode(RequestTimerStatusCommand()), encoder.encode(RequestTimerStatusCommand()), 'frame is encoded again')
+
+    def test_subclass_of_registered_message(self):
+        class CustomPowerSwitchCommand(PowerSwitchCommand):
+            pass
+
+        encoder = MessageEncoder()
+
+        self.assertEqual(encoder.encode(PowerSwitchCommand(True)), encoder.encode(CustomPowerSwitchCommand(True)), 'frame differs')
+
+    def test_unsupported_message(self):
+        with self.assertRaises(Exception):
+            MessageEncoder().encode(object())
@@ -0,0 +1,47 @@
+import unittest
+
+from sem6000.encoder import MessageEncoder
+from sem6000.parser import MessageParser
+from sem6000.message import *
+
+
+class MessageParserDispatchTest(unittest.TestCase):
+    def tearDown(self):
+        MessageParser._decoders.pop(0x42, None)
+
+    def test_unsupported_message(self):
+        encoded_message = MessageEncoder()._encode_message(b'\x42\x00\x00')
+
+        with self.assertRaises(Exception):
+            MessageParser().parse(encoded_message)
+
+    def test_register_decoder(self):
+        decode_function = lambda parser, payload: DeviceNameChangedNotification(was_successful=(payload[2] == 0x00))
+        MessageParser.register_decoder(0x42, decode_function)
+
+        encoded_message = MessageEncoder()._encode_message(b'\x42\x00\x00')
+        parsed_message = MessageParser().parse(encoded_message)
+
+        self.assertTrue(isinstance(parsed_message, DeviceNameChangedNotification), 'registered decoder not used')
+        self.assertEqual(True, parsed_message.was_successful, 'was_successful value differs')
+
+    def test_register_decoder_with_sub_opcode(self):
+        decode_function = lambda parser, payload: ConsumptionResetNotification(was_successful=True)
+        MessageParser.register_decoder(0x42, decode_function, sub_opcode=0x07, sub_opcode_offset=2)
+
+        encoded_message = MessageEncoder()._encode_message(b'\x42\x00\x07\x00')
+        parsed_message = MessageParser().parse(encoded_message)
+
+        self.assertTrue(isinstance(parsed_message, ConsumptionResetNotification), 'registered decoder not used')
+
+        encoded_message = MessageEncoder()._encode_message(b'\x42\x00\x08\x00')
+        with self.assertRaises(Exception):
+            MessageParser().parse(encoded_message)
+
+    def test_sub_opcode_dispatch(self):
+        for message in [AuthorizedNotification(was_successful=True), PinChangedNotification(was_successful=False), PinResetNotification(was_successful=True), PricesChangedNotification(was_successful=True), ReducedPeriodChangedNotification(was_successful=True), NightmodeChangedNotification(was_successful=True), ConsumptionResetNotification(was_successful=True), FactoryResetNotification(was_successful=True)]:
+            encoded_message = MessageEncoder().encode(message)
+            parsed_message = MessageParser().parse(encoded_message)
+
+            self.assertEqual(message.__class__, parsed_message.__class__, 'notification class differs')
+            self.assertEqual(message.was_successful, parsed_message.was_successful, 'was_successful value differs')
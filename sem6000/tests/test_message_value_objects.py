@@ -0,0 +1,72 @@
+import copy
+import pickle
+import unittest
+
+from sem6000.message import *
+from sem6000.tests.helpers import create_measurement
+from sem6000 import util
+
+
+class MessageValueObjectTest(unittest.TestCase):
+    def _create_scheduler_notification(self):
+        scheduler = RepeatedScheduler(is_active=True, is_action_turn_on=True, repeat_on_weekdays=[util.Weekday.MONDAY], isotime="12:00")
+        return SchedulerRequestedNotification(number_of_schedulers=1, scheduler_entries=[SchedulerEntry(slot_id=1, scheduler=scheduler)])
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(create_measurement(), '__dict__'), 'message should not have a __dict__')
+        self.assertFalse(hasattr(PowerSwitchedNotification(was_successful=True), '__dict__'), 'message should not have a __dict__')
+        self.assertFalse(hasattr(self._create_scheduler_notification().scheduler_entries[0].scheduler, '__dict__'), 'message should not have a __dict__')
+
+    def test_immutable(self):
+        notification = create_measurement()
+
+        with self.assertRaises(AttributeError):
+            notification.power_in_milliwatt = 0
+
+        with self.assertRaises(AttributeError):
+            notification.unknown_attribute = 0
+
+        with self.assertRaises(AttributeError):
+            del notification.power_in_milliwatt
+
+    def test_equality_and_hash(self):
+        self.assertEqual(create_measurement(), create_measurement())
+        self.assertNotEqual(create_measurement(), create_measurement(power_in_milliwatt=81))
+        self.assertEqual(1, len(set([create_measurement(), create_measurement()])), 'equal messages differ in hash')
+
+        self.assertNotEqual(PowerSwitchedNotification(was_successful=True), NightmodeChangedNotification(was_successful=True))
+
+        self.assertEqual(self._create_scheduler_notification(), self._create_scheduler_notification())
+        self.assertEqual(hash(self._create_scheduler_notification()), hash(self._create_scheduler_notification()), 'equal messages differ in hash')
+
+    def test_lists_are_immutable(self):
+        scheduler_entries = [SchedulerEntry(slot_id=1, scheduler=OneTimeScheduler(is_active=True, is_action_turn_on=True, isodatetime="2020-01-01T12:00"))]
+        notification = SchedulerRequestedNotification(number_of_schedulers=1, scheduler_entries=scheduler_entries)
+        hash_value = hash(notification)
+
+        scheduler_entries.append(scheduler_entries[0])
+        self.assertEqual(1, len(notification.scheduler_entries), 'scheduler_entries changed with the list passed in')
+
+        with self.assertRaises(AttributeError):
+            notification.scheduler_entries.append(scheduler_entries[0])
+
+        self.assertEqual(hash_value, hash(notification), 'hash changed')
+
+    def test_lists_compare_equal_to_lists(self):
+        notification = ConsumptionOfLast12MonthsRequestedNotification(consumption_n_months_ago_in_watt_hour=[None, 10, 20])
+
+        self.assertTrue(notification.consumption_n_months_ago_in_watt_hour == [None, 10, 20], 'values should equal a list')
+        self.assertTrue([None, 10, 20] == notification.consumption_n_months_ago_in_watt_hour, 'a list should equal the values')
+        self.assertFalse(notification.consumption_n_months_ago_in_watt_hour != [None, 10, 20], 'values should not differ from a list')
+        self.assertEqual([10, 20], notification.consumption_n_months_ago_in_watt_hour[1:], 'slice should equal a list')
+
+    def test_copy_and_pickle(self):
+        notification = self._create_scheduler_notification()
+
+        self.assertEqual(notification, pickle.loads(pickle.dumps(notification)))
+        self.assertEqual(notification, copy.deepcopy(notification))
+        self.assertEqual(str(notification), str(copy.copy(notification)))
+
+    def test_str(self):
+        self.assertEqual("MeasurementRequestedNotification(is_power_active=True, power_in_milliwatt=80, voltage_in_volt=230, current_in_milliampere=0, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=12)", str(create_measurement()))
+        self.assertEqual("DeviceNameRequestedNotification(device_name=Voltcraft)", str(DeviceNameRequestedNotification("Voltcraft")))
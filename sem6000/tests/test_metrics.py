@@ -0,0 +1,73 @@
+import unittest
+
+from sem6000.message import *
+from sem6000.metrics import Histogram, SEM6000Metrics
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import create_device
+
+
+class HistogramTest(unittest.TestCase):
+    def test_observe(self):
+        histogram = Histogram([0.1, 1])
+
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        self.assertEqual([2, 1, 1], histogram.counts, 'counts value differs')
+        self.assertEqual([(0.1, 2), (1, 3), (float('inf'), 4)], histogram.get_cumulative_counts(), 'cumulative counts differ')
+        self.assertEqual(4, histogram.count, 'count value differs')
+        self.assertAlmostEqual(5.65, histogram.sum_in_seconds, msg='sum_in_seconds value differs')
+
+
+class SEM6000MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.metrics = SEM6000Metrics()
+        self.simulator = SimulatedSEM6000Interface(seed=0)
+        self.device = create_device(self.simulator, timeout=0.01, metrics=self.metrics)
+
+    def test_phases_are_recorded_by_command_class(self):
+        self.device.request_measurement()
+        self.device.request_measurement()
+
+        self.assertEqual(1, self.metrics.get_histogram('connect').count, 'number of connects differs')
+        self.assertEqual(1, self.metrics.get_histogram('command', AuthorizeCommand).count, 'number of AuthorizeCommand differs')
+        # the pin is sent as part of the connection only on reconnects
+        self.assertIsNone(self.metrics.get_histogram('authorize'), 'authorize phase recorded')
+
+        for phase in ['write', 'wait', 'command']:
+            self.assertEqual(2, self.metrics.get_histogram(phase, RequestMeasurementCommand).count, 'number of ' + phase + ' phases differs')
+
+        self.assertIsNone(self.metrics.get_histogram('command', RequestSettingsCommand), 'histogram of command not sent exists')
+
+    def test_counters(self):
+        self.simulator.disconnect()
+        self.device.request_measurement()
+        self.assertEqual(1, self.metrics.number_of_reconnects, 'number_of_reconnects value differs')
+        self.assertEqual(1, self.metrics.get_histogram('authorize').count, 'number of authorize phases differs')
+
+        self.simulator.drop_probability = 1
+        with self.assertRaises(Exception):
+            self.device.request_measurement()
+        self.assertEqual(1, self.metrics.number_of_timeouts, 'number_of_timeouts value differs')
+        self.assertEqual(1, self.metrics.number_of_incomplete_frames, 'number_of_incomplete_frames value differs')
+
+        self.device._delegate(None, b'\x0f\x03\x03\x00\x00\xff\xff')
+        with self.assertRaises(Exception):
+            self.device._consume_notification()
+        self.assertEqual(1, self.metrics.number_of_parse_failures, 'number_of_parse_failures value differs')
+
+    def test_prometheus_text(self):
+        self.device.request_measurement()
+        self.device.send_many([RequestMeasurementCommand()])
+
+        text = self.metrics.to_prometheus_text(labels={'device': '00:11:22:33:44:55'})
+        lines = text.splitlines()
+
+        self.assertIn('# TYPE sem6000_phase_duration_seconds histogram', lines, 'histogram type missing')
+        self.assertIn('sem6000_phase_duration_seconds_count{device="00:11:22:33:44:55",phase="write",command="RequestMeasurementCommand"} 2', lines, 'count of write phase differs')
+        self.assertIn('sem6000_phase_duration_seconds_bucket{device="00:11:22:33:44:55",phase="command",command="RequestMeasurementCommand",le="+Inf"} 1', lines, 'bucket of command phase differs')
+        self.assertIn('sem6000_phase_duration_seconds_count{device="00:11:22:33:44:55",phase="connect",command=""} 1', lines, 'count of connect phase differs')
+        self.assertIn('sem6000_timeouts_total{device="00:11:22:33:44:55"} 0', lines, 'timeouts counter differs')
+        self.assertIn('# TYPE sem6000_parse_failures_total counter', lines, 'counter type missing')
@@ -0,0 +1,227 @@
+import unittest
+
+from sem6000.adaptive_timeout import AdaptiveTimeout
+from sem6000.message import *
+from sem6000.metrics import SEM6000Metrics
+from sem6000.retry import *
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import create_device
+
+
+class DroppingSimulatedSEM6000Interface(SimulatedSEM6000Interface):
+    def __init__(self, **simulator_arguments):
+        SimulatedSEM6000Interface.__init__(self, **simulator_arguments)
+
+        self.number_of_responses_to_drop = 0
+        self.number_of_writes_to_fail = 0
+        # only commands of this class fail or are not answered, all commands if None
+        self.failing_command_class = None
+
+    def write_to_characteristic(self, uuid, data):
+        is_failing_command = self.failing_command_class is None or isinstance(self._command_parser.parse(data), self.failing_command_class)
+
+        if is_failing_command and self.number_of_writes_to_fail > 0:
+            self.number_of_writes_to_fail -= 1
+            raise Exception("Write failed")
+
+        self.drop_probability = 0
+        if is_failing_command and self.number_of_responses_to_drop > 0:
+            self.number_of_responses_to_drop -= 1
+            self.drop_probability = 1
+
+        SimulatedSEM6000Interface.write_to_characteristic(self, uuid, data)
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_retry_classes(self):
+        class CustomPowerSwitchCommand(PowerSwitchCommand):
+            pass
+
+        self.assertEqual(RETRY_CLASS_READ, get_retry_class(RequestMeasurementCommand()), 'retry class differs')
+        self.assertEqual(RETRY_CLASS_IDEMPOTENT, get_retry_class(CustomPowerSwitchCommand(on=True)), 'retry class differs')
+        self.assertEqual(RETRY_CLASS_VERIFIED, get_retry_class(RemoveSchedulerCommand(slot_id=1)), 'retry class differs')
+        self.assertEqual(RETRY_CLASS_NONE, get_retry_class(FactoryResetCommand()), 'retry class differs')
+        self.assertEqual(RETRY_CLASS_NONE, get_retry_class(object()), 'retry class differs')
+
+    def test_budget(self):
+        retry_policy = RetryPolicy(max_attempts=10, budget=2, budget_per_success=0.5)
+        command = RequestMeasurementCommand()
+
+        self.assertTrue(retry_policy.acquire_retry(command, 1), 'retry denied')
+        self.assertTrue(retry_policy.acquire_retry(command, 1), 'retry denied')
+        self.assertFalse(retry_policy.acquire_retry(command, 1), 'retry exceeds budget')
+        self.assertEqual(1, retry_policy.number_of_retries_denied_by_budget, 'number_of_retries_denied_by_budget differs')
+
+        retry_policy.record_success()
+        self.assertFalse(retry_policy.acquire_retry(command, 1), 'retry exceeds budget')
+        retry_policy.record_success()
+        self.assertTrue(retry_policy.acquire_retry(command, 1), 'retry denied')
+
+        for i in range(10):
+            retry_policy.record_success()
+        self.assertEqual(2, retry_policy.remaining_budget, 'budget exceeds its maximum')
+
+        self.assertEqual(3, retry_policy.number_of_retries, 'number_of_retries differs')
+
+    def test_max_attempts_and_retry_class(self):
+        retry_policy = RetryPolicy(max_attempts=2)
+
+        self.assertTrue(retry_policy.acquire_retry(PowerSwitchCommand(on=True), 1), 'retry denied')
+        self.assertFalse(retry_policy.acquire_retry(PowerSwitchCommand(on=True), 2), 'retry exceeds max_attempts')
+        self.assertFalse(retry_policy.acquire_retry(ChangePinCommand(pin='0000', new_pin='1234'), 1), 'command is retried')
+
+    def test_backoff(self):
+        retry_policy = RetryPolicy(initial_backoff_in_seconds=0.1, maximum_backoff_in_seconds=0.3, seed=0)
+
+        for i in range(100):
+            self.assertLessEqual(retry_policy.get_backoff(1), 0.1, 'backoff of first retry too long')
+            self.assertLessEqual(retry_policy.get_backoff(5), 0.3, 'backoff exceeds maximum')
+
+
+class SEM6000RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        self.retry_policy = RetryPolicy(seed=0, sleep=self.sleeps.append)
+        self.metrics = SEM6000Metrics()
+        self.simulator = DroppingSimulatedSEM6000Interface()
+        self.device = create_device(self.simulator, timeout=0.05, metrics=self.metrics, retry_policy=self.retry_policy)
+
+    def test_read_is_retried(self):
+        self.simulator.number_of_responses_to_drop = 2
+
+        notification = self.device.request_measurement()
+
+        self.assertIsInstance(notification, MeasurementRequestedNotification)
+        self.assertEqual(2, self.retry_policy.number_of_retries, 'number_of_retries differs')
+        self.assertEqual(2, self.metrics.number_of_retries, 'number_of_retries differs')
+        self.assertEqual(2, len(self.sleeps), 'number of backoffs differs')
+
+    def test_retries_are_limited(self):
+        self.simulator.number_of_responses_to_drop = 3
+        number_of_received_commands = self.simulator.number_of_received_commands
+
+        with self.assertRaises(Exception):
+            self.device.power_on()
+
+        self.assertEqual(3, self.simulator.number_of_received_commands - number_of_received_commands, 'number of sent commands differs')
+
+    def test_non_idempotent_command_is_not_retried(self):
+        self.simulator.number_of_responses_to_drop = 1
+        number_of_received_commands = self.simulator.number_of_received_commands
+
+        with self.assertRaises(Exception):
+            self.device.reset_consumption()
+
+        self.assertEqual(1, self.simulator.number_of_received_commands - number_of_received_commands, 'number of sent commands differs')
+
+    def test_add_scheduler_is_verified_by_read_back(self):
+        # the scheduler is added, but the response is lost
+        self.simulator.failing_command_class = AddSchedulerCommand
+        self.simulator.number_of_responses_to_drop = 1
+
+        notification = self.device.add_onetime_scheduler(True, True, '2030-01-01T10:00')
+
+        self.assertTrue(notification.was_successful, 'was_successful value differs')
+        self.assertEqual(1, self.device.request_scheduler().number_of_schedulers, 'scheduler was added twice')
+        self.assertEqual(1, self.retry_policy.number_of_verified_commands, 'number_of_verified_commands differs')
+        self.assertEqual(0, self.retry_policy.number_of_retries, 'number_of_retries differs')
+
+    def test_add_scheduler_is_retried_if_not_applied(self):
+        self.simulator.failing_command_class = AddSchedulerCommand
+        self.simulator.number_of_writes_to_fail = 1
+
+        notification = self.device.add_onetime_scheduler(True, True, '2030-01-01T10:00')
+
+        self.assertTrue(notification.was_successful, 'was_successful value differs')
+        self.assertEqual(1, self.device.request_scheduler().number_of_schedulers, 'number_of_schedulers differs')
+        self.assertEqual(0, self.retry_policy.number_of_verified_commands, 'number_of_verified_commands differs')
+        self.assertEqual(1, self.retry_policy.number_of_retries, 'number_of_retries differs')
+
+    def test_identical_scheduler_is_not_taken_as_applied(self):
+        self.device.add_onetime_scheduler(True, True, '2030-01-01T10:00')
+
+        # the second, identical scheduler is not added
+        self.simulator.failing_command_class = AddSchedulerCommand
+        self.simulator.number_of_writes_to_fail = 1
+
+        notification = self.device.add_onetime_scheduler(True, True, '2030-01-01T10:00')
+
+        self.assertTrue(notification.was_successful, 'was_successful value differs')
+        self.assertEqual(2, self.device.request_scheduler().number_of_schedulers, 'number_of_schedulers differs')
+        self.assertEqual(0, self.retry_policy.number_of_verified_commands, 'number_of_verified_commands differs')
+        self.assertEqual(1, self.retry_policy.number_of_retries, 'number_of_retries differs')
+
+    def test_identical_scheduler_is_verified_by_new_slot(self):
+        self.device.add_onetime_scheduler(True, True, '2030-01-01T10:00')
+
+        # the second, identical scheduler is added, but the response is lost
+        self.simulator.failing_command_class = AddSchedulerCommand
+        self.simulator.number_of_responses_to_drop = 1
+
+        notification = self.device.add_onetime_scheduler(True, True, '2030-01-01T10:00')
+
+        self.assertTrue(notification.was_successful, 'was_successful value differs')
+        self.assertEqual(2, self.device.request_scheduler().number_of_schedulers, 'number_of_schedulers differs')
+        self.assertEqual(1, self.retry_policy.number_of_verified_commands, 'number_of_verified_commands differs')
+        self.assertEqual(0, self.retry_policy.number_of_retries, 'number_of_retries differs')
+
+    def test_send_many_retries_unanswered_commands(self):
+        self.simulator.failing_command_class = RequestTimerStatusCommand
+        self.simulator.number_of_responses_to_drop = 1
+
+        results = self.device.send_many([RequestSettingsCommand(), RequestTimerStatusCommand(), RequestMeasurementCommand()])
+
+        self.assertIsInstance(results[0], SettingsRequestedNotification)
+        self.assertIsInstance(results[1], TimerStatusRequestedNotification)
+        self.assertIsInstance(results[2], MeasurementRequestedNotification)
+        self.assertEqual(1, self.retry_policy.number_of_retries, 'number_of_retries differs')
+        self.assertEqual(1, len(self.sleeps), 'number of backoffs differs')
+
+    def test_send_many_does_not_retry_non_idempotent_commands(self):
+        self.simulator.failing_command_class = ResetConsumptionCommand
+        self.simulator.number_of_responses_to_drop = 1
+        number_of_received_commands = self.simulator.number_of_received_commands
+
+        results = self.device.send_many([ResetConsumptionCommand(), RequestMeasurementCommand()])
+
+        self.assertIsInstance(results[0], Exception)
+        self.assertIsInstance(results[1], MeasurementRequestedNotification)
+        self.assertEqual(2, self.simulator.number_of_received_commands - number_of_received_commands, 'number of sent commands differs')
+
+    def test_scheduler_pages_are_retried(self):
+        for i in range(9):
+            self.device.add_onetime_scheduler(True, True, '2030-01-01T1' + str(i) + ':00')
+
+        scheduler_entries = self.device.iter_scheduler_entries()
+        for i in range(4):
+            next(scheduler_entries)
+
+        # the pages after the first one are pipelined, one of them is not answered at first
+        self.simulator.failing_command_class = RequestSchedulerCommand
+        self.simulator.number_of_responses_to_drop = 1
+
+        self.assertEqual(5, len(list(scheduler_entries)), 'number of scheduler entries differs')
+        self.assertEqual(1, self.retry_policy.number_of_retries, 'number_of_retries differs')
+
+    def _create_late_answering_device(self):
+        simulator = SimulatedSEM6000Interface()
+        device = create_device(simulator, timeout=AdaptiveTimeout(minimum_timeout_in_seconds=0.05, maximum_timeout_in_seconds=0.05), retry_policy=RetryPolicy(seed=0, sleep=self.sleeps.append))
+
+        # the response to the first attempt arrives after its timeout and completes the retry
+        simulator.latency_in_seconds = 0.08
+
+        return device
+
+    def test_retried_command_is_not_observed(self):
+        device = self._create_late_answering_device()
+        number_of_round_trip_times = device.adaptive_timeout.number_of_round_trip_times
+
+        self.assertIsInstance(device.request_measurement(), MeasurementRequestedNotification)
+        self.assertEqual(number_of_round_trip_times, device.adaptive_timeout.number_of_round_trip_times, 'round trip time of a retry was observed')
+
+    def test_retried_pipelined_command_is_not_observed(self):
+        device = self._create_late_answering_device()
+        number_of_round_trip_times = device.adaptive_timeout.number_of_round_trip_times
+
+        self.assertIsInstance(device.send_many([RequestMeasurementCommand()])[0], MeasurementRequestedNotification)
+        self.assertEqual(number_of_round_trip_times, device.adaptive_timeout.number_of_round_trip_times, 'round trip time of a retry was observed')
@@ -0,0 +1,79 @@
+import unittest
+
+from sem6000.encoder import MessageEncoder
+from sem6000.message import *
+from sem6000.parser import MessageParser
+from sem6000.schema import *
+
+
+class MessageSchemaTest(unittest.TestCase):
+    def _assert_checksum(self, frame, suffix=b'\xff\xff'):
+        payload = frame[2:len(frame)-len(suffix)-1]
+
+        self.assertEqual(MessageEncoder()._encode_message(payload, suffix=suffix), frame, 'frame differs')
+
+    def test_encoder_calculates_checksum(self):
+        encoder = MessageEncoder()
+
+        self._assert_checksum(SCHEMA_BY_MESSAGE_CLASS[ChangePowerLimitCommand].encode(encoder, ChangePowerLimitCommand(power_limit_in_watt=0x1234)))
+        self._assert_checksum(SCHEMA_BY_MESSAGE_CLASS[ChangeDeviceNameCommand].encode(encoder, ChangeDeviceNameCommand(new_name='Voltcraft')))
+        self._assert_checksum(SCHEMA_BY_MESSAGE_CLASS[MeasurementRequestedNotification].encode(encoder, MeasurementRequestedNotification(is_power_active=True, power_in_milliwatt=0x123456, voltage_in_volt=230, current_in_milliampere=0x0456, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=0x12345678)), suffix=b'')
+
+    def test_round_trip(self):
+        encoder = MessageEncoder()
+        parser = MessageParser(year_diff=2000)
+
+        notifications = [
+            MeasurementRequestedNotification(is_power_active=True, power_in_milliwatt=0x123456, voltage_in_volt=230, current_in_milliampere=0x0456, frequency_in_hertz=50, total_consumption_in_kilowatt_hour=0x12345678),
+            TimerStatusRequestedNotification(is_active=True, is_action_turn_on=False, target_isodatetime='2020-01-02T03:04:05', original_timer_length_in_seconds=0x012345),
+            ConsumptionOfLast23HoursRequestedNotification(consumption_n_hours_ago_in_watt_hour=list(range(24))),
+            DeviceSerialRequestedNotification(serial='ML01D10012000000'),
+        ]
+
+        for notification in notifications:
+            schema = SCHEMA_BY_MESSAGE_CLASS[type(notification)]
+            frame = schema.encode(encoder, notification)
+            payload = frame[2:len(frame)-len(schema.suffix)-1]
+
+            self.assertEqual(notification, schema.decode(parser, payload), 'notification differs')
+
+    def test_invalid_payload_length(self):
+        schema = SCHEMA_BY_MESSAGE_CLASS[PowerSwitchedNotification]
+
+        with self.assertRaises(InvalidPayloadLengthException) as context:
+            schema.decode(MessageParser(), b'\x03\x00\x00\x00')
+
+        self.assertEqual(3, context.exception.expected_payload_length, 'expected_payload_length differs')
+        self.assertEqual(4, context.exception.actual_payload_length, 'actual_payload_length differs')
+
+    def test_short_payload(self):
+        # valid checksum, but the payload of a MeasurementRequestedNotification is cut off
+        with self.assertRaises(InvalidPayloadLengthException) as context:
+            MessageParser().parse(b'\x0f\x05\x04\x00\x01\x02\x08')
+
+        self.assertEqual(MeasurementRequestedNotification, context.exception.message_class, 'message_class differs')
+        self.assertEqual(4, context.exception.actual_payload_length, 'actual_payload_length differs')
+
+    def test_checked_constant(self):
+        schema = SCHEMA_BY_MESSAGE_CLASS[PowerLimitChangedNotification]
+
+        self.assertTrue(schema.decode(MessageParser(), b'\x05\x00\x00').was_successful, 'was_successful differs')
+        with self.assertRaises(Exception):
+            schema.decode(MessageParser(), b'\x05\x00\x01')
+
+    def test_variable_field(self):
+        schema = MessageSchema(ConsumptionOfLast23HoursRequestedNotification, [Constant(b'\x0a\x00'), List('consumption_n_hours_ago_in_watt_hour', UInt16()), Padding(2)])
+        encoder = MessageEncoder()
+        parser = MessageParser()
+
+        self.assertEqual(b'\x0f\x05\x0a\x00\x00\x00\x0b\xff\xff', schema.encode(encoder, ConsumptionOfLast23HoursRequestedNotification(consumption_n_hours_ago_in_watt_hour=[])), 'frame differs')
+        self.assertEqual(b'\x0f\x07\x0a\x00\x01\x02\x00\x00\x0e\xff\xff', schema.encode(encoder, ConsumptionOfLast23HoursRequestedNotification(consumption_n_hours_ago_in_watt_hour=[0x0102])), 'frame differs')
+
+        self.assertEqual([0x0102, 0x0304], schema.decode(parser, b'\x0a\x00\x01\x02\x03\x04\x00\x00').consumption_n_hours_ago_in_watt_hour, 'consumption_n_hours_ago_in_watt_hour differs')
+        self.assertEqual([0x0506], schema.decode(parser, b'\x0a\x00\x05\x06\x00\x00').consumption_n_hours_ago_in_watt_hour, 'consumption_n_hours_ago_in_watt_hour differs')
+        # one codec for each number of elements: 0, 1 and 2
+        self.assertEqual(3, len(schema._codec_by_count), 'codecs are not reused')
+
+    def test_only_one_variable_field(self):
+        with self.assertRaises(Exception):
+            MessageSchema(DeviceSerialRequestedNotification, [Constant(b'\x11\x00'), String('serial'), List('serial', UInt8())])
@@ -0,0 +1,86 @@
+import time
+import unittest
+
+from sem6000.message import *
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import create_device
+
+
+class SendManyTest(unittest.TestCase):
+    def test_results_are_in_command_order(self):
+        device = create_device()
+
+        commands = [RequestSettingsCommand(), RequestTimerStatusCommand(), RequestRandomModeStatusCommand(), RequestSchedulerCommand(page_number=0), RequestMeasurementCommand()]
+        results = device.send_many(commands)
+
+        self.assertIsInstance(results[0], SettingsRequestedNotification)
+        self.assertIsInstance(results[1], TimerStatusRequestedNotification)
+        self.assertIsInstance(results[2], RandomModeStatusRequestedNotification)
+        self.assertIsInstance(results[3], SchedulerRequestedNotification)
+        self.assertIsInstance(results[4], MeasurementRequestedNotification)
+
+    def test_same_notification_type(self):
+        device = create_device(SimulatedSEM6000Interface(load_in_milliwatt=1000))
+
+        results = device.send_many([PowerSwitchCommand(on=True), RequestMeasurementCommand(), PowerSwitchCommand(on=False), RequestMeasurementCommand()])
+
+        self.assertTrue(results[0].was_successful, 'was_successful value differs')
+        self.assertEqual(1000, results[1].power_in_milliwatt, 'power_in_milliwatt value differs')
+        self.assertTrue(results[2].was_successful, 'was_successful value differs')
+        self.assertEqual(0, results[3].power_in_milliwatt, 'power_in_milliwatt value differs')
+
+    def test_errors(self):
+        simulator = SimulatedSEM6000Interface()
+        device = create_device(simulator)
+        simulator.drop_probability = 1
+
+        results = device.send_many([RequestSettingsCommand(), object()])
+
+        self.assertIsInstance(results[0], Exception)
+        self.assertIsInstance(results[1], Exception)
+
+    def test_pipelining_saves_round_trips(self):
+        device = create_device(SimulatedSEM6000Interface(latency_in_seconds=0.05))
+        commands = [RequestSettingsCommand(), RequestTimerStatusCommand(), RequestRandomModeStatusCommand(), RequestSchedulerCommand(page_number=0)]
+
+        start = time.monotonic()
+        results = device.send_many(commands)
+        duration = time.monotonic() - start
+
+        for result in results:
+            self.assertNotIsInstance(result, Exception)
+        self.assertLess(duration, 0.15, 'responses were not pipelined')
+
+
+class PipelinedSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.simulator = SimulatedSEM6000Interface(latency_in_seconds=0.05)
+        self.device = create_device(self.simulator, timeout=0.5)
+
+        self.simulator.latency_in_seconds = 0
+        for minute in range(13):
+            self.device.add_onetime_scheduler(is_active=True, is_action_turn_on=True, isodatetime="2030-01-01T12:" + "{:02d}".format(minute))
+        self.simulator.latency_in_seconds = 0.05
+
+    def test_request_scheduler(self):
+        start = time.monotonic()
+        notification = self.device.request_scheduler()
+        duration = time.monotonic() - start
+
+        self.assertEqual(13, notification.number_of_schedulers, 'number_of_schedulers value differs')
+        slot_ids = [entry.slot_id for entry in notification.scheduler_entries]
+        self.assertEqual(sorted(set(slot_ids)), slot_ids, 'slot ids are not sorted and unique')
+        self.assertEqual(13, len(slot_ids), 'number of scheduler entries differs')
+
+        # 1st page and 3 further pages requested at once
+        self.assertLess(duration, 0.15, 'pages were not pipelined')
+
+    def test_iter_scheduler_entries(self):
+        number_of_received_commands = self.simulator.number_of_received_commands
+
+        for entry in self.device.iter_scheduler_entries():
+            break
+
+        self.assertEqual(number_of_received_commands + 1, self.simulator.number_of_received_commands, 'further pages were requested')
+
+        self.assertEqual(13, len(list(self.device.iter_scheduler_entries())), 'number of scheduler entries differs')
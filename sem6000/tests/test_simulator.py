@@ -0,0 +1,84 @@
+import datetime
+import time
+import unittest
+
+from sem6000.sem6000 import SEM6000
+from sem6000.simulator import SimulatedSEM6000Interface
+from sem6000.tests.helpers import create_device
+
+
+class SimulatedSEM6000InterfaceTest(unittest.TestCase):
+    def test_wrong_pin(self):
+        with self.assertRaises(Exception):
+            SEM6000('00:11:22:33:44:55', '1234', timeout=0.1, bluetooth_lowenergy_interface=SimulatedSEM6000Interface(pin='0000'))
+
+    def test_power_and_measurement(self):
+        device = create_device(SimulatedSEM6000Interface(load_in_milliwatt=100000))
+
+        self.assertEqual(0, device.request_measurement().power_in_milliwatt)
+
+        device.power_on()
+        notification = device.request_measurement()
+
+        self.assertTrue(notification.is_power_active)
+        self.assertEqual(100000, notification.power_in_milliwatt)
+
+    def test_settings(self):
+        device = create_device()
+
+        device.change_prices(normal_price_in_cent=30, reduced_period_price_in_cent=20)
+        device.change_reduced_period(is_active=True, start_isotime="22:00", end_isotime="06:00")
+        device.change_power_limit(power_limit_in_watt=2000)
+        device.nightmode_on()
+
+        notification = device.request_settings()
+
+        self.assertEqual(30, notification.normal_price_in_cent)
+        self.assertEqual(20, notification.reduced_period_price_in_cent)
+        self.assertEqual(True, notification.is_reduced_period)
+        self.assertEqual("22:00", notification.reduced_period_start_isotime)
+        self.assertEqual("06:00", notification.reduced_period_end_isotime)
+        self.assertEqual(2000, notification.power_limit_in_watt)
+        self.assertEqual(True, notification.is_nightmode_active)
+
+    def test_scheduler_pages(self):
+        device = create_device()
+
+        for minute in range(6):
+            device.add_onetime_scheduler(is_active=True, is_action_turn_on=True, isodatetime="2030-01-01T10:{:02}".format(minute))
+        device.remove_scheduler(slot_id=2)
+
+        notification = device.request_scheduler()
+
+        self.assertEqual(5, notification.number_of_schedulers)
+        self.assertEqual([0, 1, 3, 4, 5], [e.slot_id for e in notification.scheduler_entries])
+        self.assertEqual("2030-01-01T10:05", notification.scheduler_entries[4].scheduler.isodatetime)
+
+    def test_consumption_history(self):
+        simulator = SimulatedSEM6000Interface()
+        device = create_device(simulator)
+
+        device.change_date_and_time("2020-06-15T12:30:00")
+        simulator.add_consumption(datetime.datetime(2020, 6, 15, 9, 0), [10, 20, 30])
+
+        notification = device.request_consumption_of_last_23_hours()
+
+        self.assertEqual([0, 30, 20, 10, 0, 0], notification.consumption_n_hours_ago_in_watt_hour[0:6])
+
+    def test_dropped_response(self):
+        simulator = SimulatedSEM6000Interface()
+        device = create_device(simulator)
+        simulator.drop_probability = 1
+
+        with self.assertRaises(Exception):
+            device.request_measurement()
+
+        self.assertEqual(1, simulator.number_of_dropped_responses)
+
+    def test_latency(self):
+        device = create_device(SimulatedSEM6000Interface(latency_in_seconds=0.02))
+
+        start = time.monotonic()
+        device.request_measurement()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.02)
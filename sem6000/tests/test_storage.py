@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from sem6000.storage import MeasurementStore
+from sem6000.stream import MeasurementSample
+from sem6000.tests.helpers import create_measurement
+
+
+class MeasurementStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store_directory = os.path.join(self.directory.name, '00_11_22_33_44_55')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_append_and_read_range(self):
+        store = MeasurementStore(self.store_directory, chunk_size=7)
+        for i in range(100):
+            store.append(create_measurement(1000 * i), timestamp=1000.0 + i)
+
+        self.assertEqual(100, len(store), 'number of samples differs')
+
+        columns = store.read_range(1010.0, 1020.0)
+        self.assertEqual([1010.0 + i for i in range(10)], list(columns['timestamp']), 'timestamps differ')
+        self.assertEqual([1000 * (10 + i) for i in range(10)], list(columns['power_in_milliwatt']), 'power_in_milliwatt values differ')
+        self.assertEqual([1] * 10, list(columns['is_power_active']), 'is_power_active values differ')
+
+        self.assertEqual(100, len(store.read_range()['voltage_in_volt']), 'number of samples differs')
+        self.assertEqual(0, len(store.read_range(2000.0)['timestamp']), 'number of samples differs')
+
+        store.close()
+
+    def test_reopen(self):
+        store = MeasurementStore(self.store_directory)
+        store.append(create_measurement(1), timestamp=1.0)
+        store.append(MeasurementSample(2.0, False, 2, 231, 0, 50, 13))
+        store.close()
+
+        store = MeasurementStore(self.store_directory)
+        self.assertEqual(2, len(store), 'number of samples differs')
+
+        with self.assertRaises(Exception):
+            store.append(create_measurement(3), timestamp=1.5)
+
+        store.append(create_measurement(3), timestamp=3.0)
+
+        columns = store.read_range()
+        self.assertEqual([1.0, 2.0, 3.0], list(columns['timestamp']), 'timestamps differ')
+        self.assertEqual([1, 0, 1], list(columns['is_power_active']), 'is_power_active values differ')
+        self.assertEqual([230, 231, 230], list(columns['voltage_in_volt']), 'voltage_in_volt values differ')
+
+        store.close()
+
+    def test_rejected_sample_is_not_appended(self):
+        store = MeasurementStore(self.store_directory)
+        store.append(create_measurement(1000), timestamp=1.0)
+
+        with self.assertRaises(OverflowError):
+            store.append(MeasurementSample(2.0, True, 2000, 230, -1, 50, 12))
+
+        self.assertEqual(1, len(store), 'number of samples differs')
+
+        store.append(create_measurement(3000), timestamp=3.0)
+
+        columns = store.read_range()
+        self.assertEqual([1.0, 3.0], list(columns['timestamp']), 'timestamps differ')
+        self.assertEqual([1000, 3000], list(columns['power_in_milliwatt']), 'power_in_milliwatt values differ')
+
+        store.close()
+
+    def test_interrupted_write_is_truncated(self):
+        store = MeasurementStore(self.store_directory)
+        store.append(create_measurement(1), timestamp=1.0)
+        store.close()
+
+        # a value without timestamp, as left by a process dying while flushing
+        with open(os.path.join(self.store_directory, 'power_in_milliwatt.I'), 'ab') as f:
+            f.write(b'\x01\x00\x00\x00')
+
+        store = MeasurementStore(self.store_directory)
+        store.append(create_measurement(2), timestamp=2.0)
+
+        self.assertEqual([1, 2], list(store.read_range()['power_in_milliwatt']), 'power_in_milliwatt values differ')
+
+        store.close()
@@ -0,0 +1,69 @@
+import unittest
+
+from sem6000.stream import MeasurementRingBuffer, MeasurementSample, MeasurementStream
+from sem6000.tests.helpers import FakeClock, create_measurement
+
+
+class FakeDevice:
+    def __init__(self, clock, round_trip_times):
+        self.clock = clock
+        self.round_trip_times = round_trip_times
+        self.number_of_requests = 0
+
+    def request_measurement(self):
+        self.clock.now += self.round_trip_times[self.number_of_requests % len(self.round_trip_times)]
+        self.number_of_requests += 1
+
+        return create_measurement(self.number_of_requests)
+
+
+class MeasurementStreamTest(unittest.TestCase):
+    def _create_stream(self, round_trip_times, **arguments):
+        clock = FakeClock(1000.0)
+        device = FakeDevice(clock, round_trip_times)
+
+        return MeasurementStream(device, clock=clock, wall_clock=clock, sleep=clock.sleep, **arguments)
+
+    def test_schedule_does_not_drift(self):
+        stream = self._create_stream([0.3], samples_per_second=1)
+
+        timestamps = [sample.timestamp for sample in stream.samples(max_number_of_samples=5)]
+
+        self.assertEqual([1000.3, 1001.3, 1002.3, 1003.3, 1004.3], [round(t, 6) for t in timestamps])
+        self.assertEqual(0, stream.number_of_missed_deadlines)
+
+    def test_missed_deadlines(self):
+        stream = self._create_stream([0.1, 2.5, 0.1, 0.1], samples_per_second=1)
+
+        timestamps = [sample.timestamp for sample in stream.samples(max_number_of_samples=4)]
+
+        # the 2nd request started at 1001 and overran the deadlines at 1002 and 1003
+        self.assertEqual([1000.1, 1003.5, 1004.1, 1005.1], [round(t, 6) for t in timestamps])
+        self.assertEqual(2, stream.number_of_missed_deadlines)
+
+    def test_history_is_bounded(self):
+        stream = self._create_stream([0.01], samples_per_second=10, history_size=3)
+
+        for sample in stream.samples(max_number_of_samples=5):
+            pass
+
+        self.assertEqual(3, len(stream.history))
+        self.assertEqual([3, 4, 5], [sample.power_in_milliwatt for sample in stream.history])
+        self.assertEqual(5, stream.history.latest().power_in_milliwatt)
+        self.assertEqual(5, stream.number_of_samples)
+
+
+class MeasurementRingBufferTest(unittest.TestCase):
+    def test_wrap_around(self):
+        ring_buffer = MeasurementRingBuffer(capacity=2)
+        self.assertIsNone(ring_buffer.latest())
+
+        for i in range(3):
+            ring_buffer.append(MeasurementSample(float(i), True, 1000 + i, 230, 5, 50, 7))
+
+        self.assertEqual(2, len(ring_buffer))
+        self.assertEqual(MeasurementSample(1.0, True, 1001, 230, 5, 50, 7), ring_buffer[0])
+        self.assertEqual(MeasurementSample(2.0, True, 1002, 230, 5, 50, 7), ring_buffer[-1])
+
+        with self.assertRaises(IndexError):
+            ring_buffer[2]
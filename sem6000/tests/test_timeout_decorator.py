@@ -0,0 +1,79 @@
+import threading
+import time
+import unittest
+
+from sem6000.bluetooth_lowenergy_interface.timeout_decorator import DisconnectAfterTimeout, Watchdog
+
+
+class FakeDisconnectable:
+    watchdog = Watchdog()
+
+    def __init__(self):
+        self.disconnected = threading.Event()
+
+    def disconnect(self):
+        self.disconnected.set()
+
+    @DisconnectAfterTimeout(0.05, watchdog=watchdog)
+    def fast_operation(self):
+        return 42
+
+    @DisconnectAfterTimeout(0.05, watchdog=watchdog)
+    def slow_operation(self):
+        time.sleep(0.2)
+
+
+class WatchdogTest(unittest.TestCase):
+    def test_callbacks_fire_in_deadline_order(self):
+        watchdog = Watchdog()
+        called = []
+
+        watchdog.register(0.06, lambda: called.append(2))
+        watchdog.register(0.02, lambda: called.append(1))
+        handle = watchdog.register(0.04, lambda: called.append(3))
+        watchdog.cancel(handle)
+
+        time.sleep(0.2)
+
+        self.assertEqual([1, 2], called, 'called callbacks differ')
+        self.assertEqual(2, watchdog.number_of_fired_deadlines, 'number_of_fired_deadlines value differs')
+        self.assertEqual(1, watchdog.number_of_cancelled_deadlines, 'number_of_cancelled_deadlines value differs')
+        self.assertEqual(0, len(watchdog), 'pending deadlines differ')
+
+    def test_blocking_callback_does_not_delay_other_callbacks(self):
+        watchdog = Watchdog()
+        is_released = threading.Event()
+        called = threading.Event()
+
+        watchdog.register(0.01, is_released.wait)
+        watchdog.register(0.02, called.set)
+
+        try:
+            self.assertTrue(called.wait(1), 'callback was delayed by a blocking callback')
+        finally:
+            is_released.set()
+
+    def test_cancelled_entries_are_compacted(self):
+        watchdog = Watchdog()
+
+        for i in range(1000):
+            watchdog.cancel(watchdog.register(300, lambda: None))
+
+        self.assertEqual(0, len(watchdog), 'pending deadlines differ')
+        self.assertLess(len(watchdog._deadlines), 100, 'cancelled entries were not removed')
+
+
+class DisconnectAfterTimeoutTest(unittest.TestCase):
+    def test_operations(self):
+        disconnectable = FakeDisconnectable()
+        number_of_threads = threading.active_count()
+
+        for i in range(100):
+            self.assertEqual(42, disconnectable.fast_operation(), 'return value differs')
+
+        self.assertLessEqual(threading.active_count(), number_of_threads + 1, 'too many threads started')
+        self.assertFalse(disconnectable.disconnected.is_set(), 'fast operation was disconnected')
+
+        disconnectable.slow_operation()
+
+        self.assertTrue(disconnectable.disconnected.is_set(), 'slow operation was not disconnected')
@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+
+import signal
+import sys
+
+from sem6000.daemon import SEM6000Daemon
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] in ['-h', '--help']):
+        print("Usage:", file=sys.stderr)
+        print("\t" + sys.argv[0] + " [<socket_path>]", file=sys.stderr)
+        print("\t\tsocket_path:\tPath of the unix domain socket to serve on. Default: $XDG_RUNTIME_DIR/sem6000d.sock", file=sys.stderr)
+        sys.exit(1)
+
+    socket_path = None
+    if len(sys.argv) == 2:
+        socket_path = sys.argv[1]
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt()
+
+    signal.signal(signal.SIGTERM, stop)
+
+    daemon = SEM6000Daemon(socket_path, debug=True)
+    print("serving on " + daemon.socket_path, file=sys.stderr)
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass